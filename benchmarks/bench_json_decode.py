@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de decodificación de páginas de /exchange/v1/market/items.
+
+Compara el decodificador de la librería estándar con orjson, con y sin proyección de
+campos (ResponseDecoder), midiendo tiempo por página, pico de memoria durante la
+decodificación y memoria retenida por la página ya decodificada (tracemalloc).
+
+Uso:
+    python benchmarks/bench_json_decode.py --offers 100 --pages 200
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.json_codec import ResponseDecoder, ORJSON_AVAILABLE
+
+ENDPOINT = "/exchange/v1/market/items"
+
+
+def synthetic_offer(rng: random.Random, index: int) -> dict:
+    """Oferta con la forma (y el peso) de un objeto real de market/items."""
+    price = rng.randint(5, 500000)
+    asset_id = f"{rng.getrandbits(128):032x}"
+    return {
+        "itemId": asset_id,
+        "type": "dmarket",
+        "amount": 1,
+        "classId": f"{rng.getrandbits(40)}:{rng.getrandbits(30)}",
+        "gameId": "a8db",
+        "gameType": "steam",
+        "inMarket": True,
+        "lockStatus": False,
+        "title": f"AK-47 | Redline (Field-Tested) #{index % 50}",
+        "description": "Este ítem ha sido pintado con un patrón de fibra de carbono y detalles en rojo. " * 2,
+        "tags": ["Rifle", "Classified", "Field-Tested", "Normal"],
+        "image": f"https://cdn.dmarket.com/{asset_id}/image.png?size=512x384&fit=contain&bg=transparent",
+        "price": {"DMC": str(price * 2), "USD": str(price)},
+        "instantPrice": {"DMC": "0", "USD": "0"},
+        "exchangePrice": {"DMC": "0", "USD": "0"},
+        "suggestedPrice": {"DMC": str(price * 2), "USD": str(int(price * 1.1))},
+        "recommendedPrice": {
+            "offerPrice": {"DMC": str(price * 2), "USD": str(price)},
+            "d3": {"DMC": str(price * 2), "USD": str(price)},
+            "d7": {"DMC": str(price * 2), "USD": str(price)},
+            "d7Plus": {"DMC": str(price * 2), "USD": str(price)}
+        },
+        "assetId": asset_id,
+        "offerId": f"{rng.getrandbits(128):032x}",
+        "status": "active",
+        "discount": rng.randint(0, 30),
+        "createdAt": 1700000000 + index,
+        "extra": {
+            "nameColor": "D2D2D2", "backgroundColor": "000000", "tradable": True, "offerId": "",
+            "isNew": False, "gameId": "a8db", "name": "AK-47 | Redline",
+            "categoryPath": "rifle/ak-47", "viewAtSteam": f"steam://rungame/730/{rng.getrandbits(60)}",
+            "groupId": f"{rng.getrandbits(64):016x}", "linkId": f"{rng.getrandbits(64):016x}",
+            "exterior": "field-tested", "quality": "normal", "category": "normal",
+            "tradeLockDuration": 0, "itemType": "rifle",
+            "floatValue": rng.random(), "paintSeed": rng.randint(0, 999), "paintIndex": 282,
+            "collection": ["The Phoenix Collection"], "saleRestricted": False,
+            "inspectInGame": f"steam://rungame/730/76561202255233023/+csgo_econ_action_preview%20{rng.getrandbits(60)}"
+        },
+        "float": f"{rng.random():.8f}",
+        "paintseed": rng.randint(0, 999),
+        "stickers": []
+    }
+
+
+def synthetic_page(rng: random.Random, offers: int) -> bytes:
+    page = {
+        "objects": [synthetic_offer(rng, i) for i in range(offers)],
+        "total": {"offers": 5000, "items": 5000},
+        "cursor": "eyJvZmZzZXQiOjEwMH0="
+    }
+    return json.dumps(page).encode("utf-8")
+
+
+def _retained_size(decoder: ResponseDecoder, raw: bytes) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = decoder.decode(raw, ENDPOINT)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del data
+    return retained
+
+
+def _peak(decoder: ResponseDecoder, raw: bytes) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    decoder.decode(raw, ENDPOINT)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, default=100, help="Ofertas por página")
+    parser.add_argument("--pages", type=int, default=200, help="Páginas decodificadas por variante")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [synthetic_page(rng, args.offers) for _ in range(min(args.pages, 20))]
+    avg_bytes = sum(len(p) for p in pages) / len(pages)
+    print(f"Página: {args.offers} ofertas, {avg_bytes / 1024:.1f} KiB de JSON")
+
+    variants = [("json", False), ("json", True)]
+    if ORJSON_AVAILABLE:
+        variants += [("orjson", False), ("orjson", True)]
+    else:
+        print("orjson no instalado: solo se mide el decodificador estándar")
+
+    print(f"{'decodificador':<14}{'proyección':<12}{'ms/página':>10}{'pico KiB':>11}{'retenido KiB':>14}")
+    for name, project in variants:
+        decoder = ResponseDecoder(name, project_fields=project)
+        for raw in pages[:3]:
+            decoder.decode(raw, ENDPOINT)  # calentamiento
+        start = time.perf_counter()
+        for i in range(args.pages):
+            decoder.decode(pages[i % len(pages)], ENDPOINT)
+        per_page_ms = (time.perf_counter() - start) * 1000.0 / args.pages
+        peak = _peak(decoder, pages[0])
+        retained = _retained_size(decoder, pages[0])
+        print(f"{name:<14}{'sí' if project else 'no':<12}{per_page_ms:>10.3f}{peak / 1024:>11.1f}{retained / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark reproducible de StrategyEngine.run_strategies sobre tráfico grabado.
+
+1. Grabar una sesión real (o contra el stand-in):
+       DMARKET_RECORD_TRAFFIC=traffic.jsonl.gz python trading_real_consola.py
+2. Reproducirla sin red:
+       python benchmarks/bench_replay.py traffic.jsonl.gz --timing none --repeat 5
+       python benchmarks/bench_replay.py traffic.jsonl.gz --timing scaled --time-scale 0.1 --profile
+       python benchmarks/bench_replay.py traffic.jsonl.gz --timing original --workers 1   # secuencial
+"""
+
+import argparse
+import cProfile
+import logging
+import os
+import pstats
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dmarket_connector import DMarketAPI
+from core.market_analyzer import MarketAnalyzer
+from core.response_cache import ResponseCache
+from core.strategy_engine import StrategyEngine
+from core.traffic_recorder import TrafficReplayer
+
+
+def run_once(path: str, timing: str, time_scale: float, max_items: int, workers: int) -> float:
+    replayer = TrafficReplayer(path, timing=timing, time_scale=time_scale)
+    api = DMarketAPI(replayer=replayer, response_cache=ResponseCache(enabled=False))
+    engine = StrategyEngine(api, MarketAnalyzer(), {"scan_workers": workers})
+    titles = replayer.titles()[:max_items] if max_items else replayer.titles()
+
+    start = time.perf_counter()
+    opportunities = engine.run_strategies(titles)
+    elapsed = time.perf_counter() - start
+
+    found = sum(len(opps) for opps in opportunities.values())
+    print(f"{len(titles)} títulos, {found} oportunidades en {elapsed:.3f}s "
+          f"(replay: {replayer.get_stats()})")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Log .jsonl.gz generado por TrafficRecorder")
+    parser.add_argument("--timing", choices=["original", "scaled", "none"], default="none")
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--max-items", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8, help="scan_workers de StrategyEngine (1 = secuencial)")
+    parser.add_argument("--profile", action="store_true", help="Perfilar una ejecución con cProfile")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        run_once(args.path, args.timing, args.time_scale, args.max_items, args.workers)
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        return
+
+    timings = [run_once(args.path, args.timing, args.time_scale, args.max_items, args.workers)
+               for _ in range(args.repeat)]
+    print(f"run_strategies: mediana {statistics.median(timings):.3f}s, "
+          f"mín {min(timings):.3f}s, máx {max(timings):.3f}s ({len(timings)} ejecuciones)")
+
+
+if __name__ == "__main__":
+    main()
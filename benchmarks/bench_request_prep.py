@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de la preparación de peticiones (sin red).
+
+Mide peticiones/s de DMarketAPI._prepare_request (query ordenada, cuerpo compacto,
+firma Ed25519 y cabeceras) frente a la versión anterior (crypto_sign del mensaje
+completo y logging formateado siempre), por separado para la firma, la codificación
+y la preparación completa de un GET de market/items y un POST de compra.
+
+Uso:
+    python benchmarks/bench_request_prep.py --seconds 2
+    python benchmarks/bench_request_prep.py --debug   # con logging DEBUG activo
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Callable
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nacl.bindings import crypto_sign
+
+from core.dmarket_connector import DMarketAPI, SIGNATURE_PREFIX
+from core.dmarket_standin import generate_keypair
+from core.request_signing import Ed25519Signer, CRYPTOGRAPHY_AVAILABLE
+from core.response_cache import ResponseCache
+
+legacy_logger = logging.getLogger("core.dmarket_connector")
+
+MARKET_PARAMS = {
+    "gameId": "a8db", "limit": 100, "currency": "USD", "orderBy": "price", "orderDir": "asc",
+    "title": "AK-47 | Redline (Field-Tested)", "priceFrom": None, "priceTo": 2500, "cursor": None
+}
+BUY_BODY = {"offers": [{"offerId": f"offer-{i:04d}", "price": {"amount": "1234", "currency": "USD"}, "type": "dmarket"}
+                       for i in range(10)]}
+
+
+def legacy_prepare(api: DMarketAPI, method: str, endpoint: str, params=None, body_data=None) -> dict:
+    """Reimplementación de la preparación previa, como referencia."""
+    full_url = f"{api.base_url}{endpoint}"
+    timestamp_str = str(int(time.time()))
+    path_for_sig = endpoint
+    if params:
+        active_params = {k: v for k, v in params.items() if v is not None}
+        if active_params:
+            path_for_sig += "?" + urlencode(sorted(active_params.items()))
+    body_str_for_sig = json.dumps(body_data, separators=(',', ':')) if body_data is not None else ""
+    string_to_sign = method.upper() + path_for_sig + body_str_for_sig + timestamp_str
+    legacy_logger.debug(f"String para Firmar: {string_to_sign}")
+    signature_hex = crypto_sign(string_to_sign.encode('utf-8'), api.secret_key_bytes)[:64].hex()
+    headers = {
+        "X-Api-Key": api.public_key,
+        "X-Sign-Date": timestamp_str,
+        "X-Request-Sign": SIGNATURE_PREFIX + signature_hex,
+        "Accept": "application/json"
+    }
+    if method.upper() in ["POST", "PATCH", "PUT"] and body_data is not None:
+        headers["Content-Type"] = "application/json; charset=utf-8"
+    legacy_logger.debug(f"Petición: {method.upper()} {full_url}")
+    legacy_logger.debug(f"  Headers: {headers}")
+    if params: legacy_logger.debug(f"  Query Params (para URL): {params}")
+    if body_data: legacy_logger.debug(f"  JSON Body (para request): {body_data}")
+    return {"method": method.upper(), "url": full_url, "params": params, "json": body_data, "headers": headers}
+
+
+def rate(fn: Callable[[], object], seconds: float) -> float:
+    """Llamadas por segundo de fn durante ~seconds."""
+    for _ in range(200):
+        fn()  # calentamiento
+    calls = 0
+    batch = 500
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls / (now - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="Duración de cada medida")
+    parser.add_argument("--debug", action="store_true", help="Activar logging DEBUG (a un handler nulo)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.debug:
+        logging.getLogger("core").setLevel(logging.DEBUG)
+        logging.getLogger().handlers = [logging.NullHandler()]
+
+    public_key, secret_key = generate_keypair()
+    api = DMarketAPI(public_key=public_key, secret_key=secret_key, response_cache=ResponseCache(enabled=False))
+    message = b"GET/exchange/v1/market/items?currency=USD&gameId=a8db&limit=100&orderBy=price1700000000"
+    secret = api.secret_key_bytes
+
+    nacl_signer = Ed25519Signer(secret, backend="nacl")
+    cases = [
+        ("firma crypto_sign (anterior)", lambda: crypto_sign(message, secret)[:64]),
+        ("firma nacl", lambda: nacl_signer.sign(message)),
+    ]
+    if CRYPTOGRAPHY_AVAILABLE:
+        fast_signer = Ed25519Signer(secret, backend="cryptography")
+        cases.append(("firma cryptography", lambda: fast_signer.sign(message)))
+    else:
+        print("cryptography no instalado: se usa el backend nacl")
+    cases += [
+        ("codificación query", lambda: urlencode(sorted((k, v) for k, v in MARKET_PARAMS.items() if v is not None))),
+        ("codificación cuerpo", lambda: json.dumps(BUY_BODY, separators=(',', ':')).encode("utf-8")),
+        ("GET market/items (anterior)", lambda: legacy_prepare(api, "GET", "/exchange/v1/market/items", MARKET_PARAMS)),
+        ("GET market/items", lambda: api._prepare_request("GET", "/exchange/v1/market/items", MARKET_PARAMS)),
+        ("POST buy-offers (anterior)", lambda: legacy_prepare(api, "POST", "/exchange/v1/buy-offers", body_data=BUY_BODY)),
+        ("POST buy-offers", lambda: api._prepare_request("POST", "/exchange/v1/buy-offers", body_data=BUY_BODY)),
+    ]
+
+    print(f"Backend de firma del conector: {api.signer.backend}; DEBUG {'activo' if args.debug else 'inactivo'}")
+    print(f"{'caso':<32}{'ops/s':>12}{'µs/op':>10}")
+    for name, fn in cases:
+        ops = rate(fn, args.seconds)
+        print(f"{name:<32}{ops:>12,.0f}{1e6 / ops:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput de escaneo y latencia de ejecución contra el stand-in local de DMarket.
+
+Uso:
+    python benchmarks/bench_standin.py --titles 200 --latency-ms 40 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dmarket_standin import DMarketStandInServer, StandInConfig
+from core.dmarket_connector import DMarketAPI
+from core.async_dmarket_connector import AsyncDMarketAPI
+from core.rate_limiter import RateLimiter, EndpointFamily
+from core.response_cache import ResponseCache
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--buys", type=int, default=50)
+    args = parser.parse_args()
+
+    config = StandInConfig(titles=args.titles, latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms)
+    # Sin límite de tasa efectivo: se mide el conector, no el presupuesto de la API real
+    budgets = {family: (10_000.0, 10_000.0) for family in EndpointFamily}
+
+    with DMarketStandInServer(config) as server:
+        titles = server.market.titles()
+
+        api = DMarketAPI(server.public_key, server.secret_key, base_url=server.base_url,
+                         rate_limiter=RateLimiter(budgets), response_cache=ResponseCache(enabled=False))
+        start = time.perf_counter()
+        for title in titles:
+            api.get_offers_by_title(title)
+            api.get_buy_offers(title)
+        sync_elapsed = time.perf_counter() - start
+        print(f"Escaneo síncrono:  {len(titles)} títulos en {sync_elapsed:.2f}s "
+              f"({len(titles) / sync_elapsed:.1f} títulos/s)")
+
+        async def _scan_async() -> float:
+            async with AsyncDMarketAPI(server.public_key, server.secret_key, base_url=server.base_url,
+                                       max_concurrency=args.concurrency, rate_limiter=RateLimiter(budgets),
+                                       response_cache=ResponseCache(enabled=False)) as async_api:
+                t0 = time.perf_counter()
+                await async_api.get_item_books(titles)
+                return time.perf_counter() - t0
+
+        async_elapsed = asyncio.run(_scan_async())
+        print(f"Escaneo asíncrono: {len(titles)} títulos en {async_elapsed:.2f}s "
+              f"({len(titles) / async_elapsed:.1f} títulos/s, concurrencia {args.concurrency})")
+
+        latencies = []
+        for title in titles[:args.buys]:
+            offers = api.get_offers_by_title(title, limit=1).get("objects") or []
+            if not offers:
+                continue
+            offer = offers[0]
+            t0 = time.perf_counter()
+            api.buy_item(offer["assetId"], int(offer["price"]["USD"]) / 100.0)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+        if latencies:
+            print(f"Latencia de compra: n={len(latencies)} p50={statistics.median(latencies):.1f}ms "
+                  f"p95={_percentile(latencies, 95):.1f}ms max={max(latencies):.1f}ms")
+        print(f"Transporte: {api.get_transport_stats()}")
+        print(f"Stand-in: {server.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark y verificación cruzada de los kernels NumPy de core/vectorized_strategies.py.
+
+Genera libros sintéticos (por defecto 100k ofertas repartidas en 100 títulos) y compara,
+para snipes, flips por atributos y trade lock:
+  - las estrategias escalares de StrategyEngine, título a título;
+  - los kernels sobre todos los títulos apilados en un único OfferColumns;
+  - StrategyEngine con los kernels activados por título (vectorized_min_offers=1).
+Las tres variantes deben encontrar exactamente las mismas ofertas con el mismo beneficio
+en centavos; si no, el script termina con error.
+
+Uso:
+    python benchmarks/bench_vectorized_strategies.py --offers 100000 --titles 100
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.market_analyzer import MarketAnalyzer
+from core.order_book import OrderBook
+from core.strategy_engine import StrategyEngine, DEFAULT_GAME_ID
+from core.vectorized_strategies import (
+    NUMPY_AVAILABLE, FeeSchedule, OfferColumns, snipe_kernel, attribute_flip_kernel, trade_lock_kernel
+)
+
+FEE_DATA = {"feeRate": {"amount": "0.05"}, "minCommission": {"amount": "1"}}
+
+
+def synthetic_items(rng: random.Random, titles: int, offers: int) -> list:
+    """item_data de `titles` títulos con `offers` ofertas en total, con OrderBook ya construido."""
+    items = []
+    per_title = max(1, offers // titles)
+    for t in range(titles):
+        title = f"AK-47 | Synthetic {t} (Field-Tested)"
+        base_cents = rng.randint(30, 20000)
+        raw_offers = []
+        for i in range(per_title):
+            offer = {
+                "assetId": f"{t:04d}-{i:06d}",
+                "title": title,
+                "price": {"USD": str(max(1, int(base_cents * rng.uniform(0.6, 1.3))))},
+                "float": rng.random() ** 2,
+                "paintseed": rng.randint(0, 1000)
+            }
+            if rng.random() < 0.3:
+                offer["tradeLock"] = {"daysRemaining": rng.randint(1, 21)}
+            raw_offers.append(offer)
+        historical = [{"price_usd": base_cents / 100.0 * rng.uniform(0.95, 1.1)} for _ in range(10)]
+        items.append({
+            "title": title,
+            "current_sell_offers": raw_offers,
+            "current_buy_orders": [],
+            "historical_prices": historical,
+            "order_book": OrderBook.from_raw(title, raw_offers)
+        })
+    return items
+
+
+def make_engine(vectorized_min_offers: int) -> StrategyEngine:
+    engine = StrategyEngine(None, MarketAnalyzer(), {
+        "vectorized_min_offers": vectorized_min_offers,
+        "attribute_server_filters": False
+    })
+    engine._fee_cache[DEFAULT_GAME_ID] = {"data": FEE_DATA, "timestamp": datetime.now(timezone.utc)}
+    engine.dmarket_fee_info = {"gameId": DEFAULT_GAME_ID}
+    return engine
+
+
+def run_engine(engine: StrategyEngine, items: list) -> dict:
+    """Hallazgos {estrategia: {(título, assetId, beneficio en centavos)}} y segundos por estrategia."""
+    found = {"snipes": set(), "attribute_flips": set(), "trade_lock_arbitrage": set()}
+    timings = {}
+
+    start = time.perf_counter()
+    for item in items:
+        for opp in engine._find_snipes(item["title"], item["order_book"], item["historical_prices"]):
+            found["snipes"].add((opp["item_title"], opp["asset_id"], round(opp["profit_usd"] * 100)))
+    timings["snipes"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in items:
+        for opp in engine._find_attribute_premium_flips(item, engine.dmarket_fee_info, engine.analyzer):
+            found["attribute_flips"].add((opp["item_title"], opp["asset_id"], round(opp["potential_profit_usd"] * 100)))
+    timings["attribute_flips"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in items:
+        for opp in engine._find_trade_lock_opportunities(item, engine.dmarket_fee_info):
+            found["trade_lock_arbitrage"].add((opp["item_title"], opp["asset_id"], round(opp["potential_profit_usd"] * 100)))
+    timings["trade_lock_arbitrage"] = time.perf_counter() - start
+    return {"found": found, "timings": timings}
+
+
+def run_stacked(engine: StrategyEngine, items: list) -> dict:
+    """Los tres kernels sobre todos los títulos apilados."""
+    config = engine.config
+    fees = FeeSchedule.from_fee_data(FEE_DATA)
+    timings = {}
+
+    start = time.perf_counter()
+    columns = OfferColumns.from_books([item["order_book"] for item in items])
+    timings["columnas"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns.score_attributes(engine.analyzer, config["max_price_usd_attribute_flip"])
+    timings["rareza (Python)"] = time.perf_counter() - start
+
+    # PME por título (también es el precio base de los flips por atributos)
+    pme = [engine.analyzer.calculate_estimated_market_price(item["title"], item["historical_prices"], item["order_book"])
+           for item in items]
+
+    def keys(hits) -> set:
+        return {(columns.titles[columns.title_index[i]], columns.offers[i].asset_id, p)
+                for i, p in zip(hits.index.tolist(), hits.profit_cents.tolist())}
+
+    found = {}
+    start = time.perf_counter()
+    hits = snipe_kernel(columns, pme, fees, config["min_price_usd_for_sniping"], config["snipe_discount_percentage"])
+    timings["snipes"] = time.perf_counter() - start
+    found["snipes"] = keys(hits)
+
+    start = time.perf_counter()
+    hits = attribute_flip_kernel(
+        columns, pme, fees, config["max_price_usd_attribute_flip"], config["min_rarity_score_for_premium"],
+        config["min_premium_multiplier"], config["min_profit_usd_attribute_flip"],
+        config["min_profit_percentage_attribute_flip"]
+    )
+    timings["attribute_flips"] = time.perf_counter() - start
+    found["attribute_flips"] = keys(hits)
+
+    start = time.perf_counter()
+    hits = trade_lock_kernel(
+        columns, fees, config["max_trade_lock_days"], config["trade_lock_discount_threshold"],
+        config["min_profit_usd_trade_lock"], config["min_profit_percentage_trade_lock"]
+    )
+    timings["trade_lock_arbitrage"] = time.perf_counter() - start
+    found["trade_lock_arbitrage"] = keys(hits)
+    return {"found": found, "timings": timings}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, default=100000, help="Ofertas en total")
+    parser.add_argument("--titles", type=int, default=100, help="Títulos entre los que se reparten")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if not NUMPY_AVAILABLE:
+        sys.exit("numpy no está instalado")
+
+    items = synthetic_items(random.Random(args.seed), args.titles, args.offers)
+    total = sum(len(item["order_book"]) for item in items)
+    print(f"{total} ofertas en {len(items)} títulos")
+
+    variants = [
+        ("escalar", lambda: run_engine(make_engine(0), items)),
+        ("engine+kernels", lambda: run_engine(make_engine(1), items)),
+        ("apilado", lambda: run_stacked(make_engine(0), items)),
+    ]
+    results = {}
+    for name, run in variants:
+        runs = [run() for _ in range(args.repeat)]
+        results[name] = runs[0]["found"]
+        medians = {key: statistics.median(r["timings"][key] for r in runs) for key in runs[0]["timings"]}
+        print(f"{name}: " + ", ".join(f"{key} {seconds * 1000:.1f}ms" for key, seconds in medians.items()))
+
+    reference = results["escalar"]
+    ok = True
+    for name in ("engine+kernels", "apilado"):
+        for strategy, expected in reference.items():
+            got = results[name][strategy]
+            status = "OK" if got == expected else f"DIFERENTE (faltan {len(expected - got)}, sobran {len(got - expected)})"
+            ok &= got == expected
+            print(f"{name:<16}{strategy:<22}{len(got):>7} hallazgos  {status}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,590 @@
+# core/async_dmarket_connector.py
+"""
+Variante asíncrona (asyncio + aiohttp) del conector de DMarket.
+Reutiliza la firma Ed25519 y la construcción de peticiones de DMarketAPI,
+pero permite tener muchas peticiones en vuelo sobre un único event loop
+con un límite de concurrencia configurable.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable, AsyncIterator
+
+import aiohttp
+from yarl import URL
+
+from core.dmarket_connector import (
+    DMarketAPI, SIGNATURE_PREFIX, StopPredicate, split_page_at_stop, chunked, map_batch_results, usd_to_cents,
+    AGGREGATED_PRICES_ENDPOINT, _aggregated_prices_body, merge_aggregated_prices, mark_price
+)
+from core.rate_limiter import RateLimiter, get_shared_rate_limiter
+from core.request_coalescer import RequestCoalescer
+from core.response_cache import ResponseCache
+from core.traffic_recorder import TrafficRecorder, TrafficReplayer
+from core.json_codec import ResponseDecoder
+from core.resilience import RetryPolicy, CircuitBreakerRegistry
+from core.request_scheduler import RequestScheduler, LoadShed, resolve_priority
+from core.connector_metrics import ConnectorMetrics
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+__all__ = ["AsyncDMarketAPI", "SIGNATURE_PREFIX"]
+
+
+class AsyncDMarketAPI(DMarketAPI):
+    """
+    Conector asíncrono para la API de DMarket.
+
+    Expone la misma superficie de métodos que DMarketAPI (get_market_items,
+    get_offers_by_title, buy_item, ...) pero como corutinas. Un semáforo limita
+    el número de peticiones simultáneas en vuelo.
+
+    Uso:
+        async with AsyncDMarketAPI(max_concurrency=20) as api:
+            books = await api.get_offers_by_titles(["AK-47 | Redline (Field-Tested)", ...])
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 10
+
+    def __init__(self, public_key: str = None, secret_key: str = None,
+                 timeout: int = DMarketAPI.DEFAULT_TIMEOUT,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_429_retries: int = DMarketAPI.DEFAULT_MAX_429_RETRIES,
+                 request_coalescer: Optional[RequestCoalescer] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 base_url: Optional[str] = None,
+                 recorder: Optional[TrafficRecorder] = None,
+                 replayer: Optional[TrafficReplayer] = None,
+                 response_decoder: Optional[ResponseDecoder] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+                 request_scheduler: Optional[RequestScheduler] = None,
+                 metrics: Optional[ConnectorMetrics] = None):
+        """
+        Inicializa el conector asíncrono.
+
+        Args:
+            public_key (str, optional): Clave API pública.
+            secret_key (str, optional): Clave API secreta (hexadecimal de 128 caracteres).
+            timeout (int, optional): Tiempo máximo para cada solicitud.
+            max_concurrency (int, optional): Máximo de peticiones simultáneas en vuelo.
+            rate_limiter (RateLimiter, optional): Limitador de tasa; por defecto el compartido del proceso.
+            max_429_retries (int, optional): Reintentos ante HTTP 429.
+            request_coalescer (RequestCoalescer, optional): Coalescencia de lecturas de market/items.
+            response_cache (ResponseCache, optional): Caché TTL de lecturas GET.
+            base_url (str, optional): URL base de la API (ver DMarketAPI).
+            recorder / replayer (optional): Grabación y reproducción de tráfico (ver DMarketAPI).
+            response_decoder (ResponseDecoder, optional): Decodificador JSON de las respuestas.
+            retry_policy / circuit_breakers (optional): Reintentos de GET y circuit breakers (ver DMarketAPI).
+            request_scheduler (RequestScheduler, optional): Planificador por prioridad; por defecto
+                uno propio con max_in_flight=max_concurrency, de modo que las compras adelantan
+                también a las lecturas que esperan hueco de concurrencia.
+            metrics (ConnectorMetrics, optional): Métricas por endpoint (ver DMarketAPI).
+
+        Raises:
+            ValueError: Si las claves no son válidas o max_concurrency < 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser >= 1")
+        super().__init__(public_key=public_key, secret_key=secret_key, timeout=timeout,
+                         rate_limiter=rate_limiter, max_429_retries=max_429_retries,
+                         request_coalescer=request_coalescer, response_cache=response_cache,
+                         base_url=base_url, recorder=recorder, replayer=replayer,
+                         response_decoder=response_decoder, retry_policy=retry_policy,
+                         circuit_breakers=circuit_breakers, metrics=metrics,
+                         request_scheduler=request_scheduler or RequestScheduler(
+                             rate_limiter or get_shared_rate_limiter(), max_in_flight=max_concurrency))
+        self.max_concurrency = max_concurrency
+
+    def _create_session(self):
+        """La ClientSession de aiohttp debe crearse dentro de un event loop; se crea perezosamente."""
+        return None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Devuelve la ClientSession activa, creándola si es necesario."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=self.transport_config.keepalive_idle_sec
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self.session
+
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """Versión asíncrona de DMarketAPI.warm_up: abre conexiones en paralelo con pings HEAD."""
+        session = await self._get_session()
+        url = f"{self.base_url}{self.transport_config.warm_path}"
+
+        async def _ping() -> bool:
+            try:
+                async with session.head(url):
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Ping de calentamiento fallido: {e}")
+                return False
+
+        count = max(1, connections or self.transport_config.warm_connections)
+        return sum(await asyncio.gather(*(_ping() for _ in range(count))))
+
+    async def close(self) -> None:
+        """Cierra la sesión HTTP subyacente."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self) -> "AsyncDMarketAPI":
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _make_request(
+        self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, body_data: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Realiza una petición HTTP asíncrona a la API de DMarket con firma Ed25519.
+        Devuelve los mismos dicts de error que DMarketAPI._make_request y aplica
+        el mismo rate limiting, manejo de 429 y grabación/replay de tráfico.
+        """
+        if self.replayer is not None:
+            return await self.replayer.replay_async(method, endpoint, params, body_data)
+
+        started_at = time.monotonic()
+        result = await self._request_with_retries(method, endpoint, params, body_data)
+        if self.recorder is not None:
+            self.recorder.record(method, endpoint, params, body_data, result, started_at, time.monotonic() - started_at)
+        return result
+
+    async def _request_with_retries(
+        self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, body_data: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI._request_with_retries."""
+        family = self.rate_limiter.family_for(method, endpoint)
+        priority = resolve_priority(method, endpoint)
+        breaker = self.circuit_breakers.get(method, endpoint) if self.circuit_breakers.enabled else None
+        attempt = 0
+        retries = 0
+        while True:
+            if breaker is not None and not breaker.allow():
+                return breaker.open_error()
+            try:
+                await self.request_scheduler.acquire_async(family, priority)
+            except LoadShed as e:
+                if breaker is not None:
+                    breaker.release()
+                return self._load_shed_error(e)
+            try:
+                # Firmar justo antes de enviar para que X-Sign-Date no envejezca en la cola
+                started = time.perf_counter()
+                prepared = self._prepare_request(method, endpoint, params, body_data)
+                if "error" in prepared:
+                    if breaker is not None:
+                        breaker.release()
+                    return prepared
+
+                sample = {"sign": time.perf_counter() - started}
+                result, response_headers = await self._send_prepared(prepared, sample)
+                sample["total"] = time.perf_counter() - started
+            finally:
+                self.request_scheduler.release()
+            self.metrics.record(method, endpoint, result, sample)
+            self.rate_limiter.update_from_headers(family, response_headers)
+            if breaker is not None:
+                breaker.record(result)
+
+            if self._is_rate_limited(result) and attempt < self.max_429_retries:
+                delay = self.rate_limiter.register_429(family, response_headers, attempt)
+                logger.warning(f"HTTP 429 en {method.upper()} {endpoint}. Reintento {attempt + 1}/{self.max_429_retries} en {delay:.2f}s.")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if self.retry_policy.should_retry(method, result, retries, endpoint):
+                delay = self.retry_policy.backoff_delay(retries)
+                retries += 1
+                logger.warning(f"{result.get('error')} en {method.upper()} {endpoint}. Reintento {retries}/{self.retry_policy.max_retries} en {delay:.2f}s.")
+                await asyncio.sleep(delay)
+                continue
+            return result
+
+    async def _coalesced_get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI._coalesced_get."""
+        return await self.response_cache.get_async(endpoint, params, lambda: self.request_coalescer.do_async(
+            endpoint, params, lambda: self._make_request(method="GET", endpoint=endpoint, params=params)
+        ))
+
+    async def _cached_get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI._cached_get."""
+        return await self.response_cache.get_async(
+            endpoint, params, lambda: self._make_request(method="GET", endpoint=endpoint, params=params)
+        )
+
+    async def _send_prepared(
+        self, prepared: Dict[str, Any], sample: Optional[Dict[str, float]] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, str]]]:
+        """
+        Envía una petición ya firmada con aiohttp.
+
+        Args:
+            sample: Ver DMarketAPI._send_prepared.
+
+        Returns:
+            Tupla (resultado, cabeceras de la respuesta o None si no hubo respuesta).
+        """
+        sample = sample if sample is not None else {}
+        started = time.perf_counter()
+        try:
+            session = await self._get_session()
+            async with session.request(
+                prepared["method"],
+                # encoded=True: la query ya va codificada y ordenada tal como se firmó
+                URL(prepared["url"], encoded=True),
+                data=prepared["body"],
+                headers=prepared["headers"]
+            ) as response:
+                raw = await response.read()
+                sample["network"] = time.perf_counter() - started
+                sample["bytes_received"] = len(raw)
+                headers = dict(response.headers)
+
+                if response.status >= 400:
+                    text = raw.decode("utf-8", errors="replace")
+                    try:
+                        error_details = json.loads(text)
+                    except json.JSONDecodeError:
+                        error_details = text
+                    logger.error(f"Error HTTP: {response.status}. Respuesta: {error_details}")
+                    return {"error": "HTTPError", "status_code": response.status, "message": error_details, "response_headers": headers}, headers
+
+                try:
+                    decode_started = time.perf_counter()
+                    decoded = self.response_decoder.decode(raw, prepared["endpoint"])
+                    sample["decode"] = time.perf_counter() - decode_started
+                    return decoded, headers
+                except ValueError:
+                    text = raw.decode("utf-8", errors="replace")
+                    logger.warning(f"Respuesta no es JSON válido, devolviendo texto. Status: {response.status}, Contenido: {text[:200]}...")
+                    return {"error": "NonJSONResponse", "status_code": response.status, "message": text}, headers
+
+        except asyncio.TimeoutError as e:
+            sample["network"] = time.perf_counter() - started
+            logger.error(f"Error de Timeout: {e}")
+            return {"error": "Timeout", "message": str(e)}, None
+        except aiohttp.ClientConnectionError as e:
+            sample["network"] = time.perf_counter() - started
+            logger.error(f"Error de Conexión: {e}")
+            return {"error": "ConnectionError", "message": str(e)}, None
+        except aiohttp.ClientError as e:
+            logger.error(f"Error de Request: {e}")
+            return {"error": "RequestException", "message": str(e)}, None
+        except Exception as e:
+            logger.exception(f"Error inesperado durante la petición a la API: {e}")
+            return {"error": "UnexpectedInternalError", "message": str(e)}, None
+
+    async def get_market_items(self, game_id: str, limit: int = 50, currency: str = "USD",
+                               order_by: Optional[str] = None, order_dir: Optional[str] = None,
+                               price_from: Optional[int] = None, price_to: Optional[int] = None,
+                               title: Optional[str] = None,
+                               cursor: Optional[str] = None,
+                               tree_filters: Optional[dict] = None,
+                               **kwargs) -> dict:
+        """Versión asíncrona de DMarketAPI.get_market_items."""
+        endpoint = "/exchange/v1/market/items"
+        try:
+            final_params = self._build_market_items_params(
+                game_id, limit, currency, order_by, order_dir, price_from, price_to, title, cursor, tree_filters, **kwargs
+            )
+        except ValueError as e:
+            logger.error(f"tree_filters inválidos: {e}")
+            return {"error": "InvalidTreeFilters", "message": str(e)}
+        logger.info(f"Solicitando ítems del mercado: GET {endpoint} con params: {final_params}")
+        return await self._coalesced_get(endpoint, final_params)
+
+    async def iter_market_items(self, game_id: str = "a8db", limit: int = 100, currency: str = "USD",
+                                order_by: Optional[str] = None, order_dir: Optional[str] = None,
+                                price_from: Optional[int] = None, price_to: Optional[int] = None,
+                                title: Optional[str] = None,
+                                tree_filters: Optional[dict] = None,
+                                stop_when: Optional[StopPredicate] = None,
+                                max_pages: Optional[int] = None,
+                                prefetch: bool = True,
+                                on_error: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                **kwargs) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Versión asíncrona (async generator) de DMarketAPI.iter_market_items.
+        Con prefetch, la página siguiente se pide como tarea mientras se procesa la actual.
+        on_error recibe la respuesta de error si la iteración se corta por un error.
+
+        Uso:
+            async for page in api.iter_market_items(title="...", order_by="price", order_dir="asc"):
+                ...
+        """
+        def fetch(cursor: Optional[str]):
+            return self.get_market_items(
+                game_id=game_id, limit=limit, currency=currency, order_by=order_by, order_dir=order_dir,
+                price_from=price_from, price_to=price_to, title=title, cursor=cursor,
+                tree_filters=tree_filters, **kwargs
+            )
+
+        next_page: Optional[asyncio.Task] = None
+        try:
+            response = await fetch(None)
+            pages = 0
+            while True:
+                if "error" in response:
+                    logger.warning(f"Iteración de market items interrumpida en la página {pages + 1}: {response.get('error')}")
+                    if on_error is not None:
+                        on_error(response)
+                    return
+                objects = response.get("objects") or []
+                next_cursor = response.get("cursor")
+                pages += 1
+                page, stopped = split_page_at_stop(objects, stop_when)
+                has_more = bool(next_cursor) and bool(objects) and (max_pages is None or pages < max_pages)
+
+                next_page = None
+                if has_more and not stopped and prefetch:
+                    next_page = asyncio.create_task(fetch(next_cursor))
+
+                if page:
+                    yield page
+                if stopped or not has_more:
+                    return
+                response = await next_page if next_page is not None else await fetch(next_cursor)
+                next_page = None
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    def iter_offers_by_title(self, title: str, limit: int = 100, currency: str = "USD",
+                             stop_when: Optional[StopPredicate] = None,
+                             max_pages: Optional[int] = None,
+                             prefetch: bool = True) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Versión asíncrona de DMarketAPI.iter_offers_by_title."""
+        return self.iter_market_items(
+            game_id="a8db", limit=limit, currency=currency, order_by="price", order_dir="asc",
+            title=title, stop_when=stop_when, max_pages=max_pages, prefetch=prefetch
+        )
+
+    async def get_account_balance(self) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_account_balance."""
+        endpoint = "/account/v1/balance"
+        logger.info(f"Solicitando balance de la cuenta: GET {endpoint}")
+        return await self._cached_get(endpoint)
+
+    async def get_fee_rates(self, game_id: str) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_fee_rates."""
+        endpoint = f"/account/v1/fee-rates/{game_id}"
+        logger.info(f"Solicitando tasas de comisión para el juego {game_id}: GET {endpoint}")
+        return await self._cached_get(endpoint)
+
+    async def get_offers_by_title(
+        self,
+        title: str,
+        limit: int = 100,
+        currency: str = "USD",
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_offers_by_title."""
+        endpoint = "/exchange/v1/market/items"
+        final_params = self._build_offers_by_title_params(title, limit, currency, cursor)
+        logger.info(f"Solicitando ofertas por título '{title}': GET {endpoint} con params: {final_params}")
+        return await self._coalesced_get(endpoint, final_params)
+
+    async def get_buy_offers(
+        self,
+        title: str,
+        game_id: str = "a8db",
+        limit: int = 100,
+        currency: str = "USD",
+        cursor: Optional[str] = None,
+        order_by: Optional[str] = "price",
+        order_dir: Optional[str] = "desc"
+    ) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_buy_offers."""
+        endpoint = "/exchange/v1/market/items"
+        final_params = self._build_buy_offers_params(title, game_id, limit, currency, cursor, order_by, order_dir)
+        logger.info(f"Solicitando ítems de mercado para '{title}': GET {endpoint} con params: {final_params}")
+        response = await self._coalesced_get(endpoint, final_params)
+        return self._normalize_buy_offers_response(title, response)
+
+    async def buy_item(self, asset_id: str, price_usd: float) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.buy_item."""
+        logger.info(f"Intentando comprar ítem {asset_id} por ${price_usd:.2f}")
+        price_cents = usd_to_cents(price_usd)
+        body_data = self._build_buy_body([(asset_id, price_cents)])
+        response = await self._make_request("POST", "/exchange/v1/buy-offers", body_data=body_data)
+        self._invalidate_after_trade()
+
+        if "error" not in response:
+            logger.info(f"Compra exitosa para {asset_id}: {response}")
+        else:
+            logger.error(f"Error en compra de {asset_id}: {response}")
+        return response
+
+    async def buy_items(self, offers: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.buy_items; los bloques se envían en paralelo."""
+        logger.info(f"Intentando comprar {len(offers)} ítems en batch")
+        chunks = list(chunked(offers, self.MAX_BATCH_SIZE))
+        responses = await asyncio.gather(*(
+            self._make_request("POST", "/exchange/v1/buy-offers", body_data=self._build_buy_body(chunk))
+            for chunk in chunks
+        ))
+        results: Dict[str, Dict[str, Any]] = {}
+        for chunk, response in zip(chunks, responses):
+            results.update(map_batch_results([asset_id for asset_id, _ in chunk], response))
+        self._invalidate_after_trade()
+        return self._summarize_batch(results, list(responses), dict(offers), "compra")
+
+    async def create_sell_offer(
+        self,
+        asset_id: str,
+        price_usd: float,
+        game_id: str = "a8db"
+    ) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.create_sell_offer."""
+        logger.info(f"Creando oferta de venta para {asset_id} por ${price_usd:.2f}")
+        price_cents = usd_to_cents(price_usd)
+        body_data = self._build_sell_body([(asset_id, price_cents)], game_id)
+        response = await self._make_request("POST", "/exchange/v1/offers", body_data=body_data)
+        self._invalidate_after_trade()
+
+        if "error" not in response:
+            logger.info(f"Oferta de venta creada exitosamente para {asset_id}: {response}")
+        else:
+            logger.error(f"Error creando oferta de venta para {asset_id}: {response}")
+        return response
+
+    async def create_sell_offers(self, items: List[Tuple[str, int]], game_id: str = "a8db") -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.create_sell_offers; los bloques se envían en paralelo."""
+        logger.info(f"Creando {len(items)} ofertas de venta en batch")
+        chunks = list(chunked(items, self.MAX_BATCH_SIZE))
+        responses = await asyncio.gather(*(
+            self._make_request("POST", "/exchange/v1/offers", body_data=self._build_sell_body(chunk, game_id))
+            for chunk in chunks
+        ))
+        results: Dict[str, Dict[str, Any]] = {}
+        for chunk, response in zip(chunks, responses):
+            results.update(map_batch_results([asset_id for asset_id, _ in chunk], response))
+        self._invalidate_after_trade()
+        return self._summarize_batch(results, list(responses), dict(items), "venta")
+
+    async def cancel_sell_offer(self, offer_id: str) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.cancel_sell_offer."""
+        logger.info(f"Cancelando oferta de venta {offer_id}")
+        response = await self._make_request("PATCH", f"/exchange/v1/offers/{offer_id}/close")
+        self._invalidate_after_trade()
+
+        if "error" not in response:
+            logger.info(f"Oferta {offer_id} cancelada exitosamente: {response}")
+        else:
+            logger.error(f"Error cancelando oferta {offer_id}: {response}")
+        return response
+
+    async def cancel_sell_offers(self, offer_ids: List[str]) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.cancel_sell_offers; los bloques se envían en paralelo."""
+        logger.info(f"Cancelando {len(offer_ids)} ofertas de venta en batch")
+        chunks = list(chunked(offer_ids, self.MAX_BATCH_SIZE))
+        responses = await asyncio.gather(*(
+            self._make_request("POST", "/marketplace-api/v1/user-offers/close", body_data={"offerIds": list(chunk)})
+            for chunk in chunks
+        ))
+        results: Dict[str, Dict[str, Any]] = {}
+        for chunk, response in zip(chunks, responses):
+            results.update(map_batch_results(list(chunk), response))
+        self._invalidate_after_trade()
+        return self._summarize_batch(results, list(responses), {}, "cancelación")
+
+    async def get_aggregated_prices(self, titles: List[str], game_id: str = "a8db") -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_aggregated_prices; los bloques se envían en paralelo."""
+        unique_titles = list(dict.fromkeys(t for t in titles if t))
+        if not unique_titles:
+            return {"prices": {}, "failed_titles": []}
+        chunks = list(chunked(unique_titles, self.AGGREGATED_PRICES_CHUNK))
+        logger.info(f"Solicitando precios agregados de {len(unique_titles)} títulos en {len(chunks)} peticiones")
+        responses = await asyncio.gather(*(
+            self._make_request("POST", AGGREGATED_PRICES_ENDPOINT, body_data=_aggregated_prices_body(chunk, game_id))
+            for chunk in chunks
+        ))
+        return merge_aggregated_prices(chunks, list(responses))
+
+    async def get_market_prices_usd(self, titles: List[str], side: str = "ask", game_id: str = "a8db") -> Dict[str, float]:
+        """Versión asíncrona de DMarketAPI.get_market_prices_usd."""
+        response = await self.get_aggregated_prices(titles, game_id)
+        if "error" in response:
+            logger.warning(f"No se pudieron obtener precios agregados: {response.get('error')}")
+            return {}
+        return {
+            title: price for title, price in (
+                (title, mark_price(entry, side)) for title, entry in response["prices"].items()
+            ) if price is not None
+        }
+
+    async def get_user_offers(self, game_id: str = "a8db", limit: int = 100) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_user_offers."""
+        response = await self._cached_get("/exchange/v1/user/offers", params={"gameId": game_id, "limit": limit})
+
+        if "error" not in response:
+            logger.debug(f"Ofertas del usuario obtenidas: {len(response.get('objects', []))} ofertas")
+        else:
+            logger.error(f"Error obteniendo ofertas del usuario: {response}")
+        return response
+
+    async def get_user_inventory(self, game_id: str = "a8db", limit: int = 100) -> Dict[str, Any]:
+        """Versión asíncrona de DMarketAPI.get_user_inventory."""
+        response = await self._cached_get("/exchange/v1/user/items", params={"gameId": game_id, "limit": limit})
+
+        if "error" not in response:
+            logger.debug(f"Inventario obtenido: {len(response.get('objects', []))} ítems")
+        else:
+            logger.error(f"Error obteniendo inventario: {response}")
+        return response
+
+    async def get_offers_by_titles(
+        self,
+        titles: List[str],
+        limit: int = 100,
+        currency: str = "USD"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtiene las ofertas de venta de muchos títulos en paralelo (fan-out).
+        La concurrencia real está acotada por max_concurrency.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Respuesta (o dict de error) por título, en el orden de entrada.
+        """
+        responses = await asyncio.gather(
+            *(self.get_offers_by_title(title, limit=limit, currency=currency) for title in titles)
+        )
+        return dict(zip(titles, responses))
+
+    async def get_item_books(
+        self,
+        titles: List[str],
+        game_id: str = "a8db",
+        limit: int = 100
+    ) -> Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Obtiene, para cada título, las ofertas de venta y las "órdenes de compra"
+        (ver get_buy_offers) en paralelo. Equivale a lo que StrategyEngine._get_item_data
+        pide de forma secuencial por cada ítem.
+
+        Returns:
+            Dict[str, Tuple[sell_offers_response, buy_orders_response]] por título.
+        """
+        async def _fetch(title: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            sell, buy = await asyncio.gather(
+                self.get_offers_by_title(title, limit=limit),
+                self.get_buy_offers(title, game_id=game_id, limit=limit)
+            )
+            return sell, buy
+
+        results = await asyncio.gather(*(_fetch(title) for title in titles))
+        return dict(zip(titles, results))
@@ -0,0 +1,276 @@
+# core/connector_metrics.py
+"""
+Métricas por endpoint del conector de DMarket.
+
+ConnectorMetrics acumula, por "MÉTODO plantilla" de endpoint (ver normalize_endpoint):
+peticiones, errores por tipo, bytes recibidos e histogramas de latencia de las tres
+fases de cada envío: firma (serialización + Ed25519), red (envío y lectura de la
+respuesta) y decodificación JSON. Los histogramas usan cubos logarítmicos fijos, así
+que el coste por observación y la memoria son constantes y los percentiles
+(p50/p95/p99) tienen un error relativo acotado por el ancho del cubo (~12%).
+
+Además de la vista acumulada se mantiene una ventana que se reinicia en cada volcado
+periódico a disco (JSONL, una línea por volcado): comparar la p95 de red de la ventana
+con la acumulada permite detectar que DMarket se está ralentizando.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+from core.resilience import normalize_endpoint
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+PHASES = ("sign", "network", "decode", "total")
+
+# Límites superiores de los cubos en segundos: de 50 µs a ~2 min, 8 cubos por octava
+_BUCKET_BOUNDS: List[float] = [50e-6 * 2 ** (i / 8) for i in range(8 * 22)]
+
+
+class LatencyHistogram:
+    """Histograma de latencias con cubos logarítmicos fijos. No es thread-safe por sí solo."""
+
+    __slots__ = ("counts", "count", "total_sec", "max_sec")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total_sec = 0.0
+        self.max_sec = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total_sec += seconds
+        if seconds > self.max_sec:
+            self.max_sec = seconds
+
+    def percentile(self, q: float) -> float:
+        """Latencia (s) del percentil q (0-100): límite superior del cubo que lo contiene."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(q / 100.0 * self.count)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                upper = _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max_sec
+                return min(upper, self.max_sec)
+        return self.max_sec
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_sec / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max_sec * 1000, 3)
+        }
+
+
+class EndpointMetrics:
+    """Contadores e histogramas de una plantilla de endpoint."""
+
+    __slots__ = ("requests", "errors", "bytes_received", "histograms")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors: Dict[str, int] = {}
+        self.bytes_received = 0
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+
+    def record(self, error: Optional[str], sample: Dict[str, float]) -> None:
+        self.requests += 1
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        self.bytes_received += int(sample.get("bytes_received", 0))
+        for phase in PHASES:
+            seconds = sample.get(phase)
+            if seconds is not None:
+                self.histograms[phase].observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "error_count": sum(self.errors.values()),
+            "bytes_received": self.bytes_received,
+            "latency": {phase: histogram.snapshot() for phase, histogram in self.histograms.items() if histogram.count}
+        }
+
+
+def error_label(result: Any) -> Optional[str]:
+    """Tipo de error de un resultado de _send_prepared ("HTTPError 503", "Timeout", ...) o None."""
+    if not isinstance(result, dict) or "error" not in result:
+        return None
+    status = result.get("status_code")
+    return f"{result['error']} {status}" if result["error"] == "HTTPError" and status else str(result["error"])
+
+
+class ConnectorMetrics:
+    """Métricas por endpoint de un conector (síncrono o asíncrono). Thread-safe."""
+
+    def __init__(self, enabled: bool = True, dump_path: Optional[str] = None,
+                 dump_interval_sec: Optional[float] = None, slowdown_factor: float = 2.0,
+                 slowdown_min_requests: int = 20):
+        """
+        Args:
+            enabled: Si es False, record() no hace nada.
+            dump_path: Fichero JSONL para los volcados periódicos (ver start_periodic_dump).
+            dump_interval_sec: Intervalo de volcado; si se indica junto a dump_path, el volcado
+                periódico arranca al crear el objeto.
+            slowdown_factor: Se avisa de ralentización si la p95 de red de la ventana supera
+                la acumulada en este factor.
+            slowdown_min_requests: Peticiones mínimas en la ventana para evaluar la ralentización.
+        """
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.slowdown_factor = slowdown_factor
+        self.slowdown_min_requests = slowdown_min_requests
+        self._cumulative: Dict[str, EndpointMetrics] = {}
+        self._window: Dict[str, EndpointMetrics] = {}
+        self._started = time.monotonic()
+        self._window_started = self._started
+        self._lock = threading.Lock()
+        self._stop_dump = threading.Event()
+        self._dump_thread: Optional[threading.Thread] = None
+        if dump_path and dump_interval_sec:
+            self.start_periodic_dump(dump_interval_sec)
+
+    @staticmethod
+    def key_for(method: str, endpoint: str) -> str:
+        return f"{method.upper()} {normalize_endpoint(endpoint)}"
+
+    def record(self, method: str, endpoint: str, result: Any, sample: Dict[str, float]) -> None:
+        """
+        Registra un envío.
+
+        Args:
+            sample: Segundos por fase ("sign", "network", "decode", "total") y
+                "bytes_received"; las fases ausentes no se observan (p.ej. sin "decode"
+                si la respuesta fue un error).
+        """
+        if not self.enabled:
+            return
+        key = self.key_for(method, endpoint)
+        error = error_label(result)
+        with self._lock:
+            for table in (self._cumulative, self._window):
+                metrics = table.get(key)
+                if metrics is None:
+                    metrics = table[key] = EndpointMetrics()
+                metrics.record(error, sample)
+
+    def snapshot(self, window: bool = False) -> Dict[str, Any]:
+        """
+        Métricas por endpoint, acumuladas desde el inicio (o desde reset()) o de la
+        ventana actual si window=True.
+        """
+        with self._lock:
+            table = self._window if window else self._cumulative
+            since = self._window_started if window else self._started
+            endpoints = {key: metrics.snapshot() for key, metrics in sorted(table.items())}
+        return {
+            "elapsed_sec": round(time.monotonic() - since, 3),
+            "requests": sum(e["requests"] for e in endpoints.values()),
+            "errors": sum(e["error_count"] for e in endpoints.values()),
+            "bytes_received": sum(e["bytes_received"] for e in endpoints.values()),
+            "endpoints": endpoints
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._cumulative.clear()
+            self._window.clear()
+            self._started = self._window_started = time.monotonic()
+
+    def detect_slowdowns(self) -> List[Dict[str, Any]]:
+        """Endpoints cuya p95 de red en la ventana supera slowdown_factor × la acumulada."""
+        slow = []
+        with self._lock:
+            for key, window_metrics in self._window.items():
+                window_hist = window_metrics.histograms["network"]
+                cumulative_hist = self._cumulative[key].histograms["network"]
+                if window_hist.count < self.slowdown_min_requests or cumulative_hist.count <= window_hist.count:
+                    continue
+                window_p95 = window_hist.percentile(95)
+                baseline_p95 = cumulative_hist.percentile(95)
+                if baseline_p95 > 0 and window_p95 > baseline_p95 * self.slowdown_factor:
+                    slow.append({"endpoint": key, "window_p95_ms": round(window_p95 * 1000, 3),
+                                 "baseline_p95_ms": round(baseline_p95 * 1000, 3)})
+        return slow
+
+    def dump(self, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Añade al fichero JSONL una línea con la ventana actual y los totales acumulados,
+        avisa de los endpoints ralentizados y reinicia la ventana.
+
+        Returns:
+            El registro volcado, o None si no hay fichero configurado.
+        """
+        path = path or self.dump_path
+        if not path:
+            return None
+        slowdowns = self.detect_slowdowns()
+        for slow in slowdowns:
+            logger.warning(
+                f"DMarket lento en {slow['endpoint']}: p95 de red {slow['window_p95_ms']:.0f}ms "
+                f"(habitual {slow['baseline_p95_ms']:.0f}ms)"
+            )
+        record = {
+            "dumped_at": datetime.now(timezone.utc).isoformat(),
+            "window": self.snapshot(window=True),
+            "cumulative": self.snapshot(),
+            "slowdowns": slowdowns
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+            f.write("\n")
+        with self._lock:
+            self._window.clear()
+            self._window_started = time.monotonic()
+        return record
+
+    def start_periodic_dump(self, interval_sec: float, path: Optional[str] = None) -> bool:
+        """
+        Arranca un hilo daemon que llama a dump() cada `interval_sec`.
+
+        Returns:
+            True si el hilo se arrancó (o ya estaba activo).
+        """
+        if path:
+            self.dump_path = path
+        if not self.dump_path or not interval_sec:
+            return False
+        if self._dump_thread is not None and self._dump_thread.is_alive():
+            return True
+
+        def _loop() -> None:
+            while not self._stop_dump.wait(interval_sec):
+                try:
+                    self.dump()
+                except OSError as e:
+                    logger.error(f"Error volcando métricas del conector en {self.dump_path}: {e}")
+
+        self._stop_dump.clear()
+        self._dump_thread = threading.Thread(target=_loop, name="dmarket-metrics-dump", daemon=True)
+        self._dump_thread.start()
+        logger.info(f"Volcado de métricas del conector en {self.dump_path} cada {interval_sec:.0f}s")
+        return True
+
+    def stop_periodic_dump(self) -> None:
+        self._stop_dump.set()
+        if self._dump_thread is not None:
+            self._dump_thread.join(timeout=1.0)
+            self._dump_thread = None
@@ -2,15 +2,27 @@ import requests
 import os
 import time
 import json
+import contextvars
 import logging
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator
 from urllib.parse import urlencode
 
-from nacl.bindings import crypto_sign
-
 from dotenv import load_dotenv
 from utils.logger import configure_logging
 
+from core.rate_limiter import RateLimiter, get_shared_rate_limiter
+from core.request_coalescer import RequestCoalescer
+from core.response_cache import ResponseCache
+from core.http_transport import HttpTransport, TransportConfig
+from core.traffic_recorder import TrafficRecorder, TrafficReplayer
+from core.json_codec import ResponseDecoder
+from core.request_signing import Ed25519Signer
+from core.resilience import RetryPolicy, CircuitBreakerRegistry
+from core.request_scheduler import RequestScheduler, LoadShed, resolve_priority
+from core.connector_metrics import ConnectorMetrics
+from core.tree_filters import TREE_FILTERS_PARAM, encode_tree_filters
+
 # Cargar variables de entorno con manejo de errores
 try:
     load_dotenv()
@@ -25,6 +37,37 @@ logger = logging.getLogger(__name__)
 # Definir el prefijo de la firma como una constante
 SIGNATURE_PREFIX = "dmar ed25519 "
 
+AGGREGATED_PRICES_ENDPOINT = "/marketplace-api/v1/aggregated-prices"
+
+# Predicado de parada para los iteradores paginados: recibe una oferta y devuelve True para cortar
+StopPredicate = Callable[[Dict[str, Any]], bool]
+
+
+def stop_above_price(max_price_cents: int) -> StopPredicate:
+    """Predicado de parada: corta la iteración en la primera oferta con precio > max_price_cents."""
+    def _predicate(offer: Dict[str, Any]) -> bool:
+        try:
+            return int(offer.get('price', {}).get('USD')) > max_price_cents
+        except (TypeError, ValueError):
+            return False
+    return _predicate
+
+
+def split_page_at_stop(objects: List[Dict[str, Any]], stop_when: Optional[StopPredicate]) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Recorta una página en la primera oferta que cumple el predicado de parada.
+
+    Returns:
+        Tupla (ofertas anteriores a la parada, True si se alcanzó la parada).
+    """
+    if stop_when is None:
+        return objects, False
+    for index, offer in enumerate(objects):
+        if stop_when(offer):
+            return objects[:index], True
+    return objects, False
+
+
 class DMarketAPI:
     """
     Clase para interactuar con la API de DMarket.
@@ -33,8 +76,24 @@ class DMarketAPI:
 
     BASE_URL_V1 = "https://api.dmarket.com"
     DEFAULT_TIMEOUT = 10 # Segundos
+    DEFAULT_MAX_429_RETRIES = 3
+    MAX_BATCH_SIZE = 100 # Máximo de elementos por petición batch de compra/venta
+    AGGREGATED_PRICES_CHUNK = 100 # Títulos por petición de precios agregados
+    AGGREGATED_PRICES_CONCURRENCY = 4 # Peticiones de precios agregados en paralelo
 
-    def __init__(self, public_key: str = None, secret_key: str = None, timeout: int = DEFAULT_TIMEOUT):
+    def __init__(self, public_key: str = None, secret_key: str = None, timeout: int = DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[RateLimiter] = None, max_429_retries: int = DEFAULT_MAX_429_RETRIES,
+                 request_coalescer: Optional[RequestCoalescer] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 transport_config: Optional[TransportConfig] = None,
+                 base_url: Optional[str] = None,
+                 recorder: Optional[TrafficRecorder] = None,
+                 replayer: Optional[TrafficReplayer] = None,
+                 response_decoder: Optional[ResponseDecoder] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+                 request_scheduler: Optional[RequestScheduler] = None,
+                 metrics: Optional[ConnectorMetrics] = None):
         """
         Inicializa el conector de la API de DMarket.
 
@@ -45,12 +104,44 @@ class DMarketAPI:
             public_key (str, optional): Clave API pública. 
             secret_key (str, optional): Clave API secreta (hexadecimal de 128 caracteres).
             timeout (int, optional): Tiempo máximo para las solicitudes a la API.
+            rate_limiter (RateLimiter, optional): Limitador de tasa por familia de endpoints.
+                Por defecto se usa el limitador compartido del proceso.
+            max_429_retries (int, optional): Reintentos ante HTTP 429 antes de devolver el error.
+            request_coalescer (RequestCoalescer, optional): Coalescencia de lecturas equivalentes
+                de market/items. Por defecto se crea uno por conector.
+            response_cache (ResponseCache, optional): Caché TTL de lecturas GET con
+                stale-while-revalidate. Por defecto se crea una por conector.
+            transport_config (TransportConfig, optional): Pool de conexiones, keep-alive,
+                HTTP/2 y keep-warm del transporte HTTP.
+            base_url (str, optional): URL base de la API. Por defecto DMARKET_BASE_URL o
+                BASE_URL_V1 (útil para apuntar al stand-in local, ver core/dmarket_standin.py).
+            recorder (TrafficRecorder, optional): Graba cada petición/respuesta en un log.
+            replayer (TrafficReplayer, optional): Sirve respuestas grabadas en lugar de usar la red.
+                En modo replay las claves API son opcionales.
+            response_decoder (ResponseDecoder, optional): Decodificador JSON de las respuestas
+                (orjson si está disponible) con proyección opcional de campos de las ofertas.
+            retry_policy (RetryPolicy, optional): Reintentos con backoff de fallos transitorios
+                (conexión, timeout, 5xx) en peticiones GET. Las compras y ventas no se reintentan.
+            circuit_breakers (CircuitBreakerRegistry, optional): Circuit breaker por endpoint;
+                mientras está abierto las peticiones fallan rápido con {"error": "CircuitOpen"}.
+            request_scheduler (RequestScheduler, optional): Reparte los tokens del rate limiter
+                por prioridad (ejecución > posiciones > escaneo); el escaneo se descarta con
+                {"error": "LoadShed"} si el presupuesto está agotado. Por defecto uno por conector.
+            metrics (ConnectorMetrics, optional): Contadores e histogramas de latencia (firma,
+                red, decodificación) por endpoint, con volcado periódico opcional a disco.
 
         Raises:
             ValueError: Si la clave pública o secreta no se encuentran o son inválidas.
         """
         self.public_key = public_key or os.environ.get("DMARKET_PUBLIC_KEY")
         self.secret_key_hex = secret_key or os.environ.get("DMARKET_SECRET_KEY")
+        self.recorder = recorder
+        self.replayer = replayer
+
+        if replayer is not None:
+            # Sin red no hace falta firmar: se admiten claves ficticias
+            self.public_key = self.public_key or "replay"
+            self.secret_key_hex = self.secret_key_hex or "00" * 64
 
         if not self.public_key:
             logger.error("DMarket Public Key no encontrada. Asegúrate de que DMARKET_PUBLIC_KEY está definida.")
@@ -69,111 +160,276 @@ class DMarketAPI:
             logger.error(f"Secret Key inválida o con formato incorrecto: {e}")
             raise ValueError(f"Secret Key inválida: {e}")
 
-        self.base_url = self.BASE_URL_V1
+        # Contexto de firma y cabeceras fijas, precalculados una vez por conector
+        self.signer = Ed25519Signer(self.secret_key_bytes)
+        self._base_headers = {"X-Api-Key": self.public_key, "Accept": "application/json"}
+
+        self.base_url = (base_url or os.environ.get("DMARKET_BASE_URL") or self.BASE_URL_V1).rstrip("/")
         self.timeout = timeout
-        self.session = requests.Session()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_429_retries = max_429_retries
+        self.request_coalescer = request_coalescer or RequestCoalescer()
+        self.response_cache = response_cache or ResponseCache()
+        self.response_decoder = response_decoder or ResponseDecoder()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakerRegistry()
+        self.request_scheduler = request_scheduler or RequestScheduler(self.rate_limiter)
+        self.metrics = metrics or ConnectorMetrics()
+        self.transport_config = transport_config or TransportConfig()
+        self.transport: Optional[HttpTransport] = None
+        self.session = self._create_session()
+        if self.transport is not None and self.transport_config.keep_warm_interval_sec:
+            self.transport.start_keep_warm()
 
     def _generate_signature(self, string_to_sign_utf8_str: str) -> Optional[str]:
         """
-        Genera la firma Ed25519 para la string_to_sign dada.
-        La secret_key_bytes (64 bytes) se usa directamente.
+        Genera la firma Ed25519 para la string_to_sign dada con el firmador precalculado.
         Devuelve la firma en formato hexadecimal (128 caracteres) o None si hay error.
         """
-        if not self.secret_key_bytes:
-            logger.error("ERROR Interno: Secret key bytes no están inicializados.")
-            return None
-
-        string_to_sign_bytes = string_to_sign_utf8_str.encode('utf-8')
-        
         try:
-            signed_message_bytes = crypto_sign(string_to_sign_bytes, self.secret_key_bytes)
-            signature_bytes = signed_message_bytes[:64]
-            signature_hex = signature_bytes.hex()
-            
-            if len(signature_hex) != 128:
-                logger.error(f"Firma Ed25519 generada no tiene 128 caracteres: {len(signature_hex)}")
-                return None
-            return signature_hex
+            return self.signer.sign_hex(string_to_sign_utf8_str.encode('utf-8'))
         except Exception as e:
-            logger.error(f"Error crítico al generar firma Ed25519 con nacl.bindings.crypto_sign: {e}")
+            logger.error(f"Error crítico al generar firma Ed25519 ({self.signer.backend}): {e}")
             return None
 
-    def _make_request(
+    def _create_session(self):
+        """Crea la sesión HTTP usada por el conector (pool de requests o httpx HTTP/2, ver HttpTransport)."""
+        self.transport = HttpTransport(self.base_url, self.transport_config, timeout=self.timeout)
+        return self.transport.session
+
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Abre conexiones al host de la API antes de que se necesiten (p.ej. antes de una compra
+        tras un periodo de espera). Devuelve el número de pings exitosos.
+        """
+        return self.transport.warm(connections) if self.transport is not None else 0
+
+    def is_endpoint_available(self, method: str, endpoint: str) -> bool:
+        """False mientras el circuit breaker del endpoint está abierto."""
+        return self.circuit_breakers.is_available(method, endpoint)
+
+    def get_circuit_states(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de los circuit breakers por "MÉTODO plantilla" (ver CircuitBreakerRegistry)."""
+        return self.circuit_breakers.get_states()
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Concesiones, descartes y espera media por prioridad del RequestScheduler."""
+        return self.request_scheduler.get_stats()
+
+    def get_metrics(self, window: bool = False) -> Dict[str, Any]:
+        """Peticiones, errores, bytes y latencias p50/p95/p99 por endpoint (ver ConnectorMetrics)."""
+        return self.metrics.snapshot(window)
+
+    def get_transport_stats(self) -> Dict[str, Any]:
+        """Estadísticas de reutilización de conexiones del transporte HTTP."""
+        return self.transport.get_stats() if self.transport is not None else {}
+
+    def _prepare_request(
         self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, body_data: Optional[Any] = None
     ) -> Dict[str, Any]:
         """
-        Realiza una petición HTTP a la API de DMarket con firma Ed25519.
+        Construye URL, cabeceras firmadas con Ed25519 y cuerpo JSON de una petición.
+        Es independiente del transporte: la usan tanto DMarketAPI como AsyncDMarketAPI.
+
+        La query ordenada y el cuerpo compacto se serializan una sola vez: la URL ("url")
+        y los bytes del cuerpo ("body") que se envían son exactamente los firmados.
+
+        Returns:
+            Dict con las claves "method", "endpoint", "url", "body" y "headers",
+            o un dict con "error" si no se pudo serializar el cuerpo o generar la firma.
         """
-        full_url = f"{self.base_url}{endpoint}"
-        timestamp_str = str(int(time.time())) 
+        method = method.upper()
+        timestamp_str = str(int(time.time()))
 
-        # 1. Construir path_for_sig (endpoint + query_params_string_sorted)
+        # 1. Path firmado (endpoint + query ordenada, sin valores None); es también el de la URL real
         path_for_sig = endpoint
-        query_string_for_sig = ""
         if params:
-            # Filtrar None values antes de ordenar y codificar para la firma y la URL real
-            active_params = {k: v for k, v in params.items() if v is not None}
+            active_params = sorted((k, v) for k, v in params.items() if v is not None)
             if active_params:
-                sorted_params = sorted(active_params.items())
-                query_string_for_sig = urlencode(sorted_params)
-                path_for_sig += "?" + query_string_for_sig
-        
-        # 2. Construir body_str_for_sig (JSON compacto si hay body_data)
-        body_str_for_sig = ""
-        actual_json_for_request = None
+                path_for_sig += "?" + urlencode(active_params)
 
+        # 2. Cuerpo JSON compacto (se firma y se envía tal cual)
+        body_str_for_sig = ""
         if body_data is not None:
             try:
                 body_str_for_sig = json.dumps(body_data, separators=(',', ':'))
-                actual_json_for_request = body_data
             except TypeError as e:
                 logger.error(f"Error al serializar body_data a JSON para la firma: {e}. Body: {body_data}")
                 return {"error": "BodySerializationError", "message": str(e)}
-        
-        # 3. Construir la string_to_sign completa
-        string_to_sign = method.upper() + path_for_sig + body_str_for_sig + timestamp_str
-        logger.debug(f"String para Firmar: {string_to_sign}")
-        
-        # 4. Generar la firma Ed25519
+
+        # 3. Firma Ed25519 de method + path + body + timestamp
+        string_to_sign = method + path_for_sig + body_str_for_sig + timestamp_str
         generated_signature_hex = self._generate_signature(string_to_sign)
-        
         if not generated_signature_hex:
             logger.error("Fallo al generar la firma Ed25519. Abortando petición.")
             return {"error": "SignatureGenerationError", "message": "Fallo al generar la firma"}
 
-        # 5. Construir cabeceras
-        final_signature_header = SIGNATURE_PREFIX + generated_signature_hex
-        headers = {
-            "X-Api-Key": self.public_key,
-            "X-Sign-Date": timestamp_str,
-            "X-Request-Sign": final_signature_header,
-            "Accept": "application/json"
+        # 4. Cabeceras: copia de las fijas + las de la firma
+        headers = dict(self._base_headers)
+        headers["X-Sign-Date"] = timestamp_str
+        headers["X-Request-Sign"] = SIGNATURE_PREFIX + generated_signature_hex
+        body = None
+        if body_data is not None:
+            body = body_str_for_sig.encode("utf-8")
+            if method in ("POST", "PATCH", "PUT"):
+                headers["Content-Type"] = "application/json; charset=utf-8"
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("String para Firmar: %s", string_to_sign)
+            logger.debug("Petición: %s %s%s", method, self.base_url, path_for_sig)
+            logger.debug("  Headers: %s", headers)
+            if body_data is not None:
+                logger.debug("  JSON Body (para request): %s", body_str_for_sig)
+
+        return {
+            "method": method,
+            "endpoint": endpoint,
+            "url": self.base_url + path_for_sig,
+            "body": body,
+            "headers": headers
         }
-        if method.upper() in ["POST", "PATCH", "PUT"] and actual_json_for_request is not None:
-            headers["Content-Type"] = "application/json; charset=utf-8"
 
-        logger.debug(f"Petición: {method.upper()} {full_url}")
-        logger.debug(f"  Headers: {headers}")
-        if params: logger.debug(f"  Query Params (para URL): {params}")
-        if actual_json_for_request: logger.debug(f"  JSON Body (para request): {actual_json_for_request}")
-        
+    def _make_request(
+        self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, body_data: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Realiza una petición HTTP a la API de DMarket con firma Ed25519.
+        En modo replay devuelve la respuesta grabada; si hay un recorder, graba el resultado.
+        """
+        if self.replayer is not None:
+            return self.replayer.replay(method, endpoint, params, body_data)
+
+        started_at = time.monotonic()
+        result = self._request_with_retries(method, endpoint, params, body_data)
+        if self.recorder is not None:
+            self.recorder.record(method, endpoint, params, body_data, result, started_at, time.monotonic() - started_at)
+        return result
+
+    def _request_with_retries(
+        self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None, body_data: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Envía la petición firmada. Cada envío toma antes un token del rate limiter de su
+        familia de endpoints a través del RequestScheduler, por prioridad; ante un 429 se respeta Retry-After (con jitter) y se reintenta
+        hasta max_429_retries. Los fallos transitorios de GET se reintentan según
+        retry_policy, y si el circuit breaker del endpoint está abierto se falla rápido.
+        """
+        family = self.rate_limiter.family_for(method, endpoint)
+        priority = resolve_priority(method, endpoint)
+        breaker = self.circuit_breakers.get(method, endpoint) if self.circuit_breakers.enabled else None
+        attempt = 0
+        retries = 0
+        while True:
+            if breaker is not None and not breaker.allow():
+                return breaker.open_error()
+            try:
+                self.request_scheduler.acquire(family, priority)
+            except LoadShed as e:
+                if breaker is not None:
+                    breaker.release()
+                return self._load_shed_error(e)
+            try:
+                # Se firma en cada intento (tras la espera) para que X-Sign-Date no quede desfasado
+                started = time.perf_counter()
+                prepared = self._prepare_request(method, endpoint, params, body_data)
+                if "error" in prepared:
+                    if breaker is not None:
+                        breaker.release()
+                    return prepared
+
+                sample = {"sign": time.perf_counter() - started}
+                result, response_headers = self._send_prepared(prepared, sample)
+                sample["total"] = time.perf_counter() - started
+            finally:
+                self.request_scheduler.release()
+            self.metrics.record(method, endpoint, result, sample)
+            self.transport.mark_used()
+            self.rate_limiter.update_from_headers(family, response_headers)
+            if breaker is not None:
+                breaker.record(result)
+
+            if self._is_rate_limited(result) and attempt < self.max_429_retries:
+                delay = self.rate_limiter.register_429(family, response_headers, attempt)
+                logger.warning(f"HTTP 429 en {method.upper()} {endpoint}. Reintento {attempt + 1}/{self.max_429_retries} en {delay:.2f}s.")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if self.retry_policy.should_retry(method, result, retries, endpoint):
+                delay = self.retry_policy.backoff_delay(retries)
+                retries += 1
+                logger.warning(f"{result.get('error')} en {method.upper()} {endpoint}. Reintento {retries}/{self.retry_policy.max_retries} en {delay:.2f}s.")
+                time.sleep(delay)
+                continue
+            return result
+
+    def _coalesced_get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET de lectura de mercado a través de la caché de respuestas y del RequestCoalescer:
+        consultas equivalentes (mismo título y filtros, distinto orden) en vuelo o recientes
+        comparten una respuesta.
+        """
+        return self.response_cache.get(endpoint, params, lambda: self.request_coalescer.do(
+            endpoint, params, lambda: self._make_request(method="GET", endpoint=endpoint, params=params)
+        ))
+
+    def _cached_get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET a través de la caché de respuestas (TTL por endpoint, ver ResponseCache)."""
+        return self.response_cache.get(
+            endpoint, params, lambda: self._make_request(method="GET", endpoint=endpoint, params=params)
+        )
+
+    def _invalidate_after_trade(self) -> None:
+        """Invalida las lecturas que cambian tras una compra, venta o cancelación."""
+        self.response_cache.invalidate("/account/v1/balance")
+        self.response_cache.invalidate("/exchange/v1/user/")
+        self.response_cache.invalidate("/exchange/v1/market/items")
+
+    @staticmethod
+    def _load_shed_error(e: LoadShed) -> Dict[str, Any]:
+        logger.warning(str(e))
+        return {"error": "LoadShed", "message": str(e), "priority": e.priority.name.lower(), "family": e.family.value}
+
+    @staticmethod
+    def _is_rate_limited(result: Any) -> bool:
+        return isinstance(result, dict) and result.get("error") == "HTTPError" and result.get("status_code") == 429
+
+    def _send_prepared(
+        self, prepared: Dict[str, Any], sample: Optional[Dict[str, float]] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, str]]]:
+        """
+        Envía una petición ya firmada.
+
+        Args:
+            sample: Si se indica, recibe los segundos de red ("network") y de
+                decodificación ("decode") y los bytes recibidos ("bytes_received").
+
+        Returns:
+            Tupla (resultado, cabeceras de la respuesta o None si no hubo respuesta).
+        """
+        sample = sample if sample is not None else {}
+        started = time.perf_counter()
         try:
             response = self.session.request(
-                method.upper(),
-                full_url,
-                params=params,
-                json=actual_json_for_request, 
-                headers=headers,
+                prepared["method"],
+                prepared["url"],
+                data=prepared["body"],
+                headers=prepared["headers"],
                 timeout=self.timeout
             )
             
+            content = response.content
+            sample["network"] = time.perf_counter() - started
+            sample["bytes_received"] = len(content)
             response.raise_for_status()
             
             try:
-                return response.json()
-            except json.JSONDecodeError:
+                decode_started = time.perf_counter()
+                decoded = self.response_decoder.decode(content, prepared["endpoint"])
+                sample["decode"] = time.perf_counter() - decode_started
+                return decoded, response.headers
+            except ValueError:
                 logger.warning(f"Respuesta no es JSON válido, devolviendo texto. Status: {response.status_code}, Contenido: {response.text[:200]}...")
-                return {"error": "NonJSONResponse", "status_code": response.status_code, "message": response.text}
+                return {"error": "NonJSONResponse", "status_code": response.status_code, "message": response.text}, response.headers
 
         except requests.exceptions.HTTPError as e:
             error_content = e.response.text
@@ -183,19 +439,21 @@ class DMarketAPI:
                 error_details = error_content
             
             logger.error(f"Error HTTP: {e.response.status_code}. Respuesta: {error_details}")
-            return {"error": "HTTPError", "status_code": e.response.status_code, "message": error_details, "response_headers": dict(e.response.headers)}
+            return {"error": "HTTPError", "status_code": e.response.status_code, "message": error_details, "response_headers": dict(e.response.headers)}, e.response.headers
         except requests.exceptions.ConnectionError as e:
+            sample["network"] = time.perf_counter() - started
             logger.error(f"Error de Conexión: {e}")
-            return {"error": "ConnectionError", "message": str(e)}
+            return {"error": "ConnectionError", "message": str(e)}, None
         except requests.exceptions.Timeout as e:
+            sample["network"] = time.perf_counter() - started
             logger.error(f"Error de Timeout: {e}")
-            return {"error": "Timeout", "message": str(e)}
+            return {"error": "Timeout", "message": str(e)}, None
         except requests.exceptions.RequestException as e:
             logger.error(f"Error de Request: {e}")
-            return {"error": "RequestException", "message": str(e)}
+            return {"error": "RequestException", "message": str(e)}, None
         except Exception as e:
             logger.exception(f"Error inesperado durante la petición a la API: {e}")
-            return {"error": "UnexpectedInternalError", "message": str(e)}
+            return {"error": "UnexpectedInternalError", "message": str(e)}, None
 
     def get_market_items(self, game_id: str, limit: int = 50, currency: str = "USD", 
                          order_by: Optional[str] = None, order_dir: Optional[str] = None, 
@@ -206,8 +464,112 @@ class DMarketAPI:
                          **kwargs) -> dict:
         """
         Obtiene ítems del mercado de DMarket. Endpoint: /exchange/v1/market/items
+
+        tree_filters filtra por atributos en el servidor: valores simples, listas (OR) y
+        FilterRange, p.ej. {"floatValue": FilterRange(0.0, 0.01), "paintSeed": [661, 670]}.
         """
         endpoint = "/exchange/v1/market/items"
+        try:
+            final_params = self._build_market_items_params(
+                game_id, limit, currency, order_by, order_dir, price_from, price_to, title, cursor, tree_filters, **kwargs
+            )
+        except ValueError as e:
+            logger.error(f"tree_filters inválidos: {e}")
+            return {"error": "InvalidTreeFilters", "message": str(e)}
+        
+        logger.info(f"Solicitando ítems del mercado: GET {endpoint} con params: {final_params}")
+        return self._coalesced_get(endpoint, final_params)
+
+    def iter_market_items(self, game_id: str = "a8db", limit: int = 100, currency: str = "USD",
+                          order_by: Optional[str] = None, order_dir: Optional[str] = None,
+                          price_from: Optional[int] = None, price_to: Optional[int] = None,
+                          title: Optional[str] = None,
+                          tree_filters: Optional[dict] = None,
+                          stop_when: Optional[StopPredicate] = None,
+                          max_pages: Optional[int] = None,
+                          prefetch: bool = True,
+                          on_error: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre /exchange/v1/market/items siguiendo los cursores de DMarket y
+        entrega las ofertas página a página, sin acumular el libro completo en memoria.
+
+        Args:
+            game_id, limit, currency, order_by, order_dir, price_from, price_to, title,
+            tree_filters, **kwargs: Igual que en get_market_items (limit es el tamaño de página).
+            stop_when: Predicado opcional por oferta; al cumplirse se entrega la página
+                recortada y la iteración termina (p.ej. stop_above_price(...) con orden asc).
+            max_pages: Máximo de páginas a recorrer.
+            prefetch: Si es True, la página siguiente se pide en segundo plano mientras
+                el consumidor procesa la actual.
+            on_error: Callback opcional con la respuesta de error si la iteración se corta
+                por un error (circuito abierto, carga descartada, 429 agotados...); sin él,
+                el error solo se registra y la iteración termina como si no hubiera más páginas.
+
+        Yields:
+            List[Dict[str, Any]]: Ofertas de cada página (campo "objects").
+        """
+        def fetch(cursor: Optional[str]) -> Dict[str, Any]:
+            return self.get_market_items(
+                game_id=game_id, limit=limit, currency=currency, order_by=order_by, order_dir=order_dir,
+                price_from=price_from, price_to=price_to, title=title, cursor=cursor,
+                tree_filters=tree_filters, **kwargs
+            )
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dmarket-prefetch") if prefetch else None
+        try:
+            response = fetch(None)
+            pages = 0
+            while True:
+                if "error" in response:
+                    logger.warning(f"Iteración de market items interrumpida en la página {pages + 1}: {response.get('error')}")
+                    if on_error is not None:
+                        on_error(response)
+                    return
+                objects = response.get("objects") or []
+                next_cursor = response.get("cursor")
+                pages += 1
+                page, stopped = split_page_at_stop(objects, stop_when)
+                has_more = bool(next_cursor) and bool(objects) and (max_pages is None or pages < max_pages)
+
+                next_page = None
+                if has_more and not stopped and executor is not None:
+                    # Copia del contexto: la página siguiente conserva la prioridad de request_priority()
+                    next_page = executor.submit(contextvars.copy_context().run, fetch, next_cursor)
+
+                if page:
+                    yield page
+                if stopped or not has_more:
+                    return
+                response = next_page.result() if next_page is not None else fetch(next_cursor)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def iter_offers_by_title(self, title: str, limit: int = 100, currency: str = "USD",
+                             stop_when: Optional[StopPredicate] = None,
+                             max_pages: Optional[int] = None,
+                             prefetch: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre el libro completo de ofertas de venta de un título, de menor a mayor precio.
+        Ver iter_market_items para el significado de los argumentos.
+        """
+        return self.iter_market_items(
+            game_id="a8db", limit=limit, currency=currency, order_by="price", order_dir="asc",
+            title=title, stop_when=stop_when, max_pages=max_pages, prefetch=prefetch
+        )
+
+    def _build_market_items_params(self, game_id: str, limit: int = 50, currency: str = "USD",
+                                   order_by: Optional[str] = None, order_dir: Optional[str] = None,
+                                   price_from: Optional[int] = None, price_to: Optional[int] = None,
+                                   title: Optional[str] = None,
+                                   cursor: Optional[str] = None,
+                                   tree_filters: Optional[dict] = None,
+                                   **kwargs) -> Dict[str, str]:
+        """
+        Construye los query params de /exchange/v1/market/items (sin valores None).
+        tree_filters se codifica con encode_tree_filters (ver core/tree_filters.py).
+        """
         query_params = {
             "gameId": game_id,
             "limit": str(limit),
@@ -221,21 +583,14 @@ class DMarketAPI:
         }
         
         if tree_filters:
-            for key, value in tree_filters.items():
-                if isinstance(value, list):
-                    logger.warning(f"El manejo de listas en tree_filters ('{key}') no está completamente implementado para la firma. Se usará str().")
-                    query_params[f"Tree[{key}]"] = str(value)
-                else:
-                    query_params[f"Tree[{key}]"] = str(value) if value is not None else None
+            # Un único parámetro treeFilters (listas y rangos incluidos); se firma tal cual se envía
+            query_params[TREE_FILTERS_PARAM] = encode_tree_filters(tree_filters)
 
         if kwargs:
             for key, value in kwargs.items():
                 query_params[key] = str(value) if value is not None else None
         
-        final_params = {k: v for k, v in query_params.items() if v is not None}
-        
-        logger.info(f"Solicitando ítems del mercado: GET {endpoint} con params: {final_params}")
-        return self._make_request(method="GET", endpoint=endpoint, params=final_params)
+        return {k: v for k, v in query_params.items() if v is not None}
 
     def get_account_balance(self) -> Dict[str, Any]:
         """
@@ -244,7 +599,7 @@ class DMarketAPI:
         """
         endpoint = "/account/v1/balance"
         logger.info(f"Solicitando balance de la cuenta: GET {endpoint}")
-        return self._make_request(method="GET", endpoint=endpoint)
+        return self._cached_get(endpoint)
 
     def get_fee_rates(self, game_id: str) -> Dict[str, Any]:
         """
@@ -259,7 +614,7 @@ class DMarketAPI:
         """
         endpoint = f"/account/v1/fee-rates/{game_id}"
         logger.info(f"Solicitando tasas de comisión para el juego {game_id}: GET {endpoint}")
-        return self._make_request(method="GET", endpoint=endpoint)
+        return self._cached_get(endpoint)
 
     def get_offers_by_title(
         self, 
@@ -273,6 +628,15 @@ class DMarketAPI:
         ENDPOINT CORREGIDO: /exchange/v1/market/items con gameId incluido
         """
         endpoint = "/exchange/v1/market/items"
+        final_params = self._build_offers_by_title_params(title, limit, currency, cursor)
+        
+        logger.info(f"Solicitando ofertas por título '{title}': GET {endpoint} con params: {final_params}")
+        return self._coalesced_get(endpoint, final_params)
+
+    def _build_offers_by_title_params(
+        self, title: str, limit: int = 100, currency: str = "USD", cursor: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Construye los query params de get_offers_by_title (sin valores None)."""
         query_params = {
             "gameId": "a8db",  # CS2 game ID es requerido
             "title": title,
@@ -280,11 +644,7 @@ class DMarketAPI:
             "currency": currency.upper(),
             "cursor": cursor
         }
-        
-        final_params = {k: v for k, v in query_params.items() if v is not None}
-        
-        logger.info(f"Solicitando ofertas por título '{title}': GET {endpoint} con params: {final_params}")
-        return self._make_request(method="GET", endpoint=endpoint, params=final_params)
+        return {k: v for k, v in query_params.items() if v is not None}
 
     def get_buy_offers(
         self,
@@ -304,6 +664,23 @@ class DMarketAPI:
         
         # Usar el endpoint de market items que sí funciona
         endpoint = "/exchange/v1/market/items"
+        final_params = self._build_buy_offers_params(title, game_id, limit, currency, cursor, order_by, order_dir)
+        
+        logger.info(f"Solicitando ítems de mercado para '{title}': GET {endpoint} con params: {final_params}")
+        response = self._coalesced_get(endpoint, final_params)
+        return self._normalize_buy_offers_response(title, response)
+
+    def _build_buy_offers_params(
+        self,
+        title: str,
+        game_id: str = "a8db",
+        limit: int = 100,
+        currency: str = "USD",
+        cursor: Optional[str] = None,
+        order_by: Optional[str] = "price",
+        order_dir: Optional[str] = "desc"
+    ) -> Dict[str, str]:
+        """Construye los query params de get_buy_offers (sin valores None)."""
         query_params = {
             "gameId": game_id,
             "title": title,
@@ -313,13 +690,10 @@ class DMarketAPI:
             "orderBy": order_by,
             "orderDir": order_dir
         }
-        
-        final_params = {k: v for k, v in query_params.items() if v is not None}
-        
-        logger.info(f"Solicitando ítems de mercado para '{title}': GET {endpoint} con params: {final_params}")
-        response = self._make_request(method="GET", endpoint=endpoint, params=final_params)
-        
-        # Si hay error, devolver estructura vacía válida
+        return {k: v for k, v in query_params.items() if v is not None}
+
+    def _normalize_buy_offers_response(self, title: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Si hay error, devuelve una estructura vacía válida en lugar del dict de error."""
         if "error" in response:
             logger.warning(f"Error obteniendo ítems de mercado para '{title}': {response.get('message', 'error desconocido')}")
             return {
@@ -343,23 +717,14 @@ class DMarketAPI:
         logger.info(f"Intentando comprar ítem {asset_id} por ${price_usd:.2f}")
         
         # Convertir precio a centavos (formato requerido por DMarket)
-        price_cents = int(price_usd * 100)
+        price_cents = usd_to_cents(price_usd)
         
         endpoint = "/exchange/v1/buy-offers"
-        body_data = {
-            "offers": [
-                {
-                    "assetId": asset_id,
-                    "price": {
-                        "amount": str(price_cents),
-                        "currency": "USD"
-                    }
-                }
-            ]
-        }
+        body_data = self._build_buy_body([(asset_id, price_cents)])
         
         logger.debug(f"Datos de compra: {body_data}")
         response = self._make_request("POST", endpoint, body_data=body_data)
+        self._invalidate_after_trade()
         
         if "error" not in response:
             logger.info(f"Compra exitosa para {asset_id}: {response}")
@@ -368,6 +733,77 @@ class DMarketAPI:
             
         return response
 
+    def buy_items(self, offers: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """
+        Compra varios ítems en una sola petición firmada (en bloques de MAX_BATCH_SIZE).
+
+        Args:
+            offers: Lista de pares (asset_id, precio en centavos).
+
+        Returns:
+            Dict con:
+              - "results": {asset_id: {"success", "price_cents", "error", "details"}}
+              - "successful" / "failed": listas de asset_ids
+              - "responses": respuestas crudas de DMarket por bloque
+              - "error": solo si ningún ítem se compró y hubo un error de petición
+        """
+        logger.info(f"Intentando comprar {len(offers)} ítems en batch")
+        endpoint = "/exchange/v1/buy-offers"
+        prices = dict(offers)
+        responses = []
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for chunk in chunked(offers, self.MAX_BATCH_SIZE):
+            body_data = self._build_buy_body(chunk)
+            response = self._make_request("POST", endpoint, body_data=body_data)
+            responses.append(response)
+            results.update(map_batch_results([asset_id for asset_id, _ in chunk], response))
+
+        self._invalidate_after_trade()
+        return self._summarize_batch(results, responses, prices, "compra")
+
+    def _summarize_batch(
+        self, results: Dict[str, Dict[str, Any]], responses: List[Dict[str, Any]],
+        prices: Dict[str, int], operation: str
+    ) -> Dict[str, Any]:
+        """Agrega los resultados por elemento de una operación batch y registra el resumen."""
+        for item_id, result in results.items():
+            result["price_cents"] = prices.get(item_id)
+        successful = [item_id for item_id, result in results.items() if result["success"]]
+        failed = [item_id for item_id, result in results.items() if not result["success"]]
+        summary: Dict[str, Any] = {
+            "results": results,
+            "successful": successful,
+            "failed": failed,
+            "responses": responses
+        }
+        if not successful:
+            request_errors = [r for r in responses if isinstance(r, dict) and "error" in r]
+            if request_errors:
+                summary["error"] = request_errors[0].get("error")
+                summary["message"] = request_errors[0].get("message")
+
+        if failed:
+            logger.warning(f"Batch de {operation}: {len(successful)} exitosos, {len(failed)} fallidos ({failed})")
+        else:
+            logger.info(f"Batch de {operation} exitoso: {len(successful)} elementos")
+        return summary
+
+    def _build_buy_body(self, offers: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """Construye el cuerpo de /exchange/v1/buy-offers a partir de pares (asset_id, precio en centavos)."""
+        return {
+            "offers": [
+                {
+                    "assetId": asset_id,
+                    "price": {
+                        "amount": str(price_cents),
+                        "currency": "USD"
+                    }
+                }
+                for asset_id, price_cents in offers
+            ]
+        }
+
     def create_sell_offer(
         self, 
         asset_id: str, 
@@ -388,10 +824,51 @@ class DMarketAPI:
         logger.info(f"Creando oferta de venta para {asset_id} por ${price_usd:.2f}")
         
         # Convertir precio a centavos
-        price_cents = int(price_usd * 100)
+        price_cents = usd_to_cents(price_usd)
         
         endpoint = "/exchange/v1/offers"
-        body_data = {
+        body_data = self._build_sell_body([(asset_id, price_cents)], game_id)
+        
+        logger.debug(f"Datos de oferta de venta: {body_data}")
+        response = self._make_request("POST", endpoint, body_data=body_data)
+        self._invalidate_after_trade()
+        
+        if "error" not in response:
+            logger.info(f"Oferta de venta creada exitosamente para {asset_id}: {response}")
+        else:
+            logger.error(f"Error creando oferta de venta para {asset_id}: {response}")
+            
+        return response
+
+    def create_sell_offers(self, items: List[Tuple[str, int]], game_id: str = "a8db") -> Dict[str, Any]:
+        """
+        Crea varias ofertas de venta en peticiones batch (en bloques de MAX_BATCH_SIZE).
+
+        Args:
+            items: Lista de pares (asset_id, precio en centavos).
+            game_id: ID del juego (por defecto CS2).
+
+        Returns:
+            Dict con el mismo formato que buy_items, indexado por asset_id.
+        """
+        logger.info(f"Creando {len(items)} ofertas de venta en batch")
+        endpoint = "/exchange/v1/offers"
+        prices = dict(items)
+        responses = []
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for chunk in chunked(items, self.MAX_BATCH_SIZE):
+            body_data = self._build_sell_body(chunk, game_id)
+            response = self._make_request("POST", endpoint, body_data=body_data)
+            responses.append(response)
+            results.update(map_batch_results([asset_id for asset_id, _ in chunk], response))
+
+        self._invalidate_after_trade()
+        return self._summarize_batch(results, responses, prices, "venta")
+
+    def _build_sell_body(self, items: List[Tuple[str, int]], game_id: str = "a8db") -> Dict[str, Any]:
+        """Construye el cuerpo de /exchange/v1/offers a partir de pares (asset_id, precio en centavos)."""
+        return {
             "items": [
                 {
                     "assetId": asset_id,
@@ -400,19 +877,10 @@ class DMarketAPI:
                         "currency": "USD"
                     }
                 }
+                for asset_id, price_cents in items
             ],
             "gameId": game_id
         }
-        
-        logger.debug(f"Datos de oferta de venta: {body_data}")
-        response = self._make_request("POST", endpoint, body_data=body_data)
-        
-        if "error" not in response:
-            logger.info(f"Oferta de venta creada exitosamente para {asset_id}: {response}")
-        else:
-            logger.error(f"Error creando oferta de venta para {asset_id}: {response}")
-            
-        return response
 
     def cancel_sell_offer(self, offer_id: str) -> Dict[str, Any]:
         """
@@ -428,6 +896,7 @@ class DMarketAPI:
         
         endpoint = f"/exchange/v1/offers/{offer_id}/close"
         response = self._make_request("PATCH", endpoint)
+        self._invalidate_after_trade()
         
         if "error" not in response:
             logger.info(f"Oferta {offer_id} cancelada exitosamente: {response}")
@@ -436,6 +905,78 @@ class DMarketAPI:
             
         return response
 
+    def cancel_sell_offers(self, offer_ids: List[str]) -> Dict[str, Any]:
+        """
+        Cancela varias ofertas de venta activas en peticiones batch (en bloques de MAX_BATCH_SIZE).
+
+        Args:
+            offer_ids: IDs de las ofertas a cancelar.
+
+        Returns:
+            Dict con el mismo formato que buy_items, indexado por offer_id.
+        """
+        logger.info(f"Cancelando {len(offer_ids)} ofertas de venta en batch")
+        endpoint = "/marketplace-api/v1/user-offers/close"
+        responses = []
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for chunk in chunked(offer_ids, self.MAX_BATCH_SIZE):
+            response = self._make_request("POST", endpoint, body_data={"offerIds": list(chunk)})
+            responses.append(response)
+            results.update(map_batch_results(list(chunk), response))
+
+        self._invalidate_after_trade()
+        return self._summarize_batch(results, responses, {}, "cancelación")
+
+    def get_aggregated_prices(self, titles: List[str], game_id: str = "a8db") -> Dict[str, Any]:
+        """
+        Mejor oferta de venta (ask) y de compra (bid) de muchos títulos con pocas peticiones.
+        Endpoint: POST /marketplace-api/v1/aggregated-prices, en bloques de
+        AGGREGATED_PRICES_CHUNK títulos enviados en paralelo.
+
+        Returns:
+            {"prices": {título: {"best_ask_usd", "best_bid_usd", "offer_count", "order_count"}},
+             "failed_titles": [...]}, o un dict con "error" si fallaron todos los bloques.
+        """
+        unique_titles = list(dict.fromkeys(t for t in titles if t))
+        if not unique_titles:
+            return {"prices": {}, "failed_titles": []}
+        chunks = list(chunked(unique_titles, self.AGGREGATED_PRICES_CHUNK))
+        logger.info(f"Solicitando precios agregados de {len(unique_titles)} títulos en {len(chunks)} peticiones")
+
+        def fetch(chunk: List[str]) -> Dict[str, Any]:
+            return self._make_request("POST", AGGREGATED_PRICES_ENDPOINT, body_data=_aggregated_prices_body(chunk, game_id))
+
+        if len(chunks) == 1:
+            responses = [fetch(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.AGGREGATED_PRICES_CONCURRENCY, len(chunks)),
+                                    thread_name_prefix="dmarket-prices") as executor:
+                # Un contexto copiado por bloque para que los hilos hereden la prioridad de request_priority()
+                futures = [executor.submit(contextvars.copy_context().run, fetch, chunk) for chunk in chunks]
+                responses = [future.result() for future in futures]
+        return merge_aggregated_prices(chunks, responses)
+
+    def get_market_prices_usd(self, titles: List[str], side: str = "ask", game_id: str = "a8db") -> Dict[str, float]:
+        """
+        Precio de mercado actual por título a partir de get_aggregated_prices.
+
+        Args:
+            side: "ask" (mejor oferta de venta, con el bid como respaldo) o "bid".
+
+        Returns:
+            {título: precio USD}; los títulos sin precio (o con error) no aparecen.
+        """
+        response = self.get_aggregated_prices(titles, game_id)
+        if "error" in response:
+            logger.warning(f"No se pudieron obtener precios agregados: {response.get('error')}")
+            return {}
+        return {
+            title: price for title, price in (
+                (title, mark_price(entry, side)) for title, entry in response["prices"].items()
+            ) if price is not None
+        }
+
     def get_user_offers(self, game_id: str = "a8db", limit: int = 100) -> Dict[str, Any]:
         """
         Obtiene las ofertas activas del usuario.
@@ -455,7 +996,7 @@ class DMarketAPI:
             "limit": limit
         }
         
-        response = self._make_request("GET", endpoint, params=params)
+        response = self._cached_get(endpoint, params=params)
         
         if "error" not in response:
             logger.debug(f"Ofertas del usuario obtenidas: {len(response.get('objects', []))} ofertas")
@@ -483,7 +1024,7 @@ class DMarketAPI:
             "limit": limit
         }
         
-        response = self._make_request("GET", endpoint, params=params)
+        response = self._cached_get(endpoint, params=params)
         
         if "error" not in response:
             logger.debug(f"Inventario obtenido: {len(response.get('objects', []))} ítems")
@@ -492,6 +1033,144 @@ class DMarketAPI:
             
         return response
 
+def _aggregated_prices_body(titles: List[str], game_id: str) -> Dict[str, Any]:
+    return {"filter": {"game": game_id, "titles": list(titles)}, "limit": str(len(titles))}
+
+
+def _amount_usd(price: Any) -> Optional[float]:
+    """Importe USD de {"Currency": "USD", "Amount": "1.23"} (o variantes en minúsculas)."""
+    if not isinstance(price, dict):
+        return None
+    amount = price.get("Amount", price.get("amount"))
+    try:
+        value = float(amount)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def merge_aggregated_prices(chunks: List[List[str]], responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina las respuestas de /aggregated-prices por bloque en {"prices", "failed_titles"}."""
+    prices: Dict[str, Dict[str, Any]] = {}
+    failed: List[str] = []
+    errors = []
+    for chunk, response in zip(chunks, responses):
+        if not isinstance(response, dict) or "error" in response:
+            failed.extend(chunk)
+            errors.append(response)
+            continue
+        for entry in response.get("aggregatedPrices") or []:
+            title = entry.get("title")
+            if not title:
+                continue
+            prices[title] = {
+                "best_ask_usd": _amount_usd(entry.get("offerBestPrice")),
+                "best_bid_usd": _amount_usd(entry.get("orderBestPrice")),
+                "offer_count": int(entry.get("offerCount") or 0),
+                "order_count": int(entry.get("orderCount") or 0)
+            }
+    if failed and not prices:
+        first = errors[0] if errors and isinstance(errors[0], dict) else {}
+        return {"error": first.get("error", "AggregatedPricesError"), "message": first.get("message"),
+                "failed_titles": failed}
+    return {"prices": prices, "failed_titles": failed}
+
+
+def mark_price(entry: Dict[str, Any], side: str = "ask") -> Optional[float]:
+    """Precio de valoración de una entrada de get_aggregated_prices: ask con bid de respaldo, o bid."""
+    if side == "bid":
+        return entry.get("best_bid_usd")
+    return entry.get("best_ask_usd") or entry.get("best_bid_usd")
+
+
+def usd_to_cents(price_usd: float) -> int:
+    """
+    Importe USD a centavos enteros, redondeando: int(0.57 * 100) daría 56 y la compra
+    o la oferta saldría un centavo por debajo del precio listado.
+    """
+    return int(round(price_usd * 100))
+
+
+def chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Divide una lista en bloques de como máximo `size` elementos."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Claves donde DMarket devuelve el resultado por elemento en respuestas batch
+_BATCH_LIST_KEYS = ("result", "results", "items", "offers", "created", "closed", "successful")
+_BATCH_FAILED_KEYS = ("failed", "errors")
+_BATCH_DICT_KEYS = ("dmOffersStatus", "statuses")
+_BATCH_ID_KEYS = ("assetId", "offerId", "itemId", "AssetID", "OfferID")
+_BATCH_OK_STATUSES = {"txsuccess", "success", "successful", "ok", "created", "closed", "tx_success"}
+
+
+def _entry_id(entry: Dict[str, Any]) -> Optional[str]:
+    for key in _BATCH_ID_KEYS:
+        if entry.get(key):
+            return str(entry[key])
+    return None
+
+
+def _entry_ok(entry: Dict[str, Any]) -> bool:
+    if entry.get("error") or entry.get("errors"):
+        return False
+    if isinstance(entry.get("successful"), bool):
+        return entry["successful"]
+    status = entry.get("status")
+    if isinstance(status, str):
+        return status.lower() in _BATCH_OK_STATUSES
+    return True
+
+
+def map_batch_results(requested_ids: List[str], response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Asocia la respuesta de una petición batch a cada elemento pedido.
+
+    Si la petición falló entera, todos los elementos quedan como fallidos con ese error.
+    Si la respuesta trae resultados por elemento (listas o dicts por id), se usan;
+    un elemento sin resultado propio en una respuesta que sí los trae se considera fallido.
+    Si la respuesta es un éxito sin detalle por elemento, todos se consideran exitosos.
+    """
+    if not isinstance(response, dict) or "error" in response:
+        error = response.get("error") if isinstance(response, dict) else "InvalidResponse"
+        message = response.get("message") if isinstance(response, dict) else str(response)
+        return {item_id: {"success": False, "error": error, "message": message, "details": None}
+                for item_id in requested_ids}
+
+    per_item: Dict[str, Tuple[bool, Dict[str, Any]]] = {}
+    for key in _BATCH_LIST_KEYS:
+        entries = response.get(key)
+        if isinstance(entries, list):
+            for entry in entries:
+                if isinstance(entry, dict) and _entry_id(entry):
+                    per_item[_entry_id(entry)] = (_entry_ok(entry), entry)
+    for key in _BATCH_FAILED_KEYS:
+        entries = response.get(key)
+        if isinstance(entries, list):
+            for entry in entries:
+                if isinstance(entry, dict) and _entry_id(entry):
+                    per_item[_entry_id(entry)] = (False, entry)
+    for key in _BATCH_DICT_KEYS:
+        statuses = response.get(key)
+        if isinstance(statuses, dict):
+            for item_id, entry in statuses.items():
+                entry = entry if isinstance(entry, dict) else {"status": entry}
+                per_item[str(item_id)] = (_entry_ok(entry), entry)
+
+    results = {}
+    for item_id in requested_ids:
+        if not per_item:
+            results[item_id] = {"success": True, "error": None, "details": response}
+        elif item_id in per_item:
+            ok, entry = per_item[item_id]
+            error = None if ok else (entry.get("error") or entry.get("errors") or entry.get("status") or "ItemFailed")
+            results[item_id] = {"success": ok, "error": error, "details": entry}
+        else:
+            results[item_id] = {"success": False, "error": "MissingInBatchResponse", "details": None}
+    return results
+
+
 # Ejemplo de uso (requiere que .env esté configurado con las claves)
 if __name__ == "__main__":
     # Configurar logging para la ejecución directa de este script
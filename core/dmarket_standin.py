@@ -0,0 +1,559 @@
+# core/dmarket_standin.py
+"""
+Servidor local que imita los endpoints de DMarket que usa DMarketAPI, para pruebas
+de carga y benchmarks sin claves reales ni dinero real.
+
+- Verifica la firma Ed25519 de cada petición (X-Api-Key / X-Sign-Date / X-Request-Sign).
+- Sirve libros de ofertas sintéticos y deterministas (semilla configurable), filtrables
+  por treeFilters (floatValue y paintSeed).
+- Mantiene balance, inventario y ofertas propias en memoria (compras y ventas los modifican).
+- Inyecta latencia, errores 5xx y respuestas 429 con Retry-After de forma configurable.
+
+Uso:
+    python -m core.dmarket_standin --port 8765 --latency-ms 40 --rate-429 0.02
+    # y en otra terminal, con las claves que imprime el servidor:
+    DMARKET_BASE_URL=http://127.0.0.1:8765 python trading_real_consola.py
+"""
+
+import argparse
+import base64
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from nacl.bindings import crypto_sign_keypair, crypto_sign_open
+
+from core.dmarket_connector import SIGNATURE_PREFIX
+from core.tree_filters import TREE_FILTERS_PARAM, parse_tree_filters, range_from_parsed
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+WEAPONS = [
+    "AK-47", "AWP", "M4A4", "M4A1-S", "Desert Eagle", "Glock-18", "USP-S", "P250",
+    "UMP-45", "MP7", "Nova", "P90", "Tec-9", "MAC-10", "FAMAS", "Galil AR"
+]
+SKINS = [
+    "Redline", "Asiimov", "Howl", "Blaze", "Water Elemental", "Sand Dune", "Gunsmoke",
+    "Forest DDPAT", "Forest Leaves", "Sand Spray", "Groundwater", "Indigo", "Safari Mesh",
+    "Boreal Forest", "Urban Masked", "Printstream", "Neo-Noir", "Slate", "Hyper Beast"
+]
+EXTERIORS = [
+    ("Factory New", 0.0, 0.07), ("Minimal Wear", 0.07, 0.15), ("Field-Tested", 0.15, 0.38),
+    ("Well-Worn", 0.38, 0.45), ("Battle-Scarred", 0.45, 1.0)
+]
+
+
+def generate_keypair() -> Tuple[str, str]:
+    """Genera un par de claves Ed25519 en el formato de DMarket: (pública hex 64, secreta hex 128)."""
+    public_key, secret_key = crypto_sign_keypair()
+    return public_key.hex(), secret_key.hex()
+
+
+@dataclass
+class StandInConfig:
+    """Configuración del servidor stand-in."""
+    host: str = "127.0.0.1"
+    port: int = 0                          # 0 = puerto libre elegido por el sistema
+    public_key: Optional[str] = None       # Clave pública (hex) aceptada; None = se genera un par
+    verify_signatures: bool = True
+    max_clock_skew_sec: int = 120          # Diferencia máxima aceptada en X-Sign-Date
+    latency_ms: float = 0.0                # Latencia base añadida a cada respuesta
+    latency_jitter_ms: float = 0.0         # Jitter uniforme adicional
+    error_rate: float = 0.0                # Probabilidad de responder 503
+    rate_429: float = 0.0                  # Probabilidad de responder 429
+    max_rps: Optional[float] = None        # Límite de peticiones/segundo (429 al superarlo)
+    retry_after_sec: float = 1.0           # Retry-After de las respuestas 429
+    titles: int = 200                      # Títulos sintéticos en el mercado
+    min_offers_per_title: int = 3
+    max_offers_per_title: int = 60
+    initial_balance_usd: float = 1000.0
+    fee_fraction: str = "0.05"
+    min_fee_cents: str = "1"
+    seed: int = 42
+
+
+@dataclass
+class _Offer:
+    asset_id: str
+    title: str
+    price_cents: int
+    float_value: float
+    paintseed: int
+    owner: str = "market"                  # "market" o "user" (ofertas propias)
+    offer_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    def to_market_object(self) -> Dict[str, Any]:
+        return {
+            "itemId": self.asset_id,
+            "assetId": self.asset_id,
+            "offerId": self.offer_id,
+            "title": self.title,
+            "gameId": "a8db",
+            "amount": 1,
+            "price": {"USD": str(self.price_cents)},
+            "float": f"{self.float_value:.6f}",
+            "paintseed": self.paintseed,
+            "stickers": [],
+            "extra": {"floatValue": self.float_value, "paintSeed": self.paintseed}
+        }
+
+
+class SyntheticMarket:
+    """Estado en memoria del mercado sintético, la cuenta y el inventario. Thread-safe."""
+
+    def __init__(self, config: StandInConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self.balance_cents = int(round(config.initial_balance_usd * 100))
+        self.offers: Dict[str, _Offer] = {}           # asset_id -> oferta en el mercado
+        self.inventory: Dict[str, Dict[str, Any]] = {}  # asset_id -> ítem del usuario
+        self._build(random.Random(config.seed))
+
+    def _build(self, rng: random.Random) -> None:
+        titles = set()
+        while len(titles) < self.config.titles:
+            exterior = rng.choice(EXTERIORS)[0]
+            titles.add(f"{rng.choice(WEAPONS)} | {rng.choice(SKINS)} ({exterior})")
+        for title in sorted(titles):
+            exterior = title[title.rindex("(") + 1:-1]
+            float_low, float_high = next((low, high) for name, low, high in EXTERIORS if name == exterior)
+            # Precio base log-uniforme entre 0.05 y 2000 USD
+            base_cents = int(10 ** rng.uniform(0.7, 5.3))
+            for _ in range(rng.randint(self.config.min_offers_per_title, self.config.max_offers_per_title)):
+                asset_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                price = max(1, int(base_cents * rng.lognormvariate(0.0, 0.08)))
+                self.offers[asset_id] = _Offer(
+                    asset_id, title, price, rng.uniform(float_low, float_high), rng.randint(0, 999)
+                )
+
+    def market_items(self, params: Dict[str, str]) -> Dict[str, Any]:
+        title = params.get("title")
+        price_from = int(params["priceFrom"]) if params.get("priceFrom") else None
+        price_to = int(params["priceTo"]) if params.get("priceTo") else None
+        limit = max(1, min(100, int(params.get("limit", 50))))
+        offset = _decode_cursor(params.get("cursor"))
+        descending = (params.get("orderDir") or "asc").lower() == "desc"
+        tree = parse_tree_filters(params.get(TREE_FILTERS_PARAM))
+        float_range = range_from_parsed(tree, "floatValue")
+        seed_range = range_from_parsed(tree, "paintSeed")
+        seeds = {int(v) for v in tree.get("paintSeed", [])}
+
+        with self._lock:
+            matches = [
+                offer for offer in self.offers.values()
+                if (not title or offer.title == title or title.lower() in offer.title.lower())
+                and (price_from is None or offer.price_cents >= price_from)
+                and (price_to is None or offer.price_cents <= price_to)
+                and (float_range is None or float_range.contains(offer.float_value))
+                and (seed_range is None or seed_range.contains(offer.paintseed))
+                and (not seeds or offer.paintseed in seeds)
+            ]
+        if params.get("orderBy") == "price" or descending:
+            matches.sort(key=lambda o: (o.price_cents, o.asset_id), reverse=descending)
+        else:
+            matches.sort(key=lambda o: o.asset_id)
+
+        page = matches[offset:offset + limit]
+        next_offset = offset + len(page)
+        return {
+            "objects": [offer.to_market_object() for offer in page],
+            "total": {"offers": len(matches), "items": len(matches)},
+            "cursor": _encode_cursor(next_offset) if next_offset < len(matches) else ""
+        }
+
+    def buy(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        statuses: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for requested in body.get("offers") or []:
+                asset_id = requested.get("assetId")
+                try:
+                    amount = int(requested.get("price", {}).get("amount"))
+                except (TypeError, ValueError):
+                    statuses[str(asset_id)] = {"status": "TxFailed", "error": "InvalidPrice"}
+                    continue
+                offer = self.offers.get(asset_id)
+                if offer is None or offer.owner != "market":
+                    statuses[str(asset_id)] = {"status": "TxFailed", "error": "OfferNotFound"}
+                elif amount < offer.price_cents:
+                    statuses[asset_id] = {"status": "TxFailed", "error": "PriceChanged"}
+                elif offer.price_cents > self.balance_cents:
+                    statuses[asset_id] = {"status": "TxFailed", "error": "InsufficientFunds"}
+                else:
+                    self.balance_cents -= offer.price_cents
+                    del self.offers[asset_id]
+                    self.inventory[asset_id] = {
+                        "itemId": asset_id, "assetId": asset_id, "title": offer.title, "gameId": "a8db",
+                        "price": {"USD": str(offer.price_cents)}, "inMarket": False, "tradable": True
+                    }
+                    statuses[asset_id] = {"status": "TxSuccess"}
+        ok = any(s["status"] == "TxSuccess" for s in statuses.values())
+        return {"orderId": str(uuid.uuid4()), "status": "TxSuccess" if ok else "TxFailed", "dmOffersStatus": statuses}
+
+    def create_offers(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        results = []
+        with self._lock:
+            for requested in body.get("items") or []:
+                asset_id = requested.get("assetId")
+                item = self.inventory.get(asset_id)
+                try:
+                    amount = int(requested.get("price", {}).get("amount"))
+                except (TypeError, ValueError):
+                    amount = 0
+                if item is None or item.get("inMarket"):
+                    results.append({"AssetID": asset_id, "OfferID": None, "successful": False,
+                                    "error": {"code": "ItemNotAvailable"}})
+                    continue
+                if amount <= 0:
+                    results.append({"AssetID": asset_id, "OfferID": None, "successful": False,
+                                    "error": {"code": "InvalidPrice"}})
+                    continue
+                offer = _Offer(asset_id, item["title"], amount, 0.0, 0, owner="user")
+                self.offers[asset_id] = offer
+                item["inMarket"] = True
+                item["offerId"] = offer.offer_id
+                results.append({"AssetID": asset_id, "OfferID": offer.offer_id, "successful": True, "error": None})
+        return {"result": results}
+
+    def close_offers(self, offer_ids: List[str]) -> Dict[str, Any]:
+        results = []
+        with self._lock:
+            by_offer_id = {o.offer_id: o for o in self.offers.values() if o.owner == "user"}
+            for offer_id in offer_ids:
+                offer = by_offer_id.get(offer_id)
+                if offer is None:
+                    results.append({"offerId": offer_id, "successful": False, "error": "OfferNotFound"})
+                    continue
+                del self.offers[offer.asset_id]
+                item = self.inventory.get(offer.asset_id)
+                if item is not None:
+                    item["inMarket"] = False
+                    item.pop("offerId", None)
+                results.append({"offerId": offer_id, "successful": True})
+        return {"result": results}
+
+    def user_items(self, params: Dict[str, str]) -> Dict[str, Any]:
+        limit = max(1, min(100, int(params.get("limit", 100))))
+        with self._lock:
+            items = [dict(item) for item in self.inventory.values()][:limit]
+        return {"objects": items, "total": {"items": len(self.inventory)}}
+
+    def user_offers(self, params: Dict[str, str]) -> Dict[str, Any]:
+        limit = max(1, min(100, int(params.get("limit", 100))))
+        with self._lock:
+            offers = [o.to_market_object() for o in self.offers.values() if o.owner == "user"]
+        return {"objects": offers[:limit], "total": {"offers": len(offers)}}
+
+    def aggregated_prices(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        titles = (body.get("filter") or {}).get("titles") or []
+        wanted = set(titles)
+        with self._lock:
+            books: Dict[str, List[int]] = {}
+            for offer in self.offers.values():
+                if offer.owner == "market" and offer.title in wanted:
+                    books.setdefault(offer.title, []).append(offer.price_cents)
+        entries = []
+        for title in titles:
+            prices = books.get(title)
+            if not prices:
+                continue
+            best_ask = min(prices)
+            # Sin órdenes de compra reales: bid sintético un 10% por debajo del ask
+            best_bid = int(best_ask * 0.9)
+            entries.append({
+                "title": title,
+                "offerBestPrice": {"Currency": "USD", "Amount": f"{best_ask / 100:.2f}"},
+                "offerCount": len(prices),
+                "orderBestPrice": {"Currency": "USD", "Amount": f"{best_bid / 100:.2f}"},
+                "orderCount": 1 if best_bid > 0 else 0
+            })
+        return {"aggregatedPrices": entries, "nextCursor": ""}
+
+    def balance(self) -> Dict[str, Any]:
+        with self._lock:
+            cents = self.balance_cents
+        return {"usd": str(cents), "usdAvailableToWithdraw": str(cents), "dmc": "0", "dmcAvailableToWithdraw": "0"}
+
+    def titles(self) -> List[str]:
+        with self._lock:
+            return sorted({offer.title for offer in self.offers.values()})
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        return 0
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Handler HTTP; el estado vive en self.server.standin (DMarketStandInServer)."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, como la API real
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("stand-in: " + format % args)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def do_HEAD(self) -> None:
+        # Ping de calentamiento (HttpTransport.warm): sin firma ni cuerpo
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _handle(self, method: str) -> None:
+        standin: "DMarketStandInServer" = self.server.standin
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        split = urlsplit(self.path)
+        status, payload, headers = standin.dispatch(method, split.path, split.query, raw_body, self.headers)
+
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class DMarketStandInServer:
+    """
+    Servidor stand-in de DMarket sobre ThreadingHTTPServer.
+
+    Uso:
+        with DMarketStandInServer(StandInConfig(latency_ms=30)) as server:
+            api = DMarketAPI(server.public_key, server.secret_key, base_url=server.base_url)
+    """
+
+    def __init__(self, config: Optional[StandInConfig] = None):
+        self.config = config or StandInConfig()
+        self.secret_key: Optional[str] = None
+        if self.config.public_key:
+            self.public_key = self.config.public_key
+        else:
+            self.public_key, self.secret_key = generate_keypair()
+        self._public_key_bytes = bytes.fromhex(self.public_key)
+        self.market = SyntheticMarket(self.config)
+        self._rng = random.Random(self.config.seed + 1)
+        self._rng_lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {
+            "requests": 0, "by_endpoint": {}, "signature_failures": 0,
+            "injected_errors": 0, "injected_429": 0, "rate_limited_429": 0
+        }
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2] if self._httpd else (self.config.host, self.config.port)
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Arranca el servidor en un hilo daemon y devuelve su URL base."""
+        self._httpd = ThreadingHTTPServer((self.config.host, self.config.port), _StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="dmarket-standin", daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in de DMarket escuchando en {self.base_url}")
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "DMarketStandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+            stats["by_endpoint"] = dict(self.stats["by_endpoint"])
+        return stats
+
+    def _count(self, key: str, endpoint: Optional[str] = None) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+            if endpoint is not None:
+                self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+
+    def _verify_signature(self, method: str, path: str, query: str, raw_body: bytes, headers) -> Optional[str]:
+        """Devuelve None si la firma es válida, o el motivo del rechazo."""
+        if headers.get("X-Api-Key") != self.public_key:
+            return "UnknownApiKey"
+        timestamp = headers.get("X-Sign-Date") or ""
+        signature = headers.get("X-Request-Sign") or ""
+        if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > self.config.max_clock_skew_sec:
+            return "InvalidSignDate"
+        if not signature.startswith(SIGNATURE_PREFIX):
+            return "InvalidSignatureFormat"
+
+        # Misma cadena que DMarketAPI._prepare_request: query ordenada y cuerpo JSON compacto
+        sorted_query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+        path_for_sig = path + ("?" + sorted_query if sorted_query else "")
+        body_for_sig = ""
+        if raw_body:
+            try:
+                body_for_sig = json.dumps(json.loads(raw_body), separators=(",", ":"))
+            except ValueError:
+                return "InvalidJsonBody"
+        message = (method + path_for_sig + body_for_sig + timestamp).encode("utf-8")
+        try:
+            crypto_sign_open(bytes.fromhex(signature[len(SIGNATURE_PREFIX):]) + message, self._public_key_bytes)
+        except Exception:
+            return "InvalidSignature"
+        return None
+
+    def _inject_faults(self) -> Optional[Tuple[int, Dict[str, Any], Dict[str, str]]]:
+        retry_after = {"Retry-After": str(int(max(1, self.config.retry_after_sec)))}
+        if self.config.max_rps:
+            with self._rng_lock:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start, self._window_count = now, 0
+                self._window_count += 1
+                over_limit = self._window_count > self.config.max_rps
+            if over_limit:
+                self._count("rate_limited_429")
+                return 429, {"code": "TooManyRequests", "message": "Rate limit exceeded"}, retry_after
+        with self._rng_lock:
+            roll_429, roll_error = self._rng.random(), self._rng.random()
+            delay_ms = self.config.latency_ms + self._rng.uniform(0, self.config.latency_jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+        if roll_429 < self.config.rate_429:
+            self._count("injected_429")
+            return 429, {"code": "TooManyRequests", "message": "Injected 429"}, retry_after
+        if roll_error < self.config.error_rate:
+            self._count("injected_errors")
+            return 503, {"code": "ServiceUnavailable", "message": "Injected error"}, {}
+        return None
+
+    def dispatch(
+        self, method: str, path: str, query: str, raw_body: bytes, headers
+    ) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Procesa una petición y devuelve (status, cuerpo JSON, cabeceras extra)."""
+        self._count("requests", f"{method} {path}")
+
+        if self.config.verify_signatures:
+            reason = self._verify_signature(method, path, query, raw_body, headers)
+            if reason is not None:
+                self._count("signature_failures")
+                return 401, {"code": reason, "message": "Signature verification failed"}, {}
+
+        fault = self._inject_faults()
+        if fault is not None:
+            return fault
+
+        params = dict(parse_qsl(query, keep_blank_values=True))
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return 400, {"code": "InvalidJsonBody", "message": "Body is not valid JSON"}, {}
+
+        if method == "GET" and path == "/exchange/v1/market/items":
+            return 200, self.market.market_items(params), {}
+        if method == "GET" and path == "/account/v1/balance":
+            return 200, self.market.balance(), {}
+        if method == "GET" and path == "/exchange/v1/customized-fees":
+            return 200, {"defaultFee": {"fraction": self.config.fee_fraction, "minAmount": self.config.min_fee_cents},
+                         "reducedFees": []}, {}
+        if method == "GET" and path.startswith("/account/v1/fee-rates/"):
+            return 200, {"gameId": path.rsplit("/", 1)[-1], "feeRate": {"amount": self.config.fee_fraction},
+                         "minCommission": {"amount": self.config.min_fee_cents}}, {}
+        if method == "GET" and path == "/exchange/v1/user/items":
+            return 200, self.market.user_items(params), {}
+        if method == "GET" and path == "/exchange/v1/user/offers":
+            return 200, self.market.user_offers(params), {}
+        if method == "POST" and path == "/exchange/v1/buy-offers":
+            return 200, self.market.buy(body), {}
+        if method == "POST" and path == "/exchange/v1/offers":
+            return 200, self.market.create_offers(body), {}
+        if method == "POST" and path == "/marketplace-api/v1/aggregated-prices":
+            return 200, self.market.aggregated_prices(body), {}
+        if method == "POST" and path == "/marketplace-api/v1/user-offers/close":
+            return 200, self.market.close_offers(body.get("offerIds") or []), {}
+        if method == "PATCH" and path.startswith("/exchange/v1/offers/") and path.endswith("/close"):
+            offer_id = path[len("/exchange/v1/offers/"):-len("/close")]
+            result = self.market.close_offers([offer_id])["result"][0]
+            if not result["successful"]:
+                return 404, {"code": "OfferNotFound", "message": offer_id}, {}
+            return 200, result, {}
+        return 404, {"code": "NotFound", "message": f"{method} {path}"}, {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in local de la API de DMarket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--public-key", default=None, help="Clave pública aceptada (hex). Por defecto se genera un par.")
+    parser.add_argument("--no-verify", action="store_true", help="No verificar firmas")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--titles", type=int, default=200)
+    parser.add_argument("--balance-usd", type=float, default=1000.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    server = DMarketStandInServer(StandInConfig(
+        host=args.host, port=args.port, public_key=args.public_key, verify_signatures=not args.no_verify,
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms, error_rate=args.error_rate,
+        rate_429=args.rate_429, max_rps=args.max_rps, titles=args.titles,
+        initial_balance_usd=args.balance_usd, seed=args.seed
+    ))
+    base_url = server.start()
+    print(f"DMARKET_BASE_URL={base_url}")
+    print(f"DMARKET_PUBLIC_KEY={server.public_key}")
+    if server.secret_key:
+        print(f"DMARKET_SECRET_KEY={server.secret_key}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.get_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
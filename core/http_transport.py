@@ -0,0 +1,293 @@
+# core/http_transport.py
+"""
+Capa de transporte HTTP del conector síncrono de DMarket.
+Configura el pool de conexiones de requests (tamaño, TCP keep-alive), permite
+usar opcionalmente un cliente HTTP/2 (httpx) y mantiene las conexiones calientes
+con un ping periódico para que las peticiones críticas (compras) no paguen el
+handshake TCP/TLS tras periodos de inactividad.
+"""
+
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+# httpx (con el extra http2) es opcional: solo se usa si TransportConfig.http2 es True
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TransportConfig:
+    """Parámetros del transporte HTTP."""
+    pool_connections: int = 4            # Pools por host que se retienen
+    pool_maxsize: int = 20               # Conexiones simultáneas por host
+    pool_block: bool = False             # Bloquear en vez de abrir conexiones extra si el pool está lleno
+    tcp_keepalive: bool = True           # SO_KEEPALIVE en los sockets
+    keepalive_idle_sec: int = 30         # Inactividad antes del primer probe de keep-alive
+    keepalive_interval_sec: int = 10     # Intervalo entre probes
+    keepalive_probes: int = 3            # Probes fallidos antes de cerrar
+    http2: bool = False                  # Usar httpx con HTTP/2 (requiere httpx[http2])
+    warm_connections: int = 2            # Conexiones que abre warm()
+    keep_warm_interval_sec: Optional[float] = None  # Ping periódico si hay inactividad (None = desactivado)
+    warm_path: str = "/"                 # Ruta del ping (no firmado, no consume rate limit de la API)
+
+
+def keepalive_socket_options(config: TransportConfig) -> List[Tuple[int, int, int]]:
+    """Opciones de socket para TCP keep-alive, según lo que soporte la plataforma."""
+    options = list(HTTPConnection.default_socket_options)
+    if not config.tcp_keepalive:
+        return options
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, config.keepalive_idle_sec))
+    elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, config.keepalive_idle_sec))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, config.keepalive_interval_sec))
+    if hasattr(socket, "TCP_KEEPCNT"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, config.keepalive_probes))
+    return options
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter de requests con opciones de socket TCP keep-alive."""
+
+    def __init__(self, socket_options: List[Tuple[int, int, int]], **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class _HttpxResponse:
+    """Adapta una respuesta de httpx a la interfaz de requests que usa DMarketAPI._send_prepared."""
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    def json(self) -> Any:
+        return self._response.json()
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+class _HttpxSession:
+    """
+    Envuelve un httpx.Client (HTTP/2) con la firma de requests.Session.request y
+    traduce sus excepciones a las de requests, de modo que el manejo de errores
+    del conector no cambia.
+    """
+
+    def __init__(self, config: TransportConfig, timeout: float):
+        limits = httpx.Limits(
+            max_connections=config.pool_maxsize,
+            max_keepalive_connections=config.pool_maxsize
+        )
+        transport = httpx.HTTPTransport(http2=True, limits=limits, socket_options=keepalive_socket_options(config))
+        self.client = httpx.Client(http2=True, transport=transport, timeout=timeout)
+        self.last_http_version: Optional[str] = None
+
+    def request(self, method: str, url: str, params=None, json=None, data=None, headers=None, timeout=None, **kwargs):
+        try:
+            # data son los bytes ya serializados (y firmados) del cuerpo: se envían tal cual
+            response = self.client.request(method, url, params=params, json=json, content=data, headers=headers,
+                                           timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e))
+        self.last_http_version = response.http_version
+        return _HttpxResponse(response)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class HttpTransport:
+    """
+    Sesión HTTP del conector con pool dimensionado, keep-alive, HTTP/2 opcional,
+    calentamiento de conexiones y estadísticas de reutilización.
+    """
+
+    def __init__(self, base_url: str, config: Optional[TransportConfig] = None, timeout: float = 10):
+        """
+        Args:
+            base_url: URL base de la API (host al que se calientan las conexiones).
+            config: Configuración del transporte; por defecto TransportConfig().
+            timeout: Timeout de las peticiones de calentamiento.
+        """
+        self.base_url = base_url
+        self.config = config or TransportConfig()
+        self.timeout = timeout
+        self.http2 = False
+        self.session = self._build_session()
+        self.last_used = 0.0
+        self._warm_pings = 0
+        self._warm_errors = 0
+        self._stop_keep_warm = threading.Event()
+        self._keep_warm_thread: Optional[threading.Thread] = None
+
+    def _build_session(self):
+        if self.config.http2:
+            if HTTPX_AVAILABLE:
+                try:
+                    session = _HttpxSession(self.config, self.timeout)
+                    self.http2 = True
+                    logger.info("Transporte HTTP/2 (httpx) activado")
+                    return session
+                except ImportError as e:
+                    # httpx sin el extra h2
+                    logger.warning(f"HTTP/2 no disponible ({e}). Se usa requests (HTTP/1.1).")
+            else:
+                logger.warning("httpx no está instalado. Se usa requests (HTTP/1.1).")
+
+        session = requests.Session()
+        adapter = KeepAliveHTTPAdapter(
+            keepalive_socket_options(self.config),
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def mark_used(self) -> None:
+        """Registra actividad (el keep-warm solo hace ping tras un periodo de inactividad)."""
+        self.last_used = time.monotonic()
+
+    def _ping(self) -> bool:
+        try:
+            self.session.request("HEAD", f"{self.base_url}{self.config.warm_path}", timeout=self.timeout)
+            self._warm_pings += 1
+            return True
+        except requests.exceptions.RequestException as e:
+            self._warm_errors += 1
+            logger.debug(f"Ping de calentamiento fallido: {e}")
+            return False
+
+    def warm(self, connections: Optional[int] = None) -> int:
+        """
+        Abre (o refresca) conexiones al host de la API en paralelo para que
+        queden en el pool listas para reutilizarse.
+
+        Returns:
+            Número de pings exitosos.
+        """
+        count = max(1, connections or self.config.warm_connections)
+        if count == 1 or self.http2:
+            # Con HTTP/2 una sola conexión multiplexa todas las peticiones
+            ok = int(self._ping())
+        else:
+            with ThreadPoolExecutor(max_workers=count, thread_name_prefix="dmarket-warm") as executor:
+                ok = sum(executor.map(lambda _: self._ping(), range(count)))
+        logger.debug(f"Calentamiento de conexiones: {ok}/{count} pings exitosos")
+        return ok
+
+    def start_keep_warm(self, interval_sec: Optional[float] = None) -> bool:
+        """
+        Arranca un hilo daemon que hace ping cuando la sesión lleva `interval_sec`
+        sin uso, evitando que el servidor o NATs intermedios cierren las conexiones.
+
+        Returns:
+            True si el hilo se arrancó (o ya estaba activo).
+        """
+        interval = interval_sec or self.config.keep_warm_interval_sec
+        if not interval:
+            return False
+        if self._keep_warm_thread is not None and self._keep_warm_thread.is_alive():
+            return True
+
+        def _loop() -> None:
+            while not self._stop_keep_warm.wait(interval):
+                if time.monotonic() - self.last_used >= interval:
+                    self.warm()
+
+        self._stop_keep_warm.clear()
+        self._keep_warm_thread = threading.Thread(target=_loop, name="dmarket-keep-warm", daemon=True)
+        self._keep_warm_thread.start()
+        logger.info(f"Keep-warm de conexiones activado (cada {interval:.0f}s de inactividad)")
+        return True
+
+    def stop_keep_warm(self) -> None:
+        self._stop_keep_warm.set()
+        if self._keep_warm_thread is not None:
+            self._keep_warm_thread.join(timeout=1.0)
+            self._keep_warm_thread = None
+
+    def close(self) -> None:
+        """Detiene el keep-warm y cierra las conexiones del pool."""
+        self.stop_keep_warm()
+        self.session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas de reutilización de conexiones: conexiones abiertas y peticiones
+        servidas por cada pool de urllib3 (una conexión nueva por petición = sin reutilización).
+        """
+        stats: Dict[str, Any] = {
+            "http2": self.http2,
+            "warm_pings": self._warm_pings,
+            "warm_errors": self._warm_errors,
+            "keep_warm_active": self._keep_warm_thread is not None and self._keep_warm_thread.is_alive(),
+            "pools": {}
+        }
+        if self.http2:
+            stats["last_http_version"] = self.session.last_http_version
+            return stats
+
+        total_connections = 0
+        total_requests = 0
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            poolmanager = getattr(adapter, "poolmanager", None)
+            if poolmanager is None:
+                continue
+            for key in list(poolmanager.pools.keys()):
+                pool = poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}" if hasattr(pool, "scheme") else str(key)
+                stats["pools"][host] = {
+                    "connections_opened": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "idle_connections": pool.pool.qsize() if pool.pool is not None else 0
+                }
+                total_connections += pool.num_connections
+                total_requests += pool.num_requests
+        stats["connections_opened"] = total_connections
+        stats["requests"] = total_requests
+        stats["reuse_ratio"] = 1.0 - total_connections / total_requests if total_requests else 0.0
+        return stats
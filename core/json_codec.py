@@ -0,0 +1,113 @@
+# core/json_codec.py
+"""
+Decodificación JSON de las respuestas de DMarket.
+
+ResponseDecoder permite elegir el decodificador (orjson si está instalado, o el de la
+librería estándar, o cualquier callable) y, opcionalmente, proyectar las ofertas de
+/exchange/v1/market/items a los campos que realmente leen las estrategias, de modo que
+las páginas grandes de un crawl no retengan imágenes, descripciones y demás campos.
+"""
+
+import json
+import logging
+from typing import Any, Optional, Callable, Union, FrozenSet, Iterable
+
+# orjson es opcional: decodifica bytes directamente y bastante más rápido que json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+Decoder = Callable[[Union[bytes, str]], Any]
+
+# Campos de cada oferta que consumen StrategyEngine, MarketAnalyzer y MarketCrawler
+STRATEGY_OFFER_FIELDS: FrozenSet[str] = frozenset({
+    "assetId", "itemId", "offerId", "title", "gameId", "amount", "price", "extra",
+    "float", "paintseed", "pattern", "phase", "fade_percentage", "stickers", "tradeLock"
+})
+
+# Endpoints cuyas respuestas ("objects") se proyectan
+PROJECTED_ENDPOINTS: FrozenSet[str] = frozenset({"/exchange/v1/market/items"})
+
+
+def _stdlib_decode(raw: Union[bytes, str]) -> Any:
+    return json.loads(raw)
+
+
+def resolve_decoder(decoder: Union[str, Decoder, None] = "auto") -> Decoder:
+    """
+    Devuelve la función de decodificación.
+
+    Args:
+        decoder: "auto" (orjson si está disponible), "orjson", "json" o un callable.
+
+    Raises:
+        ValueError: Si se pide orjson y no está instalado, o el nombre no es válido.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder in (None, "auto"):
+        return orjson.loads if ORJSON_AVAILABLE else _stdlib_decode
+    if decoder == "orjson":
+        if not ORJSON_AVAILABLE:
+            raise ValueError("orjson no está instalado (pip install orjson)")
+        return orjson.loads
+    if decoder == "json":
+        return _stdlib_decode
+    raise ValueError(f"Decodificador JSON desconocido: {decoder}")
+
+
+def project_offers(response: Any, fields: FrozenSet[str]) -> Any:
+    """Reduce cada elemento de response["objects"] a `fields` (in place) y devuelve la respuesta."""
+    if isinstance(response, dict):
+        objects = response.get("objects")
+        if isinstance(objects, list):
+            response["objects"] = [
+                {k: v for k, v in obj.items() if k in fields} if isinstance(obj, dict) else obj
+                for obj in objects
+            ]
+    return response
+
+
+class ResponseDecoder:
+    """Decodificador de respuestas con proyección opcional de campos por endpoint."""
+
+    def __init__(
+        self,
+        decoder: Union[str, Decoder, None] = "auto",
+        project_fields: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        endpoints: Optional[Iterable[str]] = None
+    ):
+        """
+        Args:
+            decoder: Ver resolve_decoder().
+            project_fields: Si es True, las ofertas de `endpoints` se reducen a `fields`.
+            fields: Campos conservados; por defecto STRATEGY_OFFER_FIELDS.
+            endpoints: Endpoints proyectados; por defecto PROJECTED_ENDPOINTS.
+        """
+        self._decode = resolve_decoder(decoder)
+        self.name = getattr(self._decode, "__module__", None) or "custom"
+        if self._decode is _stdlib_decode:
+            self.name = "json"
+        self.project_fields = project_fields
+        self.fields = frozenset(fields) if fields is not None else STRATEGY_OFFER_FIELDS
+        self.endpoints = frozenset(endpoints) if endpoints is not None else PROJECTED_ENDPOINTS
+
+    def decode(self, raw: Union[bytes, str], endpoint: Optional[str] = None) -> Any:
+        """
+        Decodifica el cuerpo de una respuesta.
+
+        Raises:
+            ValueError: Si el cuerpo no es JSON válido (json.JSONDecodeError y
+                orjson.JSONDecodeError heredan de ValueError).
+        """
+        data = self._decode(raw)
+        if self.project_fields and endpoint in self.endpoints:
+            project_offers(data, self.fields)
+        return data
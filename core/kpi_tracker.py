@@ -14,6 +14,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from core.data_manager import get_db
+from core.dmarket_connector import DMarketAPI
+from core.request_scheduler import RequestPriority, request_priority
 from core.inventory_manager import InventoryManager, InventoryItem, InventoryItemStatus
 
 # Obtener logger para este módulo
@@ -68,22 +70,28 @@ class KPITracker:
     Tracker de KPIs para el sistema de trading.
     """
 
-    def __init__(self, inventory_manager: InventoryManager):
+    def __init__(self, inventory_manager: InventoryManager, dmarket_api: Optional[DMarketAPI] = None):
         """
         Inicializa el tracker de KPIs.
         
         Args:
             inventory_manager: Gestor de inventario para acceder a datos.
+            dmarket_api: Conector para valorar a mercado los ítems activos (opcional; sin él
+                la ganancia no realizada se estima con el precio de compra).
         """
         self.inventory_manager = inventory_manager
+        self.dmarket_api = dmarket_api
         logger.info("KPITracker inicializado")
 
-    def calculate_kpis(self, period: KPIPeriod = KPIPeriod.ALL_TIME) -> KPIMetrics:
+    def calculate_kpis(self, period: KPIPeriod = KPIPeriod.ALL_TIME,
+                       current_prices: Optional[Dict[str, float]] = None) -> KPIMetrics:
         """
         Calcula KPIs para el período especificado.
         
         Args:
             period: Período para calcular KPIs.
+            current_prices: Precios de mercado {item_title: price_usd} ya obtenidos. Si no
+                se indican, se consultan una vez para los ítems activos del período.
             
         Returns:
             KPIMetrics: Métricas calculadas.
@@ -101,10 +109,14 @@ class KPITracker:
                 InventoryItemStatus.PURCHASED, InventoryItemStatus.LISTED
             ]]
             
+            # Precios de mercado de los ítems activos (una sola consulta agregada)
+            if current_prices is None:
+                current_prices = self._fetch_current_prices(active_items)
+            
             # Calcular métricas de rentabilidad
-            total_profit = self._calculate_total_profit(all_items)
+            total_profit = self._calculate_total_profit(all_items, current_prices)
             realized_profit = self._calculate_realized_profit(sold_items)
-            unrealized_profit = self._calculate_unrealized_profit(active_items)
+            unrealized_profit = self._calculate_unrealized_profit(active_items, current_prices)
             
             # Calcular porcentaje de ganancia total
             total_invested = sum(item.purchase_price_usd for item in all_items)
@@ -229,8 +241,17 @@ class KPITracker:
         finally:
             db.close()
 
-    def _calculate_total_profit(self, items: List[InventoryItem]) -> float:
+    def _fetch_current_prices(self, active_items: List[InventoryItem]) -> Dict[str, float]:
+        """Mejor ask actual de los ítems activos, o {} si no hay conector o ítems."""
+        if self.dmarket_api is None or not active_items:
+            return {}
+        with request_priority(RequestPriority.POSITION):
+            return self.dmarket_api.get_market_prices_usd([item.item_title for item in active_items])
+
+    def _calculate_total_profit(self, items: List[InventoryItem],
+                                current_prices: Optional[Dict[str, float]] = None) -> float:
         """Calcula ganancia total (realizada + no realizada)."""
+        current_prices = current_prices or {}
         total_profit = 0.0
         
         for item in items:
@@ -239,8 +260,8 @@ class KPITracker:
                 profit = (item.sold_price_usd or 0.0) - item.purchase_price_usd
                 total_profit += profit
             elif item.status in [InventoryItemStatus.PURCHASED, InventoryItemStatus.LISTED]:
-                # Ganancia no realizada (estimada con precio actual - usar precio de compra como estimación)
-                current_value = item.purchase_price_usd  # Simplificación temporal
+                # Ganancia no realizada (precio de mercado actual; sin él, precio de compra)
+                current_value = current_prices.get(item.item_title, item.purchase_price_usd)
                 unrealized_profit = current_value - item.purchase_price_usd
                 total_profit += unrealized_profit
                 
@@ -257,12 +278,14 @@ class KPITracker:
                 
         return realized_profit
 
-    def _calculate_unrealized_profit(self, active_items: List[InventoryItem]) -> float:
-        """Calcula ganancia no realizada de ítems activos."""
+    def _calculate_unrealized_profit(self, active_items: List[InventoryItem],
+                                     current_prices: Optional[Dict[str, float]] = None) -> float:
+        """Calcula ganancia no realizada de ítems activos (a precio de mercado si se conoce)."""
         unrealized_profit = 0.0
+        current_prices = current_prices or {}
         
         for item in active_items:
-            current_value = item.purchase_price_usd  # Simplificación temporal
+            current_value = current_prices.get(item.item_title, item.purchase_price_usd)
             profit = current_value - item.purchase_price_usd
             unrealized_profit += profit
             
@@ -411,11 +434,18 @@ class KPITracker:
         logger.debug("Generando dashboard de performance")
         
         try:
+            # Precios de mercado una sola vez para todos los períodos
+            all_items = self._get_items_for_period(*self._get_period_dates(KPIPeriod.ALL_TIME))
+            current_prices = self._fetch_current_prices([
+                item for item in all_items
+                if item.status in [InventoryItemStatus.PURCHASED, InventoryItemStatus.LISTED]
+            ])
+            
             # Calcular KPIs para diferentes períodos
-            daily_kpis = self.calculate_kpis(KPIPeriod.DAILY)
-            weekly_kpis = self.calculate_kpis(KPIPeriod.WEEKLY)
-            monthly_kpis = self.calculate_kpis(KPIPeriod.MONTHLY)
-            all_time_kpis = self.calculate_kpis(KPIPeriod.ALL_TIME)
+            daily_kpis = self.calculate_kpis(KPIPeriod.DAILY, current_prices)
+            weekly_kpis = self.calculate_kpis(KPIPeriod.WEEKLY, current_prices)
+            monthly_kpis = self.calculate_kpis(KPIPeriod.MONTHLY, current_prices)
+            all_time_kpis = self.calculate_kpis(KPIPeriod.ALL_TIME, current_prices)
             
             # Calcular tendencias
             trends = self._calculate_trends()
@@ -1,9 +1,12 @@
 # core/market_analyzer.py
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass
 
+from core.order_book import OrderBook
+from core.tree_filters import FilterRange, compact_seeds
+
 # Obtener logger para este módulo
 logger = logging.getLogger(__name__)
 
@@ -128,7 +131,7 @@ class MarketAnalyzer:
         self,
         market_hash_name: str,
         historical_prices: List[Dict[str, Any]], # Lista de registros de PreciosHistoricos
-        current_offers: List[Dict[str, Any]] # Lista de ofertas actuales de DMarket (formato de get_offers_by_title)
+        current_offers: Union[OrderBook, List[Dict[str, Any]]] # OrderBook o lista de ofertas de DMarket (formato de get_offers_by_title)
     ) -> Optional[float]:
         """
         Calcula el Precio de Mercado Estimado (PME) para un ítem.
@@ -141,9 +144,9 @@ class MarketAnalyzer:
             historical_prices (List[Dict[str, Any]]): Una lista de diccionarios,
                 cada uno representando un registro de precio histórico para el ítem.
                 Ej: [{'price_usd': 10.50, 'timestamp': '2023-01-01T10:00:00Z'}, ...]
-            current_offers (List[Dict[str, Any]]): Una lista de diccionarios,
-                cada uno representando una oferta de venta actual en DMarket.
-                Ej: [{'price': {'USD': '1100'}, ...}, ...]
+            current_offers (Union[OrderBook, List[Dict[str, Any]]]): El OrderBook ya parseado
+                del ítem o una lista de diccionarios, cada uno representando una oferta de
+                venta actual en DMarket. Ej: [{'price': {'USD': '1100'}, ...}, ...]
 
         Returns:
             Optional[float]: El precio de mercado estimado en USD, o None si no se puede calcular.
@@ -162,7 +165,10 @@ class MarketAnalyzer:
         # Por ahora, si hay ofertas actuales, tomemos la más baja como una primera aproximación.
         # DMarket devuelve precios en centavos como string.
         current_offer_prices_usd = []
-        if current_offers:
+        if isinstance(current_offers, OrderBook):
+            if current_offers.best_ask is not None:
+                current_offer_prices_usd.append(current_offers.best_ask_usd)
+        elif current_offers:
             for offer in current_offers:
                 try:
                     price_str = offer.get('price', {}).get('USD')
@@ -260,6 +266,27 @@ class MarketAnalyzer:
         logger.info(f"Evaluación de atributos completada para {item_name}: score={overall_score:.2f}, multiplier={premium_multiplier:.2f}")
         return evaluation
 
+    def premium_attribute_filters(self, item_name: str) -> List[Dict[str, Any]]:
+        """
+        Filtros de servidor (treeFilters) que seleccionan las ofertas de `item_name` cuyos
+        atributos pueden dar una puntuación premium: float extremo (< 0.01, solo posible
+        en Factory New) y patrones especiales conocidos. Cada dict es una consulta; los
+        stickers no son filtrables en el servidor.
+        """
+        filters: List[Dict[str, Any]] = []
+        exterior_known = "(" in item_name and item_name.rstrip().endswith(")")
+        if not exterior_known or "(Factory New)" in item_name:
+            filters.append({"floatValue": FilterRange(0.0, 0.01)})
+
+        seeds = set()
+        for weapon_name, patterns in self.config.get("special_patterns", {}).items():
+            if weapon_name in item_name:
+                for pattern_list in patterns.values():
+                    seeds.update(pattern_list)
+        if seeds:
+            filters.append({"paintSeed": compact_seeds(seeds)})
+        return filters
+
     def _evaluate_float_rarity(self, float_value: Optional[float]) -> Optional[FloatRarity]:
         """Evalúa la rareza basada en el valor de float."""
         if float_value is None:
@@ -0,0 +1,305 @@
+# core/market_crawler.py
+"""
+Crawler del mercado completo de CS2 en DMarket.
+Divide el espacio de precios en shards (priceFrom/priceTo), los recorre en paralelo
+con AsyncDMarketAPI bajo el rate limiter compartido y vuelve a dividir los shards
+"calientes" que superan el presupuesto de páginas. El resultado es un snapshot
+deduplicado con LSO y número de ofertas por título.
+
+Si la paginación de un shard se corta por un error (circuito abierto, carga descartada,
+429 agotados), el resto del shard desde el último precio visto se vuelve a encolar con
+espera creciente, hasta max_shard_retries veces; los que se agotan cuentan en
+shards_failed y el snapshot queda marcado como incompleto.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Set
+
+from core.async_dmarket_connector import AsyncDMarketAPI
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PriceShard:
+    """Rango de precios [price_from, price_to] en centavos (ambos inclusive)."""
+    price_from: int
+    price_to: int
+    depth: int = 0
+    attempts: int = 0  # Reintentos ya hechos tras errores
+
+    @property
+    def width(self) -> int:
+        return self.price_to - self.price_from + 1
+
+
+@dataclass
+class TitleSnapshot:
+    """Resumen de un título listado en el mercado."""
+    title: str
+    lowest_price_cents: int
+    highest_price_cents: int
+    offer_count: int
+
+    @property
+    def lowest_price_usd(self) -> float:
+        return self.lowest_price_cents / 100.0
+
+
+@dataclass
+class MarketSnapshot:
+    """Snapshot deduplicado del mercado completo."""
+    game_id: str
+    titles: Dict[str, TitleSnapshot]
+    total_offers: int
+    shards_crawled: int
+    shards_split: int
+    pages_fetched: int
+    started_at: datetime
+    duration_sec: float
+    shards_failed: int = 0  # Shards abandonados tras agotar los reintentos
+
+    @property
+    def complete(self) -> bool:
+        """False si algún shard no se pudo recorrer: faltan títulos y ofertas en el snapshot."""
+        return self.shards_failed == 0
+
+    def top_titles(
+        self,
+        limit: int = 100,
+        min_offers: int = 1,
+        min_price_usd: float = 0.0,
+        max_price_usd: Optional[float] = None
+    ) -> List[str]:
+        """
+        Títulos más líquidos (más ofertas) cuya LSO está dentro del rango de precios dado.
+        Útil como universo de escaneo para StrategyEngine.run_strategies.
+        """
+        candidates = [
+            t for t in self.titles.values()
+            if t.offer_count >= min_offers
+            and t.lowest_price_usd >= min_price_usd
+            and (max_price_usd is None or t.lowest_price_usd <= max_price_usd)
+        ]
+        candidates.sort(key=lambda t: (-t.offer_count, t.lowest_price_cents, t.title))
+        return [t.title for t in candidates[:limit]]
+
+
+@dataclass
+class _CrawlState:
+    titles: Dict[str, TitleSnapshot] = field(default_factory=dict)
+    seen_assets: Set[str] = field(default_factory=set)
+    total_offers: int = 0
+    shards_crawled: int = 0
+    shards_split: int = 0
+    shards_failed: int = 0
+    shards_retried: int = 0
+    pages_fetched: int = 0
+
+
+class MarketCrawler:
+    """
+    Crawler paralelo por shards de precio sobre /exchange/v1/market/items.
+    """
+
+    def __init__(self, api: AsyncDMarketAPI, config: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa el crawler.
+
+        Args:
+            api: Conector asíncrono (su rate limiter y max_concurrency acotan el crawl).
+            config: Configuración opcional; se combina con _get_default_config().
+        """
+        self.api = api
+        self.config = self._get_default_config()
+        if config:
+            self.config.update(config)
+
+    def _get_default_config(self) -> Dict[str, Any]:
+        """Configuración por defecto del crawler."""
+        return {
+            "game_id": "a8db",
+            "currency": "USD",
+            "min_price_cents": 1,
+            "max_price_cents": 10_000_000,  # 100.000 USD
+            "initial_shards": 32,           # Shards iniciales, espaciados logarítmicamente
+            "page_limit": 100,              # Ofertas por página (máximo de la API)
+            "page_budget_per_shard": 20,    # Páginas antes de volver a dividir un shard
+            "max_concurrent_shards": 8,     # Shards recorridos en paralelo
+            "max_shard_retries": 3,         # Reintentos de un shard cortado por un error
+            "retry_backoff_sec": 2.0,       # Espera antes del primer reintento (se duplica en cada uno)
+        }
+
+    def _initial_shards(self) -> List[PriceShard]:
+        """Divide [min, max] en shards con límites espaciados logarítmicamente."""
+        low = max(1, int(self.config["min_price_cents"]))
+        high = int(self.config["max_price_cents"])
+        count = max(1, int(self.config["initial_shards"]))
+        ratio = (high / low) ** (1.0 / count)
+
+        bounds = [low]
+        for i in range(1, count):
+            bound = int(math.ceil(low * ratio ** i))
+            if bound > bounds[-1]:
+                bounds.append(bound)
+        shards = [PriceShard(start, end - 1) for start, end in zip(bounds, bounds[1:])]
+        shards.append(PriceShard(bounds[-1], high))
+        return shards
+
+    def _record_page(self, state: _CrawlState, page: List[Dict[str, Any]]) -> Optional[int]:
+        """Agrega una página al snapshot y devuelve el último precio visto (centavos)."""
+        last_price = None
+        for offer in page:
+            try:
+                price_cents = int(offer.get('price', {}).get('USD'))
+            except (TypeError, ValueError):
+                continue
+            last_price = price_cents
+
+            asset_id = offer.get('assetId') or offer.get('itemId')
+            if asset_id:
+                if asset_id in state.seen_assets:
+                    continue
+                state.seen_assets.add(asset_id)
+
+            title = offer.get('title')
+            if not title:
+                continue
+            state.total_offers += 1
+            entry = state.titles.get(title)
+            if entry is None:
+                state.titles[title] = TitleSnapshot(title, price_cents, price_cents, 1)
+            else:
+                entry.offer_count += 1
+                entry.lowest_price_cents = min(entry.lowest_price_cents, price_cents)
+                entry.highest_price_cents = max(entry.highest_price_cents, price_cents)
+        return last_price
+
+    async def _crawl_shard(self, shard: PriceShard, state: _CrawlState, queue: "asyncio.Queue[PriceShard]") -> None:
+        """Recorre un shard; si agota el presupuesto de páginas, encola el resto dividido en dos."""
+        budget = int(self.config["page_budget_per_shard"])
+        # Un shard de un único precio no se puede dividir más: se recorre entero
+        max_pages = None if shard.width <= 1 else budget
+        pages = 0
+        last_price = None
+        errors: List[Dict[str, Any]] = []
+
+        async for page in self.api.iter_market_items(
+            game_id=self.config["game_id"],
+            limit=self.config["page_limit"],
+            currency=self.config["currency"],
+            order_by="price",
+            order_dir="asc",
+            price_from=shard.price_from,
+            price_to=shard.price_to,
+            max_pages=max_pages,
+            on_error=errors.append
+        ):
+            pages += 1
+            seen = self._record_page(state, page)
+            if seen is not None:
+                last_price = seen
+
+        state.pages_fetched += pages
+        if errors:
+            # Lo ya recorrido queda en el snapshot; el resto se reintenta desde el último precio
+            remaining_from = shard.price_from if last_price is None else max(shard.price_from, last_price)
+            await self._retry_or_fail(
+                PriceShard(remaining_from, shard.price_to, shard.depth, shard.attempts), state, queue,
+                errors[-1].get("error")
+            )
+            return
+        state.shards_crawled += 1
+
+        if max_pages is not None and pages >= max_pages and last_price is not None:
+            # Shard caliente: el resto [last_price, price_to] se divide y se encola.
+            # last_price se repite a propósito porque puede haber más ofertas a ese precio;
+            # los duplicados se descartan por assetId.
+            remaining_from = max(shard.price_from, last_price)
+            if remaining_from >= shard.price_to:
+                await queue.put(PriceShard(shard.price_to, shard.price_to, shard.depth + 1))
+            else:
+                mid = (remaining_from + shard.price_to) // 2
+                await queue.put(PriceShard(remaining_from, mid, shard.depth + 1))
+                await queue.put(PriceShard(mid + 1, shard.price_to, shard.depth + 1))
+            state.shards_split += 1
+            logger.debug(f"Shard caliente {shard.price_from}-{shard.price_to}c re-dividido desde {remaining_from}c")
+
+    async def _retry_or_fail(self, shard: PriceShard, state: _CrawlState,
+                             queue: "asyncio.Queue[PriceShard]", error: Any) -> None:
+        """Vuelve a encolar `shard` tras una espera creciente o, agotados los reintentos, lo da por fallido."""
+        if shard.attempts >= int(self.config["max_shard_retries"]):
+            state.shards_failed += 1
+            logger.error(f"Shard {shard.price_from}-{shard.price_to}c abandonado tras {shard.attempts} reintentos: {error}")
+            return
+        delay = float(self.config["retry_backoff_sec"]) * (2 ** shard.attempts)
+        logger.warning(f"Shard {shard.price_from}-{shard.price_to}c cortado ({error}); reintento en {delay:.1f}s")
+        state.shards_retried += 1
+        await asyncio.sleep(delay)
+        await queue.put(PriceShard(shard.price_from, shard.price_to, shard.depth, shard.attempts + 1))
+
+    async def crawl(self) -> MarketSnapshot:
+        """
+        Recorre todo el espacio de precios y devuelve el snapshot del mercado.
+        """
+        started_at = datetime.now(timezone.utc)
+        start = time.monotonic()
+        state = _CrawlState()
+        queue: "asyncio.Queue[PriceShard]" = asyncio.Queue()
+        for shard in self._initial_shards():
+            queue.put_nowait(shard)
+
+        logger.info(f"Iniciando crawl del mercado {self.config['game_id']} con {queue.qsize()} shards iniciales...")
+
+        async def worker() -> None:
+            while True:
+                shard = await queue.get()
+                try:
+                    await self._crawl_shard(shard, state, queue)
+                except Exception as e:
+                    logger.error(f"Error recorriendo shard {shard.price_from}-{shard.price_to}c: {e}")
+                    await self._retry_or_fail(shard, state, queue, e)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, int(self.config["max_concurrent_shards"])))]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        snapshot = MarketSnapshot(
+            game_id=self.config["game_id"],
+            titles=state.titles,
+            total_offers=state.total_offers,
+            shards_crawled=state.shards_crawled,
+            shards_split=state.shards_split,
+            pages_fetched=state.pages_fetched,
+            started_at=started_at,
+            duration_sec=time.monotonic() - start,
+            shards_failed=state.shards_failed
+        )
+        logger.info(f"Crawl completado: {len(snapshot.titles)} títulos, {snapshot.total_offers} ofertas, "
+                    f"{snapshot.pages_fetched} páginas, {snapshot.shards_split} shards re-divididos, "
+                    f"{state.shards_retried} reintentos en {snapshot.duration_sec:.1f}s")
+        if not snapshot.complete:
+            logger.error(f"Crawl incompleto: {snapshot.shards_failed} shards sin recorrer")
+        return snapshot
+
+
+def crawl_market(api: AsyncDMarketAPI, config: Optional[Dict[str, Any]] = None) -> MarketSnapshot:
+    """Atajo síncrono: ejecuta MarketCrawler.crawl() en un event loop nuevo y cierra la sesión."""
+    async def _run() -> MarketSnapshot:
+        try:
+            return await MarketCrawler(api, config).crawl()
+        finally:
+            await api.close()
+    return asyncio.run(_run())
@@ -54,4 +54,18 @@ class RealPortfolio(Base):
     __table_args__ = (
         Index('idx_real_portfolio_item_title', 'item_title'),
         Index('idx_real_portfolio_strategy', 'strategy_type'),
-    ) 
\ No newline at end of file
+    ) 
+
+class ScanScore(Base):
+    """Puntuación adaptativa de escaneo por título (ver core/scan_scheduler.py)."""
+    __tablename__ = 'scan_scores'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    item_title = Column(String(255), nullable=False, unique=True)
+    churn_ewma = Column(Float, default=0.0)  # Fracción del libro que cambia entre escaneos
+    liquidity_ewma = Column(Float, default=0.0)  # Ofertas + órdenes de compra por escaneo
+    yield_ewma = Column(Text, nullable=True)  # JSON {estrategia: oportunidades nuevas por escaneo}
+    scans = Column(Integer, default=0)
+    opportunities_total = Column(Integer, default=0)  # Oportunidades nuevas acumuladas
+    last_scanned_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
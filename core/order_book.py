@@ -0,0 +1,208 @@
+# core/order_book.py
+"""
+Representación compacta, parseada una sola vez, del libro de un título.
+
+StrategyEngine._get_item_data construye un OrderBook por título con las ofertas de
+venta y las órdenes de compra de DMarket; todas las estrategias y
+MarketAnalyzer.calculate_estimated_market_price lo consumen en lugar de volver a
+recorrer los dicts crudos. Cada oferta se convierte en un ParsedOffer (__slots__) con
+el precio en centavos enteros y los campos que leen las estrategias ya extraídos:
+días de trade lock, float, paint seed, fase, fade y stickers. El dict original se
+conserva en `raw` (sin copiarlo) para los detalles que se adjuntan a las oportunidades.
+
+Los agregados que varias estrategias necesitan (mejor ask/bid, media de las ofertas
+sin trade lock) se calculan en la construcción. fingerprint() y offer_keys() permiten a
+StrategyEngine detectar entre ciclos si el libro cambió y qué ofertas son nuevas.
+"""
+
+import logging
+from typing import Dict, Any, Optional, List, Iterable, FrozenSet, Tuple
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+class ParsedOffer:
+    """Oferta de venta u orden de compra con sus campos ya extraídos."""
+
+    __slots__ = (
+        "price_cents", "asset_id", "has_trade_lock", "lock_days", "float_value", "paint_seed",
+        "pattern", "phase", "fade_percentage", "stickers", "stattrak", "souvenir", "raw"
+    )
+
+    def __init__(self, raw: Dict[str, Any], price_cents: int):
+        self.raw = raw
+        self.price_cents = price_cents
+        self.asset_id: Optional[str] = raw.get('assetId')
+
+        # Trade lock: campo tradeLock ({"daysRemaining": n} o número de días) o mención en el título
+        title = raw.get('title') or ''
+        lock = raw.get('tradeLock')
+        self.has_trade_lock = lock is not None
+        self.lock_days = 0
+        if isinstance(lock, dict):
+            self.lock_days = _parse_int(lock.get('daysRemaining')) or 0
+        elif lock is not None:
+            self.lock_days = _parse_int(lock) or 0
+        lowered = title.lower()
+        if 'trade lock' in lowered or 'tradelock' in lowered:
+            self.has_trade_lock = True
+
+        # Atributos: campos de primer nivel o, si no están, los de "extra" (formato de market/items)
+        extra = raw.get('extra') or {}
+        self.float_value = _parse_float(raw['float'] if 'float' in raw else extra.get('floatValue'))
+        self.paint_seed = _parse_int(raw['paintseed'] if 'paintseed' in raw else extra.get('paintSeed'))
+        self.pattern = _parse_int(raw.get('pattern')) if self.paint_seed is None else None
+        self.phase = raw['phase'] if 'phase' in raw else extra.get('phase')
+        self.fade_percentage = _parse_float(raw.get('fade_percentage'))
+        self.stickers: List[Dict[str, Any]] = raw.get('stickers') or []
+        self.stattrak = 'StatTrak' in title
+        self.souvenir = 'Souvenir' in title
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> Optional["ParsedOffer"]:
+        """ParsedOffer de un dict de DMarket, o None si no tiene un precio USD válido."""
+        try:
+            price_str = (raw.get('price') or {}).get('USD')
+            if not price_str:
+                return None
+            return cls(raw, int(price_str))
+        except (ValueError, TypeError, AttributeError):
+            logger.warning(f"Oferta con precio no válido ignorada: {raw}")
+            return None
+
+    @property
+    def price_usd(self) -> float:
+        return self.price_cents / 100.0
+
+    def attributes(self) -> Dict[str, Any]:
+        """Atributos en el formato que espera MarketAnalyzer.evaluate_attribute_rarity."""
+        attributes: Dict[str, Any] = {'stattrak': self.stattrak, 'souvenir': self.souvenir}
+        if self.float_value is not None:
+            attributes['float'] = self.float_value
+        if self.paint_seed is not None:
+            attributes['paintseed'] = self.paint_seed
+        elif self.pattern is not None:
+            attributes['pattern'] = self.pattern
+        if self.phase is not None:
+            attributes['phase'] = self.phase
+        if self.fade_percentage is not None:
+            attributes['fade_percentage'] = self.fade_percentage
+        return attributes
+
+    def __repr__(self) -> str:
+        return f"ParsedOffer({self.asset_id!r}, {self.price_cents}c, lock={self.lock_days}d, float={self.float_value})"
+
+
+def parse_offers(raw_offers: Optional[Iterable[Dict[str, Any]]]) -> List[ParsedOffer]:
+    """Parsea una lista de ofertas conservando el orden y descartando las que no tienen precio."""
+    parsed = []
+    for raw in raw_offers or ():
+        offer = ParsedOffer.from_raw(raw)
+        if offer is not None:
+            parsed.append(offer)
+    return parsed
+
+
+class OrderBook:
+    """Ofertas de venta (asks) y órdenes de compra (bids) de un título, parseadas una vez."""
+
+    __slots__ = ("title", "asks", "bids", "best_ask", "best_bid", "no_lock_mean_usd")
+
+    def __init__(self, title: str, asks: List[ParsedOffer], bids: List[ParsedOffer]):
+        """
+        Args:
+            title: Título del ítem.
+            asks: Ofertas de venta, en el orden en que llegaron de la API.
+            bids: Órdenes de compra, en el orden en que llegaron de la API.
+        """
+        self.title = title
+        self.asks = asks
+        self.bids = bids
+        # Mejor ask/bid (primera en caso de empate, como al recorrer la lista)
+        self.best_ask: Optional[ParsedOffer] = min(asks, key=lambda o: o.price_cents) if asks else None
+        self.best_bid: Optional[ParsedOffer] = max(bids, key=lambda o: o.price_cents) if bids else None
+        no_lock = [offer.price_cents for offer in asks if not offer.has_trade_lock]
+        self.no_lock_mean_usd: Optional[float] = sum(no_lock) / len(no_lock) / 100.0 if no_lock else None
+
+    @classmethod
+    def from_raw(cls, title: str, sell_offers: Optional[Iterable[Dict[str, Any]]],
+                 buy_orders: Optional[Iterable[Dict[str, Any]]] = None) -> "OrderBook":
+        return cls(title, parse_offers(sell_offers), parse_offers(buy_orders))
+
+    @classmethod
+    def from_item_data(cls, item_data: Dict[str, Any]) -> "OrderBook":
+        """OrderBook de item_data (el ya construido si existe)."""
+        book = item_data.get('order_book')
+        if book is None:
+            book = cls.from_raw(item_data.get('title', 'Unknown'),
+                                item_data.get('current_sell_offers'), item_data.get('current_buy_orders'))
+        return book
+
+    @property
+    def best_ask_usd(self) -> Optional[float]:
+        return self.best_ask.price_usd if self.best_ask is not None else None
+
+    @property
+    def best_bid_usd(self) -> Optional[float]:
+        return self.best_bid.price_usd if self.best_bid is not None else None
+
+    def fingerprint(self, depth: Optional[int] = None) -> int:
+        """
+        Huella de las `depth` primeras asks (precio, assetId, días de lock) y bids (precio),
+        o de todas si depth es None. Dos libros con la misma huella son iguales a efectos
+        de las estrategias salvo cambios por debajo de `depth`.
+        """
+        asks = tuple((o.price_cents, o.asset_id, o.lock_days) for o in self.asks[:depth])
+        bids = tuple(o.price_cents for o in self.bids[:depth])
+        return hash((asks, bids))
+
+    def offer_keys(self) -> FrozenSet[Tuple[Optional[str], int]]:
+        """(assetId, precio en centavos) de todas las asks: una oferta repreciada cuenta como nueva."""
+        return frozenset((o.asset_id, o.price_cents) for o in self.asks)
+
+    def restricted_to(self, asks: List[ParsedOffer]) -> "OrderBook":
+        """
+        Vista del libro con solo `asks` pero los agregados (mejor ask/bid, media sin lock)
+        del libro completo, para evaluar únicamente las ofertas nuevas de un título.
+        """
+        view = object.__new__(OrderBook)
+        view.title = self.title
+        view.asks = asks
+        view.bids = self.bids
+        view.best_ask = self.best_ask
+        view.best_bid = self.best_bid
+        view.no_lock_mean_usd = self.no_lock_mean_usd
+        return view
+
+    def with_extra_asks(self, raw_offers: Optional[List[Dict[str, Any]]]) -> List[ParsedOffer]:
+        """Asks del libro más las de `raw_offers` que no estén ya (por assetId), en orden."""
+        if not raw_offers:
+            return self.asks
+        seen = {offer.asset_id for offer in self.asks}
+        merged = list(self.asks)
+        for offer in parse_offers(raw_offers):
+            if offer.asset_id not in seen:
+                seen.add(offer.asset_id)
+                merged.append(offer)
+        return merged
+
+    def __len__(self) -> int:
+        return len(self.asks)
+
+    def __repr__(self) -> str:
+        return f"OrderBook({self.title!r}, asks={len(self.asks)}, bids={len(self.bids)}, best_ask={self.best_ask_usd}, best_bid={self.best_bid_usd})"
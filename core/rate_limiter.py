@@ -0,0 +1,296 @@
+# core/rate_limiter.py
+"""
+Limitador de tasa del lado del cliente para la API de DMarket.
+Mantiene un token bucket por familia de endpoints (lecturas de mercado, cuenta,
+trading), se adapta a las cabeceras de rate-limit de las respuestas y respeta
+Retry-After con backoff exponencial con jitter cuando DMarket devuelve 429.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Any, Optional, Mapping, Tuple
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+class EndpointFamily(Enum):
+    """Familias de endpoints con presupuesto de peticiones independiente."""
+    MARKET = "market"      # Lecturas de mercado (/exchange/v1/market/items, ...)
+    ACCOUNT = "account"    # Balance, comisiones, inventario y ofertas propias
+    TRADING = "trading"    # Compras, ventas y cancelaciones
+
+
+# Endpoints de solo lectura que DMarket expone como POST (la lista de títulos va en el cuerpo)
+READ_ONLY_POST_ENDPOINTS = frozenset({"/marketplace-api/v1/aggregated-prices"})
+
+
+def classify_endpoint(method: str, endpoint: str) -> EndpointFamily:
+    """
+    Determina la familia de un endpoint de DMarket.
+
+    Args:
+        method: Método HTTP.
+        endpoint: Ruta del endpoint (sin query string).
+
+    Returns:
+        EndpointFamily correspondiente.
+    """
+    method = method.upper()
+    if endpoint in READ_ONLY_POST_ENDPOINTS:
+        return EndpointFamily.MARKET
+    if method != "GET":
+        return EndpointFamily.TRADING
+    if endpoint.startswith("/account/") or endpoint.startswith("/exchange/v1/user/") \
+            or endpoint.startswith("/exchange/v1/customized-fees"):
+        return EndpointFamily.ACCOUNT
+    return EndpointFamily.MARKET
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe. No reserva tokens a futuro: try_acquire() toma un
+    token si hay disponible o devuelve cuántos segundos esperar antes de reintentar.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: float):
+        if rate_per_sec <= 0 or burst < 1:
+            raise ValueError("rate_per_sec debe ser > 0 y burst >= 1")
+        self.max_rate = float(rate_per_sec)
+        self.rate = float(rate_per_sec)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Intenta tomar `tokens` del bucket.
+
+        Returns:
+            0.0 si se tomaron; en caso contrario, segundos sugeridos de espera.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def block_for(self, seconds: float) -> None:
+        """Bloquea el bucket durante `seconds` (p.ej. tras un 429 con Retry-After)."""
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0.0
+            self._last_refill = now
+
+    def set_rate(self, rate_per_sec: float) -> None:
+        """Ajusta la tasa efectiva sin superar la tasa máxima configurada."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(min(rate_per_sec, self.max_rate), self.max_rate * 0.05)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate_per_sec": self.rate,
+                "max_rate_per_sec": self.max_rate,
+                "burst": self.burst,
+                "tokens": self.tokens,
+                "blocked_for_sec": max(0.0, self.blocked_until - now)
+            }
+
+
+class RateLimiter:
+    """
+    Limitador compartido con un presupuesto (token bucket) por familia de endpoints.
+    Es seguro para hilos y utilizable tanto desde código síncrono como desde asyncio.
+    """
+
+    # (peticiones por segundo, ráfaga) por familia
+    DEFAULT_BUDGETS: Dict[EndpointFamily, Tuple[float, float]] = {
+        EndpointFamily.MARKET: (10.0, 10.0),
+        EndpointFamily.ACCOUNT: (5.0, 5.0),
+        EndpointFamily.TRADING: (5.0, 5.0),
+    }
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[EndpointFamily, Tuple[float, float]]] = None,
+        base_backoff_sec: float = 1.0,
+        max_backoff_sec: float = 60.0,
+        jitter_fraction: float = 0.25
+    ):
+        """
+        Inicializa el limitador.
+
+        Args:
+            budgets: Presupuesto (rps, ráfaga) por familia; se combina con DEFAULT_BUDGETS.
+            base_backoff_sec: Backoff base cuando un 429 no trae Retry-After.
+            max_backoff_sec: Tope del backoff exponencial.
+            jitter_fraction: Fracción de jitter aleatorio añadida a cada espera tras 429.
+        """
+        merged = dict(self.DEFAULT_BUDGETS)
+        if budgets:
+            merged.update(budgets)
+        self.buckets: Dict[EndpointFamily, TokenBucket] = {
+            family: TokenBucket(rate, burst) for family, (rate, burst) in merged.items()
+        }
+        self.base_backoff_sec = base_backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.jitter_fraction = jitter_fraction
+        self._throttled_count: Dict[EndpointFamily, int] = {family: 0 for family in self.buckets}
+        self._wait_time_sec: Dict[EndpointFamily, float] = {family: 0.0 for family in self.buckets}
+        self._stats_lock = threading.Lock()
+
+    def family_for(self, method: str, endpoint: str) -> EndpointFamily:
+        return classify_endpoint(method, endpoint)
+
+    def try_acquire(self, family: EndpointFamily) -> float:
+        """Intenta tomar un token de la familia; devuelve 0.0 o segundos de espera sugeridos."""
+        return self.buckets[family].try_acquire()
+
+    def record_wait(self, family: EndpointFamily, waited: float) -> None:
+        if waited > 0:
+            with self._stats_lock:
+                self._wait_time_sec[family] += waited
+
+    def acquire(self, family: EndpointFamily) -> float:
+        """Bloquea el hilo actual hasta obtener un token. Devuelve el tiempo esperado."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(family)
+            if wait <= 0:
+                self.record_wait(family, waited)
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, family: EndpointFamily) -> float:
+        """Versión asyncio de acquire(): cede el event loop mientras espera."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(family)
+            if wait <= 0:
+                self.record_wait(family, waited)
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, family: EndpointFamily, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Adapta la tasa de la familia a partir de las cabeceras de rate-limit de una respuesta
+        (RateLimit-Remaining / RateLimit-Reset y variantes X-RateLimit-*).
+        Si no quedan peticiones en la ventana, bloquea el bucket hasta el reset.
+        """
+        if not headers:
+            return
+        normalized = {k.lower(): v for k, v in headers.items()}
+        remaining = _parse_float(normalized.get("ratelimit-remaining", normalized.get("x-ratelimit-remaining")))
+        reset = _parse_float(normalized.get("ratelimit-reset", normalized.get("x-ratelimit-reset")))
+        if remaining is None or reset is None or reset <= 0:
+            return
+
+        bucket = self.buckets[family]
+        if remaining <= 0:
+            logger.warning(f"Presupuesto de rate-limit agotado para '{family.value}'. Pausando {reset:.1f}s.")
+            bucket.block_for(reset)
+        else:
+            # Repartir lo que queda de la ventana de forma uniforme hasta el reset
+            bucket.set_rate(remaining / reset)
+
+    def register_429(
+        self, family: EndpointFamily, headers: Optional[Mapping[str, str]], attempt: int
+    ) -> float:
+        """
+        Registra un 429: bloquea la familia durante Retry-After (o el backoff
+        exponencial si no viene) y devuelve la espera con jitter que debe respetar el llamante.
+        """
+        retry_after = None
+        if headers:
+            normalized = {k.lower(): v for k, v in headers.items()}
+            retry_after = parse_retry_after(normalized.get("retry-after"))
+        delay = self.backoff_delay(attempt, retry_after)
+        self.buckets[family].block_for(retry_after if retry_after is not None else delay)
+        with self._stats_lock:
+            self._throttled_count[family] += 1
+        return delay
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Espera con jitter: Retry-After si se conoce, si no backoff exponencial acotado."""
+        base = retry_after if retry_after is not None else min(
+            self.max_backoff_sec, self.base_backoff_sec * (2 ** attempt)
+        )
+        return base + random.uniform(0, base * self.jitter_fraction)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado de cada familia: tasa efectiva, tokens, bloqueos, 429 recibidos y espera acumulada."""
+        with self._stats_lock:
+            return {
+                family.value: {
+                    **bucket.snapshot(),
+                    "throttled_429": self._throttled_count[family],
+                    "total_wait_sec": self._wait_time_sec[family]
+                }
+                for family, bucket in self.buckets.items()
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Interpreta Retry-After como segundos o como fecha HTTP. Devuelve None si no es válido."""
+    if value is None:
+        return None
+    seconds = _parse_float(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    Devuelve el limitador compartido del proceso. Todos los conectores creados sin
+    un limitador explícito lo usan, porque comparten el mismo presupuesto de la API key.
+    """
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
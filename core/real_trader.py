@@ -9,10 +9,11 @@ Reemplaza completamente al PaperTrader para trading en vivo.
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import json
 
-from core.dmarket_connector import DMarketAPI
+from core.dmarket_connector import DMarketAPI, usd_to_cents
+from core.request_scheduler import RequestPriority, request_priority
 from core.data_manager import get_db
 from core.models import (
     RealTransaction, RealPortfolio, 
@@ -22,6 +23,32 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Cada estrategia nombra a su manera el precio de compra y el beneficio esperado
+_BUY_PRICE_KEYS = ("buy_price_usd", "offer_price_usd", "entry_price_usd")
+_PROFIT_KEYS = ("expected_profit_usd", "potential_profit_usd", "profit_usd")
+
+
+def _first_number(opportunity: Dict[str, Any], keys: Tuple[str, ...]) -> float:
+    for key in keys:
+        value = opportunity.get(key)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                continue
+    return 0.0
+
+
+def opportunity_buy_price_usd(opportunity: Dict[str, Any]) -> float:
+    """Precio de compra de una oportunidad de cualquier estrategia (0.0 si no lo tiene)."""
+    return _first_number(opportunity, _BUY_PRICE_KEYS)
+
+
+def opportunity_profit_usd(opportunity: Dict[str, Any]) -> float:
+    """Beneficio esperado de una oportunidad de cualquier estrategia (0.0 si no lo tiene)."""
+    return _first_number(opportunity, _PROFIT_KEYS)
+
+
 class RealTrader:
     """
     Clase para ejecutar trades REALES en DMarket.
@@ -59,8 +86,14 @@ class RealTrader:
             "order_timeout_minutes": 30
         }
 
-    def get_real_balance(self) -> Dict[str, float]:
-        """Obtener balance REAL de DMarket."""
+    def get_real_balance(self, mark_to_market: bool = True) -> Dict[str, float]:
+        """
+        Obtener balance REAL de DMarket.
+        
+        Args:
+            mark_to_market: Valorar las posiciones a precio de mercado (una consulta agregada
+                a DMarket). Con False se usa el coste medio, sin peticiones adicionales.
+        """
         try:
             balance_response = self.dmarket_api.get_account_balance()
             
@@ -78,23 +111,34 @@ class RealTrader:
             else:
                 cash_balance = 0.0
             
-            # Obtener valor del portfolio
-            portfolio_value = self.get_portfolio_value()
+            # Obtener valor del portfolio (coste y valor de mercado)
+            cost_basis, portfolio_value = self._portfolio_valuation(mark_to_market)
             total_balance = cash_balance + portfolio_value
             
             return {
                 "cash_balance": cash_balance,
                 "portfolio_value": portfolio_value,
                 "total_balance": total_balance,
-                "total_invested": portfolio_value
+                "total_invested": cost_basis
             }
             
         except Exception as e:
             logger.error(f"Error obteniendo balance real: {e}")
             return {"cash_balance": 0.0, "total_balance": 0.0}
 
-    def get_portfolio_value(self) -> float:
-        """Calcular valor actual del portfolio real."""
+    def get_portfolio_value(self, mark_to_market: bool = True) -> float:
+        """
+        Calcular valor actual del portfolio real.
+        
+        Args:
+            mark_to_market: Valorar cada posición al mejor ask actual de DMarket (todas las
+                posiciones en una sola consulta agregada). Las posiciones sin precio de
+                mercado, o con False, se valoran al coste medio.
+        """
+        return self._portfolio_valuation(mark_to_market)[1]
+
+    def _portfolio_valuation(self, mark_to_market: bool) -> Tuple[float, float]:
+        """(coste total, valor de mercado) de las posiciones activas."""
         try:
             db: Session = next(get_db())
             try:
@@ -103,27 +147,46 @@ class RealTrader:
                     RealPortfolio.quantity > 0
                 ).all()
                 
+                market_prices: Dict[str, float] = {}
+                if mark_to_market and positions:
+                    with request_priority(RequestPriority.POSITION):
+                        market_prices = self.dmarket_api.get_market_prices_usd(
+                            [position.item_title for position in positions]
+                        )
+                
+                cost_basis = 0.0
                 total_value = 0.0
                 for position in positions:
-                    # Para una estimación rápida, usar el costo promedio
-                    # En una implementación completa, se obtendría el precio actual del mercado
-                    estimated_value = position.avg_cost_usd * position.quantity
-                    total_value += estimated_value
+                    cost = position.avg_cost_usd * position.quantity
+                    cost_basis += cost
+                    market_price = market_prices.get(position.item_title)
+                    total_value += market_price * position.quantity if market_price is not None else cost
                 
-                return total_value
+                if mark_to_market and positions:
+                    logger.debug(f"Portfolio valorado a mercado: {len(market_prices)}/{len(positions)} posiciones con precio")
+                return cost_basis, total_value
                 
             finally:
                 db.close()
                 
         except Exception as e:
             logger.error(f"Error calculando valor del portfolio: {e}")
-            return 0.0
+            return 0.0, 0.0
 
-    def can_afford_purchase(self, price_usd: float) -> bool:
-        """Verificar si se puede permitir una compra REAL."""
+    def can_afford_purchase(self, price_usd: float, balance_info: Optional[Dict[str, float]] = None,
+                            pending_usd: float = 0.0) -> bool:
+        """
+        Verificar si se puede permitir una compra REAL.
+        
+        Args:
+            price_usd: Precio de la compra a verificar.
+            balance_info: Balance ya obtenido (evita otra consulta a DMarket en compras batch).
+            pending_usd: Importe ya comprometido por otras compras del mismo batch.
+        """
         try:
-            balance_info = self.get_real_balance()
-            cash_available = balance_info["cash_balance"]
+            if balance_info is None:
+                balance_info = self.get_real_balance(mark_to_market=False)
+            cash_available = balance_info["cash_balance"] - pending_usd
             
             # Verificar cash disponible
             if price_usd > cash_available:
@@ -137,7 +200,7 @@ class RealTrader:
             
             # Verificar límite de exposición total
             max_exposure = balance_info["total_balance"] * (self.config["max_total_exposure_pct"] / 100.0)
-            current_invested = balance_info["total_invested"]
+            current_invested = balance_info["total_invested"] + pending_usd
             
             if (current_invested + price_usd) > max_exposure:
                 logger.warning(f"Excede límite de exposición: ${current_invested + price_usd:.2f} > ${max_exposure:.2f}")
@@ -153,14 +216,16 @@ class RealTrader:
         """Ejecutar compra REAL en DMarket."""
         try:
             item_title = opportunity.get("item_title", opportunity.get("item_name", "Unknown"))
-            buy_price = opportunity.get("buy_price_usd", 0)
+            buy_price = opportunity_buy_price_usd(opportunity)
             strategy_type = opportunity.get("strategy", "unknown")
             asset_id = opportunity.get("assetId", opportunity.get("asset_id"))
             
             logger.info(f"🔥 EJECUTANDO COMPRA REAL: {item_title} por ${buy_price:.2f}")
             
-            # Verificar si se puede permitir
-            if not self.can_afford_purchase(buy_price):
+            # Verificar si se puede permitir (la consulta de balance forma parte de la ejecución)
+            with request_priority(RequestPriority.EXECUTION):
+                can_afford = self.can_afford_purchase(buy_price)
+            if not can_afford:
                 return {
                     "success": False,
                     "reason": "insufficient_funds_or_limits",
@@ -178,7 +243,7 @@ class RealTrader:
                 }
             
             # EJECUTAR COMPRA REAL EN DMARKET
-            buy_response = self.dmarket_api.buy_item(asset_id)
+            buy_response = self.dmarket_api.buy_item(asset_id, buy_price)
             
             if "error" in buy_response:
                 logger.error(f"Error en compra real: {buy_response}")
@@ -192,42 +257,10 @@ class RealTrader:
             # Si llegamos aquí, la compra fue exitosa
             logger.info(f"✅ COMPRA REAL EXITOSA: {item_title}")
             
-            # Registrar transacción en BD
-            db: Session = next(get_db())
-            try:
-                transaction = RealTransaction(
-                    transaction_type=TransactionType.BUY.value,
-                    item_title=item_title,
-                    strategy_type=strategy_type,
-                    price_usd=buy_price,
-                    quantity=1,
-                    asset_id=asset_id,
-                    opportunity_data=json.dumps(opportunity),
-                    dmarket_response=json.dumps(buy_response),
-                    status=TransactionStatus.EXECUTED.value,
-                    executed_at=datetime.now(timezone.utc)
-                )
-                db.add(transaction)
-                
-                # Actualizar portfolio
-                self._update_portfolio_after_buy(db, item_title, buy_price, strategy_type, asset_id, opportunity)
-                
-                db.commit()
-                db.refresh(transaction)
-                
-                return {
-                    "success": True,
-                    "transaction_id": transaction.id,
-                    "item_title": item_title,
-                    "price_paid": buy_price,
-                    "strategy_type": strategy_type,
-                    "asset_id": asset_id,
-                    "dmarket_response": buy_response,
-                    "balance_after": self.get_real_balance()
-                }
-                
-            finally:
-                db.close()
+            # Registrar transacción en BD (la compra ya ocurrió aunque el registro falle)
+            result = self._commit_buy(opportunity, item_title, buy_price, strategy_type, asset_id, buy_response)
+            result["balance_after"] = self.get_real_balance(mark_to_market=False)
+            return result
                 
         except Exception as e:
             logger.error(f"Error ejecutando compra real: {e}")
@@ -238,109 +271,348 @@ class RealTrader:
                 "error": str(e)
             }
 
+    def _record_buy(self, db: Session, opportunity: Dict[str, Any], item_title: str, buy_price: float,
+                    strategy_type: str, asset_id: str, buy_response: Dict[str, Any]) -> RealTransaction:
+        """Registra la transacción de compra y actualiza el portfolio (sin hacer commit)."""
+        transaction = RealTransaction(
+            transaction_type=TransactionType.BUY.value,
+            item_title=item_title,
+            strategy_type=strategy_type,
+            price_usd=buy_price,
+            quantity=1,
+            asset_id=asset_id,
+            opportunity_data=json.dumps(opportunity),
+            dmarket_response=json.dumps(buy_response),
+            status=TransactionStatus.EXECUTED.value,
+            executed_at=datetime.now(timezone.utc)
+        )
+        db.add(transaction)
+        
+        # Actualizar portfolio
+        self._update_portfolio_after_buy(db, item_title, buy_price, strategy_type, asset_id, opportunity)
+        return transaction
+
+    def _commit_buy(self, opportunity: Dict[str, Any], item_title: str, buy_price: float,
+                    strategy_type: str, asset_id: str, buy_response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Registra en su propia transacción de BD una compra ya confirmada por DMarket.
+        Si el registro falla la compra sigue contando como exitosa, con "recorded": False
+        para que se concilie a mano.
+        """
+        result = {
+            "success": True,
+            "recorded": True,
+            "transaction_id": None,
+            "item_title": item_title,
+            "price_paid": buy_price,
+            "strategy_type": strategy_type,
+            "asset_id": asset_id,
+            "dmarket_response": buy_response
+        }
+        db: Session = next(get_db())
+        try:
+            transaction = self._record_buy(db, opportunity, item_title, buy_price, strategy_type, asset_id, buy_response)
+            db.commit()
+            db.refresh(transaction)
+            result["transaction_id"] = transaction.id
+        except Exception as e:
+            db.rollback()
+            logger.critical(f"Compra de {item_title} ({asset_id}) ejecutada en DMarket pero NO registrada: {e}")
+            result["recorded"] = False
+            result["record_error"] = str(e)
+        finally:
+            db.close()
+        return result
+
+    def execute_real_buys(self, opportunities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ejecutar varias compras REALES en una sola petición batch a DMarket.
+        
+        Las oportunidades se validan en orden contra un único balance: cada compra
+        aceptada reduce el cash disponible para las siguientes.
+        
+        Returns:
+            Lista de resultados (mismo formato que execute_real_buy), en el orden de entrada.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(opportunities)
+        accepted: List[Tuple[int, str, float]] = []  # (índice, asset_id, precio)
+        seen_assets = set()
+        pending_usd = 0.0
+        
+        logger.info(f"🔥 EJECUTANDO BATCH DE {len(opportunities)} COMPRAS REALES")
+        with request_priority(RequestPriority.EXECUTION):
+            balance_info = self.get_real_balance(mark_to_market=False)
+        
+        for index, opportunity in enumerate(opportunities):
+            item_title = opportunity.get("item_title", opportunity.get("item_name", "Unknown"))
+            buy_price = opportunity_buy_price_usd(opportunity)
+            asset_id = opportunity.get("assetId", opportunity.get("asset_id"))
+            
+            if not asset_id or asset_id in seen_assets:
+                results[index] = {
+                    "success": False,
+                    "reason": "missing_asset_id" if not asset_id else "duplicate_asset_in_batch",
+                    "item_title": item_title
+                }
+                continue
+            
+            if not self.can_afford_purchase(buy_price, balance_info=balance_info, pending_usd=pending_usd):
+                results[index] = {
+                    "success": False,
+                    "reason": "insufficient_funds_or_limits",
+                    "item_title": item_title,
+                    "attempted_price": buy_price
+                }
+                continue
+            
+            seen_assets.add(asset_id)
+            pending_usd += buy_price
+            accepted.append((index, asset_id, buy_price))
+        
+        if not accepted:
+            return results
+        
+        try:
+            batch_response = self.dmarket_api.buy_items(
+                [(asset_id, usd_to_cents(buy_price)) for _, asset_id, buy_price in accepted]
+            )
+        except Exception as e:
+            logger.error(f"Error ejecutando batch de compras reales: {e}")
+            for index, asset_id, buy_price in accepted:
+                results[index] = {
+                    "success": False,
+                    "reason": f"exception: {str(e)}",
+                    "item_title": opportunities[index].get("item_title", "Unknown"),
+                    "asset_id": asset_id,
+                    "error": str(e)
+                }
+            return results
+        
+        item_results = batch_response.get("results") if isinstance(batch_response, dict) else None
+        if not isinstance(item_results, dict):
+            error = batch_response.get("error", "MissingBatchResults") if isinstance(batch_response, dict) else "MissingBatchResults"
+            logger.error(f"Respuesta de batch de compras sin resultados por ítem: {batch_response}")
+            item_results = {}
+        else:
+            error = "MissingInBatchResponse"
+        
+        for index, asset_id, buy_price in accepted:
+            opportunity = opportunities[index]
+            item_title = opportunity.get("item_title", opportunity.get("item_name", "Unknown"))
+            strategy_type = opportunity.get("strategy", "unknown")
+            item_result = item_results.get(asset_id) or {"success": False, "error": error}
+            
+            if not item_result.get("success"):
+                logger.error(f"Error en compra real (batch) de {item_title}: {item_result.get('error')}")
+                results[index] = {
+                    "success": False,
+                    "reason": f"dmarket_error: {item_result.get('error')}",
+                    "item_title": item_title,
+                    "asset_id": asset_id
+                }
+                continue
+            
+            logger.info(f"✅ COMPRA REAL EXITOSA (batch): {item_title}")
+            # Un registro por compra: un fallo de BD no hace perder las demás compras confirmadas
+            results[index] = self._commit_buy(
+                opportunity, item_title, buy_price, strategy_type, asset_id, item_result.get("details") or {}
+            )
+        
+        return results
+
     def execute_real_sell(self, item_title: str, sell_price_usd: float, reason: str = "manual") -> Dict[str, Any]:
         """Ejecutar venta REAL en DMarket."""
+        result = self.execute_real_sells([(item_title, sell_price_usd)], reason=reason)[0]
+        if result["success"]:
+            result["balance_after"] = self.get_real_balance(mark_to_market=False)
+        return result
+
+    def execute_real_sells(self, sales: List[Tuple[str, float]], reason: str = "manual") -> List[Dict[str, Any]]:
+        """
+        Ejecutar varias ventas REALES en DMarket con peticiones batch (liquidación de posiciones).
+        
+        Args:
+            sales: Lista de pares (item_title, precio de venta en USD).
+            reason: Motivo registrado en cada transacción.
+            
+        Returns:
+            Lista de resultados (mismo formato que execute_real_sell), en el orden de entrada.
+            Cada venta se registra, con su propio commit, solo si DMarket aceptó su oferta.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sales)
         try:
-            logger.info(f"🔥 EJECUTANDO VENTA REAL: {item_title} por ${sell_price_usd:.2f}")
+            logger.info(f"🔥 EJECUTANDO {len(sales)} VENTAS REALES")
             
             db: Session = next(get_db())
             try:
-                # Buscar posición en portfolio real
-                position = db.query(RealPortfolio).filter(
-                    RealPortfolio.item_title == item_title,
-                    RealPortfolio.quantity > 0
-                ).first()
-                
-                if not position:
-                    return {
-                        "success": False,
-                        "reason": "position_not_found",
-                        "item_title": item_title
-                    }
-                
-                # Obtener asset_id de la posición
-                asset_id = position.asset_id
-                if not asset_id:
-                    logger.error(f"No asset_id encontrado para posición {item_title}")
-                    return {
-                        "success": False,
-                        "reason": "missing_asset_id_in_position",
-                        "item_title": item_title
-                    }
-                
-                # EJECUTAR VENTA REAL EN DMARKET
-                sell_response = self.dmarket_api.create_sell_offer(asset_id, sell_price_usd)
-                
-                if "error" in sell_response:
-                    logger.error(f"Error en venta real: {sell_response}")
-                    return {
-                        "success": False,
-                        "reason": f"dmarket_error: {sell_response.get('error')}",
-                        "item_title": item_title,
-                        "asset_id": asset_id
-                    }
-                
-                # Calcular profit/loss
-                cost_basis = position.avg_cost_usd * position.quantity
-                sale_proceeds = sell_price_usd * position.quantity
-                gross_profit = sale_proceeds - cost_basis
-                
-                # DMarket tiene sus propias comisiones reales
-                commission = sale_proceeds * 0.05  # Aproximación de comisión DMarket
-                net_profit = gross_profit - commission
-                
-                logger.info(f"✅ VENTA REAL EXITOSA: {item_title}, Profit: ${net_profit:.2f}")
-                
-                # Registrar transacción de venta
-                sell_transaction = RealTransaction(
-                    transaction_type=TransactionType.SELL.value,
-                    item_title=item_title,
-                    strategy_type=position.strategy_type,
-                    price_usd=sell_price_usd,
-                    quantity=position.quantity,
-                    asset_id=asset_id,
-                    status=TransactionStatus.EXECUTED.value,
-                    executed_at=datetime.now(timezone.utc),
-                    actual_profit_usd=net_profit,
-                    dmarket_response=json.dumps(sell_response),
-                    notes=f"Sold for reason: {reason}"
+                to_list: List[Tuple[int, RealPortfolio, float]] = []
+                listed_assets = set()
+                for index, (item_title, sell_price_usd) in enumerate(sales):
+                    # Buscar posición en portfolio real
+                    position = db.query(RealPortfolio).filter(
+                        RealPortfolio.item_title == item_title,
+                        RealPortfolio.quantity > 0
+                    ).first()
+                    
+                    if not position:
+                        results[index] = {
+                            "success": False,
+                            "reason": "position_not_found",
+                            "item_title": item_title
+                        }
+                        continue
+                    
+                    if not position.asset_id:
+                        logger.error(f"No asset_id encontrado para posición {item_title}")
+                        results[index] = {
+                            "success": False,
+                            "reason": "missing_asset_id_in_position",
+                            "item_title": item_title
+                        }
+                        continue
+                    
+                    if position.asset_id in listed_assets:
+                        results[index] = {
+                            "success": False,
+                            "reason": "duplicate_position_in_batch",
+                            "item_title": item_title,
+                            "asset_id": position.asset_id
+                        }
+                        continue
+                    
+                    listed_assets.add(position.asset_id)
+                    to_list.append((index, position, sell_price_usd))
+                
+                if not to_list:
+                    return results
+                
+                # EJECUTAR VENTAS REALES EN DMARKET
+                batch_response = self.dmarket_api.create_sell_offers(
+                    [(position.asset_id, usd_to_cents(sell_price_usd)) for _, position, sell_price_usd in to_list]
                 )
-                db.add(sell_transaction)
-                
-                # Actualizar portfolio (remover posición)
-                db.delete(position)
-                
-                db.commit()
-                db.refresh(sell_transaction)
                 
-                return {
-                    "success": True,
-                    "transaction_id": sell_transaction.id,
-                    "item_title": item_title,
-                    "quantity_sold": position.quantity,
-                    "cost_basis": cost_basis,
-                    "sale_proceeds": sale_proceeds,
-                    "gross_profit": gross_profit,
-                    "commission": commission,
-                    "net_profit": net_profit,
-                    "reason": reason,
-                    "asset_id": asset_id,
-                    "dmarket_response": sell_response,
-                    "balance_after": self.get_real_balance()
-                }
+                item_results = batch_response.get("results") if isinstance(batch_response, dict) else None
+                if not isinstance(item_results, dict):
+                    error = batch_response.get("error", "MissingBatchResults") if isinstance(batch_response, dict) else "MissingBatchResults"
+                    logger.error(f"Respuesta de batch de ventas sin resultados por ítem: {batch_response}")
+                    item_results = {}
+                else:
+                    error = "MissingInBatchResponse"
+                
+                for index, position, sell_price_usd in to_list:
+                    item_title = position.item_title
+                    asset_id = position.asset_id
+                    item_result = item_results.get(asset_id) or {"success": False, "error": error}
+                    
+                    if not item_result.get("success"):
+                        logger.error(f"Error en venta real de {item_title}: {item_result.get('error')}")
+                        results[index] = {
+                            "success": False,
+                            "reason": f"dmarket_error: {item_result.get('error')}",
+                            "item_title": item_title,
+                            "asset_id": asset_id
+                        }
+                        continue
+                    
+                    # Un registro por venta: un fallo de BD no hace perder las demás ventas confirmadas
+                    results[index] = self._commit_sell(db, position, sell_price_usd, reason, item_result.get("details") or {})
                 
             finally:
                 db.close()
                 
         except Exception as e:
             logger.error(f"Error ejecutando venta real: {e}")
+            # Las ventas ya aceptadas por DMarket conservan su resultado
+            for index, (item_title, _) in enumerate(sales):
+                if results[index] is None:
+                    results[index] = {
+                        "success": False,
+                        "reason": f"exception: {str(e)}",
+                        "item_title": item_title,
+                        "error": str(e)
+                    }
+        
+        return results
+
+    def _commit_sell(self, db: Session, position: RealPortfolio, sell_price_usd: float, reason: str,
+                     sell_response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Registra con su propio commit una venta ya aceptada por DMarket.
+        Si el registro falla la venta sigue contando como exitosa, con "recorded": False
+        para que se concilie a mano.
+        """
+        item_title = position.item_title
+        asset_id = position.asset_id
+        try:
+            result, sell_transaction = self._record_sell(db, position, sell_price_usd, reason, sell_response)
+            db.commit()
+            db.refresh(sell_transaction)
+            result["recorded"] = True
+            result["transaction_id"] = sell_transaction.id
+            return result
+        except Exception as e:
+            db.rollback()
+            logger.critical(f"Venta de {item_title} ({asset_id}) ejecutada en DMarket pero NO registrada: {e}")
             return {
-                "success": False,
-                "reason": f"exception: {str(e)}",
+                "success": True,
+                "recorded": False,
+                "record_error": str(e),
+                "transaction_id": None,
                 "item_title": item_title,
-                "error": str(e)
+                "reason": reason,
+                "asset_id": asset_id,
+                "dmarket_response": sell_response
             }
 
+    def _record_sell(self, db: Session, position: RealPortfolio, sell_price_usd: float, reason: str,
+                     sell_response: Dict[str, Any]) -> Tuple[Dict[str, Any], RealTransaction]:
+        """Registra la venta de una posición y la elimina del portfolio (sin hacer commit)."""
+        item_title = position.item_title
+        
+        # Calcular profit/loss
+        cost_basis = position.avg_cost_usd * position.quantity
+        sale_proceeds = sell_price_usd * position.quantity
+        gross_profit = sale_proceeds - cost_basis
+        
+        # DMarket tiene sus propias comisiones reales
+        commission = sale_proceeds * 0.05  # Aproximación de comisión DMarket
+        net_profit = gross_profit - commission
+        
+        logger.info(f"✅ VENTA REAL EXITOSA: {item_title}, Profit: ${net_profit:.2f}")
+        
+        # Registrar transacción de venta
+        sell_transaction = RealTransaction(
+            transaction_type=TransactionType.SELL.value,
+            item_title=item_title,
+            strategy_type=position.strategy_type,
+            price_usd=sell_price_usd,
+            quantity=position.quantity,
+            asset_id=position.asset_id,
+            status=TransactionStatus.EXECUTED.value,
+            executed_at=datetime.now(timezone.utc),
+            actual_profit_usd=net_profit,
+            dmarket_response=json.dumps(sell_response),
+            notes=f"Sold for reason: {reason}"
+        )
+        db.add(sell_transaction)
+        
+        # Actualizar portfolio (remover posición)
+        db.delete(position)
+        
+        return {
+            "success": True,
+            "item_title": item_title,
+            "quantity_sold": position.quantity,
+            "cost_basis": cost_basis,
+            "sale_proceeds": sale_proceeds,
+            "gross_profit": gross_profit,
+            "commission": commission,
+            "net_profit": net_profit,
+            "reason": reason,
+            "asset_id": position.asset_id,
+            "dmarket_response": sell_response
+        }, sell_transaction
+
     def _update_portfolio_after_buy(self, db: Session, item_title: str, buy_price: float, 
                                   strategy_type: str, asset_id: str, opportunity: Dict[str, Any]):
         """Actualizar portfolio después de compra real."""
@@ -409,6 +681,21 @@ class RealTrader:
             logger.error(f"Error obteniendo resumen de portfolio: {e}")
             return {"total_positions": 0, "positions": [], "balance_info": {}}
 
+    def get_open_positions(self) -> List[Tuple[str, float]]:
+        """(título, coste medio en USD) de las posiciones activas, sin consultar DMarket."""
+        try:
+            db: Session = next(get_db())
+            try:
+                positions = db.query(RealPortfolio).filter(
+                    RealPortfolio.quantity > 0
+                ).all()
+                return [(position.item_title, position.avg_cost_usd) for position in positions]
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error obteniendo posiciones abiertas: {e}")
+            return []
+
     def get_performance_summary(self) -> Dict[str, Any]:
         """Obtener resumen de rendimiento REAL."""
         try:
@@ -0,0 +1,238 @@
+# core/request_coalescer.py
+"""
+Coalescencia "single-flight" de lecturas equivalentes de /exchange/v1/market/items.
+
+StrategyEngine._get_item_data pide el mismo título dos veces (get_offers_by_title y
+get_buy_offers) cambiando solo orderBy/orderDir. Este módulo detecta consultas
+equivalentes en vuelo o recién completadas y sirve a todos los llamantes con una
+única respuesta, reordenada localmente cuando hace falta.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+MARKET_ITEMS_ENDPOINT = "/exchange/v1/market/items"
+
+# Parámetros que solo cambian el orden de la respuesta y no su contenido
+ORDER_PARAMS = ("orderBy", "orderDir")
+
+Order = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass
+class _CompletedEntry:
+    """Respuesta reciente reutilizable por consultas equivalentes."""
+    order: Order
+    limit: int
+    response: Dict[str, Any]
+    completed_at: float
+
+
+@dataclass
+class _Flight:
+    """Petición en vuelo (hilos) a la que se pueden unir otros llamantes."""
+    order: Order
+    limit: int
+    event: threading.Event = field(default_factory=threading.Event)
+    response: Optional[Dict[str, Any]] = None
+
+
+class RequestCoalescer:
+    """
+    Agrupa lecturas de market/items equivalentes (mismos parámetros salvo el orden).
+
+    Una respuesta compartida se sirve a otro llamante si:
+      - pidió exactamente el mismo orden, o
+      - la respuesta contiene el libro completo (no hay más páginas), en cuyo caso
+        se reordena localmente por precio según su orderDir.
+    Si el libro está truncado y el orden difiere, el llamante hace su propia petición.
+    """
+
+    def __init__(self, ttl_sec: float = 2.0, max_entries: int = 1024):
+        """
+        Args:
+            ttl_sec: Ventana durante la que una respuesta completada se considera reutilizable.
+            max_entries: Máximo de respuestas recientes retenidas.
+        """
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple, _Flight] = {}
+        self._inflight_async: Dict[Tuple, Tuple[Order, int, "asyncio.Future"]] = {}
+        self._recent: Dict[Tuple, _CompletedEntry] = {}
+        self.stats = {"leader_requests": 0, "joined_inflight": 0, "served_recent": 0, "not_servable": 0}
+
+    @staticmethod
+    def key_for(endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Tuple]:
+        """
+        Clave de coalescencia, o None si la petición no es coalescible
+        (otro endpoint, sin título o página distinta de la primera).
+        """
+        if endpoint != MARKET_ITEMS_ENDPOINT or not params or not params.get("title") or params.get("cursor"):
+            return None
+        return (endpoint,) + tuple(sorted(
+            (k, str(v)) for k, v in params.items() if v is not None and k not in ORDER_PARAMS
+        ))
+
+    @staticmethod
+    def _order_of(params: Dict[str, Any]) -> Order:
+        return params.get("orderBy"), params.get("orderDir")
+
+    @staticmethod
+    def _limit_of(params: Dict[str, Any]) -> int:
+        try:
+            return int(params.get("limit", 0))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _is_complete(response: Dict[str, Any], limit: int) -> bool:
+        """True si la respuesta contiene todo el libro (sin página siguiente)."""
+        objects = response.get("objects") or []
+        return not response.get("cursor") or (limit > 0 and len(objects) < limit)
+
+    def _serve(self, leader_order: Order, limit: int, response: Optional[Dict[str, Any]], order: Order) -> Optional[Dict[str, Any]]:
+        """Adapta la respuesta del líder al orden pedido, o None si no es posible."""
+        if response is None:
+            return None
+        if "error" in response or leader_order == order:
+            return dict(response)
+        if not self._is_complete(response, limit):
+            return None
+        order_by, order_dir = order
+        if order_by is None:
+            return dict(response)
+        if order_by != "price":
+            return None
+        served = dict(response)
+        served["objects"] = sorted(
+            response.get("objects") or [],
+            key=_price_cents,
+            reverse=(order_dir or "asc").lower() == "desc"
+        )
+        return served
+
+    def _lookup_recent(self, key: Tuple, order: Order) -> Optional[Dict[str, Any]]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.completed_at > self.ttl_sec:
+            del self._recent[key]
+            return None
+        return self._serve(entry.order, entry.limit, entry.response, order)
+
+    def _store(self, key: Tuple, order: Order, limit: int, response: Dict[str, Any]) -> None:
+        if "error" in response:
+            return
+        if len(self._recent) >= self.max_entries:
+            now = time.monotonic()
+            for stale_key in [k for k, e in self._recent.items() if now - e.completed_at > self.ttl_sec]:
+                del self._recent[stale_key]
+            if len(self._recent) >= self.max_entries:
+                self._recent.pop(next(iter(self._recent)))
+        self._recent[key] = _CompletedEntry(order, limit, response, time.monotonic())
+
+    def do(self, endpoint: str, params: Optional[Dict[str, Any]], fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Ejecuta `fetch` salvo que una consulta equivalente esté en vuelo o acabe de completarse.
+        Versión para hilos (DMarketAPI).
+        """
+        key = self.key_for(endpoint, params)
+        if key is None:
+            return fetch()
+        order, limit = self._order_of(params), self._limit_of(params)
+
+        with self._lock:
+            served = self._lookup_recent(key, order)
+            if served is not None:
+                self.stats["served_recent"] += 1
+                return served
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight(order, limit)
+                self._inflight[key] = flight
+                self.stats["leader_requests"] += 1
+
+        if leader:
+            response = None
+            try:
+                response = fetch()
+                return response
+            finally:
+                with self._lock:
+                    flight.response = response
+                    self._inflight.pop(key, None)
+                    if response is not None:
+                        self._store(key, order, limit, response)
+                flight.event.set()
+
+        flight.event.wait()
+        served = self._serve(flight.order, flight.limit, flight.response, order)
+        with self._lock:
+            self.stats["joined_inflight" if served is not None else "not_servable"] += 1
+        if served is None:
+            logger.debug(f"Respuesta coalescida no reutilizable para el orden {order}; se hace la petición propia.")
+            return fetch()
+        return served
+
+    async def do_async(
+        self, endpoint: str, params: Optional[Dict[str, Any]], fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Versión asyncio de do() (AsyncDMarketAPI)."""
+        key = self.key_for(endpoint, params)
+        if key is None:
+            return await fetch()
+        order, limit = self._order_of(params), self._limit_of(params)
+
+        with self._lock:
+            served = self._lookup_recent(key, order)
+            if served is not None:
+                self.stats["served_recent"] += 1
+                return served
+            inflight = self._inflight_async.get(key)
+            leader = inflight is None
+            if leader:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight_async[key] = (order, limit, future)
+                self.stats["leader_requests"] += 1
+
+        if leader:
+            response = None
+            try:
+                response = await fetch()
+                return response
+            finally:
+                with self._lock:
+                    self._inflight_async.pop(key, None)
+                    if response is not None:
+                        self._store(key, order, limit, response)
+                if not future.done():
+                    future.set_result(response)
+
+        leader_order, leader_limit, future = inflight
+        response = await asyncio.shield(future)
+        served = self._serve(leader_order, leader_limit, response, order)
+        with self._lock:
+            self.stats["joined_inflight" if served is not None else "not_servable"] += 1
+        if served is None:
+            return await fetch()
+        return served
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+
+def _price_cents(offer: Dict[str, Any]) -> int:
+    try:
+        return int(offer.get("price", {}).get("USD"))
+    except (TypeError, ValueError):
+        return 0
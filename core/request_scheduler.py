@@ -0,0 +1,338 @@
+# core/request_scheduler.py
+"""
+Planificador de peticiones por prioridad para la API de DMarket.
+
+Todas las peticiones de un conector pasan por RequestScheduler antes de enviarse: los
+tokens del rate limiter de cada familia de endpoints (y, si se configura, los huecos
+de concurrencia) se conceden en orden de prioridad y, dentro de la misma prioridad,
+por orden de llegada. Así una compra (EXECUTION) no espera detrás de cientos de
+lecturas de mercado encoladas (SCANNING).
+
+Las prioridades bajas descartan carga: si el presupuesto está agotado más allá de su
+espera máxima, o su cola está llena, la petición se rechaza con LoadShed en lugar de
+seguir ocupando el limitador. La prioridad de una petición se deriva del endpoint
+(default_priority) y puede fijarse para un bloque de código con request_priority().
+"""
+
+import asyncio
+import bisect
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Any, Optional, Callable, List, Iterator
+
+from core.rate_limiter import RateLimiter, EndpointFamily, classify_endpoint
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Espera máxima sin notificación antes de volver a comprobar la cola (salvaguarda)
+_IDLE_RECHECK_SEC = 0.5
+
+
+class RequestPriority(IntEnum):
+    """Clases de prioridad; un valor menor se atiende antes."""
+    EXECUTION = 0   # Compras, ventas y cancelaciones
+    POSITION = 1    # Gestión de posiciones: balance, inventario, ofertas propias, stop-loss
+    SCANNING = 2    # Lecturas de mercado para buscar oportunidades
+
+
+class LoadShed(Exception):
+    """Petición descartada por el planificador porque el presupuesto está agotado."""
+
+    def __init__(self, priority: RequestPriority, family: EndpointFamily, reason: str):
+        super().__init__(f"Petición {priority.name} descartada en '{family.value}': {reason}")
+        self.priority = priority
+        self.family = family
+        self.reason = reason
+
+
+_priority_override: contextvars.ContextVar[Optional[RequestPriority]] = contextvars.ContextVar(
+    "dmarket_request_priority", default=None
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """
+    Fija la prioridad de todas las peticiones hechas dentro del bloque (también en
+    tareas asyncio creadas dentro de él), p.ej. las lecturas previas a una compra.
+    """
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def default_priority(method: str, endpoint: str) -> RequestPriority:
+    """Prioridad por defecto según la familia del endpoint."""
+    family = classify_endpoint(method, endpoint)
+    if family == EndpointFamily.TRADING:
+        return RequestPriority.EXECUTION
+    if family == EndpointFamily.ACCOUNT:
+        return RequestPriority.POSITION
+    return RequestPriority.SCANNING
+
+
+def resolve_priority(method: str, endpoint: str) -> RequestPriority:
+    """Prioridad efectiva: la fijada con request_priority() o la de default_priority()."""
+    override = _priority_override.get()
+    return override if override is not None else default_priority(method, endpoint)
+
+
+class _Waiter:
+    """Petición esperando en una _PriorityGate. Se puede despertar desde cualquier hilo."""
+
+    __slots__ = ("key", "_event", "_loop")
+
+    def __init__(self, priority: RequestPriority, seq: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.key = (int(priority), seq)
+        self._loop = loop
+        self._event = asyncio.Event() if loop is not None else threading.Event()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+    def notify(self) -> None:
+        if self._loop is None:
+            self._event.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    def wait(self, timeout: float) -> None:
+        self._event.wait(timeout)
+        self._event.clear()
+
+    async def wait_async(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+
+
+class _PriorityGate:
+    """
+    Cola de prioridad sobre un recurso. Solo la cabeza de la cola intenta tomarlo:
+    `try_take` devuelve 0.0 si lo tomó, los segundos sugeridos de espera, o None si
+    hay que esperar a una notificación (p.ej. a que se libere un hueco).
+    """
+
+    def __init__(self, try_take: Callable[[], Optional[float]]):
+        self._try_take = try_take
+        self._waiters: List[_Waiter] = []
+        self._lock = threading.Lock()
+
+    def waiting(self, priority: RequestPriority) -> int:
+        with self._lock:
+            return sum(1 for w in self._waiters if w.key[0] == priority)
+
+    def _enter(self, waiter: _Waiter) -> None:
+        with self._lock:
+            bisect.insort(self._waiters, waiter)
+
+    def _leave(self, waiter: _Waiter) -> None:
+        with self._lock:
+            was_head = bool(self._waiters) and self._waiters[0] is waiter
+            self._waiters.remove(waiter)
+            head = self._waiters[0] if self._waiters else None
+        if was_head and head is not None:
+            head.notify()
+
+    def _poll(self, waiter: _Waiter) -> Optional[float]:
+        """0.0 si la cabeza es `waiter` y tomó el recurso; si no, segundos a esperar (None: hasta notificación)."""
+        with self._lock:
+            if self._waiters[0] is not waiter:
+                return None
+            return self._try_take()
+
+    def notify_head(self) -> None:
+        with self._lock:
+            head = self._waiters[0] if self._waiters else None
+        if head is not None:
+            head.notify()
+
+    def acquire(self, waiter: _Waiter, deadline: Optional[float]) -> bool:
+        """Espera el recurso. Devuelve False si se alcanzó `deadline` (o no se alcanzaría) sin obtenerlo."""
+        self._enter(waiter)
+        try:
+            while True:
+                wait = self._poll(waiter)
+                if wait is not None and wait <= 0:
+                    return True
+                timeout = _IDLE_RECHECK_SEC if wait is None else wait
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or (wait is not None and wait > remaining):
+                        return False
+                    timeout = min(timeout, remaining)
+                waiter.wait(timeout)
+        finally:
+            self._leave(waiter)
+
+    async def acquire_async(self, waiter: _Waiter, deadline: Optional[float]) -> bool:
+        """Versión asyncio de acquire()."""
+        self._enter(waiter)
+        try:
+            while True:
+                wait = self._poll(waiter)
+                if wait is not None and wait <= 0:
+                    return True
+                timeout = _IDLE_RECHECK_SEC if wait is None else wait
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or (wait is not None and wait > remaining):
+                        return False
+                    timeout = min(timeout, remaining)
+                await waiter.wait_async(timeout)
+        finally:
+            self._leave(waiter)
+
+
+class RequestScheduler:
+    """
+    Concede el permiso de envío (token del rate limiter y, opcionalmente, hueco de
+    concurrencia) por prioridad. Thread-safe y utilizable desde asyncio.
+    """
+
+    # Espera máxima por prioridad antes de descartar (None: nunca se descarta)
+    DEFAULT_SHED_AFTER_SEC: Dict[RequestPriority, Optional[float]] = {
+        RequestPriority.EXECUTION: None,
+        RequestPriority.POSITION: None,
+        RequestPriority.SCANNING: 5.0,
+    }
+    # Máximo de peticiones esperando por prioridad y familia (None: sin límite)
+    DEFAULT_MAX_WAITING: Dict[RequestPriority, Optional[int]] = {
+        RequestPriority.EXECUTION: None,
+        RequestPriority.POSITION: None,
+        RequestPriority.SCANNING: 256,
+    }
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        max_in_flight: Optional[int] = None,
+        shed_after_sec: Optional[Dict[RequestPriority, Optional[float]]] = None,
+        max_waiting: Optional[Dict[RequestPriority, Optional[int]]] = None
+    ):
+        """
+        Args:
+            rate_limiter: Limitador cuyos tokens se reparten por prioridad.
+            max_in_flight: Máximo de peticiones simultáneas (None: sin límite propio).
+            shed_after_sec: Espera máxima por prioridad; se combina con DEFAULT_SHED_AFTER_SEC.
+            max_waiting: Tamaño máximo de cola por prioridad; se combina con DEFAULT_MAX_WAITING.
+        """
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight debe ser >= 1")
+        self.rate_limiter = rate_limiter
+        self.max_in_flight = max_in_flight
+        self.shed_after_sec = {**self.DEFAULT_SHED_AFTER_SEC, **(shed_after_sec or {})}
+        self.max_waiting = {**self.DEFAULT_MAX_WAITING, **(max_waiting or {})}
+        self._seq = itertools.count()
+        self._token_gates: Dict[EndpointFamily, _PriorityGate] = {
+            family: _PriorityGate(lambda family=family: rate_limiter.try_acquire(family))
+            for family in rate_limiter.buckets
+        }
+        self._in_flight = 0
+        self._slot_lock = threading.Lock()
+        self._slot_gate = _PriorityGate(self._try_take_slot) if max_in_flight is not None else None
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[RequestPriority, Dict[str, float]] = {
+            priority: {"granted": 0, "shed": 0, "wait_sec": 0.0} for priority in RequestPriority
+        }
+
+    def _try_take_slot(self) -> Optional[float]:
+        with self._slot_lock:
+            if self._in_flight < self.max_in_flight:
+                self._in_flight += 1
+                return 0.0
+            return None
+
+    def _admit(self, family: EndpointFamily, priority: RequestPriority) -> Optional[float]:
+        """Comprueba el tamaño de cola y devuelve el deadline de descarte (o None)."""
+        limit = self.max_waiting.get(priority)
+        if limit is not None and self._token_gates[family].waiting(priority) >= limit:
+            self._record_shed(priority)
+            raise LoadShed(priority, family, f"cola llena ({limit} en espera)")
+        shed_after = self.shed_after_sec.get(priority)
+        return time.monotonic() + shed_after if shed_after is not None else None
+
+    def _record_shed(self, priority: RequestPriority) -> None:
+        with self._stats_lock:
+            self.stats[priority]["shed"] += 1
+
+    def _record_grant(self, priority: RequestPriority, waited: float) -> None:
+        with self._stats_lock:
+            self.stats[priority]["granted"] += 1
+            self.stats[priority]["wait_sec"] += waited
+
+    def acquire(self, family: EndpointFamily, priority: RequestPriority) -> float:
+        """
+        Bloquea hasta obtener permiso de envío. Si hay max_in_flight, el llamante debe
+        llamar a release() al terminar la petición.
+
+        Returns:
+            Segundos esperados.
+
+        Raises:
+            LoadShed: Si la petición se descarta por cola llena o espera excesiva.
+        """
+        started = time.monotonic()
+        deadline = self._admit(family, priority)
+        if self._slot_gate is not None and not self._slot_gate.acquire(_Waiter(priority, next(self._seq)), deadline):
+            self._record_shed(priority)
+            raise LoadShed(priority, family, "sin huecos de concurrencia")
+        if not self._token_gates[family].acquire(_Waiter(priority, next(self._seq)), deadline):
+            self.release()
+            self._record_shed(priority)
+            raise LoadShed(priority, family, "presupuesto de rate-limit agotado")
+        waited = time.monotonic() - started
+        self.rate_limiter.record_wait(family, waited)
+        self._record_grant(priority, waited)
+        return waited
+
+    async def acquire_async(self, family: EndpointFamily, priority: RequestPriority) -> float:
+        """Versión asyncio de acquire()."""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        deadline = self._admit(family, priority)
+        if self._slot_gate is not None and not await self._slot_gate.acquire_async(
+                _Waiter(priority, next(self._seq), loop), deadline):
+            self._record_shed(priority)
+            raise LoadShed(priority, family, "sin huecos de concurrencia")
+        if not await self._token_gates[family].acquire_async(_Waiter(priority, next(self._seq), loop), deadline):
+            self.release()
+            self._record_shed(priority)
+            raise LoadShed(priority, family, "presupuesto de rate-limit agotado")
+        waited = time.monotonic() - started
+        self.rate_limiter.record_wait(family, waited)
+        self._record_grant(priority, waited)
+        return waited
+
+    def release(self) -> None:
+        """Libera el hueco de concurrencia tomado por acquire() (no-op sin max_in_flight)."""
+        if self._slot_gate is None:
+            return
+        with self._slot_lock:
+            self._in_flight = max(0, self._in_flight - 1)
+        self._slot_gate.notify_head()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Concesiones, descartes y espera media por prioridad, y peticiones en vuelo."""
+        with self._stats_lock:
+            by_priority = {
+                priority.name.lower(): {
+                    "granted": int(s["granted"]),
+                    "shed": int(s["shed"]),
+                    "avg_wait_ms": (s["wait_sec"] / s["granted"] * 1000.0) if s["granted"] else 0.0
+                }
+                for priority, s in self.stats.items()
+            }
+        with self._slot_lock:
+            in_flight = self._in_flight
+        return {"priorities": by_priority, "in_flight": in_flight, "max_in_flight": self.max_in_flight}
@@ -0,0 +1,63 @@
+# core/request_signing.py
+"""
+Firma Ed25519 de las peticiones a DMarket con una clave precalculada.
+
+Ed25519Signer se construye una vez por conector. Si `cryptography` está instalado usa
+Ed25519PrivateKey.sign, que devuelve directamente la firma separada de 64 bytes; si no,
+recurre a nacl.bindings.crypto_sign (que construye el mensaje firmado completo y se
+recorta la firma). Ambas producen la misma firma (Ed25519 es determinista).
+"""
+
+import logging
+from typing import Callable
+
+from nacl.bindings import crypto_sign
+
+# cryptography es opcional: firma separada sin copiar el mensaje
+try:
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    Ed25519PrivateKey = None
+    CRYPTOGRAPHY_AVAILABLE = False
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+class Ed25519Signer:
+    """Contexto de firma reutilizable a partir de la secret key de DMarket (64 bytes: semilla + pública)."""
+
+    def __init__(self, secret_key_bytes: bytes, backend: str = "auto"):
+        """
+        Args:
+            secret_key_bytes: Clave secreta de 64 bytes.
+            backend: "auto", "cryptography" o "nacl".
+
+        Raises:
+            ValueError: Si la clave no tiene 64 bytes o el backend no está disponible.
+        """
+        if len(secret_key_bytes) != 64:
+            raise ValueError(f"La Secret Key debe tener 64 bytes, tiene {len(secret_key_bytes)}")
+        if backend == "auto":
+            backend = "cryptography" if CRYPTOGRAPHY_AVAILABLE else "nacl"
+
+        if backend == "cryptography":
+            if not CRYPTOGRAPHY_AVAILABLE:
+                raise ValueError("cryptography no está instalado")
+            private_key = Ed25519PrivateKey.from_private_bytes(secret_key_bytes[:32])
+            self._sign: Callable[[bytes], bytes] = private_key.sign
+        elif backend == "nacl":
+            self._sign = lambda message: crypto_sign(message, secret_key_bytes)[:64]
+        else:
+            raise ValueError(f"Backend de firma desconocido: {backend}")
+        self.backend = backend
+        logger.debug("Firmador Ed25519 inicializado con backend %s", backend)
+
+    def sign(self, message: bytes) -> bytes:
+        """Firma separada (64 bytes) de `message`."""
+        return self._sign(message)
+
+    def sign_hex(self, message: bytes) -> str:
+        """Firma separada en hexadecimal (128 caracteres)."""
+        return self._sign(message).hex()
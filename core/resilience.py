@@ -0,0 +1,252 @@
+# core/resilience.py
+"""
+Reintentos y circuit breakers para la API de DMarket.
+
+RetryPolicy decide si un resultado de _make_request es un fallo transitorio
+(ConnectionError, Timeout o HTTP 5xx) y cuánto esperar antes de reintentarlo, con
+backoff exponencial y jitter completo. Solo se reintentan peticiones idempotentes (GET
+y lecturas por POST como aggregated-prices): una compra o venta nunca se reenvía
+automáticamente.
+
+CircuitBreaker corta las peticiones a una plantilla de endpoint que está fallando:
+tras `failure_threshold` fallos consecutivos se abre y falla rápido durante
+`reset_timeout_sec`; después deja pasar una petición de prueba (half-open) que lo
+cierra si tiene éxito o lo vuelve a abrir si falla. CircuitBreakerRegistry mantiene
+un breaker por "MÉTODO plantilla" y expone su estado para que quien planifica el
+trabajo (StrategyEngine, la consola) lo salte en lugar de esperar timeouts.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Any, Optional, FrozenSet, List, Tuple
+
+from core.rate_limiter import READ_ONLY_POST_ENDPOINTS
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Errores de transporte que se consideran transitorios
+TRANSIENT_ERRORS: FrozenSet[str] = frozenset({"ConnectionError", "Timeout"})
+
+# Plantillas de endpoints con parámetros de ruta conocidos
+_ENDPOINT_TEMPLATES: List[Tuple["re.Pattern", str]] = [
+    (re.compile(r"^/account/v1/fee-rates/[^/]+$"), "/account/v1/fee-rates/{gameId}"),
+    (re.compile(r"^/exchange/v1/offers/[^/]+/close$"), "/exchange/v1/offers/{offerId}/close"),
+]
+# Segmentos con aspecto de identificador (UUID, hex largo o numérico) en rutas no catalogadas
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F-]{16,}|\d+)$")
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """
+    Plantilla de un endpoint: sustituye los parámetros de ruta por {nombre} para que
+    todas las peticiones a la misma ruta compartan breaker.
+    """
+    path = endpoint.split("?", 1)[0]
+    for pattern, template in _ENDPOINT_TEMPLATES:
+        if pattern.match(path):
+            return template
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def is_transient_failure(result: Any) -> bool:
+    """True si el resultado es un fallo de transporte o un HTTP 5xx."""
+    if not isinstance(result, dict):
+        return False
+    error = result.get("error")
+    if error in TRANSIENT_ERRORS:
+        return True
+    status = result.get("status_code")
+    return error == "HTTPError" and isinstance(status, int) and status >= 500
+
+
+@dataclass
+class RetryPolicy:
+    """Política de reintentos de fallos transitorios para métodos idempotentes."""
+    max_retries: int = 3
+    base_delay_sec: float = 0.5
+    max_delay_sec: float = 8.0
+    retry_methods: FrozenSet[str] = field(default_factory=lambda: frozenset({"GET", "HEAD"}))
+
+    def should_retry(self, method: str, result: Any, retries_done: int, endpoint: Optional[str] = None) -> bool:
+        """
+        True si `result` es transitorio, la petición es idempotente (método GET/HEAD o
+        endpoint de solo lectura expuesto como POST) y quedan reintentos.
+        """
+        idempotent = method.upper() in self.retry_methods or endpoint in READ_ONLY_POST_ENDPOINTS
+        return retries_done < self.max_retries and idempotent and is_transient_failure(result)
+
+    def backoff_delay(self, retries_done: int) -> float:
+        """Backoff exponencial acotado con jitter completo: uniforme en [0, min(max, base * 2^n)]."""
+        return random.uniform(0, min(self.max_delay_sec, self.base_delay_sec * (2 ** retries_done)))
+
+
+class BreakerState(Enum):
+    """Estados de un circuit breaker."""
+    CLOSED = "closed"        # Funcionamiento normal
+    OPEN = "open"            # Falla rápido sin enviar peticiones
+    HALF_OPEN = "half_open"  # Una petición de prueba en vuelo decide si se cierra
+
+
+class CircuitBreaker:
+    """Circuit breaker de una plantilla de endpoint. Thread-safe."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_sec: float = 30.0):
+        """
+        Args:
+            name: Identificador ("MÉTODO plantilla").
+            failure_threshold: Fallos transitorios consecutivos que abren el circuito.
+            reset_timeout_sec: Tiempo abierto antes de permitir una petición de prueba.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self._state = BreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _current_state(self, now: float) -> BreakerState:
+        if self._state == BreakerState.OPEN and now - self._opened_at >= self.reset_timeout_sec:
+            return BreakerState.HALF_OPEN
+        return self._state
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def is_open(self) -> bool:
+        """True mientras el circuito está abierto (sin consumir la petición de prueba)."""
+        return self.state == BreakerState.OPEN
+
+    def retry_in_sec(self) -> float:
+        """Segundos hasta que se permita la próxima petición de prueba."""
+        with self._lock:
+            if self._state != BreakerState.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout_sec - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """
+        Indica si se puede enviar una petición. En half-open solo se admite una
+        petición de prueba a la vez.
+        """
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == BreakerState.CLOSED:
+                return True
+            if state == BreakerState.HALF_OPEN and not self._probe_in_flight:
+                self._state = BreakerState.HALF_OPEN
+                self._probe_in_flight = True
+                logger.info(f"Circuit breaker {self.name}: half-open, enviando petición de prueba")
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self) -> None:
+        """Libera la petición de prueba de allow() cuando finalmente no se envió."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, result: Any) -> None:
+        """Registra el resultado de una petición permitida por allow()."""
+        if is_transient_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != BreakerState.CLOSED:
+                logger.info(f"Circuit breaker {self.name}: cerrado tras petición de prueba exitosa")
+            self._state = BreakerState.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == BreakerState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != BreakerState.OPEN:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Circuit breaker {self.name}: abierto tras {self._consecutive_failures} fallos "
+                        f"consecutivos. Fallando rápido durante {self.reset_timeout_sec:.1f}s."
+                    )
+                self._state = BreakerState.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def open_error(self) -> Dict[str, Any]:
+        """Dict de error devuelto en lugar de enviar la petición mientras está abierto."""
+        return {
+            "error": "CircuitOpen",
+            "message": f"Circuito abierto para {self.name}",
+            "endpoint": self.name,
+            "retry_in_sec": round(self.retry_in_sec(), 3)
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                "state": state.value,
+                "consecutive_failures": self._consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in_sec": max(0.0, self.reset_timeout_sec - (now - self._opened_at))
+                if state == BreakerState.OPEN else 0.0
+            }
+
+
+class CircuitBreakerRegistry:
+    """Un CircuitBreaker por método y plantilla de endpoint, creado bajo demanda."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_sec: float = 30.0, enabled: bool = True):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self.enabled = enabled
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(method: str, endpoint: str) -> str:
+        return f"{method.upper()} {normalize_endpoint(endpoint)}"
+
+    def get(self, method: str, endpoint: str) -> CircuitBreaker:
+        key = self.key_for(method, endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(key, self.failure_threshold, self.reset_timeout_sec)
+                    self._breakers[key] = breaker
+        return breaker
+
+    def is_available(self, method: str, endpoint: str) -> bool:
+        """False si el breaker del endpoint está abierto (no consume la petición de prueba)."""
+        if not self.enabled:
+            return True
+        breaker = self._breakers.get(self.key_for(method, endpoint))
+        return breaker is None or not breaker.is_open()
+
+    def get_states(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de cada breaker conocido, por "MÉTODO plantilla"."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {key: breaker.snapshot() for key, breaker in breakers}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
@@ -0,0 +1,255 @@
+# core/response_cache.py
+"""
+Caché de respuestas GET de la API de DMarket con TTL por endpoint y semántica
+stale-while-revalidate: una entrada caducada pero dentro de su ventana "stale" se
+sirve inmediatamente mientras se refresca en segundo plano.
+
+Las escrituras (compras, ventas, cancelaciones) deben invalidar explícitamente
+los prefijos afectados (balance, inventario, ofertas propias).
+
+Los libros de mercado (/exchange/v1/market/items) no tienen ventana stale por
+defecto: snipes y flips deciden sobre ellos y no deben recibir sin saberlo un libro
+de hace varios segundos. Se puede activar por conector con
+ResponseCache(ttls={"/exchange/v1/market/items": (1.0, 2.0)}).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, Set
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    """Respuesta cacheada con sus ventanas de validez (tiempos de time.monotonic())."""
+    response: Dict[str, Any]
+    fresh_until: float
+    stale_until: float
+
+
+class ResponseCache:
+    """
+    Caché thread-safe de respuestas GET, utilizable desde código síncrono y asyncio.
+
+    Solo se cachean los endpoints con TTL configurado, las respuestas sin "error"
+    y las peticiones sin cursor (las páginas profundas no se reutilizan y ocuparían memoria).
+    """
+
+    # Prefijo de endpoint -> (segundos "fresco", segundos adicionales "stale"; 0 = sin stale-while-revalidate)
+    DEFAULT_TTLS: Dict[str, Tuple[float, float]] = {
+        "/account/v1/balance": (3.0, 5.0),
+        "/account/v1/fee-rates/": (3600.0, 3600.0),
+        "/exchange/v1/user/items": (30.0, 30.0),
+        "/exchange/v1/user/offers": (15.0, 15.0),
+        "/exchange/v1/market/items": (1.0, 0.0),
+    }
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, Optional[Tuple[float, float]]]] = None,
+        max_entries: int = 2048,
+        enabled: bool = True
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            ttls: TTL (fresco, stale) por prefijo de endpoint; se combina con DEFAULT_TTLS.
+                Un valor None desactiva la caché para ese prefijo.
+            max_entries: Máximo de respuestas retenidas (se descartan las menos usadas).
+            enabled: Si es False, todas las peticiones van a la red.
+        """
+        merged: Dict[str, Optional[Tuple[float, float]]] = dict(self.DEFAULT_TTLS)
+        if ttls:
+            merged.update(ttls)
+        # Los prefijos más largos tienen prioridad
+        self.ttls = {prefix: ttl for prefix, ttl in sorted(merged.items(), key=lambda kv: -len(kv[0])) if ttl}
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self._refreshing: Set[Tuple] = set()
+        # Se incrementa en cada invalidación: una petición iniciada antes no puede
+        # guardar su respuesta (ya obsoleta) después de la invalidación.
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._background_tasks: Set["asyncio.Task"] = set()
+        self.stats = {
+            "hits": 0, "misses": 0, "stale_hits": 0, "bypass": 0,
+            "refreshes": 0, "refresh_errors": 0, "invalidations": 0, "evictions": 0
+        }
+
+    def ttl_for(self, endpoint: str) -> Optional[Tuple[float, float]]:
+        """TTL (fresco, stale) aplicable al endpoint, o None si no se cachea."""
+        for prefix, ttl in self.ttls.items():
+            if endpoint.startswith(prefix):
+                return ttl
+        return None
+
+    @staticmethod
+    def key_for(endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple:
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+        return (endpoint,) + items
+
+    def _cacheable(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
+        if not self.enabled or (params and params.get("cursor")):
+            return None
+        return self.ttl_for(endpoint)
+
+    def _lookup(self, key: Tuple) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Devuelve (respuesta, necesita_refresco). Debe llamarse con el lock tomado."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        now = time.monotonic()
+        if now <= entry.fresh_until:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return dict(entry.response), False
+        if now <= entry.stale_until:
+            self._entries.move_to_end(key)
+            self.stats["stale_hits"] += 1
+            return dict(entry.response), key not in self._refreshing
+        del self._entries[key]
+        return None, False
+
+    def _store(self, key: Tuple, ttl: Tuple[float, float], response: Dict[str, Any], generation: int) -> None:
+        if not isinstance(response, dict) or "error" in response:
+            return
+        fresh_sec, stale_sec = ttl
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = _CacheEntry(dict(response), now + fresh_sec, now + fresh_sec + stale_sec)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _refresh(
+        self, key: Tuple, ttl: Tuple[float, float], fetch: Callable[[], Dict[str, Any]], generation: int
+    ) -> None:
+        try:
+            response = fetch()
+            if isinstance(response, dict) and "error" in response:
+                with self._lock:
+                    self.stats["refresh_errors"] += 1
+            self._store(key, ttl, response, generation)
+        except Exception as e:
+            logger.warning(f"Error refrescando en segundo plano {key[0]}: {e}")
+            with self._lock:
+                self.stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]], fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Devuelve la respuesta cacheada o ejecuta `fetch`. Versión para hilos (DMarketAPI).
+        Las entradas stale se sirven al momento y se refrescan en un hilo de fondo.
+        """
+        ttl = self._cacheable(endpoint, params)
+        if ttl is None:
+            with self._lock:
+                self.stats["bypass"] += 1
+            return fetch()
+        key = self.key_for(endpoint, params)
+
+        with self._lock:
+            generation = self._generation
+            cached, needs_refresh = self._lookup(key)
+            if cached is None:
+                self.stats["misses"] += 1
+            elif needs_refresh:
+                self._refreshing.add(key)
+                self.stats["refreshes"] += 1
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dmarket-cache-refresh")
+                self._executor.submit(self._refresh, key, ttl, fetch, generation)
+
+        if cached is not None:
+            return cached
+        response = fetch()
+        self._store(key, ttl, response, generation)
+        return response
+
+    async def get_async(
+        self, endpoint: str, params: Optional[Dict[str, Any]], fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Versión asyncio de get(): el refresco de fondo es una tarea del event loop."""
+        ttl = self._cacheable(endpoint, params)
+        if ttl is None:
+            with self._lock:
+                self.stats["bypass"] += 1
+            return await fetch()
+        key = self.key_for(endpoint, params)
+
+        with self._lock:
+            generation = self._generation
+            cached, needs_refresh = self._lookup(key)
+            if cached is None:
+                self.stats["misses"] += 1
+            elif needs_refresh:
+                self._refreshing.add(key)
+                self.stats["refreshes"] += 1
+
+        if cached is not None:
+            if needs_refresh:
+                task = asyncio.get_running_loop().create_task(self._refresh_async(key, ttl, fetch, generation))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            return cached
+        response = await fetch()
+        self._store(key, ttl, response, generation)
+        return response
+
+    async def _refresh_async(
+        self, key: Tuple, ttl: Tuple[float, float], fetch: Callable[[], Awaitable[Dict[str, Any]]], generation: int
+    ) -> None:
+        try:
+            response = await fetch()
+            if isinstance(response, dict) and "error" in response:
+                with self._lock:
+                    self.stats["refresh_errors"] += 1
+            self._store(key, ttl, response, generation)
+        except Exception as e:
+            logger.warning(f"Error refrescando en segundo plano {key[0]}: {e}")
+            with self._lock:
+                self.stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, prefix: str = "") -> int:
+        """
+        Elimina las entradas cuyo endpoint empieza por `prefix` (todas si es "").
+
+        Returns:
+            Número de entradas eliminadas.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0].startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            self._generation += 1
+            self.stats["invalidations"] += len(keys)
+        if keys:
+            logger.debug(f"Caché invalidada para '{prefix or '*'}': {len(keys)} entradas")
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos/fallos y tamaño actual de la caché."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -14,6 +14,8 @@ from dataclasses import dataclass
 from sqlalchemy.orm import Session
 
 from core.data_manager import get_db
+from core.dmarket_connector import DMarketAPI
+from core.request_scheduler import RequestPriority, request_priority
 from core.inventory_manager import InventoryManager, InventoryItem, InventoryItemStatus
 
 # Obtener logger para este módulo
@@ -95,7 +97,8 @@ class RiskManager:
     def __init__(
         self,
         inventory_manager: InventoryManager,
-        config: Optional[Dict[str, Any]] = None
+        config: Optional[Dict[str, Any]] = None,
+        dmarket_api: Optional[DMarketAPI] = None
     ):
         """
         Inicializa el gestor de riesgos.
@@ -103,8 +106,10 @@ class RiskManager:
         Args:
             inventory_manager: Gestor de inventario para acceder a posiciones.
             config: Configuración opcional para límites y parámetros.
+            dmarket_api: Conector para obtener precios de mercado de los stop-loss (opcional).
         """
         self.inventory_manager = inventory_manager
+        self.dmarket_api = dmarket_api
         self.config = config or self._get_default_config()
         self.risk_limits = self._parse_risk_limits()
         self.stop_loss_orders: List[StopLossOrder] = []
@@ -776,18 +781,23 @@ class RiskManager:
         
         return max(min_stop, min(final_stop, max_stop))
 
-    def check_stop_loss_triggers(self, current_prices: Dict[str, float]) -> List[StopLossOrder]:
+    def check_stop_loss_triggers(self, current_prices: Optional[Dict[str, float]] = None) -> List[StopLossOrder]:
         """
         Verifica si alguna orden de stop-loss debe ser activada.
         
         Args:
-            current_prices: Dict con precios actuales {item_title: price_usd}
+            current_prices: Dict con precios actuales {item_title: price_usd}. Si no se
+                indica, se obtienen de DMarket en una única consulta agregada para todos
+                los ítems con stop-loss pendiente.
             
         Returns:
             Lista de órdenes de stop-loss activadas.
         """
         triggered_orders = []
         
+        if current_prices is None:
+            current_prices = self._fetch_stop_loss_prices()
+        
         for order in self.stop_loss_orders:
             if order.triggered or order.executed:
                 continue
@@ -822,6 +832,17 @@ class RiskManager:
         
         return triggered_orders
 
+    def _fetch_stop_loss_prices(self) -> Dict[str, float]:
+        """Precios de mercado de los ítems con stop-loss pendiente, en una sola consulta."""
+        titles = [order.item_title for order in self.stop_loss_orders
+                  if not (order.triggered or order.executed)]
+        if not titles or self.dmarket_api is None:
+            if titles:
+                logger.warning("check_stop_loss_triggers sin precios ni conector DMarket: no se evalúan stop-loss")
+            return {}
+        with request_priority(RequestPriority.POSITION):
+            return self.dmarket_api.get_market_prices_usd(titles)
+
     def _record_risk_alert(self, alert_type: RiskAlert, message: str, data: Dict[str, Any]) -> None:
         """Registra una alerta de riesgo en el historial."""
         alert_record = {
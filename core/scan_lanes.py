@@ -0,0 +1,234 @@
+# core/scan_lanes.py
+"""
+Carriles de escaneo de TradingPipeline: un carril rápido sobre una watchlist pequeña y
+un carril lento que recorre el universo.
+
+La Watchlist se mantiene sola a partir de tres fuentes, por orden de prioridad:
+  1. Ítems cerca del stop-loss: posiciones abiertas de RealTrader cuyo último precio
+     observado está a menos de `stop_loss_proximity` del stop (RealTrader.config
+     "stop_loss_pct") y órdenes pendientes de RiskManager en la misma situación.
+  2. Posiciones abiertas (RealTrader.get_open_positions).
+  3. Títulos con oportunidades recientes (durante `opportunity_ttl_sec`).
+El carril rápido vuelve a pedir cada título de la watchlist cada pocos segundos; el
+lento sigue el orden del ScanScheduler (o el universo completo) y omite los títulos
+que ya vigila el rápido.
+
+Los dos carriles comparten el presupuesto MARKET del rate limiter del conector: cada
+uno tiene un LaneBudget (token bucket) con su fracción de la tasa vigente de la
+familia, y cada ítem consume `requests_per_item` tokens antes de encolarse. El resto
+de la tasa queda libre para las peticiones de posiciones y ejecución.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from core.order_book import OrderBook
+from core.rate_limiter import RateLimiter, EndpointFamily, TokenBucket
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+class ScanLane(IntEnum):
+    """Carriles de escaneo; un valor menor se procesa antes en la cola de títulos."""
+    FAST = 0    # Watchlist: cerca del stop-loss, posiciones, oportunidades recientes
+    SLOW = 1    # Barrido del universo
+
+
+class WatchReason(IntEnum):
+    """Motivo por el que un título está en la watchlist; un valor menor tiene prioridad."""
+    STOP_LOSS = 0
+    POSITION = 1
+    OPPORTUNITY = 2
+
+
+@dataclass
+class WatchlistConfig:
+    """Parámetros de la watchlist del carril rápido."""
+    max_size: int = 20                  # Títulos vigilados como máximo
+    opportunity_ttl_sec: float = 600.0  # Permanencia de un título tras su última oportunidad
+    refresh_sec: float = 30.0           # Cada cuánto se releen posiciones y órdenes de stop-loss
+    stop_loss_proximity: float = 0.10   # Precio a menos de este margen sobre el stop = cerca del stop-loss
+
+
+class Watchlist:
+    """Títulos del carril rápido, mantenidos a partir de posiciones, stop-loss y oportunidades."""
+
+    def __init__(self, config: Optional[WatchlistConfig] = None, real_trader: Any = None, risk_manager: Any = None):
+        """
+        Args:
+            config: Parámetros; por defecto WatchlistConfig().
+            real_trader: Fuente de posiciones abiertas (get_open_positions); opcional.
+            risk_manager: Fuente de órdenes de stop-loss (stop_loss_orders); opcional.
+        """
+        self.config = config or WatchlistConfig()
+        self.real_trader = real_trader
+        self.risk_manager = risk_manager
+        self._lock = threading.Lock()
+        self._positions: Dict[str, float] = {}     # título -> precio de stop-loss (USD)
+        self._opportunities: Dict[str, float] = {}  # título -> time.monotonic() de la última oportunidad
+        self._prices: Dict[str, float] = {}         # título -> último precio observado (mejor ask, USD)
+        self._polled: Dict[str, float] = {}         # título -> time.monotonic() del último encolado rápido
+        self._refreshed_at: Optional[float] = None
+
+    def refresh(self, now: Optional[float] = None, force: bool = False) -> None:
+        """Relee posiciones y órdenes de stop-loss si pasaron refresh_sec desde la última vez."""
+        now = time.monotonic() if now is None else now
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < self.config.refresh_sec:
+            return
+        self._refreshed_at = now
+        stops: Dict[str, float] = {}
+        if self.real_trader is not None:
+            try:
+                stop_loss_pct = self.real_trader.config.get("stop_loss_pct", -15.0)
+                for title, avg_cost_usd in self.real_trader.get_open_positions():
+                    stops[title] = avg_cost_usd * (1 + stop_loss_pct / 100.0)
+            except Exception as e:
+                logger.warning(f"No se pudieron leer las posiciones para la watchlist: {e}")
+        if self.risk_manager is not None:
+            for order in list(self.risk_manager.stop_loss_orders):
+                if not (order.triggered or order.executed):
+                    stops[order.item_title] = max(stops.get(order.item_title, 0.0), order.stop_loss_price_usd)
+        with self._lock:
+            self._positions = stops
+        logger.debug(f"Watchlist: {len(stops)} posiciones con stop-loss")
+
+    def note_scan(self, title: str, order_book: Optional[OrderBook],
+                  opportunities: Iterable[Dict[str, Any]] = ()) -> None:
+        """Registra el último precio de un título y, si tuvo oportunidades, lo vigila durante opportunity_ttl_sec."""
+        found = any(True for _ in opportunities)
+        with self._lock:
+            if order_book is not None and order_book.best_ask_usd is not None:
+                self._prices[title] = order_book.best_ask_usd
+            if found:
+                self._opportunities[title] = time.monotonic()
+
+    def _reason(self, title: str, now: float) -> Optional[WatchReason]:
+        stop_price = self._positions.get(title)
+        if stop_price is not None:
+            price = self._prices.get(title)
+            if price is not None and price <= stop_price * (1 + self.config.stop_loss_proximity):
+                return WatchReason.STOP_LOSS
+            return WatchReason.POSITION
+        seen_at = self._opportunities.get(title)
+        if seen_at is not None and now - seen_at <= self.config.opportunity_ttl_sec:
+            return WatchReason.OPPORTUNITY
+        return None
+
+    def entries(self, now: Optional[float] = None) -> List[Tuple[str, WatchReason]]:
+        """
+        Títulos vigilados con su motivo, como mucho max_size: primero los cerca del
+        stop-loss (los más próximos antes), luego posiciones y oportunidades recientes.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # Olvidar las oportunidades caducadas
+            for title in [t for t, seen in self._opportunities.items() if now - seen > self.config.opportunity_ttl_sec]:
+                del self._opportunities[title]
+            ranked = []
+            for title in set(self._positions) | set(self._opportunities):
+                reason = self._reason(title, now)
+                if reason is None:
+                    continue
+                if reason != WatchReason.OPPORTUNITY:
+                    price = self._prices.get(title)
+                    # Distancia relativa al stop; sin precio observado, al final de su grupo
+                    order = price / self._positions[title] if price is not None and self._positions[title] > 0 else float("inf")
+                else:
+                    order = -self._opportunities[title]  # Las más recientes primero
+                ranked.append((reason, order, title))
+        ranked.sort()
+        return [(title, reason) for reason, _, title in ranked[:self.config.max_size]]
+
+    def titles(self, now: Optional[float] = None) -> List[str]:
+        return [title for title, _ in self.entries(now)]
+
+    def due_titles(self, interval_sec: float, now: Optional[float] = None) -> List[str]:
+        """Títulos vigilados no encolados en los últimos interval_sec, marcados como encolados ahora."""
+        now = time.monotonic() if now is None else now
+        watched = self.titles(now)
+        due = []
+        with self._lock:
+            for title in watched:
+                if now - self._polled.get(title, float("-inf")) >= interval_sec:
+                    self._polled[title] = now
+                    due.append(title)
+            for title in set(self._polled) - set(watched):
+                del self._polled[title]
+        return due
+
+    def seconds_until_next_due(self, interval_sec: float, now: Optional[float] = None) -> float:
+        """Segundos hasta que algún título vigilado vuelva a tocar (interval_sec si no hay ninguno)."""
+        now = time.monotonic() if now is None else now
+        titles = self.titles(now)
+        with self._lock:
+            waits = [self._polled.get(title, float("-inf")) + interval_sec - now for title in titles]
+        return max(0.0, min(waits)) if waits else interval_sec
+
+    def __contains__(self, title: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            return self._reason(title, now) is not None
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Títulos vigilados con su motivo, último precio y stop (para la consola)."""
+        entries = self.entries()
+        with self._lock:
+            return [
+                {
+                    "title": title,
+                    "reason": reason.name.lower(),
+                    "price_usd": self._prices.get(title),
+                    "stop_loss_usd": self._positions.get(title)
+                }
+                for title, reason in entries
+            ]
+
+
+class LaneBudget:
+    """
+    Fracción `share` del presupuesto MARKET del rate limiter para un carril. Sigue la
+    tasa vigente de la familia (que el limitador adapta a las cabeceras de DMarket).
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, share: float, requests_per_item: float = 2.0,
+                 family: EndpointFamily = EndpointFamily.MARKET):
+        """
+        Args:
+            rate_limiter: Limitador del conector.
+            share: Fracción (0, 1] de la tasa de la familia reservada al carril.
+            requests_per_item: Peticiones de la familia que cuesta obtener un ítem.
+            family: Familia de endpoints cuyo presupuesto se reparte.
+        """
+        if not 0 < share <= 1:
+            raise ValueError("share debe estar en (0, 1]")
+        self.family_bucket = rate_limiter.buckets[family]
+        self.share = share
+        self.requests_per_item = max(1.0, requests_per_item)
+        rate = self.family_bucket.max_rate * share
+        self.bucket = TokenBucket(rate, max(self.requests_per_item, rate))
+        self.wait_time_sec = 0.0
+
+    def acquire(self, stop: threading.Event) -> bool:
+        """
+        Espera a que el carril pueda pedir un ítem más. Devuelve False si `stop` se
+        activó mientras tanto.
+        """
+        self.bucket.set_rate(self.family_bucket.rate * self.share)
+        while True:
+            wait = self.bucket.try_acquire(self.requests_per_item)
+            if wait <= 0:
+                return True
+            self.wait_time_sec += wait
+            if stop.wait(wait):
+                return False
+
+    def items_per_sec(self) -> float:
+        return self.bucket.rate / self.requests_per_item
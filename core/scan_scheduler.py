@@ -0,0 +1,320 @@
+# core/scan_scheduler.py
+"""
+Planificador adaptativo del escaneo de títulos.
+
+En lugar de recorrer el universo en orden dando a cada título la misma atención,
+ScanScheduler mantiene por título tres medias móviles exponenciales (EWMA) que se
+actualizan tras cada escaneo (StrategyEngine.analyze_item_data llama a record_scan):
+
+- churn: fracción del libro que cambió desde el escaneo anterior (distancia de Jaccard
+  entre los conjuntos (assetId, precio) de las asks);
+- rendimiento por estrategia: oportunidades nuevas (assets no vistos en el escaneo
+  anterior) por escaneo;
+- liquidez: ofertas de venta + órdenes de compra.
+
+Con ellas se calcula una puntuación y, de ella, el intervalo de sondeo del título:
+de max_interval_sec (puntuación 0) a min_interval_sec (exponencialmente). Una cola de
+prioridad por próximo vencimiento da en cada ciclo los siguientes títulos
+(next_batch): primero los vencidos de mayor puntuación y, si sobra presupuesto, los que
+vencen antes. Así un presupuesto fijo de peticiones por ciclo se gasta donde aparecen
+oportunidades, y ningún título espera más de max_interval_sec (exploración).
+
+Las medias se guardan en la tabla scan_scores (models.ScanScore) con save() y se
+recuperan con load(), de modo que lo aprendido sobrevive entre sesiones.
+"""
+
+import heapq
+import json
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Iterable, FrozenSet, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.data_manager import get_db
+from core.models import ScanScore
+from core.order_book import OrderBook
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SchedulerConfig:
+    """Parámetros del planificador de escaneo."""
+    min_interval_sec: float = 15.0           # Intervalo de los títulos con mayor puntuación
+    max_interval_sec: float = 900.0          # Intervalo de los títulos sin actividad (cota de espera)
+    ewma_alpha: float = 0.3                  # Peso de la última observación en las medias
+    yield_weight: float = 2.0                # Puntos por oportunidad nueva por escaneo
+    churn_weight: float = 1.0                # Puntos por libro completamente renovado
+    liquidity_weight: float = 0.5            # Puntos por liquidez >= liquidity_reference
+    liquidity_reference: int = 50            # Ofertas + órdenes que cuentan como liquidez plena
+    strategy_weights: Dict[str, float] = field(default_factory=dict)  # Peso por estrategia (1.0 si no está)
+    fill_budget: bool = True                 # Completar el lote con los próximos en vencer
+    persist: bool = True                     # Guardar/cargar las medias en scan_scores
+
+
+@dataclass
+class TitleScanState:
+    """Medias y planificación de un título."""
+    title: str
+    churn: float = 0.0
+    liquidity: float = 0.0
+    yields: Dict[str, float] = field(default_factory=dict)
+    scans: int = 0
+    opportunities_total: int = 0
+    last_scanned_at: Optional[datetime] = None
+    next_due: float = 0.0                    # time.monotonic() del próximo escaneo
+    version: int = 0                         # Invalida las entradas antiguas de la cola
+    dirty: bool = False                      # Cambios pendientes de save()
+    last_offer_keys: Optional[FrozenSet[Tuple[Optional[str], int]]] = None
+    last_opportunity_assets: Dict[str, Set[Any]] = field(default_factory=dict)
+
+    def score(self, config: SchedulerConfig) -> float:
+        weighted_yield = sum(config.strategy_weights.get(s, 1.0) * y for s, y in self.yields.items())
+        liquidity = min(1.0, self.liquidity / config.liquidity_reference) if config.liquidity_reference else 0.0
+        return (config.yield_weight * weighted_yield
+                + config.churn_weight * self.churn
+                + config.liquidity_weight * liquidity)
+
+    def interval(self, config: SchedulerConfig) -> float:
+        span = config.max_interval_sec - config.min_interval_sec
+        return config.min_interval_sec + span * math.exp(-self.score(config))
+
+
+def _ewma(previous: float, sample: float, alpha: float) -> float:
+    return alpha * sample + (1 - alpha) * previous
+
+
+class ScanScheduler:
+    """Cola de prioridad de títulos con intervalos de sondeo adaptativos. Thread-safe."""
+
+    def __init__(self, config: Optional[SchedulerConfig] = None, titles: Optional[Iterable[str]] = None):
+        self.config = config or SchedulerConfig()
+        self._states: Dict[str, TitleScanState] = {}
+        self._active: Set[str] = set()
+        self._heap: List[Tuple[float, int, str]] = []
+        self._lock = threading.Lock()
+        if titles:
+            self.set_universe(titles)
+
+    # ------------------------------------------------------------------
+    # Universo y cola
+    # ------------------------------------------------------------------
+
+    def _schedule(self, state: TitleScanState, due: float) -> None:
+        state.next_due = due
+        state.version += 1
+        heapq.heappush(self._heap, (due, state.version, state.title))
+
+    def set_universe(self, titles: Iterable[str]) -> None:
+        """
+        Fija los títulos a planificar. Los nuevos vencen ya; los que salen del universo
+        conservan sus medias (para save() y por si vuelven) pero dejan de planificarse.
+        """
+        now = time.monotonic()
+        with self._lock:
+            previous, self._active = self._active, set(titles)
+            for title in self._active:
+                state = self._states.get(title)
+                if state is None:
+                    state = self._states[title] = TitleScanState(title)
+                    self._schedule(state, now)
+                elif title not in previous:
+                    self._schedule(state, state.next_due or now)
+
+    def add_titles(self, titles: Iterable[str]) -> None:
+        with self._lock:
+            current = set(self._active)
+        self.set_universe(current | set(titles))
+
+    def next_batch(self, budget: int, now: Optional[float] = None) -> List[str]:
+        """
+        Hasta `budget` títulos a escanear ahora: los vencidos, de mayor a menor puntuación,
+        y (con fill_budget) los siguientes en vencer. Cada título elegido queda
+        provisionalmente planificado a un intervalo vista, de modo que si su escaneo falla
+        no se repite en el siguiente lote; record_scan lo replanifica.
+        """
+        if budget <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due: List[TitleScanState] = []
+            upcoming: List[TitleScanState] = []
+            while self._heap and (self._heap[0][0] <= now or (self.config.fill_budget and len(due) + len(upcoming) < budget)):
+                next_due, version, title = heapq.heappop(self._heap)
+                state = self._states.get(title)
+                if state is None or state.version != version or title not in self._active:
+                    continue  # Entrada antigua o título fuera del universo
+                (due if next_due <= now else upcoming).append(state)
+
+            due.sort(key=lambda s: s.score(self.config), reverse=True)
+            chosen = (due + upcoming)[:budget]
+            # Los no elegidos vuelven a la cola con su vencimiento
+            for state in (due + upcoming)[budget:]:
+                heapq.heappush(self._heap, (state.next_due, state.version, state.title))
+            for state in chosen:
+                self._schedule(state, now + state.interval(self.config))
+        return [state.title for state in chosen]
+
+    def seconds_until_next_due(self, now: Optional[float] = None) -> Optional[float]:
+        """Segundos hasta que venza el próximo título (0 si ya hay alguno vencido), None si no hay títulos."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            while self._heap:
+                next_due, version, title = self._heap[0]
+                state = self._states.get(title)
+                if state is not None and state.version == version and title in self._active:
+                    return max(0.0, next_due - now)
+                heapq.heappop(self._heap)
+        return None
+
+    # ------------------------------------------------------------------
+    # Observaciones
+    # ------------------------------------------------------------------
+
+    def record_scan(self, title: str, order_book: Optional[OrderBook],
+                    opportunities: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Actualiza las medias de `title` con un escaneo y lo replanifica."""
+        alpha = self.config.ewma_alpha
+        offer_keys = order_book.offer_keys() if order_book is not None else frozenset()
+        with self._lock:
+            state = self._states.get(title)
+            if state is None:
+                state = self._states[title] = TitleScanState(title)
+
+            if state.last_offer_keys is not None:
+                union = len(offer_keys | state.last_offer_keys)
+                churn = 1.0 - len(offer_keys & state.last_offer_keys) / union if union else 0.0
+                state.churn = _ewma(state.churn, churn, alpha)
+            state.last_offer_keys = offer_keys
+
+            if order_book is not None:
+                liquidity = len(order_book.asks) + len(order_book.bids)
+                state.liquidity = _ewma(state.liquidity, liquidity, alpha) if state.scans else float(liquidity)
+
+            for strategy, opps in opportunities.items():
+                assets = {opp.get('asset_id', opp.get('assetId')) for opp in opps}
+                new = len(assets - state.last_opportunity_assets.get(strategy, set()))
+                state.last_opportunity_assets[strategy] = assets
+                state.yields[strategy] = _ewma(state.yields.get(strategy, 0.0), new, alpha)
+                state.opportunities_total += new
+
+            state.scans += 1
+            state.last_scanned_at = datetime.now(timezone.utc)
+            state.dirty = True
+            if title in self._active:
+                self._schedule(state, time.monotonic() + state.interval(self.config))
+
+    def snapshot(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Títulos del universo de mayor a menor puntuación, con sus medias e intervalo."""
+        now = time.monotonic()
+        with self._lock:
+            states = [self._states[t] for t in self._active if t in self._states]
+            states.sort(key=lambda s: s.score(self.config), reverse=True)
+            return [{
+                "title": s.title,
+                "score": round(s.score(self.config), 3),
+                "interval_sec": round(s.interval(self.config), 1),
+                "due_in_sec": round(max(0.0, s.next_due - now), 1),
+                "churn": round(s.churn, 3),
+                "liquidity": round(s.liquidity, 1),
+                "yields": {k: round(v, 3) for k, v in s.yields.items() if v},
+                "scans": s.scans
+            } for s in states[:limit]]
+
+    # ------------------------------------------------------------------
+    # Persistencia (tabla scan_scores)
+    # ------------------------------------------------------------------
+
+    def load(self) -> int:
+        """
+        Carga las medias guardadas. El próximo vencimiento de cada título se deriva de
+        su último escaneo y su intervalo actual.
+
+        Returns:
+            Número de títulos cargados.
+        """
+        if not self.config.persist:
+            return 0
+        db: Session = next(get_db())
+        try:
+            ScanScore.__table__.create(bind=db.get_bind(), checkfirst=True)
+            rows = db.query(ScanScore).all()
+        except Exception as e:
+            logger.warning(f"No se pudieron cargar las puntuaciones de escaneo: {e}")
+            return 0
+        finally:
+            db.close()
+
+        now_mono, now_wall = time.monotonic(), datetime.now(timezone.utc)
+        with self._lock:
+            for row in rows:
+                state = self._states.get(row.item_title) or TitleScanState(row.item_title)
+                state.churn = row.churn_ewma or 0.0
+                state.liquidity = row.liquidity_ewma or 0.0
+                state.yields = json.loads(row.yield_ewma) if row.yield_ewma else {}
+                state.scans = row.scans or 0
+                state.opportunities_total = row.opportunities_total or 0
+                state.last_scanned_at = row.last_scanned_at
+                due = now_mono
+                if row.last_scanned_at is not None:
+                    last = row.last_scanned_at if row.last_scanned_at.tzinfo else row.last_scanned_at.replace(tzinfo=timezone.utc)
+                    due = now_mono + max(0.0, state.interval(self.config) - (now_wall - last).total_seconds())
+                self._states[row.item_title] = state
+                if row.item_title in self._active:
+                    self._schedule(state, due)
+                else:
+                    state.next_due = due
+        logger.info(f"Puntuaciones de escaneo cargadas para {len(rows)} títulos")
+        return len(rows)
+
+    def save(self) -> int:
+        """
+        Guarda en scan_scores las medias de los títulos escaneados desde el último save().
+
+        Returns:
+            Número de títulos guardados.
+        """
+        if not self.config.persist:
+            return 0
+        with self._lock:
+            dirty = [s for s in self._states.values() if s.dirty]
+            records = [(s.title, s.churn, s.liquidity, json.dumps(s.yields), s.scans,
+                        s.opportunities_total, s.last_scanned_at) for s in dirty]
+        if not records:
+            return 0
+
+        db: Session = next(get_db())
+        try:
+            ScanScore.__table__.create(bind=db.get_bind(), checkfirst=True)
+            existing = {row.item_title: row for row in
+                        db.query(ScanScore).filter(ScanScore.item_title.in_([r[0] for r in records])).all()}
+            for title, churn, liquidity, yields, scans, total, last_scanned_at in records:
+                row = existing.get(title)
+                if row is None:
+                    row = ScanScore(item_title=title)
+                    db.add(row)
+                row.churn_ewma = churn
+                row.liquidity_ewma = liquidity
+                row.yield_ewma = yields
+                row.scans = scans
+                row.opportunities_total = total
+                row.last_scanned_at = last_scanned_at
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error guardando puntuaciones de escaneo: {e}")
+            return 0
+        finally:
+            db.close()
+
+        with self._lock:
+            for state in dirty:
+                state.dirty = False
+        logger.debug(f"Puntuaciones de escaneo guardadas para {len(records)} títulos")
+        return len(records)
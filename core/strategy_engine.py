@@ -2,26 +2,52 @@
 import logging
 import time
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, FrozenSet, Tuple
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.orm import Session
 
 from core.dmarket_connector import DMarketAPI
 from core.market_analyzer import MarketAnalyzer, AttributeEvaluation
+from core.order_book import OrderBook, ParsedOffer
+from core.scan_scheduler import ScanScheduler
+from core.vectorized_strategies import (
+    FeeSchedule, NO_FEES, NUMPY_AVAILABLE, OfferColumns, snipe_kernel, attribute_flip_kernel, trade_lock_kernel
+)
 from core.volatility_analyzer import VolatilityAnalyzer
 from core.data_manager import get_db, SkinsMaestra, PreciosHistoricos
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_GAME_ID = "a8db" # CS2 Game ID en DMarket
+MARKET_ITEMS_ENDPOINT = "/exchange/v1/market/items"
+# Claves del resultado de run_strategies, en el orden en que se evalúan las estrategias
+STRATEGY_KEYS = ("basic_flips", "snipes", "attribute_flips", "trade_lock_arbitrage", "volatility_trading")
+# Estrategias cuyas oportunidades son ofertas concretas (asset_id) del libro
+PER_OFFER_STRATEGY_KEYS = ("snipes", "attribute_flips", "trade_lock_arbitrage")
+
+
+@dataclass
+class TitleEvaluation:
+    """Última evaluación de un título, para no repetirla mientras su libro no cambie."""
+    fingerprint: int # OrderBook.fingerprint()
+    context: Tuple[Any, ...] # Entradas de nivel título (ver StrategyEngine._evaluation_context)
+    offer_keys: FrozenSet[Tuple[Optional[str], int]] # OrderBook.offer_keys()
+    no_lock_mean_usd: Optional[float] # Referencia del arbitraje por trade lock
+    results: Dict[str, List[Dict[str, Any]]]
+    evaluated_at: float # time.monotonic() de la última evaluación completa
+
 
 class StrategyEngine:
     """
     Motor para ejecutar estrategias de trading en DMarket.
     """
 
-    def __init__(self, dmarket_connector: DMarketAPI, market_analyzer: MarketAnalyzer, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, dmarket_connector: DMarketAPI, market_analyzer: MarketAnalyzer, config: Optional[Dict[str, Any]] = None,
+                 scan_scheduler: Optional[ScanScheduler] = None):
         """
         Inicializa el StrategyEngine.
 
@@ -30,9 +56,12 @@ class StrategyEngine:
             market_analyzer (MarketAnalyzer): Instancia del analizador de mercado.
             config (Optional[Dict[str, Any]], optional): Configuración para umbrales,
                                                          parámetros de estrategia, etc.
+            scan_scheduler (Optional[ScanScheduler]): Planificador adaptativo; si se indica,
+                cada ítem analizado actualiza sus medias (ver next_scan_batch).
         """
         self.connector = dmarket_connector
         self.analyzer = market_analyzer
+        self.scan_scheduler = scan_scheduler
         self.volatility_analyzer = VolatilityAnalyzer(config.get('volatility_config') if config else None)
         self.config = self._get_default_config() # Empezar con los defaults
         if config: # Si se proporciona una configuración (no None y no vacía)
@@ -40,6 +69,10 @@ class StrategyEngine:
             
         self.dmarket_fee_info: Optional[Dict[str, Any]] = None # Para cachear las tasas
         self._fee_cache = {} # Cache para almacenar información de comisiones
+        # Evaluación incremental: última evaluación por título y contadores por modo
+        self._evaluations: Dict[str, TitleEvaluation] = {}
+        self._evaluation_stats = {"full": 0, "delta": 0, "skipped": 0, "offers_evaluated": 0}
+        self._evaluation_lock = threading.Lock()
 
         logger.info(f"StrategyEngine inicializado con configuración: {self.config}")
 
@@ -52,7 +85,12 @@ class StrategyEngine:
             "min_price_usd_for_sniping": 0.25, # Precio mínimo de un ítem para considerarlo para sniping
             "snipe_discount_percentage": 0.10, # % de descuento sobre PME para considerar un snipe (10%)
             "game_id": DEFAULT_GAME_ID,
-            "delay_between_items_sec": 1.0, # Nueva config para delay
+            "delay_between_items_sec": 0.0, # Pausa fija opcional (solo modo secuencial); el rate limiter del conector ya regula la tasa
+            "scan_workers": 8, # Ítems evaluados en paralelo en run_strategies (1 = secuencial)
+            "incremental_evaluation": True, # No reevaluar títulos cuyo libro no cambió (solo las ofertas nuevas si cambió poco)
+            "fingerprint_depth": 0, # Ofertas/órdenes de cabeza en la huella del libro (0 = todas; con N, los cambios por debajo esperan al TTL)
+            "evaluation_cache_ttl_sec": 300, # Antigüedad máxima de una evaluación reutilizada antes de repetirla completa
+            "vectorized_min_offers": 256, # Ofertas a partir de las cuales snipes/atributos/trade lock usan los kernels NumPy (0 = nunca)
             
             # Configuración para Estrategia 2: Flip por Atributos Premium
             "min_profit_usd_attribute_flip": 0.05, # Mínimo beneficio en USD para flip por atributos (5 centavos)
@@ -60,6 +98,7 @@ class StrategyEngine:
             "min_rarity_score_for_premium": 30.0, # Puntuación mínima de rareza para considerar premium
             "min_premium_multiplier": 1.2, # Multiplicador mínimo para considerar premium
             "max_price_usd_attribute_flip": 100.00, # Precio máximo para flip por atributos
+            "attribute_server_filters": True, # Pedir al servidor (treeFilters) las ofertas con float/patrón premium
             
             # Configuración para Estrategia 5: Arbitraje por Bloqueo de Intercambio
             "min_profit_usd_trade_lock": 0.10, # Mínimo beneficio en USD para trade lock
@@ -150,37 +189,35 @@ class StrategyEngine:
             }
             return False
 
-    def _calculate_dmarket_sale_fee_cents(self, item_price_cents: int) -> int:
-        """Calcula la comisión de venta de DMarket en centavos."""
+    def _dmarket_fee_schedule(self) -> Optional[FeeSchedule]:
+        """Tasa y comisión mínima de venta cacheadas, o None (comisión 0) si no hay información válida."""
         fee_info_entry = self._fee_cache.get(self.config.get("DEFAULT_GAME_ID", "a8db"))
         if not fee_info_entry or not fee_info_entry.get('data'):
             logger.warning("No hay información de tasas de DMarket disponible para calcular comisión. Se asume 0.")
-            return 0
+            return None
 
         fee_data = fee_info_entry['data']
-        
-        fee_rate_str = fee_data.get("feeRate", {}).get("amount")
-        # minCommission.amount ahora se espera que sea un string representando CENTAVOS
-        min_comm_cents_str = fee_data.get("minCommission", {}).get("amount")
-
-        if fee_rate_str is None or min_comm_cents_str is None:
+        try:
+            # feeRate.amount es la fracción (Ej: 0.1 para 10%); minCommission.amount, CENTAVOS
+            schedule = FeeSchedule.from_fee_data(fee_data)
+        except ValueError as e:
+            logger.error(f"Error al convertir valores de comisión para cálculo: {e}. Datos: {fee_data}. Se asume comisión 0.")
+            return None
+        if schedule is None:
             logger.error(f"Formato de comisiones inesperado: {fee_data}. Se asume comisión 0.")
-            return 0
+        return schedule
 
-        try:
-            fee_rate = float(fee_rate_str) # Ej: 0.1 para 10%
-            min_commission_cents = int(min_comm_cents_str) # Ej: 1 para 1 centavo
+    def _calculate_dmarket_sale_fee_cents(self, item_price_cents: int) -> int:
+        """Calcula la comisión de venta de DMarket en centavos."""
+        schedule = self._dmarket_fee_schedule()
+        return schedule.fee_cents(item_price_cents) if schedule else 0
 
-            calculated_fee_cents = int(item_price_cents * fee_rate)
-            final_fee_cents = max(calculated_fee_cents, min_commission_cents)
-            
-            # logger.debug(f"Cálculo comisión: Precio={item_price_cents}c, Tasa={fee_rate*100}%, MinCom={min_commission_cents}c => Calculada={calculated_fee_cents}c, Final={final_fee_cents}c")
-            return final_fee_cents
-        except ValueError as e:
-            logger.error(f"Error al convertir valores de comisión para cálculo: {e}. Tasa str: '{fee_rate_str}', MinCom str: '{min_comm_cents_str}'. Se asume comisión 0.")
-            return 0
+    def _use_vectorized(self, offer_count: int) -> bool:
+        """Si un libro de `offer_count` ofertas se evalúa con los kernels NumPy (core.vectorized_strategies)."""
+        min_offers = self.config.get("vectorized_min_offers", 0)
+        return NUMPY_AVAILABLE and bool(min_offers) and offer_count >= min_offers
 
-    def _find_basic_flips(self, item_title: str, current_sell_offers: List[Dict[str, Any]], current_buy_orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _find_basic_flips(self, item_title: str, order_book: OrderBook) -> List[Dict[str, Any]]:
         """
         Identifica oportunidades de "Flip Básico" (comprar barato, vender caro en DMarket).
         Considera LSO (Lowest Sell Offer) vs HBO (Highest Buy Order).
@@ -188,58 +225,22 @@ class StrategyEngine:
         opportunities = []
         logger.info(f"Buscando flips básicos para: {item_title}")
 
-        if not current_sell_offers or not current_buy_orders:
+        if not order_book.asks or not order_book.bids:
             logger.debug(f"No hay suficientes datos de ofertas/órdenes para buscar flips básicos en {item_title}.")
             return opportunities
 
         #DEBUG: Imprimir la primera current_sell_offer para ver su estructura
-        if current_sell_offers:
-            logger.info(f"DEBUG StrategyEngine: Primera current_sell_offer para {item_title}: {current_sell_offers[0]}")
+        logger.info(f"DEBUG StrategyEngine: Primera current_sell_offer para {item_title}: {order_book.asks[0].raw}")
 
-        # 1. Extraer LSO (Lowest Sell Offer) en centavos
-        lowest_sell_price_cents: Optional[int] = None
-        lso_offer_details: Optional[Dict[str, Any]] = None
+        # 1. LSO (Lowest Sell Offer) en centavos, precalculada en el OrderBook
+        lowest_sell_price_cents = order_book.best_ask.price_cents
+        lso_offer_details = order_book.best_ask.raw
+        logger.debug(f"LSO para {item_title}: {lowest_sell_price_cents / 100:.2f} USD (Oferta: {lso_offer_details.get('assetId', 'N/A')})")
 
-        for offer in current_sell_offers:
-            try:
-                price_str = offer.get('price', {}).get('USD')
-                if price_str:
-                    price_cents = int(price_str)
-                    if lowest_sell_price_cents is None or price_cents < lowest_sell_price_cents:
-                        lowest_sell_price_cents = price_cents
-                        lso_offer_details = offer # Guardar detalles de la oferta LSO
-            except (ValueError, TypeError):
-                logger.warning(f"Error parseando precio de oferta de venta para {item_title}: {offer}")
-                continue
-        
-        if lowest_sell_price_cents is None:
-            logger.debug(f"No se encontró LSO válida para {item_title}.")
-            return opportunities
-        
-        logger.debug(f"LSO para {item_title}: {lowest_sell_price_cents / 100:.2f} USD (Oferta: {lso_offer_details.get('assetId', 'N/A') if lso_offer_details else 'N/A'})")
-
-        # 2. Extraer HBO (Highest Buy Order) en centavos
-        highest_buy_price_cents: Optional[int] = None
-        hbo_order_details: Optional[Dict[str, Any]] = None
-
-        for order in current_buy_orders:
-            try:
-                # El formato de buy_offers es ligeramente diferente: order['price']['USD']
-                price_str = order.get('price', {}).get('USD') 
-                if price_str:
-                    price_cents = int(price_str)
-                    if highest_buy_price_cents is None or price_cents > highest_buy_price_cents:
-                        highest_buy_price_cents = price_cents
-                        hbo_order_details = order # Guardar detalles de la orden HBO
-            except (ValueError, TypeError):
-                logger.warning(f"Error parseando precio de orden de compra para {item_title}: {order}")
-                continue
-
-        if highest_buy_price_cents is None:
-            logger.debug(f"No se encontró HBO válida para {item_title}.")
-            return opportunities
-
-        logger.debug(f"HBO para {item_title}: {highest_buy_price_cents / 100:.2f} USD (Orden: {hbo_order_details.get('offerId', 'N/A') if hbo_order_details else 'N/A'})")
+        # 2. HBO (Highest Buy Order) en centavos
+        highest_buy_price_cents = order_book.best_bid.price_cents
+        hbo_order_details = order_book.best_bid.raw
+        logger.debug(f"HBO para {item_title}: {highest_buy_price_cents / 100:.2f} USD (Orden: {hbo_order_details.get('offerId', 'N/A')})")
 
         # 3. Calcular beneficio potencial
         # Si compramos la LSO y la vendemos instantáneamente a la HBO.
@@ -298,21 +299,21 @@ class StrategyEngine:
             
         return opportunities
 
-    def _find_snipes(self, item_title: str, current_sell_offers: List[Dict[str, Any]], historical_prices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _find_snipes(self, item_title: str, order_book: OrderBook, historical_prices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Identifica oportunidades de "Sniping" (ítems listados significativamente por debajo de su PME).
         """
         opportunities = []
         logger.info(f"Buscando snipes para: {item_title}")
 
-        if not current_sell_offers:
+        if not order_book.asks:
             logger.debug(f"No hay ofertas de venta actuales para {item_title}, no se pueden buscar snipes.")
             return opportunities
 
         estimated_market_price_usd = self.analyzer.calculate_estimated_market_price(
             market_hash_name=item_title,
             historical_prices=historical_prices,
-            current_offers=current_sell_offers 
+            current_offers=order_book
         )
 
         if estimated_market_price_usd is None:
@@ -333,13 +334,20 @@ class StrategyEngine:
         min_price_for_sniping_usd = self.config.get("min_price_usd_for_sniping", 0.25)
         snipe_discount_percentage_threshold = self.config.get("snipe_discount_percentage", 0.10)
 
-        for offer in current_sell_offers:
+        if self._use_vectorized(len(order_book.asks)):
+            columns = OfferColumns.from_books([order_book])
+            hits = snipe_kernel(columns, estimated_market_price_usd, self._dmarket_fee_schedule() or NO_FEES,
+                                min_price_for_sniping_usd, snipe_discount_percentage_threshold)
+            for i, discount, commission_cents, profit_cents in zip(
+                    hits.index.tolist(), hits.discount.tolist(), hits.commission_cents.tolist(), hits.profit_cents.tolist()):
+                opportunities.append(self._snipe_opportunity(
+                    item_title, columns.offers[i], estimated_market_price_usd, discount, commission_cents, profit_cents
+                ))
+            return opportunities
+
+        for offer in order_book.asks:
             try:
-                offer_price_str = offer.get('price', {}).get('USD')
-                if not offer_price_str:
-                    continue
-                
-                offer_price_cents = int(offer_price_str)
+                offer_price_cents = offer.price_cents
                 offer_price_usd = offer_price_cents / 100.0
 
                 if offer_price_usd < min_price_for_sniping_usd:
@@ -364,20 +372,9 @@ class StrategyEngine:
                     profit_usd = profit_cents / 100.0
                     
                     if profit_usd > 0: # Solo registrar si el profit después de comisión es positivo
-                        opportunity = {
-                            "strategy": "snipe",
-                            "item_title": item_title,
-                            "asset_id": offer.get('assetId'),
-                            "pme_usd": estimated_market_price_usd,
-                            "offer_price_usd": offer_price_usd,
-                            "discount_percentage": discount_percentage,
-                            "profit_usd": profit_usd,
-                            "offer_details": offer, # assetId, attributes, etc.
-                            "commission_on_pme_usd": commission_cents / 100.0,
-                            "timestamp": time.time()
-                        }
-                        opportunities.append(opportunity)
-                        logger.info(f"OPORTUNIDAD DE SNIPE ENCONTRADA para {item_title}: Comprar a {offer_price_usd:.2f}, revender a PME ~{estimated_market_price_usd:.2f}, Profit Potencial: {profit_usd:.2f} USD")
+                        opportunities.append(self._snipe_opportunity(
+                            item_title, offer, estimated_market_price_usd, discount_percentage, commission_cents, profit_cents
+                        ))
                     else:
                         logger.debug(f"Snipe para {item_title} a {offer_price_usd:.2f} USD no genera profit positivo después de comisiones al PME ({profit_usd:.2f} USD).")
                 else:
@@ -385,52 +382,87 @@ class StrategyEngine:
                          logger.debug(f"Oferta para {item_title} a {offer_price_usd:.2f} USD (PME: {estimated_market_price_usd:.2f} USD) no alcanza descuento de snipe ({discount_percentage*100:.2f}% < {snipe_discount_percentage_threshold*100:.2f}%).")
 
             except (ValueError, TypeError) as e:
-                logger.warning(f"Error parseando precio de oferta de venta para snipe en {item_title}: {offer}. Error: {e}")
+                logger.warning(f"Error evaluando oferta de venta para snipe en {item_title}: {offer}. Error: {e}")
                 continue
             # La ZeroDivisionError ya se maneja con la comprobación de estimated_market_price_usd > 0
             
         return opportunities
 
-    def _find_attribute_premium_flips(self, item_data: Dict[str, Any], fee_info: Dict[str, Any], market_analyzer: MarketAnalyzer) -> List[Dict[str, Any]]:
+    def _snipe_opportunity(self, item_title: str, offer: ParsedOffer, pme_usd: float, discount_percentage: float,
+                           commission_cents: int, profit_cents: int) -> Dict[str, Any]:
+        """Oportunidad de snipe (común a la versión escalar y a la vectorizada)."""
+        offer_price_usd = offer.price_usd
+        profit_usd = profit_cents / 100.0
+        logger.info(f"OPORTUNIDAD DE SNIPE ENCONTRADA para {item_title}: Comprar a {offer_price_usd:.2f}, revender a PME ~{pme_usd:.2f}, Profit Potencial: {profit_usd:.2f} USD")
+        return {
+            "strategy": "snipe",
+            "item_title": item_title,
+            "asset_id": offer.asset_id,
+            "pme_usd": pme_usd,
+            "offer_price_usd": offer_price_usd,
+            "discount_percentage": discount_percentage,
+            "profit_usd": profit_usd,
+            "offer_details": offer.raw, # assetId, attributes, etc.
+            "commission_on_pme_usd": commission_cents / 100.0,
+            "timestamp": time.time()
+        }
+
+    def _find_attribute_premium_flips(self, item_data: Dict[str, Any], fee_info: Dict[str, Any], market_analyzer: MarketAnalyzer,
+                                      server_candidates: bool = True) -> List[Dict[str, Any]]:
         """
         Estrategia 2: Identifica oportunidades de flip basadas en atributos premium.
         Busca ítems con atributos raros/valiosos que estén subvalorados.
+        Con server_candidates=False no se piden al servidor los candidatos por atributos
+        (reevaluación incremental: solo las ofertas nuevas del libro).
         """
         opportunities = []
         item_title = item_data.get('title', 'Unknown')
-        current_sell_offers = item_data.get('current_sell_offers', [])
+        order_book = OrderBook.from_item_data(item_data)
+        candidates = order_book.asks
+        if server_candidates and self.config.get("attribute_server_filters", True):
+            candidates = order_book.with_extra_asks(self._fetch_attribute_candidates(item_title, market_analyzer))
         
         logger.info(f"Buscando flips por atributos premium para: {item_title}")
         
-        if not current_sell_offers:
+        if not candidates:
             logger.debug(f"No hay ofertas de venta para analizar atributos en {item_title}.")
             return opportunities
         
+        max_price = self.config.get("max_price_usd_attribute_flip", 100.0)
+        base_price_estimate: Optional[float] = None
+        base_price_estimated = False
+
+        if self._use_vectorized(len(candidates)):
+            columns = OfferColumns([item_title], [candidates]).score_attributes(market_analyzer, max_price)
+            base_price_estimate = self._estimate_base_item_price(item_title, item_data)
+            hits = attribute_flip_kernel(
+                columns, base_price_estimate, self._dmarket_fee_schedule() or NO_FEES, max_price,
+                self.config.get("min_rarity_score_for_premium", 30.0), self.config.get("min_premium_multiplier", 1.2),
+                self.config.get("min_profit_usd_attribute_flip", 0.05), self.config.get("min_profit_percentage_attribute_flip", 0.05)
+            )
+            for i, commission_cents, profit_cents in zip(
+                    hits.index.tolist(), hits.commission_cents.tolist(), hits.profit_cents.tolist()):
+                evaluation = columns.evaluations[i]
+                opportunities.append(self._attribute_flip_opportunity(
+                    item_title, columns.offers[i], evaluation, base_price_estimate * evaluation.premium_multiplier,
+                    commission_cents, profit_cents
+                ))
+            return opportunities
+        
         # Analizar cada oferta individual para evaluar sus atributos
-        for offer in current_sell_offers:
+        for offer in candidates:
             try:
-                # Extraer precio de la oferta
-                price_str = offer.get('price', {}).get('USD')
-                if not price_str:
-                    continue
-                    
-                offer_price_cents = int(price_str)
+                offer_price_cents = offer.price_cents
                 offer_price_usd = offer_price_cents / 100.0
                 
                 # Verificar límites de precio
-                max_price = self.config.get("max_price_usd_attribute_flip", 100.0)
                 if offer_price_usd > max_price:
                     continue
                 
-                # Extraer atributos del ítem
-                attributes = self._extract_item_attributes(offer)
-                if not attributes:
-                    continue
-                
-                # Evaluar rareza de atributos
+                # Evaluar rareza de atributos (ya extraídos en el OrderBook)
                 evaluation = market_analyzer.evaluate_attribute_rarity(
-                    attributes=attributes,
-                    stickers=offer.get('stickers', []),
+                    attributes=offer.attributes(),
+                    stickers=offer.stickers,
                     item_name=item_title
                 )
                 
@@ -442,8 +474,10 @@ class StrategyEngine:
                     evaluation.premium_multiplier < min_premium_multiplier):
                     continue
                 
-                # Calcular precio estimado con premium por atributos
-                base_price_estimate = self._estimate_base_item_price(item_title, item_data)
+                # Calcular precio estimado con premium por atributos (el precio base es el mismo para todo el título)
+                if not base_price_estimated:
+                    base_price_estimate = self._estimate_base_item_price(item_title, item_data)
+                    base_price_estimated = True
                 if not base_price_estimate:
                     continue
                 
@@ -461,37 +495,9 @@ class StrategyEngine:
                 
                 if (potential_profit_usd >= min_profit_usd and 
                     profit_percentage >= min_profit_percentage):
-                    
-                    opportunity = {
-                        "strategy": "attribute_premium_flip",
-                        "item_title": item_title,
-                        "asset_id": offer.get('assetId'),
-                        "buy_price_usd": offer_price_usd,
-                        "estimated_sell_price_usd": estimated_premium_price,
-                        "potential_profit_usd": potential_profit_usd,
-                        "profit_percentage": profit_percentage,
-                        "commission_usd": commission_cents / 100.0,
-                        "rarity_score": evaluation.overall_rarity_score,
-                        "premium_multiplier": evaluation.premium_multiplier,
-                        "attributes": {
-                            "float_value": evaluation.float_value,
-                            "float_rarity": evaluation.float_rarity.value if evaluation.float_rarity else None,
-                            "pattern_index": evaluation.pattern_index,
-                            "pattern_rarity": evaluation.pattern_rarity.value,
-                            "stickers_value": evaluation.stickers_value,
-                            "stickers_rarity": evaluation.stickers_rarity.value,
-                            "stattrak": evaluation.stattrak,
-                            "souvenir": evaluation.souvenir,
-                            "special_attributes": evaluation.special_attributes
-                        },
-                        "confidence": "high" if evaluation.overall_rarity_score > 80 else "medium",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    opportunities.append(opportunity)
-                    logger.info(f"Oportunidad de flip por atributos encontrada: {item_title} - "
-                              f"Compra: ${offer_price_usd:.2f}, Venta estimada: ${estimated_premium_price:.2f}, "
-                              f"Beneficio: ${potential_profit_usd:.2f} ({profit_percentage:.1%})")
+                    opportunities.append(self._attribute_flip_opportunity(
+                        item_title, offer, evaluation, estimated_premium_price, commission_cents, potential_profit_cents
+                    ))
                     
             except (ValueError, TypeError, KeyError) as e:
                 logger.warning(f"Error procesando oferta para flip por atributos en {item_title}: {e}")
@@ -499,6 +505,63 @@ class StrategyEngine:
         
         return opportunities
 
+    def _attribute_flip_opportunity(self, item_title: str, offer: ParsedOffer, evaluation: AttributeEvaluation,
+                                    estimated_premium_price: float, commission_cents: int,
+                                    profit_cents: int) -> Dict[str, Any]:
+        """Oportunidad de flip por atributos (común a la versión escalar y a la vectorizada)."""
+        offer_price_usd = offer.price_usd
+        potential_profit_usd = profit_cents / 100.0
+        profit_percentage = potential_profit_usd / offer_price_usd if offer_price_usd > 0 else 0
+        logger.info(f"Oportunidad de flip por atributos encontrada: {item_title} - "
+                  f"Compra: ${offer_price_usd:.2f}, Venta estimada: ${estimated_premium_price:.2f}, "
+                  f"Beneficio: ${potential_profit_usd:.2f} ({profit_percentage:.1%})")
+        return {
+            "strategy": "attribute_premium_flip",
+            "item_title": item_title,
+            "asset_id": offer.asset_id,
+            "buy_price_usd": offer_price_usd,
+            "estimated_sell_price_usd": estimated_premium_price,
+            "potential_profit_usd": potential_profit_usd,
+            "profit_percentage": profit_percentage,
+            "commission_usd": commission_cents / 100.0,
+            "rarity_score": evaluation.overall_rarity_score,
+            "premium_multiplier": evaluation.premium_multiplier,
+            "attributes": {
+                "float_value": evaluation.float_value,
+                "float_rarity": evaluation.float_rarity.value if evaluation.float_rarity else None,
+                "pattern_index": evaluation.pattern_index,
+                "pattern_rarity": evaluation.pattern_rarity.value,
+                "stickers_value": evaluation.stickers_value,
+                "stickers_rarity": evaluation.stickers_rarity.value,
+                "stattrak": evaluation.stattrak,
+                "souvenir": evaluation.souvenir,
+                "special_attributes": evaluation.special_attributes
+            },
+            "confidence": "high" if evaluation.overall_rarity_score > 80 else "medium",
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _fetch_attribute_candidates(self, item_title: str, market_analyzer: MarketAnalyzer) -> List[Dict[str, Any]]:
+        """
+        Ofertas de `item_title` con atributos potencialmente premium, filtradas en el
+        servidor con treeFilters (ver MarketAnalyzer.premium_attribute_filters). Llegan
+        aunque no estén entre las 100 más baratas y sin descargar el libro completo.
+        """
+        max_price_cents = int(self.config.get("max_price_usd_attribute_flip", 100.0) * 100)
+        game_id = self.config.get("game_id", DEFAULT_GAME_ID)
+        candidates: List[Dict[str, Any]] = []
+        for tree_filters in market_analyzer.premium_attribute_filters(item_title):
+            response = self.connector.get_market_items(
+                game_id=game_id, limit=100, currency="USD", order_by="price", order_dir="asc",
+                price_to=max_price_cents, title=item_title, tree_filters=tree_filters
+            )
+            if response and "error" not in response:
+                candidates.extend(response.get('objects') or [])
+            else:
+                logger.warning(f"No se pudieron obtener candidatos por atributos para {item_title} ({tree_filters}): {response.get('error') if response else 'Respuesta vacía'}")
+        logger.debug(f"{len(candidates)} candidatos por atributos (filtro en servidor) para {item_title}.")
+        return candidates
+
     def _find_trade_lock_opportunities(self, item_data: Dict[str, Any], fee_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Estrategia 5: Identifica oportunidades de arbitraje por bloqueo de intercambio.
@@ -506,38 +569,45 @@ class StrategyEngine:
         """
         opportunities = []
         item_title = item_data.get('title', 'Unknown')
-        current_sell_offers = item_data.get('current_sell_offers', [])
+        order_book = OrderBook.from_item_data(item_data)
         
         logger.info(f"Buscando oportunidades de trade lock para: {item_title}")
         
-        if not current_sell_offers:
+        if not order_book.asks:
             logger.debug(f"No hay ofertas de venta para analizar trade lock en {item_title}.")
             return opportunities
         
-        # Obtener precio de referencia (sin trade lock)
-        reference_price = self._get_reference_price_no_trade_lock(item_title, current_sell_offers)
+        # Precio de referencia: media de las ofertas sin trade lock
+        reference_price = order_book.no_lock_mean_usd
         if not reference_price:
             logger.debug(f"No se pudo obtener precio de referencia para {item_title}.")
             return opportunities
         
+        if self._use_vectorized(len(order_book.asks)):
+            columns = OfferColumns.from_books([order_book])
+            hits = trade_lock_kernel(
+                columns, self._dmarket_fee_schedule() or NO_FEES, self.config.get("max_trade_lock_days", 14),
+                self.config.get("trade_lock_discount_threshold", 0.15), self.config.get("min_profit_usd_trade_lock", 0.10),
+                self.config.get("min_profit_percentage_trade_lock", 0.10), reference_usd=reference_price
+            )
+            for i, discount, commission_cents, profit_cents in zip(
+                    hits.index.tolist(), hits.discount.tolist(), hits.commission_cents.tolist(), hits.profit_cents.tolist()):
+                opportunities.append(self._trade_lock_opportunity(
+                    item_title, columns.offers[i], reference_price, discount, commission_cents, profit_cents
+                ))
+            return opportunities
+
         # Analizar ofertas con trade lock
-        for offer in current_sell_offers:
+        for offer in order_book.asks:
             try:
-                # Verificar si tiene trade lock
-                trade_lock_info = self._extract_trade_lock_info(offer)
-                if not trade_lock_info or not trade_lock_info.get('has_trade_lock'):
+                if not offer.has_trade_lock:
                     continue
                 
-                # Extraer precio de la oferta
-                price_str = offer.get('price', {}).get('USD')
-                if not price_str:
-                    continue
-                    
-                offer_price_cents = int(price_str)
+                offer_price_cents = offer.price_cents
                 offer_price_usd = offer_price_cents / 100.0
                 
                 # Verificar duración del trade lock
-                lock_days = trade_lock_info.get('days_remaining', 0)
+                lock_days = offer.lock_days
                 max_lock_days = self.config.get("max_trade_lock_days", 14)
                 if lock_days > max_lock_days:
                     continue
@@ -561,27 +631,9 @@ class StrategyEngine:
                 
                 if (potential_profit_usd >= min_profit_usd and 
                     profit_percentage >= min_profit_percentage):
-                    
-                    opportunity = {
-                        "strategy": "trade_lock_arbitrage",
-                        "item_title": item_title,
-                        "asset_id": offer.get('assetId'),
-                        "buy_price_usd": offer_price_usd,
-                        "reference_price_usd": reference_price,
-                        "potential_profit_usd": potential_profit_usd,
-                        "profit_percentage": profit_percentage,
-                        "commission_usd": commission_cents / 100.0,
-                        "discount_percentage": discount_percentage,
-                        "trade_lock_days": lock_days,
-                        "unlock_date": trade_lock_info.get('unlock_date'),
-                        "confidence": "high" if discount_percentage > 0.40 else "medium",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    opportunities.append(opportunity)
-                    logger.info(f"Oportunidad de trade lock encontrada: {item_title} - "
-                              f"Compra: ${offer_price_usd:.2f}, Referencia: ${reference_price:.2f}, "
-                              f"Descuento: {discount_percentage:.1%}, Lock: {lock_days} días")
+                    opportunities.append(self._trade_lock_opportunity(
+                        item_title, offer, reference_price, discount_percentage, commission_cents, potential_profit_cents
+                    ))
                     
             except (ValueError, TypeError, KeyError) as e:
                 logger.warning(f"Error procesando oferta para trade lock en {item_title}: {e}")
@@ -589,112 +641,42 @@ class StrategyEngine:
         
         return opportunities
 
-    def _extract_item_attributes(self, offer: Dict[str, Any]) -> Dict[str, Any]:
-        """Extrae atributos del ítem de una oferta de DMarket."""
-        attributes = {}
-        
-        # Extraer float value
-        if 'float' in offer:
-            try:
-                attributes['float'] = float(offer['float'])
-            except (ValueError, TypeError):
-                pass
-        
-        # Extraer pattern/paintseed
-        if 'paintseed' in offer:
-            try:
-                attributes['paintseed'] = int(offer['paintseed'])
-            except (ValueError, TypeError):
-                pass
-        elif 'pattern' in offer:
-            try:
-                attributes['pattern'] = int(offer['pattern'])
-            except (ValueError, TypeError):
-                pass
-        
-        # Detectar StatTrak y Souvenir
-        title = offer.get('title', '')
-        attributes['stattrak'] = 'StatTrak' in title
-        attributes['souvenir'] = 'Souvenir' in title
-        
-        # Extraer otros atributos específicos
-        if 'phase' in offer:
-            attributes['phase'] = offer['phase']
-        
-        if 'fade_percentage' in offer:
-            try:
-                attributes['fade_percentage'] = float(offer['fade_percentage'])
-            except (ValueError, TypeError):
-                pass
-        
-        return attributes
+    def _trade_lock_opportunity(self, item_title: str, offer: ParsedOffer, reference_price: float,
+                                discount_percentage: float, commission_cents: int, profit_cents: int) -> Dict[str, Any]:
+        """Oportunidad de arbitraje por trade lock (común a la versión escalar y a la vectorizada)."""
+        offer_price_usd = offer.price_usd
+        potential_profit_usd = profit_cents / 100.0
+        lock_days = offer.lock_days
+        logger.info(f"Oportunidad de trade lock encontrada: {item_title} - "
+                  f"Compra: ${offer_price_usd:.2f}, Referencia: ${reference_price:.2f}, "
+                  f"Descuento: {discount_percentage:.1%}, Lock: {lock_days} días")
+        return {
+            "strategy": "trade_lock_arbitrage",
+            "item_title": item_title,
+            "asset_id": offer.asset_id,
+            "buy_price_usd": offer_price_usd,
+            "reference_price_usd": reference_price,
+            "potential_profit_usd": potential_profit_usd,
+            "profit_percentage": potential_profit_usd / offer_price_usd if offer_price_usd > 0 else 0,
+            "commission_usd": commission_cents / 100.0,
+            "discount_percentage": discount_percentage,
+            "trade_lock_days": lock_days,
+            "unlock_date": (datetime.now() + timedelta(days=lock_days)).isoformat() if lock_days > 0 else None,
+            "confidence": "high" if discount_percentage > 0.40 else "medium",
+            "timestamp": datetime.now().isoformat()
+        }
 
     def _estimate_base_item_price(self, item_title: str, item_data: Dict[str, Any]) -> Optional[float]:
         """Estima el precio base del ítem sin considerar atributos premium."""
         # Usar el PME calculado por el market analyzer
         historical_prices = item_data.get('historical_prices', [])
-        current_offers = item_data.get('current_sell_offers', [])
         
         base_price = self.analyzer.calculate_estimated_market_price(
-            item_title, historical_prices, current_offers
+            item_title, historical_prices, OrderBook.from_item_data(item_data)
         )
         
         return base_price
 
-    def _get_reference_price_no_trade_lock(self, item_title: str, offers: List[Dict[str, Any]]) -> Optional[float]:
-        """Obtiene precio de referencia de ofertas sin trade lock."""
-        no_lock_prices = []
-        
-        for offer in offers:
-            trade_lock_info = self._extract_trade_lock_info(offer)
-            if trade_lock_info and trade_lock_info.get('has_trade_lock'):
-                continue  # Saltar ofertas con trade lock
-            
-            try:
-                price_str = offer.get('price', {}).get('USD')
-                if price_str:
-                    price_usd = int(price_str) / 100.0
-                    no_lock_prices.append(price_usd)
-            except (ValueError, TypeError):
-                continue
-        
-        if not no_lock_prices:
-            return None
-        
-        # Retornar precio promedio de las ofertas sin trade lock
-        return sum(no_lock_prices) / len(no_lock_prices)
-
-    def _extract_trade_lock_info(self, offer: Dict[str, Any]) -> Dict[str, Any]:
-        """Extrae información de trade lock de una oferta."""
-        trade_lock_info = {
-            'has_trade_lock': False,
-            'days_remaining': 0,
-            'unlock_date': None
-        }
-        
-        # Verificar diferentes campos donde puede estar la info de trade lock
-        if 'tradeLock' in offer:
-            trade_lock_info['has_trade_lock'] = True
-            
-            # Extraer días restantes
-            if 'daysRemaining' in offer['tradeLock']:
-                try:
-                    trade_lock_info['days_remaining'] = int(offer['tradeLock']['daysRemaining'])
-                except (ValueError, TypeError):
-                    pass
-            
-            # Calcular fecha de unlock
-            if trade_lock_info['days_remaining'] > 0:
-                unlock_date = datetime.now() + timedelta(days=trade_lock_info['days_remaining'])
-                trade_lock_info['unlock_date'] = unlock_date.isoformat()
-        
-        # Verificar en el título si menciona trade lock
-        title = offer.get('title', '').lower()
-        if 'trade lock' in title or 'tradelock' in title:
-            trade_lock_info['has_trade_lock'] = True
-        
-        return trade_lock_info
-
     def _get_item_data(self, item_title: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene todos los datos necesarios para un ítem: ofertas de venta, órdenes de compra y precios históricos.
@@ -711,7 +693,8 @@ class StrategyEngine:
             'title': item_title,
             'current_sell_offers': [],
             'current_buy_orders': [],
-            'historical_prices': []
+            'historical_prices': [],
+            'order_book': None
         }
 
         game_id = self.config.get("game_id", DEFAULT_GAME_ID)
@@ -747,6 +730,11 @@ class StrategyEngine:
                 logger.debug(f"Encontradas {len(item_data['current_buy_orders'])} órdenes de compra para {item_title}.")
             else:
                 logger.warning(f"No se pudieron obtener órdenes de compra para {item_title}: {response_buy_orders.get('error') if response_buy_orders else 'Respuesta vacía'}")
+
+            # Parsear ofertas y órdenes una sola vez; todas las estrategias consumen el OrderBook
+            item_data['order_book'] = OrderBook.from_raw(
+                item_title, item_data['current_sell_offers'], item_data['current_buy_orders']
+            )
             
             # 3. Obtener precios históricos (de la BD)
             logger.debug(f"Obteniendo precios históricos de la BD para {item_title}...")
@@ -792,7 +780,7 @@ class StrategyEngine:
         opportunities = []
         item_title = item_data.get('title', 'Unknown')
         historical_prices = item_data.get('historical_prices', [])
-        current_sell_offers = item_data.get('current_sell_offers', [])
+        order_book = OrderBook.from_item_data(item_data)
         
         logger.info(f"Buscando oportunidades de volatilidad para: {item_title}")
         
@@ -800,21 +788,13 @@ class StrategyEngine:
             logger.debug(f"Insuficientes datos históricos para análisis de volatilidad en {item_title}.")
             return opportunities
         
-        if not current_sell_offers:
+        if not order_book.asks:
             logger.debug(f"No hay ofertas actuales para análisis de volatilidad en {item_title}.")
             return opportunities
         
         try:
-            # Obtener precio actual (LSO)
-            current_price = None
-            for offer in current_sell_offers:
-                try:
-                    price_str = offer.get('price', {}).get('USD')
-                    if price_str:
-                        current_price = int(price_str) / 100.0
-                        break
-                except (ValueError, TypeError):
-                    continue
+            # Precio actual: primera oferta con precio válido
+            current_price = order_book.asks[0].price_usd
             
             if not current_price:
                 logger.debug(f"No se pudo obtener precio actual para {item_title}.")
@@ -889,10 +869,245 @@ class StrategyEngine:
         
         return opportunities
 
+    def market_data_available(self) -> bool:
+        """
+        False mientras el circuit breaker de /exchange/v1/market/items del conector está
+        abierto: en ese caso escanear solo acumularía errores o timeouts.
+        """
+        is_available = getattr(self.connector, "is_endpoint_available", None)
+        return is_available is None or is_available("GET", MARKET_ITEMS_ENDPOINT)
+
+    def fetch_item_data(self, item_title: str) -> Optional[Dict[str, Any]]:
+        """
+        Etapa de obtención: ofertas de venta, órdenes de compra e históricos de un ítem
+        (ver _get_item_data). None si no se pudieron obtener.
+        """
+        return self._get_item_data(item_title)
+
+    def analyze_item_data(self, item_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Etapa de análisis: ejecuta las cinco estrategias sobre los datos ya obtenidos
+        de un ítem. Requiere las tasas de comisión cargadas (_fetch_and_cache_fee_info).
+
+        Con incremental_evaluation, si la huella del libro y las entradas de nivel título
+        (precios históricos, mejor ask/bid, comisiones) no cambiaron desde la última
+        evaluación se reutiliza su resultado; si solo cambiaron ofertas, se evalúan
+        únicamente las nuevas y se descartan las oportunidades de las que ya no están.
+        En ambos casos los candidatos por atributos pedidos al servidor (fuera del libro)
+        se vuelven a pedir y evaluar. Cada evaluation_cache_ttl_sec se repite la
+        evaluación completa.
+
+        Returns:
+            Oportunidades del ítem por estrategia (claves STRATEGY_KEYS).
+        """
+        item_title = item_data['title']
+        if item_data.get('order_book') is None:
+            item_data['order_book'] = OrderBook.from_item_data(item_data)
+        order_book = item_data['order_book']
+        if not self.config.get("incremental_evaluation", True):
+            results = self._run_all_strategies(item_data, order_book)
+            self._record_scan(item_title, order_book, results)
+            return results
+
+        fingerprint = order_book.fingerprint(self.config.get("fingerprint_depth") or None)
+        context = self._evaluation_context(item_data, order_book)
+        offer_keys = order_book.offer_keys()
+        now = time.monotonic()
+        with self._evaluation_lock:
+            previous = self._evaluations.get(item_title)
+
+        if (previous is None or previous.context != context
+                or now - previous.evaluated_at > self.config.get("evaluation_cache_ttl_sec", 300)):
+            mode, evaluated_at, offers_evaluated = "full", now, len(order_book.asks)
+            results = self._run_all_strategies(item_data, order_book)
+        elif previous.fingerprint == fingerprint:
+            mode, evaluated_at, offers_evaluated = "skipped", previous.evaluated_at, 0
+            # Los flips de candidatos pedidos al servidor (treeFilters) no están en el libro:
+            # no se arrastran, se vuelven a pedir para saber si siguen a la venta
+            results = self._with_server_candidates(item_data, order_book, self._carried_over(previous.results, order_book))
+            logger.debug(f"Libro de {item_title} sin cambios: se reutiliza la evaluación anterior.")
+        else:
+            new_asks = [offer for offer in order_book.asks if (offer.asset_id, offer.price_cents) not in previous.offer_keys]
+            mode, evaluated_at, offers_evaluated = "delta", previous.evaluated_at, len(new_asks)
+            results = self._run_changed_offers(item_data, order_book, previous, offer_keys, new_asks)
+
+        with self._evaluation_lock:
+            self._evaluations[item_title] = TitleEvaluation(
+                fingerprint, context, offer_keys, order_book.no_lock_mean_usd, results, evaluated_at
+            )
+            self._evaluation_stats[mode] += 1
+            self._evaluation_stats["offers_evaluated"] += offers_evaluated
+        self._record_scan(item_title, order_book, results)
+        # Copias: los consumidores (p.ej. TradingPipeline) anotan las oportunidades
+        return {key: [dict(opp) for opp in opps] for key, opps in results.items()}
+
+    def _record_scan(self, item_title: str, order_book: OrderBook, results: Dict[str, List[Dict[str, Any]]]) -> None:
+        if self.scan_scheduler is not None:
+            self.scan_scheduler.record_scan(item_title, order_book, results)
+
+    def next_scan_batch(self, budget: int) -> List[str]:
+        """
+        Siguientes `budget` títulos a escanear según el planificador adaptativo (vacío si
+        el engine no tiene planificador). Uso: run_strategies(engine.next_scan_batch(n)).
+        """
+        return self.scan_scheduler.next_batch(budget) if self.scan_scheduler is not None else []
+
+    def _run_all_strategies(self, item_data: Dict[str, Any], order_book: OrderBook) -> Dict[str, List[Dict[str, Any]]]:
+        item_title = item_data['title']
+        return {
+            # Estrategia 1: Basic Flips
+            "basic_flips": self._find_basic_flips(item_title, order_book),
+            # Estrategia 3: Snipes
+            "snipes": self._find_snipes(
+                item_title,
+                order_book,
+                item_data.get('historical_prices', [])
+            ),
+            # Estrategia 2: Attribute Premium Flips
+            "attribute_flips": self._find_attribute_premium_flips(
+                item_data, self.dmarket_fee_info, self.analyzer
+            ),
+            # Estrategia 5: Trade Lock Arbitrage
+            "trade_lock_arbitrage": self._find_trade_lock_opportunities(
+                item_data, self.dmarket_fee_info
+            ),
+            # Estrategia 4: Volatility Trading
+            "volatility_trading": self._find_volatility_opportunities(item_data)
+        }
+
+    def _run_changed_offers(self, item_data: Dict[str, Any], order_book: OrderBook, previous: TitleEvaluation,
+                            offer_keys: FrozenSet[Tuple[Optional[str], int]],
+                            new_asks: List[ParsedOffer]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Reevaluación incremental de un título cuyo contexto no cambió: los flips básicos y
+        la volatilidad solo dependen del contexto y se reutilizan; las estrategias por
+        oferta conservan las oportunidades de ofertas que siguen en el libro y evalúan
+        solo `new_asks`. El trade lock se evalúa entero si cambió su precio de referencia
+        (la media de las ofertas sin lock, que se mueve con casi cualquier cambio).
+        """
+        item_title = item_data['title']
+        gone = {asset_id for asset_id, _ in previous.offer_keys - offer_keys}
+        previous_results = self._carried_over(previous.results, order_book, gone)
+        logger.debug(f"Libro de {item_title} cambiado: {len(new_asks)} ofertas nuevas, {len(gone)} retiradas o repreciadas.")
+
+        delta_data = dict(item_data, order_book=order_book.restricted_to(new_asks))
+        fresh = {
+            "snipes": self._find_snipes(item_title, delta_data['order_book'], item_data.get('historical_prices', [])),
+            "attribute_flips": self._find_attribute_premium_flips(
+                delta_data, self.dmarket_fee_info, self.analyzer, server_candidates=False
+            ),
+        }
+        results = dict(previous_results)
+        if order_book.no_lock_mean_usd != previous.no_lock_mean_usd:
+            results["trade_lock_arbitrage"] = self._find_trade_lock_opportunities(item_data, self.dmarket_fee_info)
+        else:
+            fresh["trade_lock_arbitrage"] = self._find_trade_lock_opportunities(delta_data, self.dmarket_fee_info)
+        for key in fresh:
+            results[key] = previous_results[key] + fresh[key]
+        return self._with_server_candidates(item_data, order_book, results)
+
+    def _with_server_candidates(self, item_data: Dict[str, Any], order_book: OrderBook,
+                                results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Añade a `results` los flips por atributos de los candidatos del servidor que no
+        están en el libro. Pedirlos de nuevo es barato (caché de respuestas y coalescer) y
+        sin ellos un título vigilado perdería la oportunidad que lo puso en la watchlist.
+        """
+        if not self.config.get("attribute_server_filters", True):
+            return results
+        candidates = self._fetch_attribute_candidates(item_data['title'], self.analyzer)
+        extra = order_book.with_extra_asks(candidates)[len(order_book.asks):]
+        if not extra:
+            return results
+        candidate_data = dict(item_data, order_book=order_book.restricted_to(extra))
+        flips = self._find_attribute_premium_flips(candidate_data, self.dmarket_fee_info, self.analyzer, server_candidates=False)
+        return dict(results, attribute_flips=results.get("attribute_flips", []) + flips)
+
+    @staticmethod
+    def _carried_over(results: Dict[str, List[Dict[str, Any]]], order_book: OrderBook,
+                      gone: FrozenSet[Optional[str]] = frozenset()) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Oportunidades de una evaluación anterior que se pueden reutilizar: las de las
+        estrategias por oferta solo si su asset sigue en el libro actual y no está en
+        `gone` (retirado o repreciado).
+        """
+        listed = {offer.asset_id for offer in order_book.asks}
+        return {
+            key: [opp for opp in opps if opp.get('asset_id') in listed and opp.get('asset_id') not in gone]
+            if key in PER_OFFER_STRATEGY_KEYS else opps
+            for key, opps in results.items()
+        }
+
+    def _evaluation_context(self, item_data: Dict[str, Any], order_book: OrderBook) -> Tuple[Any, ...]:
+        """
+        Entradas de nivel título de las estrategias: si cambian, el resultado de cualquier
+        oferta puede cambiar y el título se reevalúa entero.
+        """
+        historical_prices = item_data.get('historical_prices') or []
+        # Marca de agua de los históricos: vienen ordenados del más reciente al más antiguo
+        watermark = (len(historical_prices), historical_prices[0].get('timestamp') if historical_prices else None)
+        best_ask = order_book.best_ask
+        fee_entry = self._fee_cache.get(self.config.get("DEFAULT_GAME_ID", "a8db")) or {}
+        return (
+            watermark,
+            (best_ask.price_cents, best_ask.asset_id) if best_ask else None,
+            order_book.best_bid.price_cents if order_book.best_bid else None,
+            order_book.asks[0].price_cents if order_book.asks else None,
+            json.dumps(fee_entry.get('data'), sort_keys=True)
+        )
+
+    def invalidate_evaluations(self, titles: Optional[List[str]] = None) -> None:
+        """Olvida la última evaluación de `titles` (o de todos) para forzar una evaluación completa."""
+        with self._evaluation_lock:
+            if titles is None:
+                self._evaluations.clear()
+            else:
+                for title in titles:
+                    self._evaluations.pop(title, None)
+
+    def get_evaluation_stats(self) -> Dict[str, int]:
+        """Evaluaciones por modo (full/delta/skipped), ofertas evaluadas y títulos en caché."""
+        with self._evaluation_lock:
+            return dict(self._evaluation_stats, cached_titles=len(self._evaluations))
+
+    def _evaluate_item(self, item_title: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Obtiene los datos de un ítem y ejecuta las cinco estrategias sobre ellos.
+        Los errores quedan aislados en el ítem: se registran y se devuelve None.
+
+        Returns:
+            Oportunidades del ítem por estrategia (claves STRATEGY_KEYS), o None si no
+            se pudieron obtener sus datos o falló la evaluación.
+        """
+        try:
+            # Obtener datos del ítem
+            item_data = self.fetch_item_data(item_title)
+            if not item_data:
+                logger.warning(f"No se pudieron obtener datos para {item_title}. Saltando.")
+                return None
+            return self.analyze_item_data(item_data)
+
+        except Exception as e:
+            logger.error(f"Error procesando {item_title}: {e}")
+            return None
+
+    def _evaluate_item_if_available(self, index: int, total: int, item_title: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """_evaluate_item para un worker: no hace nada si el circuito de market/items está abierto."""
+        if not self.market_data_available():
+            return None
+        logger.info(f"Procesando ítem {index + 1}/{total}: {item_title}")
+        return self._evaluate_item(item_title)
+
     def run_strategies(self, items_to_scan: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """
         Ejecuta todas las estrategias configuradas sobre una lista de ítems.
 
+        Con `scan_workers` > 1 los ítems se evalúan en un pool de hilos: las peticiones
+        de unos ítems se solapan con la evaluación de otros y el ritmo lo marca el rate
+        limiter compartido del conector (prioridad de escaneo), no una pausa fija. Los
+        resultados se combinan en el orden de `items_to_scan`, así que la salida es la
+        misma que en modo secuencial.
+
         Args:
             items_to_scan (List[str]): Lista de nombres de ítems a escanear.
 
@@ -902,13 +1117,7 @@ class StrategyEngine:
         """
         logger.info(f"Ejecutando estrategias en {len(items_to_scan)} ítems...")
         
-        all_opportunities = {
-            "basic_flips": [],
-            "snipes": [],
-            "attribute_flips": [],
-            "trade_lock_arbitrage": [],
-            "volatility_trading": []
-        }
+        all_opportunities = {key: [] for key in STRATEGY_KEYS}
 
         game_id = self.config.get("game_id", DEFAULT_GAME_ID)
         
@@ -916,67 +1125,62 @@ class StrategyEngine:
         self._fetch_and_cache_fee_info(game_id)
         logger.info("Tasas de comisión cargadas (reales o por defecto). Continuando con estrategias...")
 
-        for i, item_title in enumerate(items_to_scan):
-            logger.info(f"Procesando ítem {i+1}/{len(items_to_scan)}: {item_title}")
-            
-            try:
-                # Obtener datos del ítem
-                item_data = self._get_item_data(item_title)
-                if not item_data:
-                    logger.warning(f"No se pudieron obtener datos para {item_title}. Saltando.")
-                    continue
-
-                # Ejecutar Estrategia 1: Basic Flips
-                basic_flip_opportunities = self._find_basic_flips(
-                    item_title, 
-                    item_data.get('current_sell_offers', []), 
-                    item_data.get('current_buy_orders', [])
-                )
-                all_opportunities["basic_flips"].extend(basic_flip_opportunities)
-
-                # Ejecutar Estrategia 3: Snipes
-                snipe_opportunities = self._find_snipes(
-                    item_title, 
-                    item_data.get('current_sell_offers', []), 
-                    item_data.get('historical_prices', [])
-                )
-                all_opportunities["snipes"].extend(snipe_opportunities)
-
-                # Ejecutar Estrategia 2: Attribute Premium Flips
-                attribute_flip_opportunities = self._find_attribute_premium_flips(
-                    item_data, self.dmarket_fee_info, self.analyzer
-                )
-                all_opportunities["attribute_flips"].extend(attribute_flip_opportunities)
-
-                # Ejecutar Estrategia 5: Trade Lock Arbitrage
-                trade_lock_opportunities = self._find_trade_lock_opportunities(
-                    item_data, self.dmarket_fee_info
-                )
-                all_opportunities["trade_lock_arbitrage"].extend(trade_lock_opportunities)
-
-                # Ejecutar Estrategia 4: Volatility Trading
-                volatility_opportunities = self._find_volatility_opportunities(item_data)
-                all_opportunities["volatility_trading"].extend(volatility_opportunities)
-
-                # Delay entre ítems para no sobrecargar la API
-                delay = self.config.get("delay_between_items_sec", 1.0)
-                if delay > 0 and i < len(items_to_scan) - 1:  # No delay después del último ítem
-                    logger.debug(f"Esperando {delay} segundos antes del siguiente ítem...")
-                    time.sleep(delay)
+        workers = min(max(1, int(self.config.get("scan_workers", 1))), max(1, len(items_to_scan)))
+        if workers > 1:
+            item_results = self._run_items_parallel(items_to_scan, workers)
+        else:
+            item_results = self._run_items_sequential(items_to_scan)
 
-            except Exception as e:
-                logger.error(f"Error procesando {item_title}: {e}")
-                continue
+        # Combinar en el orden de entrada (determinista con cualquier número de workers)
+        for item_result in item_results:
+            if item_result:
+                for key in STRATEGY_KEYS:
+                    all_opportunities[key].extend(item_result[key])
 
         # Resumen de resultados
         total_opportunities = sum(len(opps) for opps in all_opportunities.values())
         logger.info(f"Estrategias completadas. Total de oportunidades encontradas: {total_opportunities}")
+        if self.config.get("incremental_evaluation", True):
+            logger.info(f"Evaluación incremental (acumulado): {self.get_evaluation_stats()}")
+        if self.scan_scheduler is not None:
+            self.scan_scheduler.save()
         for strategy, opportunities in all_opportunities.items():
             if opportunities:
                 logger.info(f"  {strategy}: {len(opportunities)} oportunidades")
 
         return all_opportunities
 
+    def _run_items_sequential(self, items_to_scan: List[str]) -> List[Optional[Dict[str, List[Dict[str, Any]]]]]:
+        """Evalúa los ítems uno a uno, con la pausa opcional delay_between_items_sec entre ellos."""
+        item_results = []
+        for i, item_title in enumerate(items_to_scan):
+            if not self.market_data_available():
+                logger.warning(f"Circuito abierto para {MARKET_ITEMS_ENDPOINT}: se omiten los {len(items_to_scan) - i} ítems restantes de este ciclo.")
+                break
+            logger.info(f"Procesando ítem {i+1}/{len(items_to_scan)}: {item_title}")
+            item_results.append(self._evaluate_item(item_title))
+
+            # Delay entre ítems para no sobrecargar la API
+            delay = self.config.get("delay_between_items_sec", 0.0)
+            if delay > 0 and i < len(items_to_scan) - 1:  # No delay después del último ítem
+                logger.debug(f"Esperando {delay} segundos antes del siguiente ítem...")
+                time.sleep(delay)
+        return item_results
+
+    def _run_items_parallel(self, items_to_scan: List[str], workers: int) -> List[Optional[Dict[str, List[Dict[str, Any]]]]]:
+        """Evalúa los ítems en un pool de `workers` hilos y devuelve los resultados en orden de entrada."""
+        total = len(items_to_scan)
+        logger.info(f"Escaneo paralelo con {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="strategy-scan") as executor:
+            futures = [
+                executor.submit(self._evaluate_item_if_available, i, total, item_title)
+                for i, item_title in enumerate(items_to_scan)
+            ]
+            item_results = [future.result() for future in futures]
+        if not self.market_data_available():
+            logger.warning(f"Circuito abierto para {MARKET_ITEMS_ENDPOINT}: parte de los {total} ítems de este ciclo se omitieron.")
+        return item_results
+
 if __name__ == '__main__':
     from utils.logger import configure_logging
     configure_logging(log_level=logging.DEBUG)
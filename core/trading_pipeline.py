@@ -0,0 +1,408 @@
+# core/trading_pipeline.py
+"""
+Pipeline de trading en streaming: obtención → análisis → control de riesgo → ejecución.
+
+Cada etapa es un grupo de hilos conectado a la siguiente por una cola acotada:
+
+    títulos ─▶ [fetch × N] ─▶ [analyze × M] ─▶ [risk gate × 1] ─▶ [execute × 1]
+             StrategyEngine    StrategyEngine    RiskManager         RealTrader
+             .fetch_item_data  .analyze_item_data .evaluate_trade_risk .execute_real_buy
+
+Una oportunidad se evalúa y se ejecuta en cuanto aparece, sin esperar a que termine el
+escaneo del resto de títulos. Las colas acotadas dan backpressure: si la ejecución o el
+análisis se atrasan, las etapas anteriores se bloquean en lugar de acumular datos de
+mercado que habrán caducado cuando se procesen. El control de riesgo y la ejecución
+tienen un único hilo para que cada decisión vea el portfolio y el balance tras la
+compra anterior.
+
+Las peticiones de las etapas de obtención y análisis salen con prioridad de escaneo y
+las de ejecución con prioridad de ejecución (ver RequestScheduler), así que las compras
+adelantan al escaneo dentro del mismo presupuesto del rate limiter.
+
+Con una Watchlist, la obtención se alimenta desde dos carriles concurrentes (ver
+core/scan_lanes.py): el rápido vuelve a pedir cada fast_lane_interval_sec los títulos
+vigilados y el lento recorre el universo. Cada carril tiene su fracción del presupuesto
+MARKET del conector y la cola de títulos entrega primero los del carril rápido.
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Iterable, Tuple
+
+from core.strategy_engine import StrategyEngine, STRATEGY_KEYS, DEFAULT_GAME_ID
+from core.risk_manager import RiskManager
+from core.real_trader import RealTrader, opportunity_buy_price_usd, opportunity_profit_usd
+from core.scan_lanes import ScanLane, Watchlist, LaneBudget
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+# Marca de fin de flujo entre etapas
+_END = object()
+
+
+@dataclass
+class PipelineConfig:
+    """Parámetros del pipeline de trading."""
+    fetch_workers: int = 4                   # Hilos de obtención (peticiones a DMarket en paralelo)
+    analyze_workers: int = 2                 # Hilos de evaluación de estrategias
+    queue_size: int = 8                      # Capacidad de cada cola entre etapas (backpressure)
+    max_buy_price_usd: Optional[float] = None  # Precio máximo por compra (None = sin límite propio)
+    min_expected_profit_usd: float = 0.0     # Beneficio esperado mínimo para pasar al control de riesgo
+    max_opportunity_age_sec: float = 30.0    # Oportunidades más antiguas se descartan antes de comprar
+    min_cycle_sec: float = 0.0               # Duración mínima de cada pasada sobre el universo
+    scan_batch_size: int = 0                 # Títulos por pasada si el engine tiene ScanScheduler (0 = todo el universo)
+    fast_lane_interval_sec: float = 5.0      # Con Watchlist: cada cuánto se vuelve a pedir cada título vigilado
+    fast_lane_share: float = 0.3             # Con Watchlist: fracción del presupuesto MARKET del carril rápido
+    slow_lane_share: float = 0.6             # Con Watchlist: fracción del presupuesto MARKET del carril lento
+    market_requests_per_item: float = 2.0    # Peticiones MARKET por ítem obtenido (ofertas de venta + órdenes de compra)
+    strategies: Tuple[str, ...] = STRATEGY_KEYS  # Estrategias cuyas oportunidades se ejecutan
+
+
+@dataclass
+class PipelineStats:
+    """Contadores de un run() del pipeline."""
+    items_fetched: int = 0
+    fast_lane_items: int = 0
+    slow_lane_items: int = 0
+    fetch_errors: int = 0
+    items_analyzed: int = 0
+    opportunities_found: int = 0
+    rejected_filters: int = 0
+    rejected_risk: int = 0
+    discarded_stale: int = 0
+    trades_attempted: int = 0
+    trades_succeeded: int = 0
+    detection_to_execution_sec: List[float] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.detection_to_execution_sec)
+        data = {k: v for k, v in self.__dict__.items() if k != "detection_to_execution_sec"}
+        data["avg_detection_to_execution_sec"] = sum(latencies) / len(latencies) if latencies else 0.0
+        data["max_detection_to_execution_sec"] = latencies[-1] if latencies else 0.0
+        return data
+
+
+class _LaneQueue(queue.Queue):
+    """Cola de títulos (carril, título) que entrega primero los del carril rápido; FIFO dentro de cada carril."""
+
+    def _init(self, maxsize: int) -> None:
+        self.queue = []
+        self._sequence = itertools.count()
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, item: Any) -> None:
+        # El fin de flujo sale después de los títulos pendientes
+        lane = item[0] if isinstance(item, tuple) else len(ScanLane)
+        heapq.heappush(self.queue, (lane, next(self._sequence), item))
+
+    def _get(self) -> Any:
+        return heapq.heappop(self.queue)[2]
+
+
+class TradingPipeline:
+    """Pipeline por etapas con colas acotadas sobre StrategyEngine, RiskManager y RealTrader."""
+
+    def __init__(
+        self,
+        strategy_engine: StrategyEngine,
+        risk_manager: RiskManager,
+        real_trader: RealTrader,
+        config: Optional[PipelineConfig] = None,
+        on_trade: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+        watchlist: Optional[Watchlist] = None
+    ):
+        """
+        Args:
+            strategy_engine: Obtención de datos y estrategias.
+            risk_manager: Control de riesgo previo a cada compra.
+            real_trader: Ejecución de las compras.
+            config: Parámetros del pipeline; por defecto PipelineConfig().
+            on_trade: Callback (oportunidad, resultado) tras cada compra intentada.
+            watchlist: Títulos del carril rápido; sin ella solo hay barrido del universo.
+        """
+        self.engine = strategy_engine
+        self.risk_manager = risk_manager
+        self.real_trader = real_trader
+        self.config = config or PipelineConfig()
+        self.on_trade = on_trade
+        self.watchlist = watchlist
+        self.stats = PipelineStats()
+        self._stop = threading.Event()
+        self._feed_done = threading.Event()  # El carril lento terminó: el rápido también para
+        self._stats_lock = threading.Lock()
+        self._claimed_assets: set = set()  # Assets ya aprobados (una oferta no se compra dos veces)
+
+    def stop(self) -> None:
+        """Pide a todas las etapas que terminen (run() vuelve tras vaciar lo que esté en curso)."""
+        self._stop.set()
+        self._feed_done.set()
+
+    def run(self, titles: Iterable[str], duration_sec: Optional[float] = None) -> PipelineStats:
+        """
+        Ejecuta el pipeline hasta agotar `titles` o, si se indica `duration_sec`, recorriendo
+        el universo en bucle hasta que venza el plazo (o se llame a stop()).
+
+        Returns:
+            Estadísticas del run.
+        """
+        titles = list(titles)
+        self.stats = PipelineStats()
+        self._stop.clear()
+        self._feed_done.clear()
+        self._claimed_assets.clear()
+        if not titles:
+            return self.stats
+
+        self.engine._fetch_and_cache_fee_info(self.engine.config.get("game_id", DEFAULT_GAME_ID))
+        deadline = time.monotonic() + duration_sec if duration_sec else None
+
+        cfg = self.config
+        title_queue: "queue.Queue" = _LaneQueue(maxsize=cfg.queue_size)
+        data_queue: "queue.Queue" = queue.Queue(maxsize=cfg.queue_size)
+        opportunity_queue: "queue.Queue" = queue.Queue(maxsize=cfg.queue_size)
+        approved_queue: "queue.Queue" = queue.Queue(maxsize=cfg.queue_size)
+
+        stages = [
+            ("fetch", max(1, cfg.fetch_workers), title_queue, data_queue, self._fetch),
+            ("analyze", max(1, cfg.analyze_workers), data_queue, opportunity_queue, self._analyze),
+            ("risk", 1, opportunity_queue, approved_queue, self._risk_gate),
+            ("execute", 1, approved_queue, None, self._execute),
+        ]
+        threads: List[threading.Thread] = []
+        for index, (name, workers, inbox, outbox, handler) in enumerate(stages):
+            downstream_workers = stages[index + 1][1] if index + 1 < len(stages) else 0
+            remaining = [workers]  # Workers vivos de la etapa; el último propaga el fin
+            for n in range(workers):
+                thread = threading.Thread(
+                    target=self._stage_loop,
+                    args=(name, inbox, outbox, handler, remaining, downstream_workers),
+                    name=f"pipeline-{name}-{n}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        logger.info(
+            f"Pipeline iniciado: {len(titles)} títulos, {cfg.fetch_workers} fetch / {cfg.analyze_workers} analyze, "
+            f"colas de {cfg.queue_size}" + (f", {duration_sec:.0f}s" if duration_sec else "")
+            + (f", carril rápido cada {cfg.fast_lane_interval_sec:.0f}s ({cfg.fast_lane_share:.0%} / "
+               f"{cfg.slow_lane_share:.0%} del presupuesto MARKET)" if self.watchlist is not None else "")
+        )
+        fast_lane = None
+        if self.watchlist is not None:
+            fast_lane = threading.Thread(
+                target=self._feed_fast_lane, args=(title_queue, deadline), name="pipeline-fast-lane", daemon=True
+            )
+            fast_lane.start()
+        try:
+            self._feed(titles, title_queue, deadline)
+        except BaseException:
+            # KeyboardInterrupt o error del alimentador: las etapas descartan lo pendiente
+            self._stop.set()
+            raise
+        finally:
+            self._feed_done.set()
+            if fast_lane is not None:
+                while fast_lane.is_alive():
+                    fast_lane.join(timeout=0.5)
+            # Fin de flujo para la primera etapa; cada etapa lo propaga al terminar
+            for _ in range(max(1, cfg.fetch_workers)):
+                self._put(title_queue, _END, force=True)
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+
+        logger.info(f"Pipeline terminado: {self.stats.as_dict()}")
+        return self.stats
+
+    # ------------------------------------------------------------------
+    # Infraestructura de etapas
+    # ------------------------------------------------------------------
+
+    def _put(self, target: "queue.Queue", item: Any, force: bool = False) -> bool:
+        """put() bloqueante (backpressure) que abandona si se pide parar, salvo force."""
+        while True:
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                if self._stop.is_set() and not force:
+                    return False
+
+    def _stage_loop(self, name: str, inbox: "queue.Queue", outbox: Optional["queue.Queue"],
+                    handler: Callable[[Any], Iterable[Any]], remaining: List[int], downstream_workers: int) -> None:
+        while True:
+            item = inbox.get()
+            if item is _END:
+                break
+            if self._stop.is_set():
+                continue  # Vaciar la cola sin procesar
+            try:
+                for output in handler(item):
+                    if outbox is not None and not self._put(outbox, output):
+                        break
+            except Exception as e:
+                # Aislamiento por elemento: un fallo no detiene la etapa
+                logger.error(f"Error en la etapa {name} del pipeline: {e}", exc_info=True)
+        with self._stats_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(downstream_workers):
+                self._put(outbox, _END, force=True)
+
+    def _count(self, attribute: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self.stats, attribute, getattr(self.stats, attribute) + amount)
+
+    # ------------------------------------------------------------------
+    # Etapas
+    # ------------------------------------------------------------------
+
+    def _lane_budget(self, share: float) -> Optional[LaneBudget]:
+        """Presupuesto de un carril (None sin Watchlist o si el conector no expone rate limiter)."""
+        rate_limiter = getattr(self.engine.connector, "rate_limiter", None)
+        if self.watchlist is None or rate_limiter is None or share <= 0:
+            return None
+        return LaneBudget(rate_limiter, min(share, 1.0), self.config.market_requests_per_item)
+
+    def _feed(self, titles: List[str], title_queue: "queue.Queue", deadline: Optional[float]) -> None:
+        """
+        Carril lento: alimenta la primera etapa; con plazo recorre el universo en bucle. Si
+        el engine tiene ScanScheduler, cada pasada son los scan_batch_size títulos que este
+        elija. Con Watchlist omite los títulos vigilados y respeta slow_lane_share.
+        """
+        budget = self._lane_budget(self.config.slow_lane_share)
+        scheduler = self.engine.scan_scheduler
+        if scheduler is not None:
+            scheduler.add_titles(titles)
+        while not self._stop.is_set():
+            cycle_started = time.monotonic()
+            batch = scheduler.next_batch(self.config.scan_batch_size or len(titles)) if scheduler is not None else titles
+            for title in batch:
+                if self._stop.is_set() or (deadline is not None and time.monotonic() >= deadline):
+                    return
+                while not self.engine.market_data_available():
+                    logger.warning("Circuito abierto para market/items: el pipeline espera antes de seguir escaneando")
+                    if self._stop.wait(5.0) or (deadline is not None and time.monotonic() >= deadline):
+                        return
+                if self.watchlist is not None and title in self.watchlist:
+                    continue  # Lo cubre el carril rápido
+                if budget is not None and not budget.acquire(self._stop):
+                    return
+                if not self._put(title_queue, (ScanLane.SLOW, title)):
+                    return
+            if scheduler is not None:
+                scheduler.save()
+            if deadline is None:
+                return
+            pause = self.config.min_cycle_sec - (time.monotonic() - cycle_started)
+            if pause > 0 and self._stop.wait(min(pause, max(0.0, deadline - time.monotonic()))):
+                return
+
+    def _feed_fast_lane(self, title_queue: "queue.Queue", deadline: Optional[float]) -> None:
+        """
+        Carril rápido: encola los títulos de la watchlist que lleven fast_lane_interval_sec
+        sin pedirse, hasta que termine el carril lento o venza el plazo.
+        """
+        cfg = self.config
+        budget = self._lane_budget(cfg.fast_lane_share)
+        try:
+            self.watchlist.refresh(force=True)
+            while not self._feed_done.is_set():
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                self.watchlist.refresh()
+                if not self.engine.market_data_available():
+                    self._feed_done.wait(5.0)
+                    continue
+                for title in self.watchlist.due_titles(cfg.fast_lane_interval_sec):
+                    if budget is not None and not budget.acquire(self._feed_done):
+                        return
+                    if not self._put(title_queue, (ScanLane.FAST, title)):
+                        return
+                wait = max(0.2, self.watchlist.seconds_until_next_due(cfg.fast_lane_interval_sec))
+                if deadline is not None:
+                    wait = min(wait, max(0.0, deadline - time.monotonic()))
+                self._feed_done.wait(wait)
+        except Exception as e:
+            # El carril lento sigue aunque el rápido falle
+            logger.error(f"Error en el carril rápido del pipeline: {e}", exc_info=True)
+
+    def _fetch(self, entry: Tuple[ScanLane, str]) -> Iterable[Dict[str, Any]]:
+        lane, title = entry
+        item_data = self.engine.fetch_item_data(title)
+        if not item_data:
+            self._count("fetch_errors")
+            return []
+        self._count("items_fetched")
+        self._count("fast_lane_items" if lane == ScanLane.FAST else "slow_lane_items")
+        return [item_data]
+
+    def _analyze(self, item_data: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        by_strategy = self.engine.analyze_item_data(item_data)
+        detected_at = time.monotonic()
+        opportunities = []
+        for strategy in self.config.strategies:
+            for opportunity in by_strategy.get(strategy, []):
+                opportunity.setdefault("strategy", strategy)
+                opportunity["_detected_at"] = detected_at
+                opportunities.append(opportunity)
+        self._count("items_analyzed")
+        self._count("opportunities_found", len(opportunities))
+        if self.watchlist is not None:
+            self.watchlist.note_scan(item_data['title'], item_data.get('order_book'), opportunities)
+        # Las más rentables del ítem primero
+        opportunities.sort(key=opportunity_profit_usd, reverse=True)
+        return opportunities
+
+    def _risk_gate(self, opportunity: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+        cfg = self.config
+        item_title = opportunity.get("item_title", opportunity.get("item_name", "Unknown"))
+        buy_price = opportunity_buy_price_usd(opportunity)
+        asset_id = opportunity.get("assetId", opportunity.get("asset_id"))
+
+        if (buy_price <= 0
+                or (cfg.max_buy_price_usd is not None and buy_price > cfg.max_buy_price_usd)
+                or opportunity_profit_usd(opportunity) < cfg.min_expected_profit_usd
+                or (asset_id and asset_id in self._claimed_assets)):
+            self._count("rejected_filters")
+            return []
+
+        approved, risk_score, message = self.risk_manager.evaluate_trade_risk(
+            item_title, buy_price, opportunity["strategy"]
+        )
+        if not approved:
+            self._count("rejected_risk")
+            logger.info(f"Riesgo: {item_title} rechazado ({message})")
+            return []
+        opportunity["risk_score"] = risk_score
+        if asset_id:
+            self._claimed_assets.add(asset_id)
+        return [opportunity]
+
+    def _execute(self, opportunity: Dict[str, Any]) -> Iterable[Any]:
+        age = time.monotonic() - opportunity.pop("_detected_at", time.monotonic())
+        item_title = opportunity.get("item_title", "Unknown")
+        if age > self.config.max_opportunity_age_sec:
+            self._count("discarded_stale")
+            logger.info(f"Oportunidad de {item_title} descartada: detectada hace {age:.1f}s")
+            return []
+
+        self._count("trades_attempted")
+        result = self.real_trader.execute_real_buy(opportunity)
+        with self._stats_lock:
+            self.stats.detection_to_execution_sec.append(age)
+            if result.get("success"):
+                self.stats.trades_succeeded += 1
+        if self.on_trade is not None:
+            self.on_trade(opportunity, result)
+        return []
@@ -0,0 +1,193 @@
+# core/traffic_recorder.py
+"""
+Grabación y reproducción del tráfico de la API de DMarket.
+
+TrafficRecorder guarda cada par petición/respuesta de DMarketAPI._make_request en un
+log JSONL comprimido con gzip (sin cabeceras ni firmas). TrafficReplayer sirve esas
+respuestas de vuelta sin red, con la latencia original, escalada o nula, de modo que
+StrategyEngine y RealTrader se pueden perfilar y comparar con formas reales del mercado.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple, Deque, List
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+TRAFFIC_FORMAT = "dmarket-traffic"
+TRAFFIC_VERSION = 1
+
+
+def request_key(method: str, endpoint: str, params: Optional[Dict[str, Any]], body_data: Optional[Any]) -> Tuple:
+    """Clave de emparejamiento: método, endpoint, query params (sin None) y cuerpo canónico."""
+    items = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+    body = json.dumps(body_data, sort_keys=True, separators=(",", ":")) if body_data is not None else ""
+    return method.upper(), endpoint, items, body
+
+
+class TrafficRecorder:
+    """Graba peticiones y respuestas en un fichero .jsonl.gz. Thread-safe."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Ruta del log (se sobrescribe si existe).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._started = time.monotonic()
+        self.entries = 0
+        self._write({
+            "format": TRAFFIC_FORMAT,
+            "version": TRAFFIC_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat()
+        })
+        logger.info(f"Grabando tráfico de DMarket en {path}")
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        self._file.write("\n")
+
+    def record(
+        self, method: str, endpoint: str, params: Optional[Dict[str, Any]], body_data: Optional[Any],
+        result: Dict[str, Any], started_at: float, duration_sec: float
+    ) -> None:
+        """
+        Añade una entrada al log.
+
+        Args:
+            started_at: Instante de inicio (time.monotonic()) de la petición.
+            duration_sec: Duración total, incluidas esperas del rate limiter y reintentos.
+        """
+        record = {
+            "t": round(started_at - self._started, 6),
+            "d": round(duration_sec, 6),
+            "m": method.upper(),
+            "e": endpoint,
+            "p": {k: str(v) for k, v in (params or {}).items() if v is not None} or None,
+            "b": body_data,
+            "r": result
+        }
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write(record)
+            self.entries += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"Grabación de tráfico cerrada: {self.entries} entradas en {self.path}")
+
+    def __enter__(self) -> "TrafficRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class TrafficReplayer:
+    """
+    Sirve respuestas grabadas por TrafficRecorder.
+
+    Las peticiones se emparejan por request_key(); si una misma petición se grabó varias
+    veces, las respuestas se devuelven en el orden grabado y la última se repite cuando
+    se agotan. Una petición no grabada devuelve {"error": "ReplayMiss", ...}.
+    """
+
+    def __init__(self, path: str, timing: str = "original", time_scale: float = 1.0):
+        """
+        Args:
+            path: Log generado por TrafficRecorder.
+            timing: "original" (latencia grabada), "scaled" (latencia * time_scale) o "none".
+            time_scale: Factor aplicado a la latencia en modo "scaled".
+        """
+        if timing not in ("original", "scaled", "none"):
+            raise ValueError("timing debe ser 'original', 'scaled' o 'none'")
+        self.path = path
+        self.timing = timing
+        self.time_scale = time_scale
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple, Deque[Tuple[float, Dict[str, Any]]]] = defaultdict(deque)
+        self._last: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        self.entries: List[Dict[str, Any]] = []
+        self.stats = {"served": 0, "repeated": 0, "misses": 0}
+        self._load()
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != TRAFFIC_FORMAT:
+                raise ValueError(f"{self.path} no es un log de tráfico de DMarket")
+            if header.get("version") != TRAFFIC_VERSION:
+                logger.warning(f"Versión de log {header.get('version')} distinta de {TRAFFIC_VERSION}")
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.entries.append(entry)
+                key = request_key(entry["m"], entry["e"], entry.get("p"), entry.get("b"))
+                self._responses[key].append((entry.get("d", 0.0), entry["r"]))
+        logger.info(f"Tráfico cargado para replay: {len(self.entries)} entradas de {self.path}")
+
+    def titles(self) -> List[str]:
+        """Títulos consultados en market/items durante la grabación, en orden de aparición."""
+        seen: Dict[str, None] = {}
+        for entry in self.entries:
+            title = (entry.get("p") or {}).get("title")
+            if entry["e"] == "/exchange/v1/market/items" and title:
+                seen.setdefault(title, None)
+        return list(seen)
+
+    def _next(self, method: str, endpoint: str, params: Optional[Dict[str, Any]], body_data: Optional[Any]) -> Tuple[float, Dict[str, Any]]:
+        key = request_key(method, endpoint, params, body_data)
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                delay, response = queue.popleft()
+                self._last[key] = (delay, response)
+                self.stats["served"] += 1
+            elif key in self._last:
+                delay, response = self._last[key]
+                self.stats["repeated"] += 1
+            else:
+                self.stats["misses"] += 1
+                logger.warning(f"Replay sin respuesta grabada para {method.upper()} {endpoint} {params or ''}")
+                return 0.0, {"error": "ReplayMiss", "message": f"{method.upper()} {endpoint} no está en {self.path}"}
+        return self._delay_for(delay), json.loads(json.dumps(response))
+
+    def _delay_for(self, recorded_sec: float) -> float:
+        if self.timing == "none":
+            return 0.0
+        if self.timing == "scaled":
+            return recorded_sec * self.time_scale
+        return recorded_sec
+
+    def replay(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+               body_data: Optional[Any] = None) -> Dict[str, Any]:
+        """Devuelve la respuesta grabada, esperando la latencia correspondiente."""
+        delay, response = self._next(method, endpoint, params, body_data)
+        if delay > 0:
+            time.sleep(delay)
+        return response
+
+    async def replay_async(self, method: str, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                           body_data: Optional[Any] = None) -> Dict[str, Any]:
+        """Versión asyncio de replay()."""
+        delay, response = self._next(method, endpoint, params, body_data)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return response
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
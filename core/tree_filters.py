@@ -0,0 +1,112 @@
+# core/tree_filters.py
+"""
+Codificación del parámetro treeFilters de /exchange/v1/market/items.
+
+DMarket recibe todos los filtros de atributos en un único query param, con pares
+`clave[]=valor` separados por comas:
+
+    treeFilters=exterior[]=factory new,exterior[]=minimal wear,floatValueFrom[]=0,floatValueTo[]=0.01
+
+- Un valor simple se codifica como `clave[]=valor`.
+- Una lista (OR entre valores) repite la clave: `clave[]=a,clave[]=b`.
+- Un FilterRange se codifica como `claveFrom[]=min,claveTo[]=max` (extremos opcionales).
+
+La cadena resultante es un único valor de query: _prepare_request la ordena y codifica
+junto al resto de parámetros y la firma exactamente como se envía. Las claves se
+emiten ordenadas para que filtros equivalentes den la misma cadena (y compartan
+caché y coalescencia).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Union, Iterable
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+TREE_FILTERS_PARAM = "treeFilters"
+
+
+@dataclass(frozen=True)
+class FilterRange:
+    """Rango [low, high] de un atributo numérico (float, paint seed, ...)."""
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    def contains(self, value: float) -> bool:
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+
+TreeFilterValue = Union[str, int, float, bool, FilterRange, Iterable[Union[str, int, float]]]
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        text = "true" if value else "false"
+    elif isinstance(value, float):
+        text = repr(value)
+    else:
+        text = str(value)
+    if "," in text or "=" in text:
+        raise ValueError(f"Valor de treeFilters no codificable (contiene ',' o '='): {text!r}")
+    return text
+
+
+def encode_tree_filters(tree_filters: Optional[Dict[str, TreeFilterValue]]) -> Optional[str]:
+    """
+    Codifica un dict de filtros de atributos en el valor de treeFilters.
+
+    Returns:
+        La cadena codificada, o None si no hay filtros (o todos son None/vacíos).
+
+    Raises:
+        ValueError: Si una clave o un valor contiene ',' o '='.
+    """
+    if not tree_filters:
+        return None
+    parts: List[str] = []
+    for key in sorted(tree_filters):
+        value = tree_filters[key]
+        if "," in key or "=" in key:
+            raise ValueError(f"Clave de treeFilters no válida: {key!r}")
+        if value is None:
+            continue
+        if isinstance(value, FilterRange):
+            if value.low is not None:
+                parts.append(f"{key}From[]={_format_value(value.low)}")
+            if value.high is not None:
+                parts.append(f"{key}To[]={_format_value(value.high)}")
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            values = sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+            parts.extend(f"{key}[]={_format_value(v)}" for v in values)
+        else:
+            parts.append(f"{key}[]={_format_value(value)}")
+    return ",".join(parts) or None
+
+
+def parse_tree_filters(encoded: Optional[str]) -> Dict[str, List[str]]:
+    """Inversa de encode_tree_filters: {clave: [valores]} (los rangos quedan como claveFrom/claveTo)."""
+    parsed: Dict[str, List[str]] = {}
+    for part in (encoded or "").split(","):
+        if not part or "=" not in part:
+            continue
+        key, value = part.split("=", 1)
+        parsed.setdefault(key[:-2] if key.endswith("[]") else key, []).append(value)
+    return parsed
+
+
+def range_from_parsed(parsed: Dict[str, List[str]], key: str) -> Optional[FilterRange]:
+    """FilterRange de `key` a partir de parse_tree_filters(), o None si no hay extremos."""
+    low = parsed.get(f"{key}From")
+    high = parsed.get(f"{key}To")
+    if not low and not high:
+        return None
+    return FilterRange(float(low[0]) if low else None, float(high[0]) if high else None)
+
+
+def compact_seeds(seeds: Iterable[int]) -> Union[FilterRange, List[int]]:
+    """Lista ordenada de paint seeds, o un FilterRange si son consecutivas (consulta más corta)."""
+    ordered = sorted(set(seeds))
+    if len(ordered) > 2 and ordered[-1] - ordered[0] + 1 == len(ordered):
+        return FilterRange(ordered[0], ordered[-1])
+    return ordered
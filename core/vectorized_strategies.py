@@ -0,0 +1,238 @@
+# core/vectorized_strategies.py
+"""
+Versiones vectorizadas (NumPy) de las estrategias por oferta de StrategyEngine.
+
+_find_snipes, _find_attribute_premium_flips y _find_trade_lock_opportunities recorren
+las ofertas de un título una a una calculando descuento, comisión y beneficio. Aquí el
+mismo cálculo se hace sobre columnas (OfferColumns: precio en centavos, días de trade
+lock, float, puntuación de rareza y multiplicador de premium) de un título o de muchos
+títulos apilados, con las comisiones y los umbrales aplicados como máscaras.
+
+Los kernels reproducen exactamente la aritmética de las versiones escalares (mismas
+operaciones en float64 y truncamiento a centavos enteros), así que devuelven las mismas
+ofertas con los mismos importes; benchmarks/bench_vectorized_strategies.py lo comprueba
+sobre libros sintéticos de 100k ofertas. StrategyEngine los usa para los libros grandes
+(config "vectorized_min_offers") si numpy está instalado.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Sequence, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from core.order_book import OrderBook, ParsedOffer
+
+# Obtener logger para este módulo
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    """Comisión de venta de DMarket: max(int(precio × rate), mínimo), en centavos."""
+    rate: float
+    min_commission_cents: int
+
+    @classmethod
+    def from_fee_data(cls, fee_data: Dict[str, Any]) -> Optional["FeeSchedule"]:
+        """
+        FeeSchedule del formato cacheado por StrategyEngine
+        ({"feeRate": {"amount": "0.05"}, "minCommission": {"amount": "1"}}).
+
+        Returns:
+            None si faltan los campos. Lanza ValueError si no son numéricos.
+        """
+        fee_rate_str = (fee_data.get("feeRate") or {}).get("amount")
+        min_comm_cents_str = (fee_data.get("minCommission") or {}).get("amount")
+        if fee_rate_str is None or min_comm_cents_str is None:
+            return None
+        return cls(float(fee_rate_str), int(min_comm_cents_str))
+
+    def fee_cents(self, price_cents: int) -> int:
+        return max(int(price_cents * self.rate), self.min_commission_cents)
+
+    def fee_cents_array(self, price_cents: "np.ndarray") -> "np.ndarray":
+        return np.maximum((price_cents * self.rate).astype(np.int64), self.min_commission_cents)
+
+
+# Sin información de comisiones las estrategias escalares asumen comisión 0
+NO_FEES = FeeSchedule(0.0, 0)
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy no está instalado: los kernels vectorizados no están disponibles")
+
+
+class OfferColumns:
+    """
+    Ofertas de uno o varios títulos en columnas. Las ofertas del título i ocupan
+    [offsets[i], offsets[i + 1]); title_index da el título de cada oferta.
+    """
+
+    __slots__ = (
+        "titles", "offers", "offsets", "title_index", "price_cents", "has_trade_lock",
+        "lock_days", "float_value", "rarity_score", "premium_multiplier", "evaluations"
+    )
+
+    def __init__(self, titles: List[str], offer_lists: Sequence[Sequence[ParsedOffer]]):
+        _require_numpy()
+        self.titles = titles
+        self.offers: List[ParsedOffer] = [offer for offers in offer_lists for offer in offers]
+        counts = np.fromiter((len(offers) for offers in offer_lists), dtype=np.int64, count=len(offer_lists))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.title_index = np.repeat(np.arange(len(titles), dtype=np.int64), counts)
+        n = len(self.offers)
+        self.price_cents = np.fromiter((o.price_cents for o in self.offers), dtype=np.int64, count=n)
+        self.has_trade_lock = np.fromiter((o.has_trade_lock for o in self.offers), dtype=bool, count=n)
+        self.lock_days = np.fromiter((o.lock_days for o in self.offers), dtype=np.int64, count=n)
+        self.float_value = np.fromiter(
+            (o.float_value if o.float_value is not None else np.nan for o in self.offers), dtype=np.float64, count=n
+        )
+        # Rellenadas por score_attributes(); NaN = oferta no evaluada
+        self.rarity_score = np.full(n, np.nan)
+        self.premium_multiplier = np.full(n, np.nan)
+        self.evaluations: List[Any] = [None] * n
+
+    @classmethod
+    def from_books(cls, books: Sequence[OrderBook]) -> "OfferColumns":
+        """Columnas de las asks de uno o varios OrderBook, apiladas en orden."""
+        return cls([book.title for book in books], [book.asks for book in books])
+
+    def __len__(self) -> int:
+        return len(self.offers)
+
+    def score_attributes(self, market_analyzer: Any, max_price_usd: Optional[float] = None) -> "OfferColumns":
+        """
+        Rellena rarity_score/premium_multiplier con MarketAnalyzer.evaluate_attribute_rarity.
+        La evaluación es por oferta (Python); solo se evalúan las ofertas que no superan
+        max_price_usd, como en la estrategia escalar.
+        """
+        for i, offer in enumerate(self.offers):
+            if max_price_usd is not None and offer.price_usd > max_price_usd:
+                continue
+            evaluation = market_analyzer.evaluate_attribute_rarity(
+                attributes=offer.attributes(),
+                stickers=offer.stickers,
+                item_name=self.titles[self.title_index[i]]
+            )
+            self.evaluations[i] = evaluation
+            self.rarity_score[i] = evaluation.overall_rarity_score
+            self.premium_multiplier[i] = evaluation.premium_multiplier
+        return self
+
+    def per_offer(self, value: Union[float, Sequence[Optional[float]], None]) -> "np.ndarray":
+        """Difunde un valor por título (escalar o uno por título, None = NaN) a cada oferta."""
+        if value is None or np.ndim(value) == 0:
+            return np.full(len(self.offers), np.nan if value is None else float(value))
+        per_title = np.array([np.nan if v is None else v for v in value], dtype=np.float64)
+        return per_title[self.title_index]
+
+    def no_lock_mean_usd(self) -> "np.ndarray":
+        """Media por título de las ofertas sin trade lock (NaN si no hay), como OrderBook.no_lock_mean_usd."""
+        free = ~self.has_trade_lock
+        n_titles = len(self.titles)
+        sums = np.bincount(self.title_index[free], weights=self.price_cents[free].astype(np.float64), minlength=n_titles)
+        counts = np.bincount(self.title_index[free], minlength=n_titles)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, sums / counts / 100.0, np.nan)
+
+
+@dataclass
+class KernelHits:
+    """Ofertas que superan los umbrales de un kernel (índices en OfferColumns) y sus importes."""
+    index: "np.ndarray"
+    sell_cents: "np.ndarray"
+    commission_cents: "np.ndarray"
+    profit_cents: "np.ndarray"
+    discount: Optional["np.ndarray"] = None
+    profit_percentage: Optional["np.ndarray"] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def take(self, keep: "np.ndarray") -> "KernelHits":
+        return KernelHits(
+            self.index[keep], self.sell_cents[keep], self.commission_cents[keep], self.profit_cents[keep],
+            None if self.discount is None else self.discount[keep],
+            None if self.profit_percentage is None else self.profit_percentage[keep]
+        )
+
+
+def _profit(columns: OfferColumns, index: "np.ndarray", sell_usd: "np.ndarray", fees: FeeSchedule,
+            discount: Optional["np.ndarray"] = None) -> KernelHits:
+    """Comisión y beneficio de vender a sell_usd las ofertas `index` (centavos truncados como int())."""
+    sell_cents = (sell_usd * 100).astype(np.int64)
+    commission_cents = fees.fee_cents_array(sell_cents)
+    profit_cents = sell_cents - columns.price_cents[index] - commission_cents
+    price_usd = columns.price_cents[index] / 100.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_percentage = np.where(price_usd > 0, (profit_cents / 100.0) / price_usd, 0.0)
+    return KernelHits(index, sell_cents, commission_cents, profit_cents, discount, profit_percentage)
+
+
+def snipe_kernel(columns: OfferColumns, pme_usd: Union[float, Sequence[Optional[float]], None],
+                 fees: FeeSchedule, min_price_usd: float, discount_threshold: float) -> KernelHits:
+    """
+    Versión vectorizada de StrategyEngine._find_snipes: ofertas con precio >= min_price_usd
+    y descuento sobre el PME >= discount_threshold cuyo beneficio al revender al PME,
+    descontada la comisión, es positivo.
+
+    Args:
+        pme_usd: PME del título, o uno por título si las columnas apilan varios.
+    """
+    price_usd = columns.price_cents / 100.0
+    pme = columns.per_offer(pme_usd)
+    index = np.flatnonzero((price_usd >= min_price_usd) & (pme > 0))
+    pme = pme[index]
+    discount = (pme - price_usd[index]) / pme
+    keep = discount >= discount_threshold
+    hits = _profit(columns, index[keep], pme[keep], fees, discount[keep])
+    return hits.take(hits.profit_cents > 0)
+
+
+def attribute_flip_kernel(columns: OfferColumns, base_price_usd: Union[float, Sequence[Optional[float]], None],
+                          fees: FeeSchedule, max_price_usd: float, min_rarity_score: float,
+                          min_premium_multiplier: float, min_profit_usd: float,
+                          min_profit_percentage: float) -> KernelHits:
+    """
+    Versión vectorizada de StrategyEngine._find_attribute_premium_flips sobre columnas
+    ya puntuadas (score_attributes): precio estimado = precio base × multiplicador de premium.
+    """
+    price_usd = columns.price_cents / 100.0
+    base = columns.per_offer(base_price_usd)
+    mask = (
+        (price_usd <= max_price_usd)
+        & (columns.rarity_score >= min_rarity_score)
+        & (columns.premium_multiplier >= min_premium_multiplier)
+        & ~np.isnan(base) & (base != 0)
+    )
+    index = np.flatnonzero(mask)
+    hits = _profit(columns, index, base[index] * columns.premium_multiplier[index], fees)
+    return hits.take((hits.profit_cents / 100.0 >= min_profit_usd) & (hits.profit_percentage >= min_profit_percentage))
+
+
+def trade_lock_kernel(columns: OfferColumns, fees: FeeSchedule, max_lock_days: int, min_discount: float,
+                      min_profit_usd: float, min_profit_percentage: float,
+                      reference_usd: Union[float, Sequence[Optional[float]], None] = None) -> KernelHits:
+    """
+    Versión vectorizada de StrategyEngine._find_trade_lock_opportunities: ofertas con trade
+    lock de como mucho max_lock_days con descuento suficiente sobre el precio de referencia
+    (por defecto, la media por título de las ofertas sin lock) y beneficio al venderlas a él.
+    """
+    reference = columns.per_offer(columns.no_lock_mean_usd() if reference_usd is None else reference_usd)
+    price_usd = columns.price_cents / 100.0
+    index = np.flatnonzero(
+        columns.has_trade_lock & (columns.lock_days <= max_lock_days) & ~np.isnan(reference) & (reference != 0)
+    )
+    reference = reference[index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discount = np.where(reference > 0, (reference - price_usd[index]) / reference, 0.0)
+    keep = discount >= min_discount
+    hits = _profit(columns, index[keep], reference[keep], fees, discount[keep])
+    return hits.take((hits.profit_cents / 100.0 >= min_profit_usd) & (hits.profit_percentage >= min_profit_percentage))
@@ -0,0 +1,37 @@
+# tests/conftest.py
+"""
+Fixtures comunes: el paquete raíz en sys.path (como en benchmarks/) y una BD SQLite en
+memoria en lugar de ./cs2_trading.db para los módulos que usan get_db().
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    """Sustituye get_db() de core.real_trader por sesiones sobre una BD en memoria con todas las tablas."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from core.data_manager import Base
+    import core.models  # noqa: F401  (registra las tablas de trading real en Base)
+    import core.real_trader
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(core.real_trader, "get_db", get_db)
+    return session_factory
@@ -0,0 +1,50 @@
+# tests/test_dmarket_connector.py
+"""DMarketAPI: la prioridad fijada con request_priority() llega a las peticiones hechas en hilos auxiliares."""
+
+import threading
+
+import pytest
+
+from core.dmarket_connector import DMarketAPI
+from core.request_scheduler import RequestPriority, request_priority, resolve_priority
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = DMarketAPI(public_key="a" * 64, secret_key="b" * 128, base_url="https://api.test")
+    api.sent = []
+    api.pages = {None: {"objects": [{"itemId": "o1"}], "cursor": "c1"}, "c1": {"objects": [{"itemId": "o2"}], "cursor": ""}}
+
+    def fake_request(method, endpoint, params=None, body_data=None):
+        api.sent.append((endpoint, resolve_priority(method, endpoint), threading.current_thread().name))
+        if endpoint.endswith("/market/items"):
+            return api.pages[(params or {}).get("cursor")]
+        return {"aggregatedPrices": []}
+
+    monkeypatch.setattr(api, "_request_with_retries", fake_request)
+    return api
+
+
+def test_aggregated_prices_chunks_keep_request_priority(api):
+    api.AGGREGATED_PRICES_CHUNK = 1
+
+    with request_priority(RequestPriority.POSITION):
+        api.get_aggregated_prices(["A", "B", "C"])
+
+    assert len(api.sent) == 3
+    assert all(thread.startswith("dmarket-prices") for _, _, thread in api.sent)
+    assert [priority for _, priority, _ in api.sent] == [RequestPriority.POSITION] * 3
+
+
+def test_prefetched_page_keeps_request_priority(api):
+    with request_priority(RequestPriority.EXECUTION):
+        pages = list(api.iter_market_items(title="AK-47 | Redline (Field-Tested)", prefetch=True))
+
+    assert [offer["itemId"] for page in pages for offer in page] == ["o1", "o2"]
+    assert api.sent[1][2].startswith("dmarket-prefetch")
+    assert [priority for _, priority, _ in api.sent] == [RequestPriority.EXECUTION] * 2
+
+
+def test_priority_defaults_outside_request_priority(api):
+    api.get_aggregated_prices(["A"])
+    assert api.sent[0][1] == resolve_priority("POST", "/marketplace-api/v1/aggregated-prices")
@@ -0,0 +1,93 @@
+# tests/test_http_transport.py
+"""Transporte HTTP/2 (httpx): _send_prepared a través de _HttpxSession con un httpx simulado."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import core.http_transport as http_transport
+from core.dmarket_connector import DMarketAPI
+from core.http_transport import TransportConfig, _HttpxSession
+
+
+class FakeHttpxResponse:
+    """Lo que _HttpxResponse lee de un httpx.Response."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.http_version = "HTTP/2"
+        self.content = json.dumps(payload).encode("utf-8")
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeHttpxClient:
+    """httpx.Client que responde con una cola de respuestas y anota las peticiones."""
+
+    def __init__(self, http2=False, transport=None, timeout=None):
+        self.responses = []
+        self.requests = []
+
+    def request(self, method, url, params=None, json=None, content=None, headers=None, timeout=None):
+        self.requests.append((method, url, content))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+class _HttpxError(Exception):
+    pass
+
+
+@pytest.fixture
+def fake_httpx(monkeypatch):
+    fake = SimpleNamespace(
+        Limits=lambda **kwargs: kwargs,
+        HTTPTransport=lambda **kwargs: kwargs,
+        Client=FakeHttpxClient,
+        USE_CLIENT_DEFAULT=None,
+        HTTPError=_HttpxError,
+        TransportError=type("TransportError", (_HttpxError,), {}),
+        TimeoutException=type("TimeoutException", (_HttpxError,), {}),
+    )
+    monkeypatch.setattr(http_transport, "httpx", fake)
+    return fake
+
+
+@pytest.fixture
+def api_over_httpx(fake_httpx):
+    api = DMarketAPI(public_key="a" * 64, secret_key="b" * 128, base_url="https://api.test")
+    api.session = _HttpxSession(TransportConfig(http2=True), timeout=5)
+    return api
+
+
+def test_send_prepared_reads_httpx_content(api_over_httpx):
+    api_over_httpx.session.client.responses.append(FakeHttpxResponse(200, {"objects": [], "cursor": ""}))
+    prepared = api_over_httpx._prepare_request("GET", "/exchange/v1/market/items", {"gameId": "a8db"})
+    sample = {}
+
+    result, headers = api_over_httpx._send_prepared(prepared, sample)
+
+    assert result == {"objects": [], "cursor": ""}
+    assert headers["Content-Type"] == "application/json"
+    assert sample["bytes_received"] == len(b'{"objects": [], "cursor": ""}')
+    assert api_over_httpx.session.last_http_version == "HTTP/2"
+
+
+def test_send_prepared_maps_httpx_http_errors(api_over_httpx):
+    api_over_httpx.session.client.responses.append(FakeHttpxResponse(404, {"message": "not found"}))
+    prepared = api_over_httpx._prepare_request("GET", "/exchange/v1/market/items", {"gameId": "a8db"})
+
+    result, _ = api_over_httpx._send_prepared(prepared)
+
+    assert result["error"] == "HTTPError"
+    assert result["status_code"] == 404
+    assert result["message"] == {"message": "not found"}
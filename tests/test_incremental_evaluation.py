@@ -0,0 +1,95 @@
+# tests/test_incremental_evaluation.py
+"""Evaluación incremental de StrategyEngine: las oportunidades reutilizadas deben seguir en el libro
+y los candidatos del servidor se vuelven a pedir."""
+
+from core.market_analyzer import MarketAnalyzer
+from core.order_book import OrderBook
+from core.strategy_engine import StrategyEngine, STRATEGY_KEYS
+
+TITLE = "AK-47 | Redline (Field-Tested)"
+
+
+def _item(asset_prices):
+    offers = [{"assetId": asset_id, "title": TITLE, "price": {"USD": str(cents)}} for asset_id, cents in asset_prices]
+    return {"title": TITLE, "current_sell_offers": offers, "current_buy_orders": [], "historical_prices": [],
+            "order_book": OrderBook.from_raw(TITLE, offers)}
+
+
+def _engine(monkeypatch, server_candidates=()):
+    engine = StrategyEngine(None, MarketAnalyzer(), {"attribute_server_filters": True})
+    engine.server_candidates = list(server_candidates)
+    engine.candidate_fetches = 0
+
+    def run_all(item_data, order_book):
+        # Un flip de un candidato del servidor (fuera del libro) y un snipe de una oferta del libro
+        results = {key: [] for key in STRATEGY_KEYS}
+        results["attribute_flips"] = [{"asset_id": "server-1", "item_title": TITLE}]
+        results["snipes"] = [{"asset_id": order_book.asks[0].asset_id, "item_title": TITLE}]
+        return results
+
+    def fetch_candidates(item_title, market_analyzer):
+        engine.candidate_fetches += 1
+        return engine.server_candidates
+
+    def attribute_flips(item_data, fee_info, market_analyzer, server_candidates=True):
+        # Toda ask evaluada es un flip
+        return [{"asset_id": o.asset_id, "item_title": TITLE} for o in OrderBook.from_item_data(item_data).asks]
+
+    monkeypatch.setattr(engine, "_run_all_strategies", run_all)
+    monkeypatch.setattr(engine, "_fetch_attribute_candidates", fetch_candidates)
+    monkeypatch.setattr(engine, "_find_attribute_premium_flips", attribute_flips)
+    return engine
+
+
+SERVER_CANDIDATE = {"assetId": "server-1", "title": TITLE, "price": {"USD": "150"}}
+
+
+def test_skipped_evaluation_refreshes_server_candidates(monkeypatch):
+    engine = _engine(monkeypatch, [SERVER_CANDIDATE])
+    first = engine.analyze_item_data(_item([("a1", 100), ("a2", 120)]))
+    assert [o["asset_id"] for o in first["attribute_flips"]] == ["server-1"]
+
+    again = engine.analyze_item_data(_item([("a1", 100), ("a2", 120)]))
+    assert engine.get_evaluation_stats()["skipped"] == 1
+    assert engine.candidate_fetches == 1
+    assert [o["asset_id"] for o in again["attribute_flips"]] == ["server-1"]
+    assert [o["asset_id"] for o in again["snipes"]] == ["a1"]
+
+    # El candidato se vendió: el servidor ya no lo devuelve
+    engine.server_candidates = []
+    sold = engine.analyze_item_data(_item([("a1", 100), ("a2", 120)]))
+    assert sold["attribute_flips"] == []
+
+
+def test_delta_evaluation_refreshes_server_candidates(monkeypatch):
+    engine = _engine(monkeypatch, [SERVER_CANDIDATE, {"assetId": "a2", "title": TITLE, "price": {"USD": "120"}}])
+    engine.analyze_item_data(_item([("a1", 100), ("a2", 120)]))
+    # Una oferta nueva por encima de la mejor: mismo contexto, libro distinto
+    delta = engine.analyze_item_data(_item([("a1", 100), ("a2", 120), ("a3", 130)]))
+    assert engine.get_evaluation_stats()["delta"] == 1
+    # a3 (nueva en el libro) y server-1 (candidato); a2 está en el libro y no se duplica
+    assert sorted(o["asset_id"] for o in delta["attribute_flips"]) == ["a3", "server-1"]
+    assert [o["asset_id"] for o in delta["snipes"]] == ["a1"]
+
+
+def test_incremental_evaluation_without_server_filters_skips_fetch(monkeypatch):
+    engine = _engine(monkeypatch, [SERVER_CANDIDATE])
+    engine.config["attribute_server_filters"] = False
+    engine.analyze_item_data(_item([("a1", 100)]))
+    again = engine.analyze_item_data(_item([("a1", 100)]))
+    assert engine.candidate_fetches == 0
+    assert again["attribute_flips"] == []
+
+
+def test_carried_over_drops_unlisted_and_repriced_assets():
+    book = OrderBook.from_raw(TITLE, [{"assetId": "a1", "price": {"USD": "100"}},
+                                      {"assetId": "a2", "price": {"USD": "90"}}])
+    previous = {
+        "snipes": [{"asset_id": "a1"}, {"asset_id": "a2"}, {"asset_id": "sold"}],
+        "attribute_flips": [{"asset_id": "server-1"}],
+        "basic_flips": [{"asset_id": None}],
+    }
+    carried = StrategyEngine._carried_over(previous, book, gone=frozenset({"a2"}))
+    assert [o["asset_id"] for o in carried["snipes"]] == ["a1"]
+    assert carried["attribute_flips"] == []
+    assert carried["basic_flips"] == previous["basic_flips"]
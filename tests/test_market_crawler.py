@@ -0,0 +1,57 @@
+# tests/test_market_crawler.py
+"""MarketCrawler ante errores de paginación: reintento del resto del shard y snapshot incompleto."""
+
+import asyncio
+
+from core.market_crawler import MarketCrawler
+
+
+class FlakyMarketAPI:
+    """
+    iter_market_items sobre un libro fijo ordenado por precio. Las `fail_times` primeras
+    iteraciones se cortan con un error tras la primera página.
+    """
+
+    def __init__(self, offers, fail_times):
+        self.offers = sorted(offers, key=lambda o: int(o["price"]["USD"]))
+        self.fail_times = fail_times
+        self.calls = []
+
+    async def iter_market_items(self, price_from=None, price_to=None, limit=100, max_pages=None, on_error=None, **kwargs):
+        self.calls.append((price_from, price_to))
+        in_range = [o for o in self.offers if price_from <= int(o["price"]["USD"]) <= price_to]
+        pages = [in_range[i:i + limit] for i in range(0, len(in_range), limit)]
+        for number, page in enumerate(pages[:max_pages] if max_pages else pages):
+            if number == 1 and self.fail_times > 0:
+                self.fail_times -= 1
+                on_error({"error": "CircuitOpen"})
+                return
+            yield page
+
+
+def _offers(count):
+    return [{"assetId": f"a{i}", "title": f"Title {i % 7}", "price": {"USD": str(100 + i)}} for i in range(count)]
+
+
+def _crawl(api):
+    config = {"initial_shards": 1, "min_price_cents": 1, "max_price_cents": 10_000, "page_limit": 10,
+              "page_budget_per_shard": 100, "retry_backoff_sec": 0.0, "max_shard_retries": 2}
+    return asyncio.run(MarketCrawler(api, config).crawl())
+
+
+def test_interrupted_shard_is_resumed_from_last_price():
+    api = FlakyMarketAPI(_offers(30), fail_times=1)
+    snapshot = _crawl(api)
+    assert snapshot.complete
+    assert snapshot.total_offers == 30
+    # El reintento empieza en el último precio de la página ya recorrida
+    assert api.calls[1] == (109, 10_000)
+
+
+def test_exhausted_retries_mark_snapshot_incomplete():
+    api = FlakyMarketAPI(_offers(30), fail_times=10)
+    snapshot = _crawl(api)
+    assert snapshot.shards_failed == 1
+    assert not snapshot.complete
+    assert snapshot.shards_crawled == 0
+    assert len(api.calls) == 3
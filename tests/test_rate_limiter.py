@@ -0,0 +1,82 @@
+# tests/test_rate_limiter.py
+"""RateLimiter: recarga del token bucket, bloqueo tras 429 y adaptación a las cabeceras de rate-limit."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import core.rate_limiter as rate_limiter
+from core.dmarket_connector import DMarketAPI
+from core.dmarket_standin import DMarketStandInServer, StandInConfig
+from core.rate_limiter import EndpointFamily, RateLimiter, TokenBucket
+
+MARKET = EndpointFamily.MARKET
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate_per_sec=2.0, burst=2.0)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.value += 0.5
+    assert bucket.try_acquire() == 0.0
+    # La recarga no supera la ráfaga
+    clock.value += 10.0
+    assert bucket.snapshot()["tokens"] == pytest.approx(2.0)
+
+
+def test_register_429_blocks_for_retry_after(clock):
+    limiter = RateLimiter({MARKET: (10.0, 10.0)}, jitter_fraction=0.0)
+    delay = limiter.register_429(MARKET, {"Retry-After": "3"}, attempt=0)
+
+    assert delay == pytest.approx(3.0)
+    assert limiter.try_acquire(MARKET) == pytest.approx(3.0)
+    clock.value += 2.9
+    assert limiter.try_acquire(MARKET) == pytest.approx(0.1)
+    clock.value += 0.1
+    assert limiter.try_acquire(MARKET) == 0.0
+    assert limiter.get_stats()[MARKET.value]["throttled_429"] == 1
+
+
+def test_register_429_without_retry_after_backs_off(clock):
+    limiter = RateLimiter({MARKET: (10.0, 10.0)}, base_backoff_sec=1.0, jitter_fraction=0.0)
+    assert limiter.register_429(MARKET, {}, attempt=2) == pytest.approx(4.0)
+    assert limiter.try_acquire(MARKET) == pytest.approx(4.0)
+
+
+def test_update_from_headers_spreads_remaining_budget(clock):
+    limiter = RateLimiter({MARKET: (10.0, 10.0)})
+    limiter.update_from_headers(MARKET, {"RateLimit-Remaining": "5", "RateLimit-Reset": "10"})
+    assert limiter.buckets[MARKET].rate == pytest.approx(0.5)
+
+    # La tasa nunca supera el máximo configurado
+    limiter.update_from_headers(MARKET, {"X-RateLimit-Remaining": "500", "X-RateLimit-Reset": "1"})
+    assert limiter.buckets[MARKET].rate == pytest.approx(10.0)
+
+
+def test_update_from_headers_blocks_when_exhausted(clock):
+    limiter = RateLimiter({MARKET: (10.0, 10.0)})
+    limiter.update_from_headers(MARKET, {"RateLimit-Remaining": "0", "RateLimit-Reset": "2"})
+    assert limiter.try_acquire(MARKET) == pytest.approx(2.0)
+    # Sin cabeceras (o incompletas) no cambia nada
+    limiter.update_from_headers(MARKET, {"RateLimit-Remaining": "3"})
+    assert limiter.buckets[MARKET].rate == pytest.approx(10.0)
+
+
+def test_limiter_paces_requests_under_standin_max_rps():
+    with DMarketStandInServer(StandInConfig(latency_ms=0, titles=5, max_rps=20)) as server:
+        # Ventanas fijas de 1 s en el stand-in: un bucket de ráfaga 1 deja pasar como mucho rate + 1 por ventana
+        api = DMarketAPI(server.public_key, server.secret_key, base_url=server.base_url, max_429_retries=0,
+                         rate_limiter=RateLimiter({family: (15.0, 1.0) for family in EndpointFamily}))
+        results = [api.get_market_items(game_id="a8db", limit=1, price_from=i) for i in range(25)]
+
+        assert all("error" not in result for result in results)
+        assert server.get_stats()["rate_limited_429"] == 0
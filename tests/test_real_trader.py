@@ -0,0 +1,154 @@
+# tests/test_real_trader.py
+"""Compras y ventas batch de RealTrader: precios en centavos y fallos parciales tras confirmar DMarket."""
+
+from datetime import datetime, timezone
+
+from core.dmarket_connector import usd_to_cents
+from core.models import RealPortfolio
+from core.real_trader import RealTrader
+
+
+class FakeDMarketAPI:
+    """Conector mínimo: balance fijo y compras batch que aceptan todo salvo `rejected`."""
+
+    def __init__(self, response_override=None, rejected=()):
+        self.bought = []
+        self.response_override = response_override
+        self.rejected = set(rejected)
+
+    def get_account_balance(self):
+        return {"usd": "100000"}
+
+    def buy_items(self, offers):
+        self.bought.extend(offers)
+        if self.response_override is not None:
+            return self.response_override
+        return {
+            "results": {
+                asset_id: {"success": asset_id not in self.rejected, "error": "Rejected" if asset_id in self.rejected else None,
+                           "details": {"assetId": asset_id}}
+                for asset_id, _ in offers
+            }
+        }
+
+
+def _opportunity(asset_id, price_usd, title="AK-47 | Redline (Field-Tested)"):
+    return {"item_title": title, "buy_price_usd": price_usd, "asset_id": asset_id, "strategy": "snipes"}
+
+
+def test_usd_to_cents_rounds():
+    assert usd_to_cents(0.57) == 57
+    assert usd_to_cents(1.15) == 115
+    assert usd_to_cents(19.99) == 1999
+
+
+def test_batch_buy_sends_rounded_cents(memory_db):
+    api = FakeDMarketAPI()
+    trader = RealTrader(api)
+    results = trader.execute_real_buys([_opportunity("a1", 0.57), _opportunity("a2", 1.15)])
+    assert api.bought == [("a1", 57), ("a2", 115)]
+    assert [r["success"] for r in results] == [True, True]
+    assert all(r["recorded"] for r in results)
+
+
+def test_batch_buy_record_failure_keeps_confirmed_buys(memory_db, monkeypatch):
+    api = FakeDMarketAPI(rejected={"a3"})
+    trader = RealTrader(api)
+    original = trader._record_buy
+
+    def failing_record_buy(db, opportunity, item_title, *args):
+        if opportunity["asset_id"] == "a2":
+            raise RuntimeError("disco lleno")
+        return original(db, opportunity, item_title, *args)
+
+    monkeypatch.setattr(trader, "_record_buy", failing_record_buy)
+    results = trader.execute_real_buys([
+        _opportunity("a1", 1.00, "Title A"), _opportunity("a2", 2.00, "Title B"), _opportunity("a3", 3.00, "Title C")
+    ])
+
+    assert all(result is not None for result in results)
+    assert results[0]["success"] and results[0]["recorded"]
+    # Comprado en DMarket pero no registrado: se informa como éxito sin registrar
+    assert results[1]["success"] and not results[1]["recorded"]
+    assert not results[2]["success"]
+    db = memory_db()
+    try:
+        assert [p.item_title for p in db.query(RealPortfolio).all()] == ["Title A"]
+    finally:
+        db.close()
+
+
+def test_batch_buy_without_results_fills_every_slot(memory_db):
+    trader = RealTrader(FakeDMarketAPI(response_override={"error": "BadGateway"}))
+    results = trader.execute_real_buys([_opportunity("a1", 1.00), _opportunity("a2", 2.00)])
+    assert [r["success"] for r in results] == [False, False]
+    assert all("BadGateway" in r["reason"] for r in results)
+
+
+def _add_positions(memory_db, *positions):
+    db = memory_db()
+    try:
+        for title, asset_id in positions:
+            db.add(RealPortfolio(item_title=title, strategy_type="snipes", quantity=1, avg_cost_usd=1.00,
+                                 asset_id=asset_id, acquired_at=datetime.now(timezone.utc)))
+        db.commit()
+    finally:
+        db.close()
+
+
+class SellAPI(FakeDMarketAPI):
+    """Ventas batch que aceptan todo salvo `rejected`."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.listed = []
+
+    def create_sell_offers(self, items, game_id="a8db"):
+        self.listed.extend(items)
+        if self.response_override is not None:
+            return self.response_override
+        return {"results": {asset_id: {"success": asset_id not in self.rejected,
+                                       "error": "Rejected" if asset_id in self.rejected else None,
+                                       "details": {"offerId": f"offer-{asset_id}"}}
+                            for asset_id, _ in items}}
+
+
+def test_batch_sell_sends_rounded_cents(memory_db):
+    _add_positions(memory_db, ("Title A", "a1"))
+    api = SellAPI(rejected={"a1"})
+    RealTrader(api).execute_real_sells([("Title A", 1.15)])
+    assert api.listed == [("a1", 115)]
+
+
+def test_batch_sell_record_failure_keeps_confirmed_sales(memory_db, monkeypatch):
+    _add_positions(memory_db, ("Title A", "a1"), ("Title B", "a2"), ("Title C", "a3"))
+    trader = RealTrader(SellAPI(rejected={"a3"}))
+    original = trader._record_sell
+
+    def failing_record_sell(db, position, *args):
+        if position.asset_id == "a2":
+            raise RuntimeError("disco lleno")
+        return original(db, position, *args)
+
+    monkeypatch.setattr(trader, "_record_sell", failing_record_sell)
+    results = trader.execute_real_sells([("Title A", 2.00), ("Title B", 2.00), ("Title C", 2.00)])
+
+    assert results[0]["success"] and results[0]["recorded"] and results[0]["transaction_id"]
+    # Vendido en DMarket pero no registrado: se informa como éxito sin registrar
+    assert results[1]["success"] and not results[1]["recorded"]
+    assert not results[2]["success"]
+    db = memory_db()
+    try:
+        # La venta registrada sale del portfolio; la no registrada queda para conciliar
+        assert sorted(p.item_title for p in db.query(RealPortfolio).all()) == ["Title B", "Title C"]
+    finally:
+        db.close()
+
+
+def test_batch_sell_without_results_fills_every_slot(memory_db):
+    _add_positions(memory_db, ("Title A", "a1"), ("Title B", "a2"))
+    results = RealTrader(SellAPI(response_override={"error": "BadGateway"})).execute_real_sells(
+        [("Title A", 2.00), ("Title B", 2.00)]
+    )
+    assert [r["success"] for r in results] == [False, False]
+    assert all("BadGateway" in r["reason"] for r in results)
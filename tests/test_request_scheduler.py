@@ -0,0 +1,70 @@
+# tests/test_request_scheduler.py
+"""RequestScheduler: las compras adelantan a las lecturas encoladas y el escaneo se descarta sin presupuesto."""
+
+import threading
+import time
+
+import pytest
+
+from core.rate_limiter import EndpointFamily, RateLimiter
+from core.request_scheduler import LoadShed, RequestPriority, RequestScheduler
+
+MARKET = EndpointFamily.MARKET
+
+
+def _drained_limiter(rate_per_sec):
+    """Limitador con ráfaga 1 y el token de MARKET ya consumido."""
+    limiter = RateLimiter({MARKET: (rate_per_sec, 1.0)})
+    assert limiter.try_acquire(MARKET) <= 0
+    return limiter
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout esperando la condición"
+        time.sleep(0.01)
+
+
+def test_execution_overtakes_queued_scanning():
+    scheduler = RequestScheduler(_drained_limiter(4.0), shed_after_sec={RequestPriority.SCANNING: None})
+    granted = []
+    lock = threading.Lock()
+
+    def acquire(priority):
+        scheduler.acquire(MARKET, priority)
+        with lock:
+            granted.append(priority)
+
+    scanners = [threading.Thread(target=acquire, args=(RequestPriority.SCANNING,)) for _ in range(3)]
+    for thread in scanners:
+        thread.start()
+    _wait_until(lambda: scheduler._token_gates[MARKET].waiting(RequestPriority.SCANNING) == 3)
+
+    buyer = threading.Thread(target=acquire, args=(RequestPriority.EXECUTION,))
+    buyer.start()
+    for thread in scanners + [buyer]:
+        thread.join(timeout=5.0)
+
+    assert granted[0] == RequestPriority.EXECUTION
+    assert granted.count(RequestPriority.SCANNING) == 3
+    assert scheduler.get_stats()["priorities"]["execution"]["granted"] == 1
+
+
+def test_scanning_is_shed_when_budget_exhausted():
+    scheduler = RequestScheduler(_drained_limiter(0.1), shed_after_sec={RequestPriority.SCANNING: 0.2})
+    started = time.monotonic()
+
+    with pytest.raises(LoadShed) as shed:
+        scheduler.acquire(MARKET, RequestPriority.SCANNING)
+
+    # El token llegaría en ~10 s, más allá de la espera máxima: se descarta sin esperar
+    assert time.monotonic() - started < 1.0
+    assert shed.value.priority == RequestPriority.SCANNING
+    assert scheduler.get_stats()["priorities"]["scanning"]["shed"] == 1
+
+
+def test_scanning_is_shed_when_queue_full():
+    scheduler = RequestScheduler(_drained_limiter(0.1), max_waiting={RequestPriority.SCANNING: 0})
+    with pytest.raises(LoadShed, match="cola llena"):
+        scheduler.acquire(MARKET, RequestPriority.SCANNING)
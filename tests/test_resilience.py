@@ -0,0 +1,123 @@
+# tests/test_resilience.py
+"""Circuit breakers y política de reintentos: apertura, prueba half-open y métodos no idempotentes."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import core.resilience as resilience
+from core.dmarket_connector import DMarketAPI
+from core.rate_limiter import EndpointFamily
+from core.request_scheduler import LoadShed, RequestPriority
+from core.resilience import BreakerState, CircuitBreaker, RetryPolicy
+
+TIMEOUT = {"error": "Timeout", "message": "timed out"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_breaker_opens_after_failure_threshold(clock):
+    breaker = CircuitBreaker("GET /exchange/v1/market/items", failure_threshold=3, reset_timeout_sec=30.0)
+    for _ in range(2):
+        breaker.record(TIMEOUT)
+    assert breaker.state == BreakerState.CLOSED
+
+    breaker.record(TIMEOUT)
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+    assert breaker.open_error()["error"] == "CircuitOpen"
+    assert breaker.rejected == 1
+
+
+def test_success_resets_consecutive_failures(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=2)
+    breaker.record(TIMEOUT)
+    breaker.record({"objects": []})
+    breaker.record(TIMEOUT)
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_half_open_admits_a_single_probe(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=1, reset_timeout_sec=30.0)
+    breaker.record(TIMEOUT)
+    clock.value += 30.0
+    assert breaker.state == BreakerState.HALF_OPEN
+
+    assert breaker.allow()
+    assert not breaker.allow()  # La prueba sigue en vuelo
+
+    breaker.record({"objects": []})
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("GET /x", failure_threshold=1, reset_timeout_sec=30.0)
+    breaker.record(TIMEOUT)
+    clock.value += 30.0
+    assert breaker.allow()
+    breaker.record(TIMEOUT)
+    assert breaker.state == BreakerState.OPEN
+
+
+@pytest.mark.parametrize("method, endpoint", [
+    ("POST", "/exchange/v1/buy-offers"),
+    ("POST", "/exchange/v1/offers"),
+    ("PATCH", "/exchange/v1/offers"),
+])
+def test_retry_policy_never_retries_trades(method, endpoint):
+    assert not RetryPolicy().should_retry(method, TIMEOUT, 0, endpoint)
+
+
+def test_retry_policy_retries_reads():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry("POST", TIMEOUT, 0, "/marketplace-api/v1/aggregated-prices")
+    assert policy.should_retry("GET", {"error": "HTTPError", "status_code": 503}, 1, "/exchange/v1/market/items")
+    assert not policy.should_retry("GET", TIMEOUT, 2, "/exchange/v1/market/items")
+    assert not policy.should_retry("GET", {"error": "HTTPError", "status_code": 404}, 0, "/exchange/v1/market/items")
+
+
+@pytest.fixture
+def api_with_probe(monkeypatch):
+    """Conector cuyo breaker de market/items está en half-open y anota las llamadas a release()."""
+    api = DMarketAPI(public_key="a" * 64, secret_key="b" * 128, base_url="https://api.test")
+    breaker = api.circuit_breakers.get("GET", "/exchange/v1/market/items")
+    breaker._state = BreakerState.HALF_OPEN
+    breaker.released = 0
+    original_release = breaker.release
+
+    def counting_release():
+        breaker.released += 1
+        original_release()
+
+    monkeypatch.setattr(breaker, "release", counting_release)
+    return api, breaker
+
+
+def test_load_shed_releases_the_probe(api_with_probe):
+    api, breaker = api_with_probe
+
+    def shed(family, priority):
+        raise LoadShed(RequestPriority.SCANNING, EndpointFamily.MARKET, "presupuesto agotado")
+
+    api.request_scheduler = SimpleNamespace(acquire=shed, release=lambda: None)
+    result = api._request_with_retries("GET", "/exchange/v1/market/items")
+
+    assert result["error"] == "LoadShed"
+    assert breaker.released == 1
+    assert breaker.allow()  # La prueba no quedó ocupada
+
+
+def test_prepare_error_releases_the_probe(api_with_probe, monkeypatch):
+    api, breaker = api_with_probe
+    monkeypatch.setattr(api, "_prepare_request", lambda *args: {"error": "SignatureGenerationError"})
+    result = api._request_with_retries("GET", "/exchange/v1/market/items")
+
+    assert result["error"] == "SignatureGenerationError"
+    assert breaker.released == 1
+    assert breaker.allow()
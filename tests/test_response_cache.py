@@ -0,0 +1,53 @@
+# tests/test_response_cache.py
+"""ResponseCache: sin stale-while-revalidate para los libros de mercado, con él para cuenta e inventario."""
+
+import time
+
+from core.response_cache import ResponseCache
+
+MARKET_ITEMS = "/exchange/v1/market/items"
+
+
+def _counting_fetch():
+    calls = []
+
+    def fetch():
+        calls.append(time.monotonic())
+        return {"objects": [], "call": len(calls)}
+    return fetch, calls
+
+
+def _expire(cache):
+    # Adelanta las entradas hasta justo después de su ventana "fresco"
+    for entry in cache._entries.values():
+        shift = entry.fresh_until - time.monotonic() + 0.001
+        entry.fresh_until -= shift
+        entry.stale_until -= shift
+
+
+def test_market_items_not_served_stale_by_default():
+    cache = ResponseCache()
+    fetch, calls = _counting_fetch()
+    cache.get(MARKET_ITEMS, {"title": "T"}, fetch)
+    _expire(cache)
+    response = cache.get(MARKET_ITEMS, {"title": "T"}, fetch)
+    assert response["call"] == 2
+    assert cache.stats["stale_hits"] == 0
+
+
+def test_market_items_stale_is_opt_in():
+    cache = ResponseCache(ttls={MARKET_ITEMS: (1.0, 2.0)})
+    fetch, calls = _counting_fetch()
+    cache.get(MARKET_ITEMS, {"title": "T"}, fetch)
+    _expire(cache)
+    assert cache.get(MARKET_ITEMS, {"title": "T"}, fetch)["call"] == 1
+    assert cache.stats["stale_hits"] == 1
+
+
+def test_balance_keeps_stale_while_revalidate():
+    cache = ResponseCache()
+    fetch, calls = _counting_fetch()
+    cache.get("/account/v1/balance", None, fetch)
+    _expire(cache)
+    assert cache.get("/account/v1/balance", None, fetch)["call"] == 1
+    assert cache.stats["stale_hits"] == 1
@@ -0,0 +1,120 @@
+# tests/test_scan_lanes.py
+"""Watchlist del carril rápido (orden por motivo, caducidad, títulos pendientes) y reparto del presupuesto MARKET."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import core.scan_lanes as scan_lanes
+from core.order_book import OrderBook
+from core.rate_limiter import EndpointFamily, RateLimiter
+from core.scan_lanes import LaneBudget, Watchlist, WatchlistConfig, WatchReason
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(scan_lanes, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def _book(title, cents):
+    return OrderBook.from_raw(title, [{"assetId": f"{title}-1", "price": {"USD": str(cents)}}])
+
+
+def _watchlist(positions=(), stop_orders=(), **config):
+    trader = SimpleNamespace(config={"stop_loss_pct": -10.0}, get_open_positions=lambda: list(positions))
+    risk = SimpleNamespace(stop_loss_orders=list(stop_orders))
+    watchlist = Watchlist(WatchlistConfig(**config), real_trader=trader, risk_manager=risk)
+    watchlist.refresh(force=True)
+    return watchlist
+
+
+def test_ranks_stop_loss_before_positions_before_opportunities(clock):
+    # Stop en 9.0 USD (coste 10, stop_loss_pct -10): a menos del 10% del stop cuenta como cerca
+    watchlist = _watchlist(positions=[("Held", 10.0), ("Near", 10.0)])
+    watchlist.note_scan("Opp", _book("Opp", 500), [{"strategy": "snipes"}])
+    watchlist.note_scan("Held", _book("Held", 1200))
+    watchlist.note_scan("Near", _book("Near", 950))
+    watchlist.note_scan("Quiet", _book("Quiet", 300))
+
+    assert watchlist.entries() == [
+        ("Near", WatchReason.STOP_LOSS), ("Held", WatchReason.POSITION), ("Opp", WatchReason.OPPORTUNITY)
+    ]
+    assert "Quiet" not in watchlist
+
+
+def test_pending_stop_loss_orders_are_watched(clock):
+    order = SimpleNamespace(item_title="Ordered", stop_loss_price_usd=4.0, triggered=False, executed=False)
+    done = SimpleNamespace(item_title="Done", stop_loss_price_usd=4.0, triggered=True, executed=True)
+    watchlist = _watchlist(stop_orders=[order, done])
+    watchlist.note_scan("Ordered", _book("Ordered", 420))
+
+    assert watchlist.entries() == [("Ordered", WatchReason.STOP_LOSS)]
+
+
+def test_closer_to_stop_ranks_first(clock):
+    watchlist = _watchlist(positions=[("A", 10.0), ("B", 10.0)])
+    watchlist.note_scan("A", _book("A", 980))
+    watchlist.note_scan("B", _book("B", 920))
+    assert watchlist.titles() == ["B", "A"]
+
+
+def test_opportunities_expire_after_ttl(clock):
+    watchlist = _watchlist(opportunity_ttl_sec=600.0)
+    watchlist.note_scan("Old", _book("Old", 100), [{}])
+    clock.value += 300.0
+    watchlist.note_scan("New", _book("New", 100), [{}])
+    assert watchlist.titles() == ["New", "Old"]  # Las más recientes primero
+
+    clock.value += 301.0
+    assert watchlist.titles() == ["New"]
+
+
+def test_max_size_caps_entries(clock):
+    watchlist = _watchlist(max_size=2)
+    for title in ("A", "B", "C"):
+        watchlist.note_scan(title, _book(title, 100), [{}])
+        clock.value += 1.0
+    assert watchlist.titles() == ["C", "B"]
+
+
+def test_due_titles_polls_each_title_once_per_interval(clock):
+    watchlist = _watchlist(positions=[("A", 10.0), ("B", 10.0)])
+    assert sorted(watchlist.due_titles(5.0)) == ["A", "B"]
+    assert watchlist.due_titles(5.0) == []
+    assert watchlist.seconds_until_next_due(5.0) == pytest.approx(5.0)
+
+    clock.value += 5.0
+    assert sorted(watchlist.due_titles(5.0)) == ["A", "B"]
+
+
+def test_lane_budget_takes_its_share_of_the_family_rate():
+    limiter = RateLimiter({EndpointFamily.MARKET: (10.0, 10.0)})
+    fast = LaneBudget(limiter, share=0.3, requests_per_item=2.0)
+    slow = LaneBudget(limiter, share=0.6, requests_per_item=2.0)
+    assert fast.items_per_sec() == pytest.approx(1.5)
+    assert slow.items_per_sec() == pytest.approx(3.0)
+
+    # La tasa de la familia baja (cabeceras de DMarket): el carril la sigue en su siguiente acquire
+    limiter.update_from_headers(EndpointFamily.MARKET, {"RateLimit-Remaining": "50", "RateLimit-Reset": "10"})
+    assert fast.acquire(threading.Event())
+    assert fast.items_per_sec() == pytest.approx(0.75)
+
+
+def test_lane_budget_stops_waiting_when_stopped():
+    limiter = RateLimiter({EndpointFamily.MARKET: (10.0, 10.0)})
+    lane = LaneBudget(limiter, share=0.1, requests_per_item=2.0)
+    stop = threading.Event()
+    assert lane.acquire(stop)
+    stop.set()
+    assert not lane.acquire(stop)
+
+
+def test_lane_budget_rejects_invalid_share():
+    limiter = RateLimiter()
+    with pytest.raises(ValueError):
+        LaneBudget(limiter, share=0.0)
+    with pytest.raises(ValueError):
+        LaneBudget(limiter, share=1.5)
@@ -0,0 +1,63 @@
+# tests/test_trading_pipeline.py
+"""Control de riesgo y orden de TradingPipeline con las claves propias de cada estrategia."""
+
+from core.trading_pipeline import TradingPipeline, PipelineConfig
+
+
+class ApprovingRiskManager:
+    def __init__(self):
+        self.evaluated = []
+
+    def evaluate_trade_risk(self, item_title, price_usd, strategy):
+        self.evaluated.append((item_title, price_usd, strategy))
+        return True, 0.1, "ok"
+
+
+class FakeEngine:
+    scan_scheduler = None
+
+    def __init__(self, results):
+        self.results = results
+
+    def analyze_item_data(self, item_data):
+        return self.results
+
+
+def _snipe(asset_id="a1", price=1.50, profit=0.40):
+    # Formato de StrategyEngine._snipe_opportunity
+    return {"strategy": "snipe", "item_title": "AK-47 | Redline (Field-Tested)", "asset_id": asset_id,
+            "pme_usd": 2.10, "offer_price_usd": price, "profit_usd": profit}
+
+
+def _pipeline(config=None, results=None):
+    risk = ApprovingRiskManager()
+    return TradingPipeline(FakeEngine(results or {}), risk, None, config or PipelineConfig()), risk
+
+
+def test_snipe_passes_risk_gate_with_its_offer_price():
+    pipeline, risk = _pipeline(PipelineConfig(max_buy_price_usd=2.0, min_expected_profit_usd=0.25))
+    approved = list(pipeline._risk_gate(_snipe()))
+    assert len(approved) == 1
+    assert risk.evaluated == [("AK-47 | Redline (Field-Tested)", 1.50, "snipe")]
+    assert pipeline.stats.rejected_filters == 0
+
+
+def test_snipe_filtered_by_price_and_profit():
+    pipeline, _ = _pipeline(PipelineConfig(max_buy_price_usd=1.0))
+    assert list(pipeline._risk_gate(_snipe(price=1.50))) == []
+    pipeline, _ = _pipeline(PipelineConfig(min_expected_profit_usd=0.50))
+    assert list(pipeline._risk_gate(_snipe(profit=0.40))) == []
+    assert pipeline.stats.rejected_filters == 1
+
+
+def test_analyze_orders_by_normalised_profit():
+    results = {
+        "snipes": [_snipe("s1", profit=0.40)],
+        "attribute_flips": [{"strategy": "attribute_premium_flip", "item_title": "T", "asset_id": "f1",
+                             "buy_price_usd": 3.0, "potential_profit_usd": 0.90}],
+        "volatility_trading": [{"strategy": "volatility_trading", "item_title": "T",
+                        "entry_price_usd": 5.0, "expected_profit_usd": 0.10}],
+    }
+    pipeline, _ = _pipeline(results=results)
+    ordered = pipeline._analyze({"title": "T", "order_book": None})
+    assert [o.get("asset_id") for o in ordered] == ["f1", "s1", None]
@@ -0,0 +1,79 @@
+# tests/test_tree_filters.py
+"""Codificación de treeFilters y viaje de ida y vuelta firmado contra el stand-in de DMarket."""
+
+import pytest
+
+from core.dmarket_connector import DMarketAPI
+from core.dmarket_standin import DMarketStandInServer, StandInConfig
+from core.rate_limiter import EndpointFamily, RateLimiter
+from core.tree_filters import FilterRange, compact_seeds, encode_tree_filters, parse_tree_filters, range_from_parsed
+
+
+def test_keys_are_sorted():
+    assert encode_tree_filters({"paintSeed": 661, "exterior": "factory new"}) == "exterior[]=factory new,paintSeed[]=661"
+    assert encode_tree_filters({"b": 1, "a": 2}) == encode_tree_filters({"a": 2, "b": 1})
+
+
+def test_list_is_or_of_repeated_key():
+    assert encode_tree_filters({"exterior": ["factory new", "minimal wear"]}) == \
+        "exterior[]=factory new,exterior[]=minimal wear"
+    # Los conjuntos se ordenan para que la cadena sea estable
+    assert encode_tree_filters({"paintSeed": {661, 151}}) == "paintSeed[]=151,paintSeed[]=661"
+
+
+def test_filter_range_encodes_from_and_to():
+    assert encode_tree_filters({"floatValue": FilterRange(0.0, 0.01)}) == "floatValueFrom[]=0.0,floatValueTo[]=0.01"
+    assert encode_tree_filters({"floatValue": FilterRange(high=0.07)}) == "floatValueTo[]=0.07"
+    parsed = parse_tree_filters(encode_tree_filters({"floatValue": FilterRange(0.0, 0.01)}))
+    assert range_from_parsed(parsed, "floatValue") == FilterRange(0.0, 0.01)
+
+
+def test_empty_filters_encode_to_none():
+    assert encode_tree_filters(None) is None
+    assert encode_tree_filters({"paintSeed": None}) is None
+    assert encode_tree_filters({"paintSeed": []}) is None
+
+
+@pytest.mark.parametrize("tree_filters", [
+    {"exterior": "factory new,minimal wear"},
+    {"exterior": "a=b"},
+    {"ext,erior": "factory new"},
+    {"ext=erior": "factory new"},
+])
+def test_rejects_separators(tree_filters):
+    with pytest.raises(ValueError):
+        encode_tree_filters(tree_filters)
+
+
+def test_compact_seeds():
+    assert compact_seeds([5, 3, 4, 4]) == FilterRange(3, 5)
+    assert compact_seeds([661, 151, 555]) == [151, 555, 661]
+    assert compact_seeds([2, 1]) == [1, 2]
+
+
+@pytest.fixture
+def standin():
+    with DMarketStandInServer(StandInConfig(latency_ms=0, titles=20)) as server:
+        yield server
+
+
+def test_signed_round_trip_against_standin(standin):
+    api = DMarketAPI(standin.public_key, standin.secret_key, base_url=standin.base_url,
+                     rate_limiter=RateLimiter({family: (1000.0, 1000.0) for family in EndpointFamily}))
+    title = max({o.title for o in standin.market.offers.values()},
+                key=lambda t: sum(1 for o in standin.market.offers.values() if o.title == t))
+    offers = [o for o in standin.market.offers.values() if o.title == title]
+    floats = sorted(o.float_value for o in offers)
+    low, high = floats[len(floats) // 4], floats[3 * len(floats) // 4]
+    seeds = sorted({o.paintseed for o in offers})[:3]
+
+    by_float = api.get_market_items(game_id="a8db", limit=100, title=title,
+                                    tree_filters={"floatValue": FilterRange(low, high)})
+    by_seed = api.get_market_items(game_id="a8db", limit=100, title=title, tree_filters={"paintSeed": seeds})
+
+    assert "error" not in by_float and "error" not in by_seed
+    assert standin.get_stats()["signature_failures"] == 0
+    assert sorted(o["assetId"] for o in by_float["objects"]) == \
+        sorted(o.asset_id for o in offers if low <= o.float_value <= high)
+    assert sorted(o["assetId"] for o in by_seed["objects"]) == \
+        sorted(o.asset_id for o in offers if o.paintseed in seeds)
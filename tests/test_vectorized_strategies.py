@@ -0,0 +1,35 @@
+# tests/test_vectorized_strategies.py
+"""Los kernels NumPy encuentran las mismas oportunidades que las estrategias escalares (libro pequeño)."""
+
+import random
+
+import pytest
+
+from core.vectorized_strategies import NUMPY_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy no está instalado")
+
+STRATEGIES = ("snipes", "attribute_flips", "trade_lock_arbitrage")
+
+
+@pytest.fixture(scope="module")
+def cross_check():
+    from benchmarks.bench_vectorized_strategies import make_engine, run_engine, run_stacked, synthetic_items
+
+    items = synthetic_items(random.Random(7), titles=12, offers=3000)
+    return {
+        "escalar": run_engine(make_engine(0), items)["found"],
+        "engine+kernels": run_engine(make_engine(1), items)["found"],
+        "apilado": run_stacked(make_engine(0), items)["found"],
+    }
+
+
+def test_reference_finds_opportunities(cross_check):
+    # Sin hallazgos la comparación no probaría nada
+    assert all(cross_check["escalar"][strategy] for strategy in STRATEGIES)
+
+
+@pytest.mark.parametrize("variant", ["engine+kernels", "apilado"])
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_kernels_match_scalar(cross_check, variant, strategy):
+    assert cross_check[variant][strategy] == cross_check["escalar"][strategy]
@@ -8,7 +8,6 @@ Sin simulación - solo trades reales con dinero real.
 
 import os
 import sys
-import time
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
@@ -27,13 +26,39 @@ if not os.environ.get("DMARKET_PUBLIC_KEY") or not os.environ.get("DMARKET_SECRE
 
 # Imports del sistema
 from core.dmarket_connector import DMarketAPI
+from core.http_transport import TransportConfig
+from core.traffic_recorder import TrafficRecorder
+from core.connector_metrics import ConnectorMetrics
+from core.json_codec import ResponseDecoder
+from core.async_dmarket_connector import AsyncDMarketAPI
+from core.market_crawler import crawl_market
 from core.market_analyzer import MarketAnalyzer
 from core.strategy_engine import StrategyEngine
-from core.real_trader import RealTrader
+from core.scan_scheduler import ScanScheduler
+from core.scan_lanes import Watchlist
+from core.real_trader import RealTrader, opportunity_buy_price_usd, opportunity_profit_usd
 from core.kpi_tracker import KPITracker, KPIPeriod
+from core.risk_manager import RiskManager
+from core.trading_pipeline import TradingPipeline, PipelineConfig
 from core.inventory_manager import InventoryManager
 from core.data_manager import get_db
 
+# Lista de ítems populares usada como universo de escaneo hasta que se haga un crawl del mercado
+DEFAULT_SCAN_UNIVERSE = [
+    "AK-47 | Redline (Field-Tested)",
+    "AWP | Asiimov (Field-Tested)",
+    "M4A4 | Howl (Field-Tested)",
+    "Desert Eagle | Blaze (Factory New)",
+    "Glock-18 | Water Elemental (Factory New)",
+    "P250 | Sand Dune (Battle-Scarred)",
+    "UMP-45 | Gunsmoke (Battle-Scarred)",
+    "MP7 | Forest DDPAT (Battle-Scarred)",
+    "Nova | Forest Leaves (Battle-Scarred)",
+    "P90 | Sand Spray (Battle-Scarred)",
+    "Tec-9 | Groundwater (Battle-Scarred)",
+    "MAC-10 | Indigo (Battle-Scarred)"
+]
+
 class TradingConsole:
     """Consola interactiva para trading real."""
     
@@ -43,11 +68,25 @@ class TradingConsole:
         print("=" * 60)
         
         # Configurar componentes
-        self.api = DMarketAPI()
+        # Keep-warm: la sesión automática espera 60s entre ciclos y las compras no deben pagar el handshake TLS
+        # DMARKET_RECORD_TRAFFIC=<ruta.jsonl.gz> graba la sesión para replay (ver benchmarks/bench_replay.py)
+        record_path = os.environ.get("DMARKET_RECORD_TRAFFIC")
+        self.recorder = TrafficRecorder(record_path) if record_path else None
+        # DMARKET_METRICS_DUMP=<ruta.jsonl> vuelca las métricas por endpoint cada DMARKET_METRICS_DUMP_INTERVAL segundos
+        self.metrics = ConnectorMetrics(
+            dump_path=os.environ.get("DMARKET_METRICS_DUMP"),
+            dump_interval_sec=float(os.environ.get("DMARKET_METRICS_DUMP_INTERVAL", "60"))
+        )
+        self.api = DMarketAPI(
+            transport_config=TransportConfig(keep_warm_interval_sec=20.0),
+            recorder=self.recorder,
+            metrics=self.metrics
+        )
         self.market_analyzer = MarketAnalyzer()
         self.inventory_manager = InventoryManager()
         self.real_trader = RealTrader(self.api)
-        self.kpi_tracker = KPITracker(self.inventory_manager)
+        self.kpi_tracker = KPITracker(self.inventory_manager, dmarket_api=self.api)
+        self.risk_manager = RiskManager(self.inventory_manager, dmarket_api=self.api)
         
         # Configuración agresiva para encontrar oportunidades
         self.strategy_config = {
@@ -64,11 +103,21 @@ class TradingConsole:
             "min_fee_usd_dmarket": float(os.getenv("DMARKET_MIN_FEE_USD", "0.01"))
         }
         
+        # Universo de escaneo (se puede ampliar con refresh_scan_universe); el planificador
+        # decide qué títulos se escanean en cada pasada según lo aprendido en sesiones anteriores
+        self.scan_universe: List[str] = list(DEFAULT_SCAN_UNIVERSE)
+        self.scan_scheduler = ScanScheduler()
+        self.scan_scheduler.load()
+        self.scan_scheduler.set_universe(self.scan_universe)
+        
         self.strategy_engine = StrategyEngine(
             self.api, 
             self.market_analyzer, 
-            self.strategy_config
+            self.strategy_config,
+            scan_scheduler=self.scan_scheduler
         )
+        # Carril rápido de la sesión automática: posiciones, ítems cerca del stop-loss y oportunidades recientes
+        self.watchlist = Watchlist(real_trader=self.real_trader, risk_manager=self.risk_manager)
         
         # Verificar conexión
         self._verify_connection()
@@ -141,24 +190,8 @@ class TradingConsole:
         print(f"\n🔍 ESCANEANDO OPORTUNIDADES (máx {max_items} ítems)")
         print("=" * 60)
         
-        # Lista de ítems populares para escanear
-        items_to_scan = [
-            "AK-47 | Redline (Field-Tested)",
-            "AWP | Asiimov (Field-Tested)",
-            "M4A4 | Howl (Field-Tested)",
-            "Desert Eagle | Blaze (Factory New)",
-            "Glock-18 | Water Elemental (Factory New)",
-            "P250 | Sand Dune (Battle-Scarred)",
-            "UMP-45 | Gunsmoke (Battle-Scarred)",
-            "MP7 | Forest DDPAT (Battle-Scarred)",
-            "Nova | Forest Leaves (Battle-Scarred)",
-            "P90 | Sand Spray (Battle-Scarred)",
-            "Tec-9 | Groundwater (Battle-Scarred)",
-            "MAC-10 | Indigo (Battle-Scarred)"
-        ]
-        
-        # Limitar a max_items
-        items_to_scan = items_to_scan[:max_items]
+        # Los max_items títulos que el planificador considera más prometedores ahora
+        items_to_scan = self.strategy_engine.next_scan_batch(max_items)
         
         print(f"📋 Escaneando {len(items_to_scan)} ítems...")
         
@@ -184,15 +217,13 @@ class TradingConsole:
             if all_opportunities:
                 print(f"\n🔥 TOP 5 MEJORES OPORTUNIDADES:")
                 # Ordenar por profit esperado
-                sorted_opps = sorted(all_opportunities, 
-                                   key=lambda x: x.get('expected_profit_usd', 0), 
-                                   reverse=True)
+                sorted_opps = sorted(all_opportunities, key=opportunity_profit_usd, reverse=True)
                 
                 for i, opp in enumerate(sorted_opps[:5], 1):
                     item_title = opp.get('item_title', 'N/A')
                     strategy = opp.get('strategy', 'N/A')
-                    buy_price = opp.get('buy_price_usd', opp.get('entry_price_usd', 0))
-                    profit = opp.get('expected_profit_usd', 0)
+                    buy_price = opportunity_buy_price_usd(opp)
+                    profit = opportunity_profit_usd(opp)
                     roi = opp.get('profit_percentage', 0)
                     
                     print(f"\n   {i}. {item_title}")
@@ -211,11 +242,42 @@ class TradingConsole:
             traceback.print_exc()
             return []
     
+    def refresh_scan_universe(self, max_titles: int = 200):
+        """Recorre el mercado completo y usa los títulos más líquidos como universo de escaneo."""
+        print("\n🌐 CRAWL COMPLETO DEL MERCADO CS2")
+        print("=" * 60)
+        
+        try:
+            # El crawl solo necesita título, precio y assetId: se proyectan las ofertas para no retener páginas enteras
+            snapshot = crawl_market(AsyncDMarketAPI(
+                rate_limiter=self.api.rate_limiter,
+                response_decoder=ResponseDecoder(project_fields=True),
+                metrics=self.metrics
+            ))
+            titles = snapshot.top_titles(
+                limit=max_titles,
+                min_offers=2,
+                min_price_usd=self.strategy_config.get("min_price_usd_for_sniping", 0.0),
+                max_price_usd=self.strategy_config.get("max_trade_amount_usd")
+            )
+            print(f"📊 {len(snapshot.titles)} títulos, {snapshot.total_offers} ofertas en {snapshot.duration_sec:.1f}s")
+            
+            if not snapshot.complete:
+                print(f"⚠️ Crawl incompleto ({snapshot.shards_failed} rangos de precio sin recorrer), se mantiene el universo actual")
+            elif titles:
+                self.scan_universe = titles
+                self.scan_scheduler.set_universe(titles)
+                print(f"✅ Universo de escaneo actualizado: {len(titles)} ítems")
+            else:
+                print("⚠️ Ningún título cumple los filtros, se mantiene el universo actual")
+        except Exception as e:
+            print(f"❌ Error en crawl del mercado: {e}")
+    
     def execute_trade(self, opportunity: Dict[str, Any]):
         """Ejecutar un trade real."""
         item_title = opportunity.get('item_title', 'N/A')
-        buy_price = opportunity.get('buy_price_usd', opportunity.get('entry_price_usd', 0))
-        profit = opportunity.get('expected_profit_usd', 0)
+        buy_price = opportunity_buy_price_usd(opportunity)
+        profit = opportunity_profit_usd(opportunity)
         strategy = opportunity.get('strategy', 'N/A')
         
         print(f"\n🚀 EJECUTANDO TRADE REAL")
@@ -281,6 +343,41 @@ class TradingConsole:
         except Exception as e:
             print(f"❌ Error obteniendo portfolio: {e}")
     
+    def show_connector_metrics(self):
+        """Mostrar peticiones, errores y latencias por endpoint del conector."""
+        print("\n📡 MÉTRICAS DEL CONECTOR DMARKET")
+        print("=" * 60)
+        
+        snapshot = self.api.get_metrics()
+        print(f"📨 Peticiones: {snapshot['requests']} | ❌ Errores: {snapshot['errors']} | "
+              f"📥 Recibido: {snapshot['bytes_received'] / 1024:.1f} KB en {snapshot['elapsed_sec'] / 60:.1f} min")
+        if not snapshot["endpoints"]:
+            print("ℹ️ Aún no se han enviado peticiones")
+            return
+        
+        # Endpoints ordenados por tiempo total consumido
+        endpoints = sorted(
+            snapshot["endpoints"].items(),
+            key=lambda kv: kv[1]["latency"].get("total", {}).get("mean_ms", 0) * kv[1]["requests"],
+            reverse=True
+        )
+        for key, metrics in endpoints:
+            latency = metrics["latency"]
+            network = latency.get("network", {})
+            print(f"\n🔗 {key}")
+            print(f"   Peticiones: {metrics['requests']} | Errores: {metrics['error_count']} | "
+                  f"KB: {metrics['bytes_received'] / 1024:.1f}")
+            print(f"   Red p50/p95/p99: {network.get('p50_ms', 0):.1f} / {network.get('p95_ms', 0):.1f} / "
+                  f"{network.get('p99_ms', 0):.1f} ms")
+            print(f"   Firma p95: {latency.get('sign', {}).get('p95_ms', 0):.2f} ms | "
+                  f"Decodificación p95: {latency.get('decode', {}).get('p95_ms', 0):.2f} ms")
+            if metrics["errors"]:
+                print(f"   Errores: {', '.join(f'{name} x{count}' for name, count in metrics['errors'].items())}")
+        
+        for slow in self.metrics.detect_slowdowns():
+            print(f"\n🐢 {slow['endpoint']} más lento de lo habitual: p95 {slow['window_p95_ms']:.0f}ms "
+                  f"(habitual {slow['baseline_p95_ms']:.0f}ms)")
+    
     def auto_trading_session(self, duration_minutes: int = 30):
         """Sesión de trading automático por tiempo limitado."""
         print(f"\n🤖 SESIÓN DE TRADING AUTOMÁTICO ({duration_minutes} minutos)")
@@ -294,47 +391,47 @@ class TradingConsole:
         
         start_time = datetime.now()
         end_time = start_time + timedelta(minutes=duration_minutes)
-        trades_executed = 0
         
         print(f"🚀 Sesión iniciada - terminará a las {end_time.strftime('%H:%M:%S')}")
+        print("🔄 Pipeline continuo: cada oportunidad se evalúa y ejecuta en cuanto se detecta")
         
-        while datetime.now() < end_time:
-            try:
-                print(f"\n⏰ {datetime.now().strftime('%H:%M:%S')} - Escaneando oportunidades...")
-                
-                # Escanear oportunidades
-                opportunities = self.scan_opportunities(max_items=10)
-                
-                # Ejecutar la mejor oportunidad si existe
-                if opportunities:
-                    best_opp = opportunities[0]
-                    buy_price = best_opp.get('buy_price_usd', 0)
-                    
-                    # Solo ejecutar si es menor a $2 para sesión automática
-                    if buy_price <= 2.0:
-                        print(f"🎯 Ejecutando automáticamente: {best_opp.get('item_title')}")
-                        success = self.execute_trade_auto(best_opp)
-                        if success:
-                            trades_executed += 1
-                            print(f"✅ Trade {trades_executed} completado")
-                        else:
-                            print(f"❌ Trade falló")
-                    else:
-                        print(f"⚠️ Oportunidad muy cara para auto-trade: ${buy_price:.2f}")
-                
-                # Esperar antes del próximo ciclo
-                print("⏳ Esperando 60 segundos...")
-                time.sleep(60)
-                
-            except KeyboardInterrupt:
-                print("\n🛑 Sesión interrumpida por usuario")
-                break
-            except Exception as e:
-                print(f"❌ Error en sesión automática: {e}")
-                time.sleep(30)
+        def on_trade(opportunity: Dict[str, Any], result: Dict[str, Any]) -> None:
+            title = opportunity.get('item_title', 'N/A')
+            if result.get('success'):
+                print(f"✅ {datetime.now().strftime('%H:%M:%S')} Compra ejecutada: {title} "
+                      f"(${opportunity_buy_price_usd(opportunity):.2f}, {opportunity.get('strategy')})")
+            else:
+                print(f"❌ {datetime.now().strftime('%H:%M:%S')} Trade falló: {title} ({result.get('reason', 'desconocido')})")
+        
+        # Solo ítems de hasta $2 en la sesión automática. Carril rápido: la watchlist cada 5s con el 30%
+        # del presupuesto de mercado; carril lento: cada 15s como mínimo, los 50 títulos que elija el planificador
+        pipeline = TradingPipeline(
+            self.strategy_engine,
+            self.risk_manager,
+            self.real_trader,
+            PipelineConfig(max_buy_price_usd=2.0, min_cycle_sec=15.0, scan_batch_size=50,
+                           fast_lane_interval_sec=5.0, fast_lane_share=0.3, slow_lane_share=0.6),
+            on_trade=on_trade,
+            watchlist=self.watchlist
+        )
+        try:
+            stats = pipeline.run(self.scan_universe, duration_sec=duration_minutes * 60)
+        except KeyboardInterrupt:
+            print("\n🛑 Sesión interrumpida por usuario")
+            stats = pipeline.stats
         
         print(f"\n🏁 SESIÓN AUTOMÁTICA COMPLETADA")
-        print(f"📊 Trades ejecutados: {trades_executed}")
+        print(f"🔍 Ítems analizados: {stats.items_analyzed} (carril rápido {stats.fast_lane_items}, "
+              f"lento {stats.slow_lane_items}) | 🎯 Oportunidades: {stats.opportunities_found}")
+        watched = self.watchlist.snapshot()
+        if watched:
+            print("👀 Watchlist: " + ", ".join(f"{entry['title']} ({entry['reason']})" for entry in watched[:5])
+                  + (f" y {len(watched) - 5} más" if len(watched) > 5 else ""))
+        print(f"🛡️ Rechazadas por filtros: {stats.rejected_filters} | por riesgo: {stats.rejected_risk} | "
+              f"caducadas: {stats.discarded_stale}")
+        print(f"📊 Trades ejecutados: {stats.trades_succeeded}/{stats.trades_attempted}")
+        if stats.detection_to_execution_sec:
+            print(f"⚡ Detección → ejecución: media {stats.as_dict()['avg_detection_to_execution_sec']:.2f}s")
         print(f"⏱️ Duración: {(datetime.now() - start_time).total_seconds()/60:.1f} minutos")
     
     def execute_trade_auto(self, opportunity: Dict[str, Any]) -> bool:
@@ -358,10 +455,11 @@ class TradingConsole:
             print("4. 🚀 Ejecutar Trade Manual")
             print("5. 📦 Ver Portfolio")
             print("6. 🤖 Sesión Trading Automático")
-            print("7. ❌ Salir")
+            print("7. 📡 Métricas del Conector")
+            print("8. ❌ Salir")
             
             try:
-                choice = input("\n🎯 Selecciona opción (1-7): ").strip()
+                choice = input("\n🎯 Selecciona opción (1-8): ").strip()
                 
                 if choice == '1':
                     self.show_balance()
@@ -370,6 +468,9 @@ class TradingConsole:
                     self.show_kpis()
                 
                 elif choice == '3':
+                    refresh = input("🌐 ¿Actualizar universo con crawl completo del mercado? (s/N): ").strip().lower()
+                    if refresh == 's':
+                        self.refresh_scan_universe()
                     max_items = input("📊 Máximo ítems a escanear (default 20): ").strip()
                     max_items = int(max_items) if max_items.isdigit() else 20
                     self.scan_opportunities(max_items)
@@ -380,7 +481,7 @@ class TradingConsole:
                         print("\n🎯 Selecciona oportunidad para ejecutar:")
                         for i, opp in enumerate(opportunities[:5], 1):
                             item_title = opp.get('item_title', 'N/A')
-                            profit = opp.get('expected_profit_usd', 0)
+                            profit = opportunity_profit_usd(opp)
                             print(f"{i}. {item_title} (${profit:.2f} profit)")
                         
                         try:
@@ -403,6 +504,10 @@ class TradingConsole:
                     self.auto_trading_session(duration)
                 
                 elif choice == '7':
+                    self.show_connector_metrics()
+                
+                elif choice == '8':
+                    self.scan_scheduler.save()
                     print("👋 ¡Hasta luego! Happy trading!")
                     break
                 
@@ -417,6 +522,7 @@ class TradingConsole:
 
 def main():
     """Función principal."""
+    console = None
     try:
         console = TradingConsole()
         console.run_menu()
@@ -424,6 +530,9 @@ def main():
         print(f"❌ Error crítico: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if console is not None and console.recorder is not None:
+            console.recorder.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file